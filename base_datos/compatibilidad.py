@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - COMPATIBILIDAD DE REPUESTOS
+============================================================================
+Índice de los modelos compatibles de cada repuesto
+(repuestos_compatibilidad), para encontrar los repuestos de un equipo
+por igualdad de marca y modelo normalizados en lugar de buscar con LIKE
+sobre el texto libre de repuestos.modelos_compatibles.
+
+El texto se separa por comas, punto y coma, barras o renglones:
+
+    "Samsung A10, A20 / Motorola G7 Play"
+        -> (samsung, a10), (samsung, a20), (motorola, g7play) y, sin marca,
+           (samsunga10), (samsunga20), (motorolag7play)
+
+Solo se separa como marca una palabra que sea una marca conocida (las
+de los equipos cargados); las palabras anteriores a ella describen el
+repuesto y se descartan ("Pantalla Samsung A10" -> (samsung, a10)). Un
+modelo sin marca hereda la del anterior, así "Samsung A10, A20" da
+(samsung, a20); sin ninguna marca conocida el modelo se indexa entero y
+sin marca ("A10 Lite, A20" -> a10lite y a20). Cada modelo con marca se
+indexa además pegado a ella y sin marca, para los equipos cuyo modelo
+ya la lleva (marca 'Apple', modelo 'iPhone 11' encuentra "iPhone 11").
+
+Al dar de alta un repuesto o cambiar sus modelos, un trigger lo anota en
+repuestos_compatibilidad_pendientes; actualizar_compatibilidad() los
+vuelve a indexar antes de cada búsqueda, así también quedan al día los
+que se cargan por importación o por fuera del sistema.
+============================================================================
+"""
+
+import re
+import unicodedata
+from base_datos.conexion import db
+
+
+# Separadores entre modelos dentro de modelos_compatibles
+SEPARADORES_MODELOS = re.compile(r"[,;/|\n]+")
+
+
+def normalizar(texto):
+    """
+    Normaliza una marca o un modelo para compararlos
+
+    Minúsculas, sin acentos y solo letras y números:
+    'Moto G7-Play' -> 'motog7play'
+
+    Args:
+        texto (str): Marca o modelo
+
+    Returns:
+        str: Texto normalizado ('' si no queda nada)
+    """
+    if not texto:
+        return ""
+    sin_acentos = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode("ascii")
+    return "".join(caracter for caracter in sin_acentos.lower() if caracter.isalnum())
+
+
+def parsear_modelos(texto, marcas=()):
+    """
+    Separa el texto de modelos compatibles en pares (marca, modelo)
+
+    Args:
+        texto (str): modelos_compatibles de un repuesto
+        marcas (set): Marcas conocidas, normalizadas
+
+    Returns:
+        list: Pares (marca_norm, modelo_norm) sin repetir; la marca es ''
+            en los que se indexan sin marca
+    """
+    pares = []
+    marca = ""
+    for parte in SEPARADORES_MODELOS.split(texto or ""):
+        palabras = [normalizar(palabra) for palabra in parte.split()]
+        palabras = [palabra for palabra in palabras if palabra]
+        # La primera marca conocida seguida de un modelo; lo anterior a ella
+        # describe el repuesto ("Pantalla Samsung A10")
+        for posicion, palabra in enumerate(palabras[:-1]):
+            if palabra in marcas:
+                marca, palabras = palabra, palabras[posicion + 1:]
+                break
+        if not palabras:
+            continue
+        modelo = "".join(palabras)
+        if marca:
+            pares.append((marca, modelo))
+        pares.append(("", marca + modelo))
+    return list(dict.fromkeys(par for par in pares if par[1]))
+
+
+def actualizar_compatibilidad(cursor=None):
+    """
+    Vuelve a indexar los repuestos pendientes (nuevos o con modelos cambiados)
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor de la transacción en curso. Si no
+            se indica, se confirma en una transacción propia.
+
+    Returns:
+        int: Repuestos indexados
+    """
+    if cursor is None:
+        # Lo habitual es que no haya pendientes: no abrir una transacción
+        if not db.obtener_uno("SELECT 1 AS hay FROM repuestos_compatibilidad_pendientes LIMIT 1"):
+            return 0
+        with db.transaccion() as cursor_propio:
+            return actualizar_compatibilidad(cursor_propio)
+
+    cursor.execute("""
+        SELECT p.id_repuesto, r.modelos_compatibles
+        FROM repuestos_compatibilidad_pendientes p
+        LEFT JOIN repuestos r ON r.id_repuesto = p.id_repuesto
+    """)
+    pendientes = cursor.fetchall()
+    if not pendientes:
+        return 0
+
+    marcas = {normalizar(marca) for marca, in cursor.execute("SELECT DISTINCT marca FROM equipos")}
+
+    ids = [(id_repuesto,) for id_repuesto, _ in pendientes]
+    cursor.executemany("DELETE FROM repuestos_compatibilidad WHERE id_repuesto = ?", ids)
+    cursor.executemany(
+        "INSERT INTO repuestos_compatibilidad (id_repuesto, marca_norm, modelo_norm) VALUES (?, ?, ?)",
+        [(id_repuesto, marca, modelo)
+         for id_repuesto, texto in pendientes
+         for marca, modelo in parsear_modelos(texto, marcas)]
+    )
+    cursor.executemany("DELETE FROM repuestos_compatibilidad_pendientes WHERE id_repuesto = ?", ids)
+    return len(pendientes)
+
+
+def reconstruir_compatibilidad():
+    """
+    Vuelve a indexar todos los repuestos
+
+    Returns:
+        int: Repuestos indexados
+    """
+    with db.transaccion() as cursor:
+        cursor.execute("""
+            INSERT OR IGNORE INTO repuestos_compatibilidad_pendientes (id_repuesto)
+            SELECT id_repuesto FROM repuestos
+        """)
+        cursor.execute("""
+            DELETE FROM repuestos_compatibilidad
+            WHERE id_repuesto NOT IN (SELECT id_repuesto FROM repuestos)
+        """)
+        return actualizar_compatibilidad(cursor)
+
+
+def repuestos_compatibles(id_equipo, solo_con_stock=True):
+    """
+    Repuestos compatibles con la marca y el modelo de un equipo
+
+    Args:
+        id_equipo (int): ID del equipo
+        solo_con_stock (bool): Solo los que tienen unidades libres
+
+    Returns:
+        list: Repuestos (dict), los del mismo tipo de dispositivo primero
+    """
+    equipo = db.obtener_uno(
+        "SELECT tipo_dispositivo, marca, modelo FROM equipos WHERE id_equipo = ?", (id_equipo,)
+    )
+    if not equipo:
+        return []
+    modelo = normalizar(equipo['modelo'])
+    if not modelo:
+        return []
+
+    actualizar_compatibilidad()
+
+    consulta = """
+    SELECT r.*
+    FROM repuestos r
+    WHERE r.id_repuesto IN (
+        SELECT id_repuesto FROM repuestos_compatibilidad
+        WHERE modelo_norm IN (?, ?) AND marca_norm IN (?, '')
+    )
+    """
+    marca = normalizar(equipo['marca'])
+    parametros = [modelo, marca + modelo, marca]
+    if solo_con_stock:
+        consulta += " AND r.cantidad_disponible > 0"
+    consulta += " ORDER BY r.tipo_dispositivo != ?, r.nombre"
+    parametros.append(equipo['tipo_dispositivo'])
+
+    return db.obtener_todos(consulta, tuple(parametros))
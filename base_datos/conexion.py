@@ -9,8 +9,10 @@ Implementa el patrón Singleton para una única conexión
 """
 
 import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
 from sistema_base.configuracion import config
+from base_datos.eventos import instalar_observadores, extraer_cambios, bus_cambios
 
 
 class ConexionBD:
@@ -53,6 +55,9 @@ class ConexionBD:
                 # Configurar row_factory para obtener resultados como diccionarios
                 self._conexion.row_factory = sqlite3.Row
                 
+                # Anotar los cambios para publicarlos después de cada commit
+                instalar_observadores(self._conexion)
+                
                 config.guardar_log("Conexión a base de datos establecida", "INFO")
                 
             except sqlite3.Error as e:
@@ -94,6 +99,7 @@ class ConexionBD:
                 cursor.execute(consulta)
             
             conexion.commit()
+            self._publicar_cambios()
             return cursor.lastrowid
             
         except sqlite3.Error as e:
@@ -120,6 +126,7 @@ class ConexionBD:
         try:
             cursor.executemany(consulta, lista_parametros)
             conexion.commit()
+            self._publicar_cambios()
             return cursor.rowcount
             
         except sqlite3.Error as e:
@@ -191,6 +198,91 @@ class ConexionBD:
         finally:
             cursor.close()
     
+    @contextmanager
+    def transaccion(self):
+        """
+        Agrupa varias operaciones en una única transacción.
+        
+        Confirma todo al salir del bloque; si ocurre un error deshace
+        todas las operaciones del bloque y relanza la excepción.
+        
+        Uso:
+            with db.transaccion() as cursor:
+                cursor.executemany(...)
+                cursor.execute(...)
+        
+        Yields:
+            sqlite3.Cursor: Cursor de la conexión principal
+        """
+        conexion = self.conectar()
+        cursor = conexion.cursor()
+        
+        try:
+            yield cursor
+            conexion.commit()
+            self._publicar_cambios()
+            
+        except Exception as e:
+            conexion.rollback()
+            config.guardar_log(f"Error en transacción, cambios revertidos: {e}", "ERROR")
+            raise
+        finally:
+            cursor.close()
+    
+    def _publicar_cambios(self):
+        """Publica en bus_cambios los registros modificados por el último commit"""
+        try:
+            eventos = extraer_cambios(self._conexion)
+        except sqlite3.Error as e:
+            config.guardar_log(f"Error al leer cambios pendientes: {e}", "ERROR")
+            return
+        bus_cambios.publicar(eventos)
+    
+    def iterar_consulta(self, consulta, parametros=None, tamano_lote=500):
+        """
+        Ejecuta una consulta SELECT y entrega los resultados de a uno,
+        leyendo del cursor por lotes (no carga todo el resultado en memoria).
+        
+        Usa una conexión de solo lectura propia, de modo que puede
+        recorrerse desde un hilo de trabajo sin bloquear la conexión
+        principal de la aplicación.
+        
+        Args:
+            consulta (str): Consulta SQL a ejecutar
+            parametros (tuple): Parámetros de la consulta
+            tamano_lote (int): Filas leídas del cursor en cada vuelta
+            
+        Yields:
+            dict: Cada registro como diccionario
+        """
+        conexion = sqlite3.connect(
+            f"file:{Path(config.ruta_base_datos).as_posix()}?mode=ro",
+            uri=True,
+            check_same_thread=False
+        )
+        conexion.row_factory = sqlite3.Row
+        cursor = conexion.cursor()
+        
+        try:
+            if parametros:
+                cursor.execute(consulta, parametros)
+            else:
+                cursor.execute(consulta)
+                
+            while True:
+                lote = cursor.fetchmany(tamano_lote)
+                if not lote:
+                    break
+                for row in lote:
+                    yield dict(row)
+                    
+        except sqlite3.Error as e:
+            config.guardar_log(f"Error al recorrer registros: {e}", "ERROR")
+            raise
+        finally:
+            cursor.close()
+            conexion.close()
+    
     def tabla_existe(self, nombre_tabla):
         """
         Verifica si una tabla existe en la base de datos
@@ -8,7 +8,16 @@ Crea todas las tablas necesarias de la base de datos
 """
 
 from base_datos.conexion import db
+from base_datos.eventos import instalar_observadores
+from base_datos.versiones import TABLAS_VERSIONADAS, TIPO_SECUENCIA
+from base_datos.particiones import crear_particiones_auditoria
+from base_datos.saldos_facturas import asignaciones_saldo, recalcular_saldos_facturas
+from base_datos.resumen_clientes import (CONTADORES_CLIENTES, VISITAS_CLIENTES,
+                                         recalcular_resumen_clientes)
+from base_datos.stock import MOVIMIENTO_ENTRADA, MOVIMIENTO_LIBERACION
+from base_datos.compatibilidad import reconstruir_compatibilidad
 from sistema_base.configuracion import config
+from sistema_base.constantes import ID_USUARIO_SISTEMA, USERNAME_SISTEMA
 
 
 def crear_tabla_usuarios():
@@ -27,9 +36,84 @@ def crear_tabla_usuarios():
     )
     """
     db.ejecutar_consulta(sql)
+    crear_usuario_sistema()
     config.guardar_log("Tabla usuarios creada/verificada", "INFO")
 
 
+def crear_usuario_sistema():
+    """
+    Crea el usuario reservado de las tareas automáticas (SESION_SISTEMA)
+    
+    Es inactivo y tiene un hash inválido, así nunca puede iniciar sesión.
+    Su username no pasa la validación de usuarios, así que no choca con
+    ninguna cuenta real. Nunca se modifica una cuenta real: si el ID
+    reservado está ocupado, se registra el conflicto y
+    verificar_usuario_sistema() se lo muestra al admin.
+    """
+    with db.transaccion() as cursor:
+        # Bases anteriores reservaban el username 'sistema'
+        cursor.execute(
+            """
+            UPDATE usuarios SET username = ?
+            WHERE id_usuario = ? AND username = 'sistema' AND password_hash = '!'
+            """,
+            (USERNAME_SISTEMA, ID_USUARIO_SISTEMA)
+        )
+        
+        # y renombraban a 'sistema_<id>' la cuenta real que lo usaba:
+        # se le devuelve su username
+        cursor.execute("SELECT COUNT(*) FROM usuarios WHERE username = 'sistema'")
+        if cursor.fetchone()[0] == 0:
+            cursor.execute(
+                "SELECT id_usuario FROM usuarios WHERE username = 'sistema_' || id_usuario"
+            )
+            renombrado = cursor.fetchone()
+            if renombrado:
+                cursor.execute(
+                    "UPDATE usuarios SET username = 'sistema' WHERE id_usuario = ?",
+                    (renombrado[0],)
+                )
+                config.guardar_log(
+                    f"El usuario ID {renombrado[0]} recupera su username 'sistema'", "WARNING"
+                )
+        
+        cursor.execute(
+            """
+            INSERT OR IGNORE INTO usuarios (id_usuario, nombre, username, password_hash, rol, activo, primer_login)
+            VALUES (?, 'Sistema', ?, '!', 'admin', 0, 0)
+            """,
+            (ID_USUARIO_SISTEMA, USERNAME_SISTEMA)
+        )
+    
+    exito, mensaje = verificar_usuario_sistema()
+    if not exito:
+        config.guardar_log(mensaje, "ERROR")
+
+
+def verificar_usuario_sistema():
+    """
+    Verifica que el ID reservado sea del usuario de las tareas automáticas
+    
+    Returns:
+        tuple: (exito, mensaje) - el mensaje explica el conflicto para el admin
+    """
+    reservado = db.obtener_uno(
+        "SELECT username FROM usuarios WHERE id_usuario = ?", (ID_USUARIO_SISTEMA,)
+    )
+    
+    if reservado is None:
+        return False, f"No existe el usuario reservado para las tareas automáticas (ID {ID_USUARIO_SISTEMA})"
+    
+    if reservado['username'] != USERNAME_SISTEMA:
+        return False, (
+            f"El ID {ID_USUARIO_SISTEMA}, reservado para las tareas automáticas, lo ocupa "
+            f"el usuario '{reservado['username']}'. Las tareas automáticas no se van a poder "
+            f"registrar en la auditoría hasta que ese usuario tenga otro ID."
+        )
+    
+    return True, ""
+
+
 def crear_tabla_clientes():
     """Crea la tabla de clientes"""
     sql = """
@@ -268,6 +352,16 @@ def crear_tabla_facturacion():
     )
     """
     db.ejecutar_consulta(sql)
+    
+    # Número de factura (las facturas anteriores a la numeración quedan sin número)
+    try:
+        db.ejecutar_consulta("ALTER TABLE facturacion ADD COLUMN numero_factura TEXT")
+    except:
+        pass
+    db.ejecutar_consulta(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_facturacion_numero ON facturacion(numero_factura)"
+    )
+    
     config.guardar_log("Tabla facturacion creada/verificada", "INFO")
 
 
@@ -422,13 +516,522 @@ def crear_tabla_backups():
         exitoso BOOLEAN NOT NULL DEFAULT 1,
         mensaje_error TEXT,
         id_usuario INTEGER,
+        descripcion TEXT,
+        verificado BOOLEAN NOT NULL DEFAULT 0,
+        fecha_verificacion DATETIME,
         FOREIGN KEY (id_usuario) REFERENCES usuarios(id_usuario)
     )
     """
     db.ejecutar_consulta(sql)
+    
+    # Agregar columnas si no existen (para bases de datos existentes)
+    try:
+        db.ejecutar_consulta("ALTER TABLE backups ADD COLUMN descripcion TEXT")
+    except:
+        pass
+    
+    try:
+        db.ejecutar_consulta("ALTER TABLE backups ADD COLUMN verificado BOOLEAN NOT NULL DEFAULT 0")
+    except:
+        pass
+    
+    try:
+        db.ejecutar_consulta("ALTER TABLE backups ADD COLUMN fecha_verificacion DATETIME")
+    except:
+        pass
+    
     config.guardar_log("Tabla backups creada/verificada", "INFO")
 
 
+def crear_tabla_secuencias():
+    """Crea la tabla de contadores para numerar facturas y remitos"""
+    sql = """
+    CREATE TABLE IF NOT EXISTS secuencias (
+        tipo TEXT NOT NULL,
+        periodo TEXT NOT NULL,
+        ultimo_valor INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (tipo, periodo)
+    ) WITHOUT ROWID
+    """
+    db.ejecutar_consulta(sql)
+    
+    # Bases existentes: los contadores continúan desde el último número emitido
+    # (R-YYYYMMDD-#### en remitos, F-YYYY-#### en facturas)
+    tablas_numeradas = [
+        ("remito", "remitos", "numero_remito", "substr(numero_remito, 3, 8)", "substr(numero_remito, 12)", "R-%"),
+        ("factura", "facturacion", "numero_factura", "substr(numero_factura, 3, 4)", "substr(numero_factura, 8)", "F-%")
+    ]
+    
+    for tipo, tabla, columna, periodo, valor, patron in tablas_numeradas:
+        try:
+            if not db.tabla_existe(tabla):
+                continue
+            db.ejecutar_consulta(f"""
+                INSERT INTO secuencias (tipo, periodo, ultimo_valor)
+                SELECT ?, {periodo}, MAX(CAST({valor} AS INTEGER))
+                FROM {tabla}
+                WHERE {columna} LIKE ?
+                GROUP BY {periodo}
+                ON CONFLICT(tipo, periodo) DO UPDATE
+                SET ultimo_valor = MAX(ultimo_valor, excluded.ultimo_valor)
+            """, (tipo, patron))
+        except Exception as e:
+            config.guardar_log(f"Error al inicializar secuencia de {tipo}: {e}", "ERROR")
+    
+    config.guardar_log("Tabla secuencias creada/verificada", "INFO")
+
+
+def crear_tabla_importaciones():
+    """Crea la tabla de importaciones masivas (permite retomar una importación cortada)"""
+    sql = """
+    CREATE TABLE IF NOT EXISTS importaciones (
+        id_importacion INTEGER PRIMARY KEY AUTOINCREMENT,
+        entidad TEXT NOT NULL,
+        archivo TEXT NOT NULL,
+        huella_archivo TEXT NOT NULL,
+        filas_procesadas INTEGER NOT NULL DEFAULT 0,
+        filas_importadas INTEGER NOT NULL DEFAULT 0,
+        filas_con_error INTEGER NOT NULL DEFAULT 0,
+        estado TEXT NOT NULL DEFAULT 'En curso'
+            CHECK(estado IN ('En curso', 'Completada', 'Cancelada', 'Error')),
+        fecha_inicio DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        fecha_fin DATETIME,
+        id_usuario INTEGER NOT NULL,
+        FOREIGN KEY (id_usuario) REFERENCES usuarios(id_usuario)
+    )
+    """
+    db.ejecutar_consulta(sql)
+    
+    db.ejecutar_consulta(
+        "CREATE INDEX IF NOT EXISTS idx_importaciones_huella ON importaciones(entidad, huella_archivo)"
+    )
+    config.guardar_log("Tabla importaciones creada/verificada", "INFO")
+
+
+def crear_control_versiones():
+    """
+    Agrega 'version' y 'fecha_modificacion' a las tablas versionadas, la
+    tabla de borrados y los triggers que los mantienen (ver base_datos.versiones)
+    """
+    sql = """
+    CREATE TABLE IF NOT EXISTS registros_eliminados (
+        tabla TEXT NOT NULL,
+        id_registro INTEGER NOT NULL,
+        version INTEGER NOT NULL,
+        fecha_eliminacion DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (tabla, id_registro)
+    ) WITHOUT ROWID
+    """
+    db.ejecutar_consulta(sql)
+    db.ejecutar_consulta(
+        "CREATE INDEX IF NOT EXISTS idx_registros_eliminados_version ON registros_eliminados(tabla, version)"
+    )
+    
+    db.ejecutar_consulta(
+        "INSERT OR IGNORE INTO secuencias (tipo, periodo, ultimo_valor) VALUES (?, '', 0)", (TIPO_SECUENCIA,)
+    )
+    siguiente_version = f"""
+        UPDATE secuencias SET ultimo_valor = ultimo_valor + 1 WHERE tipo = '{TIPO_SECUENCIA}' AND periodo = '';
+    """
+    version = f"(SELECT ultimo_valor FROM secuencias WHERE tipo = '{TIPO_SECUENCIA}' AND periodo = '')"
+    
+    for tabla, clave in TABLAS_VERSIONADAS.items():
+        # Agregar columnas si no existen (las filas anteriores quedan en la versión 0)
+        try:
+            db.ejecutar_consulta(f"ALTER TABLE {tabla} ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        except:
+            pass
+        
+        try:
+            db.ejecutar_consulta(f"ALTER TABLE {tabla} ADD COLUMN fecha_modificacion DATETIME")
+            db.ejecutar_consulta(f"UPDATE {tabla} SET fecha_modificacion = CURRENT_TIMESTAMP")
+        except:
+            pass
+        
+        db.ejecutar_consulta(f"CREATE INDEX IF NOT EXISTS idx_{tabla}_version ON {tabla}(version)")
+        
+        marcar_fila = f"""
+            UPDATE {tabla} SET version = {version}, fecha_modificacion = CURRENT_TIMESTAMP
+            WHERE {clave} = NEW.{clave};
+        """
+        db.ejecutar_consulta(f"""
+            CREATE TRIGGER IF NOT EXISTS version_{tabla}_insert AFTER INSERT ON {tabla}
+            BEGIN {siguiente_version} {marcar_fila} END
+        """)
+        # Si la escritura ya cambió 'version' es la del trigger de arriba: no volver a contar
+        db.ejecutar_consulta(f"""
+            CREATE TRIGGER IF NOT EXISTS version_{tabla}_update AFTER UPDATE ON {tabla}
+            WHEN NEW.version IS OLD.version
+            BEGIN {siguiente_version} {marcar_fila} END
+        """)
+        db.ejecutar_consulta(f"""
+            CREATE TRIGGER IF NOT EXISTS version_{tabla}_delete AFTER DELETE ON {tabla}
+            BEGIN
+                {siguiente_version}
+                INSERT OR REPLACE INTO registros_eliminados (tabla, id_registro, version)
+                VALUES ('{tabla}', OLD.{clave}, {version});
+            END
+        """)
+    
+    # Relaciones que recorren las consultas de cambios de los listados
+    # (un cliente renombrado cambia las filas de sus equipos, órdenes y presupuestos)
+    for indice, tabla, columna in [
+        ("idx_equipos_cliente", "equipos", "id_cliente"),
+        ("idx_presupuestos_equipo", "presupuestos", "id_equipo"),
+        ("idx_ordenes_trabajo_equipo", "ordenes_trabajo", "id_equipo"),
+        ("idx_ordenes_trabajo_tecnico", "ordenes_trabajo", "id_tecnico"),
+    ]:
+        db.ejecutar_consulta(f"CREATE INDEX IF NOT EXISTS {indice} ON {tabla}({columna})")
+    
+    config.guardar_log("Control de versiones de datos creado/verificado", "INFO")
+
+
+def crear_saldos_facturas():
+    """
+    Imputa cada pago a su factura (pagos.id_factura) y crea los triggers
+    que mantienen lo pagado y lo adeudado (ver base_datos.saldos_facturas)
+    """
+    columna_nueva = False
+    try:
+        db.ejecutar_consulta("ALTER TABLE pagos ADD COLUMN id_factura INTEGER REFERENCES facturacion(id_factura)")
+        columna_nueva = True
+    except:
+        pass
+    
+    # Pagos ya cargados: a la última factura de su orden (antes de los triggers)
+    if columna_nueva:
+        db.ejecutar_consulta("""
+            UPDATE pagos SET id_factura = (
+                SELECT MAX(f.id_factura) FROM facturacion f WHERE f.id_orden = pagos.id_orden
+            )
+        """)
+    
+    db.ejecutar_consulta("CREATE INDEX IF NOT EXISTS idx_pagos_factura ON pagos(id_factura)")
+    db.ejecutar_consulta("CREATE INDEX IF NOT EXISTS idx_pagos_orden ON pagos(id_orden)")
+    db.ejecutar_consulta("CREATE INDEX IF NOT EXISTS idx_facturacion_orden ON facturacion(id_orden)")
+    # Cuentas por cobrar: por estado y ordenadas por lo adeudado
+    db.ejecutar_consulta(
+        "CREATE INDEX IF NOT EXISTS idx_facturacion_cobro ON facturacion(estado_cobro, monto_adeudado)"
+    )
+    
+    db.ejecutar_consulta(f"""
+        CREATE TRIGGER IF NOT EXISTS saldo_pago_insert AFTER INSERT ON pagos
+        WHEN NEW.id_factura IS NOT NULL
+        BEGIN
+            UPDATE facturacion SET {asignaciones_saldo("monto_pagado + NEW.monto")}
+            WHERE id_factura = NEW.id_factura;
+        END
+    """)
+    # Sin factura: la última de la orden (el UPDATE dispara saldo_pago_update)
+    db.ejecutar_consulta("""
+        CREATE TRIGGER IF NOT EXISTS saldo_pago_imputar AFTER INSERT ON pagos
+        WHEN NEW.id_factura IS NULL
+        BEGIN
+            UPDATE pagos SET id_factura = (
+                SELECT MAX(id_factura) FROM facturacion WHERE id_orden = NEW.id_orden
+            )
+            WHERE id_pago = NEW.id_pago;
+        END
+    """)
+    db.ejecutar_consulta(f"""
+        CREATE TRIGGER IF NOT EXISTS saldo_pago_delete AFTER DELETE ON pagos
+        WHEN OLD.id_factura IS NOT NULL
+        BEGIN
+            UPDATE facturacion SET {asignaciones_saldo("monto_pagado - OLD.monto")}
+            WHERE id_factura = OLD.id_factura;
+        END
+    """)
+    db.ejecutar_consulta(f"""
+        CREATE TRIGGER IF NOT EXISTS saldo_pago_update AFTER UPDATE OF monto, id_factura ON pagos
+        WHEN OLD.monto != NEW.monto OR OLD.id_factura IS NOT NEW.id_factura
+        BEGIN
+            UPDATE facturacion SET {asignaciones_saldo("monto_pagado - OLD.monto")}
+            WHERE id_factura = OLD.id_factura;
+            UPDATE facturacion SET {asignaciones_saldo("monto_pagado + NEW.monto")}
+            WHERE id_factura = NEW.id_factura;
+        END
+    """)
+    # Anticipos: los pagos de la orden que todavía no tenían factura
+    db.ejecutar_consulta("""
+        CREATE TRIGGER IF NOT EXISTS saldo_factura_insert AFTER INSERT ON facturacion
+        BEGIN
+            UPDATE pagos SET id_factura = NEW.id_factura
+            WHERE id_orden = NEW.id_orden AND id_factura IS NULL;
+        END
+    """)
+    db.ejecutar_consulta(f"""
+        CREATE TRIGGER IF NOT EXISTS saldo_factura_total AFTER UPDATE OF monto_total ON facturacion
+        WHEN OLD.monto_total != NEW.monto_total
+        BEGIN
+            UPDATE facturacion SET {asignaciones_saldo("monto_pagado")}
+            WHERE id_factura = NEW.id_factura;
+        END
+    """)
+    
+    # Bases existentes: alinear las facturas con los pagos recién imputados
+    if columna_nueva:
+        recalcular_saldos_facturas()
+    
+    config.guardar_log("Saldos de facturas creados/verificados", "INFO")
+
+
+def crear_resumen_clientes():
+    """
+    Agrega a clientes los contadores de base_datos.resumen_clientes, sus
+    índices y los triggers que los mantienen
+    """
+    columnas_nuevas = False
+    for columna, (_, _, _, decimales) in CONTADORES_CLIENTES.items():
+        tipo = "INTEGER" if decimales is None else "REAL"
+        try:
+            db.ejecutar_consulta(f"ALTER TABLE clientes ADD COLUMN {columna} {tipo} NOT NULL DEFAULT 0")
+            columnas_nuevas = True
+        except:
+            pass
+    
+    try:
+        db.ejecutar_consulta("ALTER TABLE clientes ADD COLUMN fecha_ultima_visita DATETIME")
+        columnas_nuevas = True
+    except:
+        pass
+    
+    # Ordenar y filtrar el listado por deuda o actividad
+    db.ejecutar_consulta("CREATE INDEX IF NOT EXISTS idx_clientes_saldo ON clientes(saldo_adeudado)")
+    db.ejecutar_consulta("CREATE INDEX IF NOT EXISTS idx_clientes_ultima_visita ON clientes(fecha_ultima_visita)")
+    
+    # Para recalcular (y para el detalle del cliente)
+    for tabla in ("ordenes_trabajo", "facturacion", "pagos"):
+        db.ejecutar_consulta(f"CREATE INDEX IF NOT EXISTS idx_{tabla}_cliente ON {tabla}(id_cliente)")
+    
+    # Los triggers se vuelven a crear: si cambió un aporte, hay que recalcular
+    consulta_triggers = "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'resumen_%'"
+    triggers_anteriores = {fila['name']: fila['sql'] for fila in db.obtener_todos(consulta_triggers)}
+    for nombre in triggers_anteriores:
+        db.ejecutar_consulta(f"DROP TRIGGER IF EXISTS {nombre}")
+    
+    for columna, (tabla, aporte, cambian, decimales) in CONTADORES_CLIENTES.items():
+        nuevo, anterior = aporte.format(f="NEW"), aporte.format(f="OLD")
+        
+        def sumar(expresion):
+            return expresion if decimales is None else f"ROUND({expresion}, {decimales})"
+        
+        db.ejecutar_consulta(f"""
+            CREATE TRIGGER IF NOT EXISTS resumen_{columna}_insert AFTER INSERT ON {tabla}
+            WHEN {nuevo} != 0
+            BEGIN
+                UPDATE clientes SET {columna} = {sumar(f"{columna} + {nuevo}")}
+                WHERE id_cliente = NEW.id_cliente;
+            END
+        """)
+        db.ejecutar_consulta(f"""
+            CREATE TRIGGER IF NOT EXISTS resumen_{columna}_delete AFTER DELETE ON {tabla}
+            WHEN {anterior} != 0
+            BEGIN
+                UPDATE clientes SET {columna} = {sumar(f"{columna} - {anterior}")}
+                WHERE id_cliente = OLD.id_cliente;
+            END
+        """)
+        # Un solo UPDATE aunque la fila cambie de cliente
+        db.ejecutar_consulta(f"""
+            CREATE TRIGGER IF NOT EXISTS resumen_{columna}_update
+            AFTER UPDATE OF {', '.join(cambian)}, id_cliente ON {tabla}
+            WHEN {anterior} IS NOT {nuevo} OR OLD.id_cliente != NEW.id_cliente
+            BEGIN
+                UPDATE clientes SET {columna} = {sumar(
+                    f"{columna} + (CASE WHEN id_cliente = NEW.id_cliente THEN {nuevo} ELSE 0 END)"
+                    f" - (CASE WHEN id_cliente = OLD.id_cliente THEN {anterior} ELSE 0 END)"
+                )}
+                WHERE id_cliente IN (OLD.id_cliente, NEW.id_cliente);
+            END
+        """)
+    
+    # La última visita solo avanza (al borrar, recalcular_resumen_clientes)
+    for tabla, fecha in VISITAS_CLIENTES.items():
+        for operacion, evento in (("insert", "INSERT"), ("update", f"UPDATE OF {fecha}, id_cliente")):
+            db.ejecutar_consulta(f"""
+                CREATE TRIGGER IF NOT EXISTS resumen_visita_{tabla}_{operacion} AFTER {evento} ON {tabla}
+                BEGIN
+                    UPDATE clientes SET fecha_ultima_visita = NEW.{fecha}
+                    WHERE id_cliente = NEW.id_cliente
+                      AND (fecha_ultima_visita IS NULL OR fecha_ultima_visita < NEW.{fecha});
+                END
+            """)
+    
+    # Bases existentes: calcular los contadores de los datos que ya tienen
+    triggers = {fila['name']: fila['sql'] for fila in db.obtener_todos(consulta_triggers)}
+    if columnas_nuevas or triggers != triggers_anteriores:
+        recalcular_resumen_clientes()
+    
+    config.guardar_log("Contadores de clientes creados/verificados", "INFO")
+
+
+def crear_movimientos_stock():
+    """
+    Agrega a repuestos lo reservado y crea el libro de movimientos, las
+    reservas por orden y sus triggers (ver base_datos.stock)
+    """
+    columna_nueva = False
+    try:
+        db.ejecutar_consulta(
+            "ALTER TABLE repuestos ADD COLUMN cantidad_reservada INTEGER NOT NULL DEFAULT 0 "
+            "CHECK(cantidad_reservada >= 0)"
+        )
+        columna_nueva = True
+    except:
+        pass
+    
+    # id_orden sin FOREIGN KEY: las órdenes se archivan y el libro queda
+    db.ejecutar_consulta("""
+    CREATE TABLE IF NOT EXISTS movimientos_stock (
+        id_movimiento INTEGER PRIMARY KEY AUTOINCREMENT,
+        id_repuesto INTEGER NOT NULL,
+        tipo TEXT NOT NULL,
+        cantidad INTEGER NOT NULL,
+        delta_disponible INTEGER NOT NULL DEFAULT 0,
+        delta_reservado INTEGER NOT NULL DEFAULT 0,
+        id_orden INTEGER,
+        fecha DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        id_usuario INTEGER,
+        motivo TEXT,
+        FOREIGN KEY (id_repuesto) REFERENCES repuestos(id_repuesto)
+    )
+    """)
+    db.ejecutar_consulta(
+        "CREATE INDEX IF NOT EXISTS idx_movimientos_stock_repuesto ON movimientos_stock(id_repuesto, fecha)"
+    )
+    db.ejecutar_consulta("CREATE INDEX IF NOT EXISTS idx_movimientos_stock_orden ON movimientos_stock(id_orden)")
+    
+    db.ejecutar_consulta("""
+    CREATE TABLE IF NOT EXISTS reservas_repuestos (
+        id_reserva INTEGER PRIMARY KEY AUTOINCREMENT,
+        id_orden INTEGER NOT NULL,
+        id_repuesto INTEGER NOT NULL,
+        cantidad INTEGER NOT NULL CHECK(cantidad >= 0),
+        fecha_reserva DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        id_usuario INTEGER,
+        UNIQUE (id_orden, id_repuesto),
+        FOREIGN KEY (id_repuesto) REFERENCES repuestos(id_repuesto)
+    )
+    """)
+    db.ejecutar_consulta(
+        "CREATE INDEX IF NOT EXISTS idx_reservas_repuestos_repuesto ON reservas_repuestos(id_repuesto)"
+    )
+    
+    # Último resguardo para lo que actualice el saldo sin pasar por el libro
+    db.ejecutar_consulta("""
+        CREATE TRIGGER IF NOT EXISTS stock_no_negativo BEFORE UPDATE OF cantidad_disponible ON repuestos
+        WHEN NEW.cantidad_disponible < 0
+        BEGIN
+            SELECT RAISE(ABORT, 'Stock insuficiente');
+        END
+    """)
+    # La cantidad con la que se da de alta un repuesto entra al libro
+    db.ejecutar_consulta(f"""
+        CREATE TRIGGER IF NOT EXISTS stock_repuesto_alta AFTER INSERT ON repuestos
+        WHEN NEW.cantidad_disponible != 0
+        BEGIN
+            INSERT INTO movimientos_stock (
+                id_repuesto, tipo, cantidad, delta_disponible, fecha, motivo
+            )
+            VALUES (
+                NEW.id_repuesto, '{MOVIMIENTO_ENTRADA}', NEW.cantidad_disponible,
+                NEW.cantidad_disponible, NEW.fecha_ingreso, 'Alta del repuesto'
+            );
+        END
+    """)
+    # Una orden finalizada ya no retiene repuestos
+    db.ejecutar_consulta(f"""
+        CREATE TRIGGER IF NOT EXISTS stock_liberar_orden AFTER UPDATE OF estado ON ordenes_trabajo
+        WHEN NEW.estado LIKE 'Finalizad%' AND OLD.estado NOT LIKE 'Finalizad%'
+        BEGIN
+            INSERT INTO movimientos_stock (
+                id_repuesto, tipo, cantidad, delta_disponible, delta_reservado,
+                id_orden, fecha, motivo
+            )
+            SELECT id_repuesto, '{MOVIMIENTO_LIBERACION}', cantidad, cantidad, -cantidad,
+                   NEW.id_orden, CURRENT_TIMESTAMP, 'Orden finalizada'
+            FROM reservas_repuestos WHERE id_orden = NEW.id_orden AND cantidad > 0;
+            
+            UPDATE repuestos SET
+                cantidad_disponible = cantidad_disponible + (
+                    SELECT rr.cantidad FROM reservas_repuestos rr
+                    WHERE rr.id_orden = NEW.id_orden AND rr.id_repuesto = repuestos.id_repuesto
+                ),
+                cantidad_reservada = cantidad_reservada - (
+                    SELECT rr.cantidad FROM reservas_repuestos rr
+                    WHERE rr.id_orden = NEW.id_orden AND rr.id_repuesto = repuestos.id_repuesto
+                )
+            WHERE id_repuesto IN (SELECT id_repuesto FROM reservas_repuestos WHERE id_orden = NEW.id_orden);
+            
+            DELETE FROM reservas_repuestos WHERE id_orden = NEW.id_orden;
+        END
+    """)
+    
+    # Bases existentes: el stock que ya tenían es el saldo inicial del libro
+    if columna_nueva:
+        db.ejecutar_consulta(f"""
+            INSERT INTO movimientos_stock (id_repuesto, tipo, cantidad, delta_disponible, fecha, motivo)
+            SELECT id_repuesto, '{MOVIMIENTO_ENTRADA}', cantidad_disponible, cantidad_disponible,
+                   CURRENT_TIMESTAMP, 'Saldo inicial'
+            FROM repuestos
+            WHERE cantidad_disponible != 0
+              AND id_repuesto NOT IN (SELECT id_repuesto FROM movimientos_stock)
+        """)
+    
+    config.guardar_log("Movimientos de stock creados/verificados", "INFO")
+
+
+def crear_compatibilidad_repuestos():
+    """
+    Crea el índice de modelos compatibles de los repuestos y los triggers
+    que anotan los que hay que volver a indexar (ver base_datos.compatibilidad)
+    """
+    tabla_nueva = not db.obtener_uno(
+        "SELECT 1 AS existe FROM sqlite_master WHERE type = 'table' AND name = 'repuestos_compatibilidad'"
+    )
+    
+    db.ejecutar_consulta("""
+    CREATE TABLE IF NOT EXISTS repuestos_compatibilidad (
+        id_repuesto INTEGER NOT NULL,
+        marca_norm TEXT NOT NULL DEFAULT '',
+        modelo_norm TEXT NOT NULL,
+        PRIMARY KEY (modelo_norm, marca_norm, id_repuesto),
+        FOREIGN KEY (id_repuesto) REFERENCES repuestos(id_repuesto)
+    ) WITHOUT ROWID
+    """)
+    db.ejecutar_consulta(
+        "CREATE INDEX IF NOT EXISTS idx_repuestos_compatibilidad_repuesto ON repuestos_compatibilidad(id_repuesto)"
+    )
+    db.ejecutar_consulta("""
+    CREATE TABLE IF NOT EXISTS repuestos_compatibilidad_pendientes (
+        id_repuesto INTEGER PRIMARY KEY
+    )
+    """)
+    
+    for operacion, evento in (("insert", "INSERT"), ("update", "UPDATE OF modelos_compatibles")):
+        db.ejecutar_consulta(f"""
+            CREATE TRIGGER IF NOT EXISTS compatibilidad_repuesto_{operacion} AFTER {evento} ON repuestos
+            BEGIN
+                INSERT OR IGNORE INTO repuestos_compatibilidad_pendientes (id_repuesto)
+                VALUES (NEW.id_repuesto);
+            END
+        """)
+    db.ejecutar_consulta("""
+        CREATE TRIGGER IF NOT EXISTS compatibilidad_repuesto_delete AFTER DELETE ON repuestos
+        BEGIN
+            DELETE FROM repuestos_compatibilidad WHERE id_repuesto = OLD.id_repuesto;
+            DELETE FROM repuestos_compatibilidad_pendientes WHERE id_repuesto = OLD.id_repuesto;
+        END
+    """)
+    
+    # Bases existentes: indexar los modelos que ya tienen cargados. En la
+    # v12 y la v13 cambió cómo se separa la marca del modelo: volver a indexar
+    if tabla_nueva or obtener_version_esquema() < 13:
+        reconstruir_compatibilidad()
+    
+    config.guardar_log("Compatibilidad de repuestos creada/verificada", "INFO")
+
+
 def crear_tabla_configuracion():
     """Crea la tabla de configuración del sistema"""
     sql = """
@@ -457,6 +1060,53 @@ def crear_tabla_configuracion():
     )
     """
     db.ejecutar_consulta(sql)
+    
+    # Agregar columnas si no existen (para bases de datos existentes)
+    try:
+        db.ejecutar_consulta("ALTER TABLE configuracion_sistema ADD COLUMN impresora_termica_tipo TEXT")
+    except:
+        pass
+    
+    try:
+        db.ejecutar_consulta("ALTER TABLE configuracion_sistema ADD COLUMN impresora_termica_destino TEXT")
+    except:
+        pass
+    
+    try:
+        db.ejecutar_consulta("ALTER TABLE configuracion_sistema ADD COLUMN ancho_papel_ticket INTEGER NOT NULL DEFAULT 80")
+    except:
+        pass
+    
+    try:
+        db.ejecutar_consulta("ALTER TABLE configuracion_sistema ADD COLUMN costo_bcrypt INTEGER")
+    except:
+        pass
+    
+    try:
+        db.ejecutar_consulta("ALTER TABLE configuracion_sistema ADD COLUMN latencia_objetivo_login_ms INTEGER NOT NULL DEFAULT 250")
+    except:
+        pass
+    
+    try:
+        db.ejecutar_consulta("ALTER TABLE configuracion_sistema ADD COLUMN maximo_ventanas_abiertas INTEGER NOT NULL DEFAULT 6")
+    except:
+        pass
+    
+    try:
+        db.ejecutar_consulta("ALTER TABLE configuracion_sistema ADD COLUMN memoria_maxima_ventanas_mb INTEGER NOT NULL DEFAULT 0")
+    except:
+        pass
+    
+    try:
+        db.ejecutar_consulta("ALTER TABLE configuracion_sistema ADD COLUMN archivo_anios_antiguedad INTEGER NOT NULL DEFAULT 2")
+    except:
+        pass
+    
+    try:
+        db.ejecutar_consulta("ALTER TABLE configuracion_sistema ADD COLUMN auditoria_meses_retencion INTEGER NOT NULL DEFAULT 0")
+    except:
+        pass
+    
     config.guardar_log("Tabla configuracion_sistema creada/verificada", "INFO")
 
 
@@ -485,11 +1135,41 @@ def insertar_configuracion_inicial():
         config.guardar_log(f"Error al insertar configuración inicial: {e}", "ERROR")
 
 
-def inicializar_base_datos():
+# Versión del esquema, guardada en PRAGMA user_version de la base.
+# Subirla cada vez que se agrega una tabla, columna, índice o trigger: si la
+# base ya está en esta versión, el arranque no vuelve a recorrer la
+# creación de tablas (una sola lectura en lugar de decenas de sentencias).
+VERSION_ESQUEMA = 13
+
+
+def obtener_version_esquema():
+    """
+    Lee la versión del esquema de la base de datos
+    
+    Returns:
+        int: Versión guardada (0 en una base nueva o anterior al versionado)
+    """
+    resultado = db.obtener_uno("PRAGMA user_version")
+    return resultado['user_version'] if resultado else 0
+
+
+def inicializar_base_datos(forzar=False):
     """
     Inicializa la base de datos creando todas las tablas necesarias
+    
+    Args:
+        forzar (bool): Recorrer la creación aunque el esquema esté al día
+        
+    Returns:
+        bool: True si se crearon/verificaron las tablas, False si el
+            esquema ya estaba al día
     """
     try:
+        version = obtener_version_esquema()
+        
+        if not forzar and version >= VERSION_ESQUEMA:
+            return False
+        
         print("    → Creando/verificando tablas...")
         
         # Crear tablas en orden (respetando foreign keys)
@@ -509,13 +1189,28 @@ def inicializar_base_datos():
         crear_tabla_logs_sistema()
         crear_tabla_historial_notas()
         crear_tabla_backups()
+        crear_tabla_secuencias()
+        crear_tabla_importaciones()
         crear_tabla_configuracion()
+        crear_control_versiones()
+        crear_particiones_auditoria()
+        crear_saldos_facturas()
+        crear_resumen_clientes()
+        crear_movimientos_stock()
+        crear_compatibilidad_repuestos()
         
         # Insertar datos iniciales
         insertar_configuracion_inicial()
         
+        # Observar también las tablas recién creadas (ver base_datos.eventos)
+        instalar_observadores(db.conectar())
+        
+        if version < VERSION_ESQUEMA:
+            db.ejecutar_consulta(f"PRAGMA user_version = {VERSION_ESQUEMA}")
+        
         print("    ✓ Base de datos inicializada correctamente")
-        config.guardar_log("Base de datos inicializada correctamente", "INFO")
+        config.guardar_log(f"Base de datos inicializada correctamente (esquema v{VERSION_ESQUEMA})", "INFO")
+        return True
         
     except Exception as e:
         print(f"    ✗ Error al inicializar base de datos: {e}")
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - EVENTOS DE CAMBIO DE DATOS
+============================================================================
+Avisa a las ventanas abiertas qué registros cambiaron, para que
+actualicen solo esas filas en lugar de recargar todo.
+
+Triggers temporales (solo existen en la conexión de la aplicación)
+anotan cada INSERT/UPDATE/DELETE de las tablas observadas en
+temp.cambios_pendientes. Después de cada commit, ConexionBD lee esas
+anotaciones y las publica en bus_cambios como EventoCambio. Si la
+transacción se deshace, las anotaciones se deshacen con ella.
+
+    bus_cambios.suscribir(funcion, tablas=("equipos",))
+    funcion([EventoCambio("equipos", 15, "UPDATE"), ...])
+
+Cuando una tabla tuvo demasiados cambios juntos (importaciones,
+restauraciones) se publica un único evento con id_registro None: la
+ventana debe recargar todo.
+============================================================================
+"""
+
+import threading
+import weakref
+from collections import namedtuple
+
+from sistema_base.configuracion import config
+
+
+EventoCambio = namedtuple("EventoCambio", ["tabla", "id_registro", "operacion"])
+
+# Tabla observada -> columna de su clave primaria
+TABLAS_OBSERVADAS = {
+    "clientes": "id_cliente",
+    "equipos": "id_equipo",
+    "presupuestos": "id_presupuesto",
+    "ordenes_trabajo": "id_orden",
+    "repuestos": "id_repuesto",
+    "repuestos_usados": "id_uso",
+    "pagos": "id_pago",
+    "facturacion": "id_factura",
+    "garantias": "id_garantia",
+    "remitos": "id_remito",
+    "comprobantes_entrega": "id_comprobante",
+    "equipos_abandonados": "id_abandonado",
+    "usuarios": "id_usuario",
+    "backups": "id_backup",
+}
+
+# Cambios de una tabla a partir de los cuales se pide recargar todo
+MAXIMO_CAMBIOS_POR_TABLA = 200
+
+
+def instalar_observadores(conexion):
+    """
+    Crea los triggers temporales sobre las tablas observadas que existan
+
+    Se puede llamar de nuevo después de crear tablas (inicializar_base_datos).
+
+    Args:
+        conexion (sqlite3.Connection): Conexión de la aplicación
+    """
+    conexion.execute("PRAGMA temp_store = MEMORY")
+    conexion.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS cambios_pendientes (
+            tabla TEXT NOT NULL,
+            id_registro INTEGER,
+            operacion TEXT NOT NULL
+        )
+    """)
+
+    existentes = {fila[0] for fila in conexion.execute("SELECT name FROM main.sqlite_master WHERE type = 'table'")}
+    for tabla, clave in TABLAS_OBSERVADAS.items():
+        if tabla not in existentes:
+            continue
+        for operacion, fila in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            conexion.execute(f"""
+                CREATE TEMP TRIGGER IF NOT EXISTS observar_{tabla}_{operacion.lower()}
+                AFTER {operacion} ON main.{tabla}
+                BEGIN
+                    INSERT INTO cambios_pendientes VALUES ('{tabla}', {fila}.{clave}, '{operacion}');
+                END
+            """)
+    conexion.commit()
+
+
+def extraer_cambios(conexion):
+    """
+    Lee y borra las anotaciones de cambios ya confirmados
+
+    Returns:
+        list: EventoCambio, uno por registro y operación
+    """
+    filas = conexion.execute(
+        "SELECT DISTINCT tabla, id_registro, operacion FROM cambios_pendientes ORDER BY rowid"
+    ).fetchall()
+    if not filas:
+        return []
+    conexion.execute("DELETE FROM cambios_pendientes")
+    conexion.commit()
+
+    por_tabla = {}
+    for tabla, id_registro, operacion in filas:
+        por_tabla.setdefault(tabla, []).append(EventoCambio(tabla, id_registro, operacion))
+
+    eventos = []
+    for tabla, cambios in por_tabla.items():
+        if len(cambios) > MAXIMO_CAMBIOS_POR_TABLA:
+            eventos.append(EventoCambio(tabla, None, None))
+        else:
+            eventos.extend(cambios)
+    return eventos
+
+
+class BusCambios:
+    """
+    Publicación y suscripción de EventoCambio dentro del proceso
+
+    Los suscriptores se guardan como referencias débiles: una ventana
+    cerrada deja de recibir eventos sin tener que desuscribirse. Se los
+    llama en el hilo que hizo el commit (ver ReceptorCambios para la
+    interfaz).
+    """
+
+    def __init__(self):
+        self._suscriptores = []    # (referencia débil, tablas o None)
+        self._candado = threading.Lock()
+
+    def suscribir(self, funcion, tablas=None):
+        """
+        Registra una función que recibe la lista de eventos de cada commit
+
+        Args:
+            funcion (callable): Recibe list[EventoCambio]
+            tablas (iterable): Solo eventos de estas tablas (None = todas)
+        """
+        referencia = weakref.WeakMethod(funcion) if hasattr(funcion, "__self__") else weakref.ref(funcion)
+        with self._candado:
+            self._suscriptores.append((referencia, frozenset(tablas) if tablas else None))
+
+    def desuscribir(self, funcion):
+        """Quita una función registrada con suscribir()"""
+        with self._candado:
+            self._suscriptores = [(r, t) for r, t in self._suscriptores if r() not in (None, funcion)]
+
+    def publicar(self, eventos):
+        """
+        Entrega los eventos a cada suscriptor interesado
+
+        Args:
+            eventos (list): EventoCambio a publicar
+        """
+        if not eventos:
+            return
+        with self._candado:
+            suscriptores = list(self._suscriptores)
+
+        for referencia, tablas in suscriptores:
+            funcion = referencia()
+            if funcion is None:
+                self.desuscribir(None)
+                continue
+            interesantes = eventos if tablas is None else [e for e in eventos if e.tabla in tablas]
+            if not interesantes:
+                continue
+            try:
+                funcion(interesantes)
+            except RuntimeError:
+                # Objeto de Qt ya destruido
+                self.desuscribir(funcion)
+            except Exception as e:
+                config.guardar_log(f"Error al notificar cambios: {e}", "ERROR")
+
+
+# ============================================================================
+# Instancia global del bus
+# ============================================================================
+bus_cambios = BusCambios()
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - PARTICIONES DEL LOG DE AUDITORÍA
+============================================================================
+El log de auditoría se guarda por mes. Todas las escrituras van a
+logs_sistema, que conserva solo el mes en curso. rotar_auditoria() pasa
+cada mes cerrado a su propia tabla (logs_sistema_AAAA_MM, con los
+mismos índices), así que borrar meses viejos es un DROP TABLE y no un
+DELETE fila por fila.
+
+La vista 'auditoria' une logs_sistema con todas las particiones. Usa los
+nombres de columna de ModuloAuditoria: id_auditoria, motivo y
+es_critica. Las consultas por rango de fechas no pasan por la vista:
+consulta_auditoria() y fuente_auditoria() leen solo los meses del rango.
+============================================================================
+"""
+
+from datetime import datetime
+from base_datos.conexion import db
+from sistema_base.configuracion import config
+
+
+TABLA_ACTUAL = "logs_sistema"
+PREFIJO_PARTICION = "logs_sistema_"
+VISTA = "auditoria"
+
+# Columnas de logs_sistema que en la vista tienen otro nombre
+ALIAS_VISTA = {
+    "id_log": "id_auditoria",
+    "motivo_modificacion": "motivo",
+    "es_accion_critica": "es_critica",
+}
+
+# Índices de cada partición (y de logs_sistema): sufijo -> columnas
+INDICES = {
+    "fecha": "fecha_hora",
+    "usuario": "id_usuario, fecha_hora",
+    "registro": "modulo, id_registro",
+}
+
+# Columnas de cada tabla (se vuelven a leer al rehacer la vista)
+_columnas_particion = {}
+
+
+def _mes(valor):
+    """'AAAA_MM' de una fecha, datetime o texto que empiece con AAAA-MM"""
+    return str(valor)[:7].replace("-", "_")
+
+
+def _columnas(tabla):
+    if tabla not in _columnas_particion:
+        _columnas_particion[tabla] = [fila['name'] for fila in db.obtener_todos(f"PRAGMA table_info({tabla})")]
+    return _columnas_particion[tabla]
+
+
+def listar_particiones():
+    """
+    Particiones mensuales existentes
+
+    Returns:
+        list: Nombres de tabla, del mes más nuevo al más viejo
+    """
+    filas = db.obtener_todos(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ? ORDER BY name DESC",
+        (f"{PREFIJO_PARTICION}[0-9][0-9][0-9][0-9]_[0-9][0-9]",)
+    )
+    return [fila['name'] for fila in filas]
+
+
+def particiones_auditoria(fecha_desde=None, fecha_hasta=None):
+    """
+    Tablas que pueden tener registros del rango, de la más nueva a la más vieja
+
+    logs_sistema va siempre: tiene el mes en curso y lo que todavía no se rotó.
+
+    Args:
+        fecha_desde: Fecha desde (None = sin límite)
+        fecha_hasta: Fecha hasta (None = sin límite)
+
+    Returns:
+        list: Nombres de tabla
+    """
+    desde = _mes(fecha_desde) if fecha_desde else None
+    hasta = _mes(fecha_hasta) if fecha_hasta else None
+
+    tablas = [TABLA_ACTUAL]
+    for tabla in listar_particiones():
+        mes = tabla[len(PREFIJO_PARTICION):]
+        if (desde is None or mes >= desde) and (hasta is None or mes <= hasta):
+            tablas.append(tabla)
+    return tablas
+
+
+def _select_vista(tabla):
+    """SELECT de una tabla con las columnas de la vista (NULL las que no tenga)"""
+    propias = set(_columnas(tabla))
+    columnas = ", ".join(
+        f"{columna if columna in propias else 'NULL'} AS {ALIAS_VISTA.get(columna, columna)}"
+        for columna in _columnas(TABLA_ACTUAL)
+    )
+    return f"SELECT {columnas} FROM {tabla}"
+
+
+def fuente_auditoria(fecha_desde=None, fecha_hasta=None):
+    """
+    Tabla o subconsulta para el FROM, con solo los meses del rango
+
+    Las condiciones de fecha las sigue poniendo quien consulta.
+
+    Returns:
+        str: 'auditoria' (sin rango) o una subconsulta entre paréntesis
+    """
+    if not fecha_desde and not fecha_hasta:
+        return VISTA
+    partes = [_select_vista(tabla) for tabla in particiones_auditoria(fecha_desde, fecha_hasta)]
+    return f"({' UNION ALL '.join(partes)})"
+
+
+def consulta_auditoria(condiciones="", parametros=(), fecha_desde=None, fecha_hasta=None, limite=None):
+    """
+    Registros de auditoría del más nuevo al más viejo, leyendo solo los meses del rango
+
+    Con límite, cada mes aporta a lo sumo 'limite' filas (por su índice de
+    fecha) y solo esas se ordenan juntas: no hace falta ordenar todo el log.
+
+    Args:
+        condiciones (str): Condiciones extra sobre las columnas de la vista
+        parametros (tuple): Parámetros de las condiciones
+        fecha_desde: Fecha desde (incluida)
+        fecha_hasta: Fecha hasta (incluida)
+        limite (int): Cantidad máxima de registros (None = todos)
+
+    Returns:
+        tuple: (consulta, parametros); las columnas son las de la vista
+    """
+    filtros = []
+    parametros_filtro = []
+    if fecha_desde:
+        filtros.append("fecha_hora >= ?")
+        parametros_filtro.append(fecha_desde)
+    if fecha_hasta:
+        filtros.append("fecha_hora <= ?")
+        parametros_filtro.append(fecha_hasta)
+    if condiciones:
+        filtros.append(f"({condiciones})")
+        parametros_filtro.extend(parametros)
+    where = f" WHERE {' AND '.join(filtros)}" if filtros else ""
+
+    partes = []
+    parametros_consulta = []
+    for tabla in particiones_auditoria(fecha_desde, fecha_hasta):
+        parte = f"SELECT * FROM ({_select_vista(tabla)}){where} ORDER BY fecha_hora DESC"
+        parametros_consulta.extend(parametros_filtro)
+        if limite:
+            parte += " LIMIT ?"
+            parametros_consulta.append(limite)
+        partes.append(f"SELECT * FROM ({parte})")
+
+    consulta = f"SELECT * FROM ({' UNION ALL '.join(partes)}) ORDER BY fecha_hora DESC"
+    if limite:
+        consulta += " LIMIT ?"
+        parametros_consulta.append(limite)
+    return consulta, tuple(parametros_consulta)
+
+
+def _crear_indices(cursor, tabla):
+    for sufijo, columnas in INDICES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{tabla}_{sufijo} ON {tabla}({columnas})")
+
+
+def _crear_particion(cursor, tabla):
+    """Crea una partición con las columnas de logs_sistema (sin AUTOINCREMENT ni claves foráneas)"""
+    definiciones = []
+    for cid, nombre, tipo, no_nulo, por_defecto, clave in cursor.execute(f"PRAGMA main.table_info({TABLA_ACTUAL})"):
+        definicion = f"{nombre} {tipo}"
+        if clave:
+            definicion += " PRIMARY KEY"
+        if no_nulo:
+            definicion += " NOT NULL"
+        if por_defecto is not None:
+            definicion += f" DEFAULT {por_defecto}"
+        definiciones.append(definicion)
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {tabla} ({', '.join(definiciones)})")
+    _crear_indices(cursor, tabla)
+
+
+def actualizar_vista(cursor):
+    """Rehace la vista 'auditoria' con las particiones que existen"""
+    _columnas_particion.clear()
+    partes = [_select_vista(TABLA_ACTUAL)] + [_select_vista(tabla) for tabla in listar_particiones()]
+    cursor.execute(f"DROP VIEW IF EXISTS {VISTA}")
+    cursor.execute(f"CREATE VIEW {VISTA} AS {' UNION ALL '.join(partes)}")
+
+
+def crear_particiones_auditoria():
+    """Índices de logs_sistema y vista 'auditoria' (ver crear_tablas)"""
+    with db.transaccion() as cursor:
+        _crear_indices(cursor, TABLA_ACTUAL)
+        actualizar_vista(cursor)
+
+
+def rotar_auditoria():
+    """
+    Pasa los meses cerrados de logs_sistema a sus particiones
+
+    Es barato si no hay nada que rotar (una lectura por índice): se puede
+    llamar en cada arranque.
+
+    Returns:
+        dict: {partición: registros movidos}
+    """
+    inicio_mes = datetime.now().strftime("%Y-%m-01")
+    anterior = db.obtener_uno(f"SELECT MIN(fecha_hora) AS fecha FROM {TABLA_ACTUAL}")
+    if not anterior or anterior['fecha'] is None or str(anterior['fecha']) >= inicio_mes:
+        return {}
+
+    meses = db.obtener_todos(
+        f"SELECT DISTINCT strftime('%Y-%m', fecha_hora) AS mes FROM {TABLA_ACTUAL} WHERE fecha_hora < ?",
+        (inicio_mes,)
+    )
+
+    movidos = {}
+    with db.transaccion() as cursor:
+        for mes in sorted(fila['mes'] for fila in meses if fila['mes']):
+            tabla = PREFIJO_PARTICION + _mes(mes)
+            anio, numero = (int(parte) for parte in mes.split("-"))
+            siguiente = f"{anio + numero // 12:04d}-{numero % 12 + 1:02d}-01"
+            rango = (f"{mes}-01", siguiente)
+
+            _crear_particion(cursor, tabla)
+            propias = set(_columnas(tabla))
+            columnas = ", ".join(c for c in _columnas(TABLA_ACTUAL) if c in propias)
+            condicion = "fecha_hora >= ? AND fecha_hora < ?"
+            cursor.execute(
+                f"INSERT INTO {tabla} ({columnas}) SELECT {columnas} FROM {TABLA_ACTUAL} WHERE {condicion}", rango
+            )
+            cursor.execute(f"DELETE FROM {TABLA_ACTUAL} WHERE {condicion}", rango)
+            movidos[tabla] = cursor.rowcount
+
+        actualizar_vista(cursor)
+
+    config.guardar_log(f"Auditoría rotada: {sum(movidos.values())} registros en {len(movidos)} particiones", "INFO")
+    return movidos
+
+
+def eliminar_particiones(anteriores_a, cursor=None):
+    """
+    Borra las particiones de los meses anteriores a uno dado
+
+    Args:
+        anteriores_a: Fecha o 'AAAA-MM'; se borran los meses previos a ese
+        cursor (sqlite3.Cursor): Transacción en curso (None = una propia)
+
+    Returns:
+        list: Particiones borradas
+    """
+    limite = _mes(anteriores_a)
+    viejas = [t for t in listar_particiones() if t[len(PREFIJO_PARTICION):] < limite]
+    if not viejas:
+        return []
+
+    def borrar(cursor):
+        for tabla in viejas:
+            cursor.execute(f"DROP TABLE {tabla}")
+        actualizar_vista(cursor)
+
+    if cursor is None:
+        with db.transaccion() as propio:
+            borrar(propio)
+    else:
+        borrar(cursor)
+    return viejas
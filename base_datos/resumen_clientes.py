@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - CONTADORES DE CLIENTES
+============================================================================
+Columnas de clientes con totales de sus equipos, órdenes, facturas y
+pagos, para listar, ordenar y filtrar sin sumar cada vez:
+
+    equipos_activos      equipos en el taller (activos y no entregados)
+    ordenes_abiertas     órdenes de trabajo no finalizadas
+    saldo_adeudado       lo que deben sus facturas (sin las incobrables)
+    fecha_ultima_visita  último ingreso de un equipo o último pago
+
+Los mantienen triggers (ver crear_tablas.crear_resumen_clientes): cada
+alta, baja o cambio suma o resta el aporte de esa fila. Si algo quedó
+desfasado (datos cargados con los triggers desactivados, la última
+visita después de borrar un pago), recalcular_resumen_clientes() los
+vuelve a calcular desde cero.
+============================================================================
+"""
+
+from base_datos.conexion import db
+
+
+# Contador -> (tabla, aporte de una fila {f} al total, columnas que lo cambian, decimales)
+CONTADORES_CLIENTES = {
+    "equipos_activos": (
+        "equipos", "({f}.activo = 1 AND {f}.estado_actual != 'Entregado')", ("activo", "estado_actual"), None
+    ),
+    "ordenes_abiertas": (
+        # 'Finalizada ...' en ModuloOrdenes, 'Finalizado ...' en sistema_base.constantes
+        "ordenes_trabajo", "({f}.estado NOT LIKE 'Finalizad%')", ("estado",), None
+    ),
+    "saldo_adeudado": (
+        "facturacion", "(CASE WHEN {f}.estado_cobro != 'Incobrable' THEN {f}.monto_adeudado ELSE 0 END)",
+        ("monto_adeudado", "estado_cobro"), 2
+    ),
+}
+
+# Fechas que cuentan como visita del cliente: tabla -> columna
+VISITAS_CLIENTES = {
+    "equipos": "fecha_ingreso",
+    "pagos": "fecha_pago",
+}
+
+
+def recalcular_resumen_clientes():
+    """
+    Recalcula los contadores de todos los clientes desde sus tablas
+
+    Solo escribe los clientes cuyos valores estaban desfasados.
+
+    Returns:
+        int: Clientes corregidos
+    """
+    totales = []
+    for columna, (tabla, aporte, _, decimales) in CONTADORES_CLIENTES.items():
+        suma = f"SUM({aporte.format(f='f')})"
+        if decimales is not None:
+            suma = f"ROUND({suma}, {decimales})"
+        totales.append(
+            f"COALESCE((SELECT {suma} FROM {tabla} f WHERE f.id_cliente = c.id_cliente), 0) AS {columna}"
+        )
+    visitas = " UNION ALL ".join(
+        f"SELECT MAX({fecha}) AS fecha FROM {tabla} WHERE id_cliente = c.id_cliente"
+        for tabla, fecha in VISITAS_CLIENTES.items()
+    )
+    totales.append(f"(SELECT MAX(fecha) FROM ({visitas})) AS fecha_ultima_visita")
+
+    columnas = list(CONTADORES_CLIENTES) + ["fecha_ultima_visita"]
+    distinto = " OR ".join(f"c.{columna} IS NOT r.{columna}" for columna in columnas)
+    asignaciones = ", ".join(
+        f"{columna} = (SELECT r.{columna} FROM temp.resumen_clientes r WHERE r.id_cliente = clientes.id_cliente)"
+        for columna in columnas
+    )
+
+    with db.transaccion() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS temp.resumen_clientes")
+        cursor.execute(f"""
+            CREATE TEMP TABLE resumen_clientes AS
+            SELECT c.id_cliente, {', '.join(totales)}
+            FROM clientes c
+        """)
+        cursor.execute(f"""
+            UPDATE clientes SET {asignaciones}
+            WHERE id_cliente IN (
+                SELECT c.id_cliente FROM clientes c
+                INNER JOIN temp.resumen_clientes r ON r.id_cliente = c.id_cliente
+                WHERE {distinto}
+            )
+        """)
+        corregidos = cursor.rowcount
+        cursor.execute("DROP TABLE temp.resumen_clientes")
+    return corregidos
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - SALDOS DE FACTURAS
+============================================================================
+Lo pagado, lo adeudado y el estado de cobro de cada factura los mantienen
+triggers sobre pagos (ver crear_tablas.crear_saldos_facturas): registrar
+un pago es un solo INSERT y las cuentas por cobrar se listan filtrando
+monto_adeudado por su índice, sin sumar pagos.
+
+Cada pago cuenta para la factura de pagos.id_factura. Los que se cargan
+sin factura se imputan a la última factura de su orden; los anticipos
+(pagos de una orden que todavía no se facturó) pasan a la primera
+factura que se emita para la orden.
+
+Una factura marcada Incobrable conserva ese estado; lo pagado y lo
+adeudado se siguen actualizando. recalcular_saldos_facturas() compara
+cada factura con la suma de sus pagos y corrige las desfasadas.
+============================================================================
+"""
+
+from base_datos.conexion import db
+
+
+# Estados de cobro (los de ModuloFacturacion.ESTADOS_COBRO)
+ESTADO_PENDIENTE = "Pendiente"
+ESTADO_PARCIAL = "Pago parcial"
+ESTADO_PAGADO = "Pagado"
+ESTADO_INCOBRABLE = "Incobrable"
+
+# Diferencia que se considera saldada (redondeo de centavos)
+TOLERANCIA = 0.005
+
+
+def estado_cobro_segun(pagado):
+    """
+    Estado de cobro que corresponde a lo pagado (CASE sobre la fila de facturacion)
+
+    Args:
+        pagado (str): Expresión SQL del total pagado
+
+    Returns:
+        str: Expresión SQL
+    """
+    return f"""CASE
+            WHEN estado_cobro = '{ESTADO_INCOBRABLE}' THEN estado_cobro
+            WHEN ({pagado}) <= {TOLERANCIA} THEN '{ESTADO_PENDIENTE}'
+            WHEN ({pagado}) >= monto_total - {TOLERANCIA} THEN '{ESTADO_PAGADO}'
+            ELSE '{ESTADO_PARCIAL}'
+        END"""
+
+
+def asignaciones_saldo(pagado):
+    """
+    SET de un UPDATE de facturacion con lo pagado que se indique
+
+    Args:
+        pagado (str): Expresión SQL del nuevo total pagado (sobre los
+            valores anteriores de la fila)
+
+    Returns:
+        str: Asignaciones de monto_pagado, monto_adeudado y estado_cobro
+    """
+    return (f"monto_pagado = ROUND({pagado}, 2), "
+            f"monto_adeudado = ROUND(monto_total - ({pagado}), 2), "
+            f"estado_cobro = {estado_cobro_segun(pagado)}")
+
+
+def recalcular_saldos_facturas(id_factura=None):
+    """
+    Verifica lo pagado de las facturas contra sus pagos y corrige las desfasadas
+
+    Args:
+        id_factura (int): Solo esa factura (None = todas)
+
+    Returns:
+        list: IDs de las facturas corregidas
+    """
+    pagado = "COALESCE((SELECT SUM(p.monto) FROM pagos p WHERE p.id_factura = facturacion.id_factura), 0)"
+    condicion = f"""(
+        ABS(monto_pagado - {pagado}) > {TOLERANCIA}
+        OR ABS(monto_adeudado - (monto_total - {pagado})) > {TOLERANCIA}
+        OR estado_cobro IS NOT {estado_cobro_segun(pagado)}
+    )"""
+    parametros = ()
+    if id_factura is not None:
+        condicion += " AND id_factura = ?"
+        parametros = (id_factura,)
+
+    with db.transaccion() as cursor:
+        corregidas = [fila[0] for fila in cursor.execute(
+            f"SELECT id_factura FROM facturacion WHERE {condicion}", parametros
+        )]
+        if corregidas:
+            cursor.execute(f"UPDATE facturacion SET {asignaciones_saldo(pagado)} WHERE {condicion}", parametros)
+    return corregidas
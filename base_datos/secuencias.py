@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - SECUENCIAS DE NUMERACIÓN
+============================================================================
+Contadores atómicos por (tipo, período) para numerar facturas y remitos.
+
+Cada número se obtiene incrementando una sola fila de la tabla
+'secuencias' dentro de la transacción del llamador: el incremento toma el
+bloqueo de escritura de la base, así que dos terminales nunca obtienen el
+mismo número, y si la transacción se deshace el número no se consume.
+============================================================================
+"""
+
+from datetime import datetime
+from base_datos.conexion import db
+
+
+# Tipos de secuencia y período de reinicio de cada uno
+SECUENCIA_FACTURA = "factura"     # F-YYYY-####    (se reinicia cada año)
+SECUENCIA_REMITO = "remito"       # R-YYYYMMDD-####  (se reinicia cada día)
+
+
+def siguiente_valor(tipo, periodo, cursor=None):
+    """
+    Incrementa y devuelve el contador de una secuencia
+
+    Args:
+        tipo (str): Tipo de secuencia (factura, remito, ...)
+        periodo (str): Período del contador (ej: '2025' o '20250113')
+        cursor (sqlite3.Cursor): Cursor de la transacción en curso. Si no
+            se indica, el incremento se confirma en una transacción propia.
+
+    Returns:
+        int: Nuevo valor del contador (el primero de cada período es 1)
+    """
+    if cursor is None:
+        with db.transaccion() as cursor_propio:
+            return siguiente_valor(tipo, periodo, cursor_propio)
+
+    # El UPSERT toma el bloqueo de escritura; la lectura posterior dentro
+    # de la misma transacción ve el valor que acabamos de escribir.
+    cursor.execute(
+        """
+        INSERT INTO secuencias (tipo, periodo, ultimo_valor)
+        VALUES (?, ?, 1)
+        ON CONFLICT(tipo, periodo) DO UPDATE SET ultimo_valor = ultimo_valor + 1
+        """,
+        (tipo, periodo)
+    )
+    cursor.execute(
+        "SELECT ultimo_valor FROM secuencias WHERE tipo = ? AND periodo = ?",
+        (tipo, periodo)
+    )
+    return cursor.fetchone()[0]
+
+
+def siguiente_numero_factura(cursor=None, fecha=None):
+    """
+    Genera el próximo número de factura: F-YYYY-####
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor de la transacción en curso (opcional)
+        fecha (datetime): Fecha de emisión (por defecto, ahora)
+
+    Returns:
+        str: Número de factura
+    """
+    anio = (fecha or datetime.now()).strftime("%Y")
+    valor = siguiente_valor(SECUENCIA_FACTURA, anio, cursor)
+    return f"F-{anio}-{valor:04d}"
+
+
+def siguiente_numero_remito(cursor=None, fecha=None):
+    """
+    Genera el próximo número de remito: R-YYYYMMDD-####
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor de la transacción en curso (opcional)
+        fecha (datetime): Fecha de emisión (por defecto, ahora)
+
+    Returns:
+        str: Número de remito
+    """
+    dia = (fecha or datetime.now()).strftime("%Y%m%d")
+    valor = siguiente_valor(SECUENCIA_REMITO, dia, cursor)
+    return f"R-{dia}-{valor:04d}"
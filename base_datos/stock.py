@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - STOCK DE REPUESTOS
+============================================================================
+Libro de movimientos de stock (movimientos_stock) y reservas de repuestos
+para órdenes abiertas (reservas_repuestos).
+
+El saldo de cada repuesto está en su propia fila, para leerlo sin sumar:
+
+    cantidad_disponible  unidades libres (las que se pueden usar o reservar)
+    cantidad_reservada   unidades apartadas para órdenes abiertas
+
+Cada movimiento cambia el saldo con un UPDATE condicional (el saldo no
+puede quedar negativo) y queda asentado en el libro en la misma
+transacción: dos terminales que usan el último repuesto no pueden
+descontarlo las dos, a una le llega StockInsuficiente.
+
+El alta de un repuesto asienta su cantidad inicial (trigger
+stock_repuesto_alta) y al finalizar una orden se liberan sus reservas
+(trigger stock_liberar_orden). recalcular_stock() compara los saldos con
+el libro y las reservas y corrige lo desfasado.
+============================================================================
+"""
+
+from datetime import datetime
+from base_datos.conexion import db
+
+
+# Tipos de movimiento y efecto de cada unidad en (disponible, reservado)
+MOVIMIENTO_ENTRADA = "Entrada"
+MOVIMIENTO_SALIDA = "Salida"
+MOVIMIENTO_RESERVA = "Reserva"
+MOVIMIENTO_LIBERACION = "Liberación"
+MOVIMIENTO_USO_RESERVA = "Uso de reserva"
+MOVIMIENTO_AJUSTE = "Ajuste"
+
+EFECTOS_MOVIMIENTO = {
+    MOVIMIENTO_ENTRADA: (1, 0),
+    MOVIMIENTO_SALIDA: (-1, 0),
+    MOVIMIENTO_RESERVA: (-1, 1),
+    MOVIMIENTO_LIBERACION: (1, -1),
+    MOVIMIENTO_USO_RESERVA: (0, -1),
+    MOVIMIENTO_AJUSTE: (1, 0),      # la cantidad de un ajuste lleva signo
+}
+
+
+class StockInsuficiente(Exception):
+    """El movimiento dejaría negativo el saldo de un repuesto"""
+
+    def __init__(self, mensaje, disponible=0):
+        super().__init__(mensaje)
+        self.disponible = disponible
+
+
+def registrar_movimiento(id_repuesto, tipo, cantidad, id_usuario=None, id_orden=None,
+                         motivo=None, cursor=None):
+    """
+    Cambia el saldo de un repuesto y asienta el movimiento en el libro
+
+    Args:
+        id_repuesto (int): ID del repuesto
+        tipo (str): Uno de EFECTOS_MOVIMIENTO
+        cantidad (int): Unidades (positivas; con signo si es un ajuste)
+        id_usuario (int): Usuario que lo registra
+        id_orden (int): Orden de trabajo relacionada (si corresponde)
+        motivo (str): Detalle libre
+        cursor (sqlite3.Cursor): Cursor de la transacción en curso. Si no
+            se indica, el movimiento se confirma en una transacción propia.
+
+    Returns:
+        int: ID del movimiento
+
+    Raises:
+        StockInsuficiente: Si el saldo no alcanza
+        ValueError: Si el tipo, la cantidad o el repuesto no son válidos
+    """
+    if tipo not in EFECTOS_MOVIMIENTO:
+        raise ValueError(f"Tipo de movimiento inválido: {tipo}")
+    if cantidad == 0 or (cantidad < 0 and tipo != MOVIMIENTO_AJUSTE):
+        raise ValueError("La cantidad debe ser mayor a cero")
+
+    if cursor is None:
+        with db.transaccion() as cursor_propio:
+            return registrar_movimiento(id_repuesto, tipo, cantidad, id_usuario,
+                                        id_orden, motivo, cursor_propio)
+
+    efecto_disponible, efecto_reservado = EFECTOS_MOVIMIENTO[tipo]
+    delta_disponible = efecto_disponible * cantidad
+    delta_reservado = efecto_reservado * cantidad
+
+    # Comprobar y descontar en la misma sentencia: no hay lectura previa
+    # que otra terminal pueda dejar vieja
+    cursor.execute(
+        """
+        UPDATE repuestos
+        SET cantidad_disponible = cantidad_disponible + ?,
+            cantidad_reservada = cantidad_reservada + ?
+        WHERE id_repuesto = ?
+          AND cantidad_disponible + ? >= 0
+          AND cantidad_reservada + ? >= 0
+        """,
+        (delta_disponible, delta_reservado, id_repuesto, delta_disponible, delta_reservado)
+    )
+    if cursor.rowcount == 0:
+        cursor.execute(
+            "SELECT cantidad_disponible, cantidad_reservada FROM repuestos WHERE id_repuesto = ?",
+            (id_repuesto,)
+        )
+        fila = cursor.fetchone()
+        if fila is None:
+            raise ValueError("Repuesto no encontrado")
+        if delta_disponible + fila[0] < 0:
+            raise StockInsuficiente(f"Stock insuficiente. Disponible: {fila[0]}", fila[0])
+        raise StockInsuficiente(f"Reserva insuficiente. Reservado: {fila[1]}", fila[0])
+
+    cursor.execute(
+        """
+        INSERT INTO movimientos_stock (
+            id_repuesto, tipo, cantidad, delta_disponible, delta_reservado,
+            id_orden, fecha, id_usuario, motivo
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (id_repuesto, tipo, cantidad, delta_disponible, delta_reservado,
+         id_orden, datetime.now(), id_usuario, motivo)
+    )
+    return cursor.lastrowid
+
+
+def reservar(id_orden, id_repuesto, cantidad, id_usuario=None, cursor=None):
+    """
+    Aparta unidades libres de un repuesto para una orden
+
+    Las reservas de una misma orden y repuesto se acumulan en una fila.
+
+    Args:
+        id_orden (int): ID de la orden
+        id_repuesto (int): ID del repuesto
+        cantidad (int): Unidades a reservar
+        id_usuario (int): Usuario que reserva
+        cursor (sqlite3.Cursor): Cursor de la transacción en curso (opcional)
+
+    Returns:
+        int: Unidades reservadas para la orden en total
+
+    Raises:
+        StockInsuficiente: Si no hay unidades libres suficientes
+    """
+    if cursor is None:
+        with db.transaccion() as cursor_propio:
+            return reservar(id_orden, id_repuesto, cantidad, id_usuario, cursor_propio)
+
+    registrar_movimiento(id_repuesto, MOVIMIENTO_RESERVA, cantidad, id_usuario, id_orden,
+                         f"Reserva para orden N° {id_orden}", cursor)
+    cursor.execute(
+        """
+        INSERT INTO reservas_repuestos (id_orden, id_repuesto, cantidad, fecha_reserva, id_usuario)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(id_orden, id_repuesto) DO UPDATE SET cantidad = cantidad + excluded.cantidad
+        """,
+        (id_orden, id_repuesto, cantidad, datetime.now(), id_usuario)
+    )
+    cursor.execute(
+        "SELECT cantidad FROM reservas_repuestos WHERE id_orden = ? AND id_repuesto = ?",
+        (id_orden, id_repuesto)
+    )
+    return cursor.fetchone()[0]
+
+
+def _quitar_reserva(cursor, id_orden, id_repuesto, cantidad):
+    """
+    Descuenta unidades de la reserva de una orden (la borra si queda en cero)
+
+    Returns:
+        bool: False si la reserva ya no tenía esas unidades
+    """
+    cursor.execute(
+        """
+        UPDATE reservas_repuestos SET cantidad = cantidad - ?
+        WHERE id_orden = ? AND id_repuesto = ? AND cantidad >= ?
+        """,
+        (cantidad, id_orden, id_repuesto, cantidad)
+    )
+    if cursor.rowcount == 0:
+        return False
+    cursor.execute(
+        "DELETE FROM reservas_repuestos WHERE id_orden = ? AND id_repuesto = ? AND cantidad = 0",
+        (id_orden, id_repuesto)
+    )
+    return True
+
+
+def liberar(id_orden, id_repuesto=None, cantidad=None, id_usuario=None, motivo=None, cursor=None):
+    """
+    Devuelve al stock libre lo reservado para una orden
+
+    Args:
+        id_orden (int): ID de la orden
+        id_repuesto (int): Solo ese repuesto (None = todos los de la orden)
+        cantidad (int): Unidades a liberar (None = toda la reserva)
+        id_usuario (int): Usuario que libera
+        motivo (str): Detalle para el libro
+        cursor (sqlite3.Cursor): Cursor de la transacción en curso (opcional)
+
+    Returns:
+        int: Unidades liberadas
+
+    Raises:
+        StockInsuficiente: Si se pide liberar más de lo reservado
+    """
+    if cursor is None:
+        with db.transaccion() as cursor_propio:
+            return liberar(id_orden, id_repuesto, cantidad, id_usuario, motivo, cursor_propio)
+
+    consulta = "SELECT id_repuesto, cantidad FROM reservas_repuestos WHERE id_orden = ?"
+    parametros = [id_orden]
+    if id_repuesto is not None:
+        consulta += " AND id_repuesto = ?"
+        parametros.append(id_repuesto)
+
+    liberadas = 0
+    for repuesto, reservado in cursor.execute(consulta, parametros).fetchall():
+        a_liberar = reservado if cantidad is None else cantidad
+        if not _quitar_reserva(cursor, id_orden, repuesto, a_liberar):
+            raise StockInsuficiente(f"Reserva insuficiente. Reservado: {reservado}")
+        registrar_movimiento(repuesto, MOVIMIENTO_LIBERACION, a_liberar, id_usuario, id_orden,
+                             motivo or f"Reserva liberada de orden N° {id_orden}", cursor)
+        liberadas += a_liberar
+
+    if cantidad is not None and liberadas == 0:
+        raise StockInsuficiente("La orden no tiene ese repuesto reservado")
+    return liberadas
+
+
+def usar_en_orden(id_orden, id_repuesto, cantidad, id_usuario=None, cursor=None):
+    """
+    Saca del stock las unidades que se usan en una orden
+
+    Primero toma lo reservado para la orden y el resto lo descuenta del
+    stock libre; todo o nada.
+
+    Args:
+        id_orden (int): ID de la orden
+        id_repuesto (int): ID del repuesto
+        cantidad (int): Unidades usadas
+        id_usuario (int): Usuario que lo registra
+        cursor (sqlite3.Cursor): Cursor de la transacción en curso (opcional)
+
+    Returns:
+        tuple: (unidades tomadas de la reserva, unidades tomadas del stock libre)
+
+    Raises:
+        StockInsuficiente: Si entre la reserva y el stock libre no alcanza
+    """
+    if cantidad <= 0:
+        raise ValueError("La cantidad debe ser mayor a cero")
+
+    if cursor is None:
+        with db.transaccion() as cursor_propio:
+            return usar_en_orden(id_orden, id_repuesto, cantidad, id_usuario, cursor_propio)
+
+    cursor.execute(
+        "SELECT cantidad FROM reservas_repuestos WHERE id_orden = ? AND id_repuesto = ?",
+        (id_orden, id_repuesto)
+    )
+    fila = cursor.fetchone()
+    de_reserva = min(fila[0], cantidad) if fila else 0
+    de_stock = cantidad - de_reserva
+    motivo = f"Uso en orden N° {id_orden}"
+
+    if de_reserva:
+        # Si otra terminal usó la reserva entre la lectura y ahora, no se pisa
+        if not _quitar_reserva(cursor, id_orden, id_repuesto, de_reserva):
+            raise StockInsuficiente("La reserva de la orden cambió, vuelva a intentarlo")
+        registrar_movimiento(id_repuesto, MOVIMIENTO_USO_RESERVA, de_reserva, id_usuario,
+                             id_orden, motivo, cursor)
+    if de_stock:
+        registrar_movimiento(id_repuesto, MOVIMIENTO_SALIDA, de_stock, id_usuario,
+                             id_orden, motivo, cursor)
+    return de_reserva, de_stock
+
+
+def recalcular_stock():
+    """
+    Verifica los saldos de los repuestos contra el libro y las reservas
+
+    Primero libera las reservas que quedaron de órdenes ya finalizadas
+    (las que cerró algo que no pasó por el trigger stock_liberar_orden).
+    Lo reservado se vuelve a calcular desde reservas_repuestos. Si las
+    unidades libres no coinciden con el libro (saldos cambiados por fuera
+    de registrar_movimiento), la fila del repuesto manda: se asienta un
+    ajuste por la diferencia.
+
+    Returns:
+        list: IDs de los repuestos corregidos
+    """
+    reservado = ("COALESCE((SELECT SUM(rr.cantidad) FROM reservas_repuestos rr "
+                 "WHERE rr.id_repuesto = r.id_repuesto), 0)")
+    libro = ("COALESCE((SELECT SUM(m.{columna}) FROM movimientos_stock m "
+             "WHERE m.id_repuesto = r.id_repuesto), 0)")
+
+    with db.transaccion() as cursor:
+        huerfanas = cursor.execute("""
+            SELECT DISTINCT rr.id_orden, rr.id_repuesto
+            FROM reservas_repuestos rr
+            JOIN ordenes_trabajo o ON o.id_orden = rr.id_orden
+            WHERE o.estado LIKE 'Finalizad%'
+        """).fetchall()
+        for id_orden in sorted({id_orden for id_orden, _ in huerfanas}):
+            liberar(id_orden, motivo=f"Orden N° {id_orden} finalizada con reserva pendiente",
+                    cursor=cursor)
+
+        cursor.execute("DROP TABLE IF EXISTS temp.saldos_stock")
+        cursor.execute(f"""
+            CREATE TEMP TABLE saldos_stock AS
+            SELECT r.id_repuesto, r.cantidad_disponible, r.cantidad_reservada,
+                   {reservado} AS reservado,
+                   {libro.format(columna='delta_disponible')} AS libro_disponible,
+                   {libro.format(columna='delta_reservado')} AS libro_reservado
+            FROM repuestos r
+        """)
+        cursor.execute("""
+            DELETE FROM temp.saldos_stock
+            WHERE cantidad_reservada = reservado
+              AND libro_disponible = cantidad_disponible
+              AND libro_reservado = reservado
+        """)
+        cursor.execute("""
+            UPDATE repuestos SET cantidad_reservada = (
+                SELECT s.reservado FROM temp.saldos_stock s WHERE s.id_repuesto = repuestos.id_repuesto
+            )
+            WHERE id_repuesto IN (
+                SELECT id_repuesto FROM temp.saldos_stock WHERE cantidad_reservada != reservado
+            )
+        """)
+        cursor.execute(
+            """
+            INSERT INTO movimientos_stock (
+                id_repuesto, tipo, cantidad, delta_disponible, delta_reservado, fecha, motivo
+            )
+            SELECT id_repuesto, ?, cantidad_disponible - libro_disponible,
+                   cantidad_disponible - libro_disponible, reservado - libro_reservado,
+                   ?, 'Ajuste por verificación de stock'
+            FROM temp.saldos_stock
+            WHERE libro_disponible != cantidad_disponible OR libro_reservado != reservado
+            """,
+            (MOVIMIENTO_AJUSTE, datetime.now())
+        )
+        corregidos = {fila[0] for fila in cursor.execute("SELECT id_repuesto FROM temp.saldos_stock")}
+        corregidos.update(id_repuesto for _, id_repuesto in huerfanas)
+        cursor.execute("DROP TABLE temp.saldos_stock")
+    return sorted(corregidos)
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - VERSIONES DE LOS DATOS
+============================================================================
+Cada fila de las tablas versionadas guarda en 'version' el valor del
+contador global (secuencias, tipo 'version_datos') en su última
+escritura, y en 'fecha_modificacion' cuándo ocurrió. Los borrados
+quedan en registros_eliminados con la versión en que se hicieron. Todo
+lo mantienen triggers (ver crear_tablas.crear_control_versiones), así
+que vale también para escrituras de otros procesos.
+
+Con eso un listado puede pedir solo lo que cambió desde la última vez:
+
+    delta = ModuloEquipos.listar_equipos_desde(version)
+    delta['cambios']     filas nuevas o modificadas, como en el listado
+    delta['eliminados']  IDs que ya no están en el listado
+    delta['version']     versión a pedir la próxima vez
+============================================================================
+"""
+
+from base_datos.conexion import db
+
+
+# Tablas versionadas -> columna de su clave primaria
+TABLAS_VERSIONADAS = {
+    "usuarios": "id_usuario",
+    "clientes": "id_cliente",
+    "equipos": "id_equipo",
+    "presupuestos": "id_presupuesto",
+    "ordenes_trabajo": "id_orden",
+    "repuestos": "id_repuesto",
+    "repuestos_usados": "id_uso",
+    "pagos": "id_pago",
+    "facturacion": "id_factura",
+    "garantias": "id_garantia",
+    "remitos": "id_remito",
+    "comprobantes_entrega": "id_comprobante",
+    "equipos_abandonados": "id_abandonado",
+    "historial_notas": "id_nota",
+}
+
+# Contador global en la tabla secuencias
+TIPO_SECUENCIA = "version_datos"
+
+
+def version_actual():
+    """
+    Última versión asignada a una escritura
+
+    Returns:
+        int: Versión (0 si todavía no hubo escrituras versionadas)
+    """
+    resultado = db.obtener_uno(
+        "SELECT ultimo_valor FROM secuencias WHERE tipo = ? AND periodo = ''", (TIPO_SECUENCIA,)
+    )
+    return resultado['ultimo_valor'] if resultado else 0
+
+
+def cambios_desde(tabla, version, listar, consulta_modificados):
+    """
+    Arma la respuesta de un listar_*_desde
+
+    Args:
+        tabla (str): Tabla principal del listado (ver TABLAS_VERSIONADAS)
+        version (int): Versión que ya tiene quien pregunta (None = listado completo)
+        listar (callable): Recibe la versión y devuelve las filas del listado
+            que cambiaron desde ella (todas si es None), ya filtradas
+        consulta_modificados (str): SELECT de los IDs cuyas filas del listado
+            cambiaron desde la versión; cada '?' recibe la versión
+
+    Returns:
+        dict: 'version', 'cambios' (filas) y 'eliminados' (IDs a quitar)
+    """
+    # Leer la versión antes que los datos: lo escrito en el medio se vuelve
+    # a entregar la próxima vez, nunca se pierde
+    actual = version_actual()
+    filas = listar(version)
+    if version is None:
+        return {'version': actual, 'cambios': filas, 'eliminados': []}
+
+    clave = TABLAS_VERSIONADAS[tabla]
+    visibles = {fila[clave] for fila in filas}
+
+    # Cambiaron pero ya no pasan los filtros (o se dieron de baja)...
+    modificados = db.obtener_todos(consulta_modificados, (version,) * consulta_modificados.count("?"))
+    eliminados = {fila[clave] for fila in modificados} - visibles
+
+    # ...o se borraron
+    borrados = db.obtener_todos(
+        "SELECT id_registro FROM registros_eliminados WHERE tabla = ? AND version > ?", (tabla, version)
+    )
+    eliminados.update(fila['id_registro'] for fila in borrados)
+
+    return {'version': actual, 'cambios': filas, 'eliminados': sorted(eliminados)}
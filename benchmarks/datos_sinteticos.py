@@ -0,0 +1,497 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - GENERADOR DE DATOS SINTÉTICOS
+============================================================================
+Arma una base de TechManager con el esquema real (crear_tablas) y datos
+realistas a la escala pedida: clientes con varios equipos, presupuestos,
+órdenes, repuestos usados, facturación, pagos, garantías, remitos y años
+de auditoría en logs_sistema.
+
+La escala es la cantidad de equipos; el resto de las tablas se deriva de
+ella con proporciones parecidas a las de un taller real. Con la misma
+semilla y escala la base generada es siempre la misma (salvo las fechas,
+que se calculan hacia atrás desde hoy).
+
+Uso:
+    python -m benchmarks.datos_sinteticos --equipos 100000 --salida /tmp/tm_100k.db
+============================================================================
+"""
+
+import argparse
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sistema_base.configuracion import config
+from sistema_base.constantes import (TIPOS_DISPOSITIVO, TIPOS_REPUESTO, METODOS_PAGO,
+                                     ID_USUARIO_SISTEMA)
+
+
+# Escalas con nombre: cantidad de equipos
+ESCALAS = {
+    "1k": 1_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+NOMBRES = ["Juan", "María", "Carlos", "Ana", "Luis", "Laura", "Diego", "Sofía", "Martín", "Lucía",
+           "Pablo", "Valeria", "Jorge", "Camila", "Andrés", "Florencia", "Gustavo", "Paula"]
+APELLIDOS = ["González", "Rodríguez", "Gómez", "Fernández", "López", "Díaz", "Martínez", "Pérez",
+             "García", "Sánchez", "Romero", "Sosa", "Álvarez", "Torres", "Ruiz", "Ramírez"]
+MARCAS = {
+    "Celular": ["Samsung", "Motorola", "Apple", "Xiaomi"],
+    "Tablet": ["Samsung", "Apple", "Lenovo"],
+    "PC / Notebook": ["HP", "Dell", "Lenovo", "Asus", "Acer"],
+    "Consola": ["Sony", "Microsoft", "Nintendo"],
+    "Otro": ["Genérico"],
+}
+# Modelos de cada marca (M-100 en adelante), compartidos por equipos y
+# repuestos para que haya repuestos compatibles
+MODELOS_POR_MARCA = 40
+FALLAS = ["No enciende", "Pantalla rota", "No carga", "Se reinicia solo", "Sin señal",
+          "Batería se descarga rápido", "No da imagen", "Se calienta", "Mojado", "Botón trabado"]
+ACCIONES_AUDITORIA = [("Crear", "Clientes"), ("Modificar", "Equipos"), ("Crear", "Presupuestos"),
+                      ("Modificar", "Órdenes"), ("Crear", "Pagos"), ("Login", "Sistema"),
+                      ("Crear", "Remitos"), ("Modificar", "Repuestos")]
+
+# Técnicos sintéticos (ids 2..) además del admin (id 1)
+CANTIDAD_TECNICOS = 4
+
+# Filas por executemany
+TAMANO_LOTE = 10_000
+
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+
+
+def _fecha(valor):
+    """Fecha con el formato de CURRENT_TIMESTAMP"""
+    return valor.strftime(FORMATO_FECHA)
+
+
+def _preparar_base(ruta):
+    """Apunta la configuración a la base nueva y crea el esquema real"""
+    config.ruta_datos = ruta.parent
+    config.ruta_base_datos = ruta
+    config.ruta_backups = ruta.parent / "backups"
+
+    from base_datos.conexion import db
+    from base_datos.crear_tablas import inicializar_base_datos
+
+    db.desconectar()
+    if ruta.exists():
+        ruta.unlink()
+    inicializar_base_datos()
+    return db
+
+
+class GeneradorDatos:
+    """
+    Genera e inserta los datos sintéticos
+
+    Args:
+        equipos (int): Cantidad de equipos (escala)
+        semilla (int): Semilla del generador aleatorio
+        equipos_por_cliente (float): Promedio de equipos de cada cliente
+        anios (int): Años de historia (fechas de ingreso y auditoría)
+        logs_por_equipo (int): Registros de logs_sistema por equipo
+    """
+
+    def __init__(self, equipos, semilla=42, equipos_por_cliente=2.0, anios=3, logs_por_equipo=3):
+        self.equipos = equipos
+        self.clientes = max(1, int(equipos / equipos_por_cliente))
+        self.repuestos = max(50, equipos // 20)
+        self.anios = anios
+        self.logs_por_equipo = logs_por_equipo
+        self.aleatorio = random.Random(semilla)
+        self.ahora = datetime.now().replace(microsecond=0)
+        self.inicio = self.ahora - timedelta(days=365 * anios)
+        self.filas = {}
+        self.remitos_por_dia = {}
+        self.facturas_por_anio = {}
+
+    def generar(self, db):
+        """
+        Inserta todas las tablas en la base conectada
+
+        Args:
+            db (ConexionBD): Conexión ya apuntada a la base nueva
+
+        Returns:
+            dict: Filas insertadas por tabla
+        """
+        conexion = db.conectar()
+        # Carga masiva: sin diario ni fsync; la base se descarta si falla
+        conexion.execute("PRAGMA journal_mode = OFF")
+        conexion.execute("PRAGMA synchronous = OFF")
+
+        with db.transaccion() as cursor:
+            self._insertar(cursor, "usuarios", self._usuarios())
+            self._insertar(cursor, "clientes", self._clientes())
+            self._insertar(cursor, "repuestos", self._repuestos())
+            self._insertar_equipos(cursor)
+            self._insertar(cursor, "logs_sistema", self._logs())
+
+        conexion.execute("PRAGMA synchronous = FULL")
+        conexion.execute("PRAGMA journal_mode = DELETE")
+
+        # Los contadores de numeración continúan desde los remitos generados
+        from base_datos.crear_tablas import crear_tabla_secuencias
+        crear_tabla_secuencias()
+
+        # Los modelos compatibles de los repuestos cargados, ya indexados
+        from base_datos.compatibilidad import actualizar_compatibilidad
+        actualizar_compatibilidad()
+
+        # La auditoría de meses anteriores queda en sus particiones, como en uso real
+        from base_datos.particiones import rotar_auditoria
+        rotar_auditoria()
+
+        conexion.execute("ANALYZE")
+        return self.filas
+
+    # ------------------------------------------------------------------
+    # Inserción
+    # ------------------------------------------------------------------
+
+    COLUMNAS = {
+        "usuarios": ("id_usuario", "nombre", "username", "password_hash", "rol", "primer_login"),
+        "clientes": ("id_cliente", "nombre", "apellido", "telefono", "direccion", "email",
+                     "fecha_registro", "estado_cliente"),
+        "repuestos": ("id_repuesto", "nombre", "tipo", "tipo_dispositivo", "modelos_compatibles",
+                      "origen", "cantidad_disponible", "estado", "precio_referencia", "fecha_ingreso"),
+        "equipos": ("id_equipo", "id_cliente", "tipo_dispositivo", "marca", "modelo", "identificador",
+                    "estado_fisico", "falla_declarada", "fecha_ingreso", "estado_actual",
+                    "fecha_cambio_estado", "fecha_ultimo_movimiento"),
+        "remitos": ("numero_remito", "id_equipo", "id_cliente", "id_usuario", "fecha_emision", "impreso"),
+        "presupuestos": ("id_presupuesto", "id_equipo", "id_cliente", "id_usuario", "descripcion_trabajo",
+                         "monto_total", "recargo_transferencia", "monto_sin_recargo", "estado",
+                         "fecha_creacion", "fecha_vencimiento", "fecha_respuesta"),
+        "ordenes_trabajo": ("id_orden", "id_presupuesto", "id_equipo", "id_cliente", "id_tecnico",
+                            "descripcion_reparacion", "estado", "fecha_inicio", "fecha_finalizacion",
+                            "tiene_reparacion"),
+        "repuestos_usados": ("id_orden", "id_repuesto", "cantidad", "fecha_uso", "id_usuario"),
+        "facturacion": ("id_factura", "numero_factura", "id_orden", "id_cliente", "monto_total", "monto_adeudado",
+                        "fecha_emision"),
+        "pagos": ("id_factura", "id_orden", "id_cliente", "monto", "metodo_pago", "es_anticipo", "fecha_pago",
+                  "id_usuario"),
+        "garantias": ("id_orden", "id_equipo", "descripcion_reparacion", "fecha_inicio", "dias_garantia",
+                      "fecha_vencimiento", "que_cubre", "que_no_cubre", "estado"),
+        "logs_sistema": ("id_usuario", "accion", "modulo", "id_registro", "fecha_hora", "es_accion_critica"),
+    }
+
+    def _sql_insertar(self, tabla):
+        columnas = self.COLUMNAS[tabla]
+        return f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))})"
+
+    def _insertar(self, cursor, tabla, filas):
+        """Inserta un iterable de filas por lotes"""
+        sql = self._sql_insertar(tabla)
+        lote = []
+        for fila in filas:
+            lote.append(fila)
+            if len(lote) >= TAMANO_LOTE:
+                cursor.executemany(sql, lote)
+                self.filas[tabla] = self.filas.get(tabla, 0) + len(lote)
+                lote.clear()
+        if lote:
+            cursor.executemany(sql, lote)
+            self.filas[tabla] = self.filas.get(tabla, 0) + len(lote)
+
+    # ------------------------------------------------------------------
+    # Tablas independientes
+    # ------------------------------------------------------------------
+
+    def _usuarios(self):
+        yield (1, "Administrador", "admin", "!", "admin", 0)
+        for i in range(CANTIDAD_TECNICOS):
+            yield (i + 2, f"Técnico {i + 1}", f"tecnico{i + 1}", "!", "tecnico", 0)
+
+    def _clientes(self):
+        a = self.aleatorio
+        paso = (self.ahora - self.inicio) / self.clientes
+        for i in range(1, self.clientes + 1):
+            nombre, apellido = a.choice(NOMBRES), a.choice(APELLIDOS)
+            estado = a.choices(["Nuevo", "Buen Pagador", "Deudor", "Moroso"], (30, 60, 8, 2))[0]
+            yield (i, nombre, apellido, f"11{a.randint(10000000, 99999999)}",
+                   f"Calle {a.randint(1, 999)} N° {a.randint(1, 9999)}",
+                   f"{nombre.lower()}.{i}@correo.com" if a.random() < 0.6 else None,
+                   _fecha(self.inicio + paso * (i - 1)), estado)
+
+    def _repuestos(self):
+        a = self.aleatorio
+        for i in range(1, self.repuestos + 1):
+            tipo_dispositivo = a.choice(TIPOS_DISPOSITIVO)
+            tipo = a.choice(TIPOS_REPUESTO)
+            marca = a.choice(MARCAS[tipo_dispositivo])
+            modelos = ", ".join(f"{marca} M-{a.randint(100, 99 + MODELOS_POR_MARCA)}" for _ in range(a.randint(1, 4)))
+            yield (i, f"{tipo} {marca}", tipo, tipo_dispositivo, modelos,
+                   a.choices(["Nuevo", "Recuperado"], (70, 30))[0], a.randint(0, 20),
+                   "Funcionando", round(a.uniform(2000, 80000), 2),
+                   _fecha(self.inicio + timedelta(days=a.randint(0, 365 * self.anios))))
+
+    def _logs(self):
+        """Auditoría repartida a lo largo de los años de historia"""
+        a = self.aleatorio
+        total = self.equipos * self.logs_por_equipo
+        paso = (self.ahora - self.inicio) / max(1, total)
+        for i in range(total):
+            accion, modulo = a.choice(ACCIONES_AUDITORIA)
+            yield (a.randint(ID_USUARIO_SISTEMA, CANTIDAD_TECNICOS + 1), accion, modulo,
+                   a.randint(1, self.equipos), _fecha(self.inicio + paso * i), int(a.random() < 0.02))
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida de cada equipo
+    # ------------------------------------------------------------------
+
+    def _insertar_equipos(self, cursor):
+        """
+        Genera cada equipo con todo lo que le sigue (remito, presupuesto,
+        orden, repuestos, factura, pagos, garantía), por lotes para no
+        tener la escala completa en memoria
+        """
+        tablas = ["equipos", "remitos", "presupuestos", "ordenes_trabajo", "repuestos_usados",
+                  "facturacion", "pagos", "garantias"]
+        lotes = {tabla: [] for tabla in tablas}
+        sentencias = {tabla: self._sql_insertar(tabla) for tabla in tablas}
+
+        def volcar():
+            # En orden de claves foráneas
+            for tabla in tablas:
+                if lotes[tabla]:
+                    cursor.executemany(sentencias[tabla], lotes[tabla])
+                    self.filas[tabla] = self.filas.get(tabla, 0) + len(lotes[tabla])
+                    lotes[tabla].clear()
+
+        for id_equipo in range(1, self.equipos + 1):
+            self._ciclo_equipo(id_equipo, lotes)
+            if len(lotes["equipos"]) >= TAMANO_LOTE:
+                volcar()
+        volcar()
+
+    def _ciclo_equipo(self, id_equipo, lotes):
+        a = self.aleatorio
+        id_cliente = a.randint(1, self.clientes)
+        id_tecnico = a.randint(2, CANTIDAD_TECNICOS + 1)
+
+        # Los equipos llegan a lo largo de la historia, en orden
+        ingreso = self.inicio + (self.ahora - self.inicio) * (id_equipo / self.equipos)
+        ingreso -= timedelta(minutes=a.randint(0, 600))
+        dias = (self.ahora - ingreso).days
+
+        tipo = a.choices(TIPOS_DISPOSITIVO, (55, 10, 25, 7, 3))[0]
+        marca = a.choice(MARCAS[tipo])
+        falla = a.choice(FALLAS)
+
+        # Remito de ingreso: R-YYYYMMDD-#### correlativo por día
+        dia = ingreso.strftime("%Y%m%d")
+        self.remitos_por_dia[dia] = self.remitos_por_dia.get(dia, 0) + 1
+        lotes["remitos"].append((f"R-{dia}-{self.remitos_por_dia[dia]:04d}", id_equipo, id_cliente,
+                                 id_tecnico, _fecha(ingreso), 1))
+
+        # Presupuesto (casi todos los equipos) y respuesta del cliente
+        estado_equipo = "En revisión" if dias < 3 else "Entregado"
+        if a.random() < 0.9:
+            monto = round(a.uniform(5000, 150000), 2)
+            recargo = round(monto * 0.1, 2) if a.random() < 0.3 else 0
+            creado = ingreso + timedelta(hours=a.randint(2, 48))
+            if dias < 10:
+                estado = a.choices(["Pendiente", "Aceptado"], (60, 40))[0]
+            else:
+                estado = a.choices(["Aceptado", "Rechazado por cliente", "Rechazado por vencimiento"],
+                                   (70, 20, 10))[0]
+            lotes["presupuestos"].append((
+                id_equipo, id_equipo, id_cliente, id_tecnico, f"{falla}: revisión y reparación",
+                monto + recargo, recargo, monto, estado, _fecha(creado),
+                _fecha(creado + timedelta(days=7)),
+                None if estado == "Pendiente" else _fecha(creado + timedelta(days=a.randint(0, 7)))
+            ))
+
+            if estado == "Aceptado":
+                estado_equipo = self._orden(id_equipo, id_cliente, id_tecnico, creado, monto + recargo, lotes)
+            elif estado != "Pendiente":
+                estado_equipo = self._retiro_sin_reparacion()
+
+        movimiento = ingreso + timedelta(days=min(dias, a.randint(0, 20)))
+        lotes["equipos"].append((
+            id_equipo, id_cliente, tipo, marca, f"M-{a.randint(100, 99 + MODELOS_POR_MARCA)}",
+            f"SN{id_equipo:010d}" if a.random() < 0.8 else None,
+            a.choice(["Bueno", "Regular", "Con golpes"]), falla, _fecha(ingreso), estado_equipo,
+            _fecha(movimiento), _fecha(movimiento)
+        ))
+
+    def _orden(self, id_equipo, id_cliente, id_tecnico, aceptado, monto, lotes):
+        """Orden de un presupuesto aceptado; devuelve el estado final del equipo"""
+        a = self.aleatorio
+        inicio = aceptado + timedelta(days=a.randint(0, 3))
+        if inicio + timedelta(days=5) > self.ahora:
+            estado, fin, reparado = a.choice(["En diagnóstico", "En reparación", "Esperando repuesto"]), None, True
+        else:
+            reparado = a.random() < 0.92
+            estado = "Finalizado con reparación" if reparado else "Finalizado sin reparación"
+            fin = inicio + timedelta(days=a.randint(1, 5))
+
+        lotes["ordenes_trabajo"].append((
+            id_equipo, id_equipo, id_equipo, id_cliente, id_tecnico, "Reparación según presupuesto",
+            estado, _fecha(inicio), _fecha(fin) if fin else None, int(reparado)
+        ))
+
+        for _ in range(a.choices([0, 1, 2], (40, 45, 15))[0]):
+            lotes["repuestos_usados"].append((id_equipo, a.randint(1, self.repuestos), 1,
+                                              _fecha(inicio + timedelta(hours=4)), id_tecnico))
+
+        if fin is None:
+            return "En reparación"
+
+        # Factura y pagos (la mayoría paga todo al retirar); lo pagado y el
+        # estado de cobro los completan los triggers de los pagos
+        cobro = a.choices(["Pagado total", "Pagado parcial", "Pendiente"], (85, 10, 5))[0]
+        pagado = monto if cobro == "Pagado total" else (round(monto * 0.5, 2) if cobro == "Pagado parcial" else 0)
+        # Número F-YYYY-#### correlativo por año (los equipos no llegan en orden de finalización)
+        anio = fin.strftime("%Y")
+        self.facturas_por_anio[anio] = self.facturas_por_anio.get(anio, 0) + 1
+        lotes["facturacion"].append((id_equipo, f"F-{anio}-{self.facturas_por_anio[anio]:04d}", id_equipo,
+                                     id_cliente, monto, monto, _fecha(fin)))
+        if pagado:
+            anticipo = round(pagado * 0.4, 2)
+            partes = [pagado] if a.random() < 0.7 else [anticipo, round(pagado - anticipo, 2)]
+            for numero, parte in enumerate(partes):
+                lotes["pagos"].append((id_equipo, id_equipo, id_cliente, parte, a.choice(METODOS_PAGO),
+                                       int(len(partes) > 1 and numero == 0),
+                                       _fecha(fin + timedelta(hours=numero * 24)), id_tecnico))
+
+        if reparado:
+            dias_garantia = a.choice([30, 60, 90])
+            vencimiento = fin + timedelta(days=dias_garantia)
+            lotes["garantias"].append((
+                id_equipo, id_equipo, "Reparación según presupuesto", _fecha(fin), dias_garantia,
+                _fecha(vencimiento), "Mano de obra y repuestos colocados", "Golpes, humedad",
+                "Vigente" if vencimiento > self.ahora else "Vencida"
+            ))
+            return "Entregado"
+
+        return self._retiro_sin_reparacion()
+
+    def _retiro_sin_reparacion(self):
+        """La mayoría retira el equipo; algunos quedan sin retirar o abandonados"""
+        return self.aleatorio.choices(["Entregado", "Sin reparación", "Abandonado"], (85, 10, 5))[0]
+
+
+def generar_base(ruta, equipos, semilla=42, **opciones):
+    """
+    Crea una base sintética completa
+
+    Args:
+        ruta (Path): Archivo de la base (se reemplaza si existe)
+        equipos (int): Cantidad de equipos (escala)
+        semilla (int): Semilla del generador aleatorio
+        **opciones: equipos_por_cliente, anios, logs_por_equipo (ver GeneradorDatos)
+
+    Returns:
+        dict: Filas insertadas por tabla
+    """
+    db = _preparar_base(Path(ruta))
+    return GeneradorDatos(equipos, semilla, **opciones).generar(db)
+
+
+def obtener_base(directorio, escala, semilla=42, regenerar=False):
+    """
+    Devuelve la base sintética de una escala, generándola si no existe
+
+    Las bases se guardan en 'directorio' y se reutilizan entre corridas
+    (generar la escala de un millón lleva minutos).
+
+    Args:
+        directorio (Path): Carpeta de las bases generadas
+        escala (str): Escala con nombre (ver ESCALAS) o cantidad de equipos
+        semilla (int): Semilla del generador aleatorio
+        regenerar (bool): Volver a generarla aunque exista
+
+    Returns:
+        tuple: (ruta, resumen) con equipos, filas por tabla, tamaño y,
+            si se generó, los segundos que llevó
+    """
+    from base_datos.conexion import db
+
+    equipos = ESCALAS.get(str(escala).lower()) or int(escala)
+    ruta = Path(directorio) / f"techmanager_{escala}_s{semilla}.db"
+    resumen = {'equipos': equipos}
+
+    if regenerar or not ruta.exists():
+        print(f"  generando base de {equipos} equipos...", flush=True)
+        inicio = time.perf_counter()
+        resumen['filas'] = generar_base(ruta, equipos, semilla)
+        resumen['generacion_s'] = round(time.perf_counter() - inicio, 2)
+        db.desconectar()
+    else:
+        conexion = sqlite3.connect(str(ruta))
+        tablas = [fila[0] for fila in conexion.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+        resumen['filas'] = {t: conexion.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in tablas}
+        conexion.close()
+
+    resumen['tamanio_bytes'] = ruta.stat().st_size
+    return ruta, resumen
+
+
+@contextmanager
+def copia_de_trabajo(ruta):
+    """
+    Apunta la configuración a una copia temporal de una base sintética
+
+    Los benchmarks modifican datos (barridos, restauraciones, numeración);
+    la base generada queda intacta para la próxima corrida.
+
+    Args:
+        ruta (Path): Base sintética
+
+    Yields:
+        Path: Carpeta temporal donde está la copia (techmanager.db)
+    """
+    from base_datos.conexion import db
+
+    with tempfile.TemporaryDirectory(dir=Path(ruta).parent) as temporal:
+        temporal = Path(temporal)
+        shutil.copy2(ruta, temporal / "techmanager.db")
+        config.ruta_datos = temporal
+        config.ruta_base_datos = temporal / "techmanager.db"
+        config.ruta_backups = temporal / "backups"
+        config.ruta_backup_local = str(config.ruta_backups)
+        try:
+            yield temporal
+        finally:
+            db.desconectar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera una base de TechManager con datos sintéticos")
+    parser.add_argument("--equipos", default="1k",
+                        help=f"Cantidad de equipos o escala con nombre ({', '.join(ESCALAS)})")
+    parser.add_argument("--salida", type=Path, default=Path("techmanager_sintetica.db"))
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--equipos-por-cliente", type=float, default=2.0)
+    parser.add_argument("--anios", type=int, default=3, help="Años de historia")
+    parser.add_argument("--logs-por-equipo", type=int, default=3)
+    argumentos = parser.parse_args()
+
+    equipos = ESCALAS.get(argumentos.equipos.lower()) or int(argumentos.equipos)
+    config.ruta_logs = argumentos.salida.resolve().parent
+
+    inicio = time.perf_counter()
+    filas = generar_base(argumentos.salida.resolve(), equipos, argumentos.semilla,
+                         equipos_por_cliente=argumentos.equipos_por_cliente, anios=argumentos.anios,
+                         logs_por_equipo=argumentos.logs_por_equipo)
+    segundos = time.perf_counter() - inicio
+
+    for tabla, cantidad in filas.items():
+        print(f"{tabla:<18} {cantidad:>10}")
+    print(f"\n✓ {sum(filas.values())} filas en {segundos:.1f} s -> {argumentos.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - BENCHMARK DE EXPORTACIÓN DE PDF EN LOTE
+============================================================================
+Mide cómo escala la exportación en lote con la cantidad de procesos.
+Genera presupuestos sintéticos (no usa la base de datos) y los arma con
+impresion.exportacion_lote.renderizar_en_paralelo.
+
+Uso:
+    python -m benchmarks.exportacion_pdf --documentos 400
+============================================================================
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import zipfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from impresion.exportacion_lote import renderizar_en_paralelo
+
+
+MARCAS = ["Samsung", "Motorola", "Apple", "Xiaomi", "Lenovo", "HP", "Dell"]
+TIPOS = ["Celular", "Notebook", "Tablet", "PC"]
+
+
+def generar_presupuestos(cantidad, semilla=42):
+    """
+    Genera presupuestos sintéticos listos para la plantilla 'presupuesto'
+
+    Args:
+        cantidad (int): Cantidad de documentos
+        semilla (int): Semilla del generador aleatorio
+
+    Yields:
+        tuple: (plantilla, datos, nombre_archivo)
+    """
+    aleatorio = random.Random(semilla)
+    fecha_base = datetime(2025, 1, 1)
+
+    for numero in range(1, cantidad + 1):
+        monto = round(aleatorio.uniform(5000, 150000), 2)
+        recargo = round(monto * 0.1, 2) if aleatorio.random() < 0.3 else 0
+        fecha = fecha_base + timedelta(minutes=aleatorio.randint(0, 60 * 24 * 365))
+        datos = {
+            'id_presupuesto': numero,
+            'fecha_creacion': fecha.isoformat(sep=' '),
+            'fecha_vencimiento': (fecha + timedelta(days=15)).isoformat(sep=' '),
+            'estado': 'Pendiente',
+            'cliente_nombre': f"Cliente {aleatorio.randint(1, 5000)}",
+            'cliente_telefono': f"11{aleatorio.randint(10000000, 99999999)}",
+            'tipo_dispositivo': aleatorio.choice(TIPOS),
+            'marca': aleatorio.choice(MARCAS),
+            'modelo': f"M-{aleatorio.randint(100, 999)}",
+            'descripcion_trabajo': "Reemplazo de módulo y limpieza general. " * aleatorio.randint(1, 6),
+            'monto_sin_recargo': monto,
+            'recargo_transferencia': recargo,
+            'monto_total': monto + recargo,
+        }
+        yield "presupuesto", datos, f"presupuesto_{numero}.pdf"
+
+
+def medir(documentos, procesos, comprimir):
+    """
+    Mide una corrida de exportación
+
+    Returns:
+        float: Segundos transcurridos
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        inicio = time.perf_counter()
+        if comprimir:
+            with zipfile.ZipFile(Path(directorio) / "lote.zip", "w", zipfile.ZIP_DEFLATED) as archivo_zip:
+                renderizar_en_paralelo(generar_presupuestos(documentos), archivo_zip, procesos)
+        else:
+            renderizar_en_paralelo(generar_presupuestos(documentos), Path(directorio), procesos)
+        return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de exportación de PDF en lote")
+    parser.add_argument("--documentos", type=int, default=400)
+    parser.add_argument("--procesos", type=int, nargs="*",
+                        help="Cantidades de procesos a medir (por defecto 1, 2, 4... hasta los núcleos)")
+    parser.add_argument("--carpeta", action="store_true", help="Escribir en carpeta en lugar de ZIP")
+    argumentos = parser.parse_args()
+
+    nucleos = os.cpu_count() or 1
+    procesos = argumentos.procesos or sorted({1, *[2 ** i for i in range(1, 6) if 2 ** i <= nucleos], nucleos})
+
+    print(f"Documentos: {argumentos.documentos} - Núcleos: {nucleos}")
+    print(f"{'Procesos':>9} {'Segundos':>10} {'Docs/s':>9} {'Aceleración':>12}")
+
+    base = None
+    for cantidad in procesos:
+        segundos = medir(argumentos.documentos, cantidad, not argumentos.carpeta)
+        base = base or segundos
+        print(f"{cantidad:>9} {segundos:>10.2f} {argumentos.documentos / segundos:>9.1f} {base / segundos:>11.2f}x")
+
+
+if __name__ == "__main__":
+    main()
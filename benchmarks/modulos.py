@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - BENCHMARK DE LOS MÓDULOS DE NEGOCIO
+============================================================================
+Mide los listados (listar_*), las estadísticas de las tarjetas
+(obtener_estadisticas_*), los barridos de vencimientos, backup/restauración
+y la numeración de remitos y facturas sobre bases sintéticas de distintas
+escalas (ver benchmarks.datos_sinteticos).
+
+El resultado se guarda en JSON para comparar entre versiones:
+
+    python -m benchmarks.modulos --escalas 1k 100k --salida v1.json
+    python -m benchmarks.modulos --escalas 1k 100k --salida v2.json --comparar v1.json
+
+Las bases generadas se guardan en --directorio y se reutilizan entre
+corridas (--regenerar para volver a crearlas). Cada corrida trabaja sobre
+una copia, porque los barridos y la restauración modifican los datos.
+
+Los módulos atrapan sus errores y los dejan en el log; el benchmark los
+registra en cada escenario para que un tiempo "rápido" por una consulta
+fallida no pase por bueno.
+============================================================================
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from sistema_base.configuracion import config
+from sistema_base.constantes import VERSION
+from benchmarks.datos_sinteticos import ESCALAS, obtener_base, copia_de_trabajo
+
+
+# Consultas de solo lectura: (nombre, módulo, clase, método)
+LISTADOS = [
+    ("listar_clientes", "modulos.clientes", "ModuloClientes", "listar_clientes"),
+    ("listar_equipos", "modulos.equipos_LOGICA", "ModuloEquipos", "listar_equipos"),
+    ("listar_presupuestos", "modulos.presupuestos_LOGICA", "ModuloPresupuestos", "listar_presupuestos"),
+    ("listar_ordenes", "modulos.ordenes_LOGICA", "ModuloOrdenes", "listar_ordenes"),
+    ("listar_repuestos", "modulos.repuestos_LOGICA", "ModuloRepuestos", "listar_repuestos"),
+    ("listar_facturas", "modulos.facturacion_LOGICA", "ModuloFacturacion", "listar_facturas"),
+    ("listar_pagos", "modulos.pagos_LOGICA", "ModuloPagos", "listar_pagos"),
+    ("listar_garantias", "modulos.garantias_LOGICA", "ModuloGarantias", "listar_garantias"),
+    ("listar_remitos", "modulos.remitos_LOGICA", "ModuloRemitos", "listar_remitos"),
+    ("listar_auditoria", "modulos.auditoria_LOGICA", "ModuloAuditoria", "listar_auditoria"),
+    ("listar_backups", "modulos.backups_LOGICA", "ModuloBackups", "listar_backups"),
+    ("listar_usuarios", "modulos.usuarios", "ModuloUsuarios", "listar_usuarios"),
+]
+
+ESTADISTICAS = [
+    ("estadisticas_clientes", "modulos.clientes", "ModuloClientes", "obtener_estadisticas_clientes"),
+    ("estadisticas_equipos", "modulos.equipos_LOGICA", "ModuloEquipos", "obtener_estadisticas_equipos"),
+    ("estadisticas_presupuestos", "modulos.presupuestos_LOGICA", "ModuloPresupuestos",
+     "obtener_estadisticas_presupuestos"),
+    ("estadisticas_ordenes", "modulos.ordenes_LOGICA", "ModuloOrdenes", "obtener_estadisticas_ordenes"),
+    ("estadisticas_repuestos", "modulos.repuestos_LOGICA", "ModuloRepuestos", "obtener_estadisticas_repuestos"),
+    ("estadisticas_facturas", "modulos.facturacion_LOGICA", "ModuloFacturacion", "obtener_estadisticas_facturas"),
+    ("estadisticas_pagos", "modulos.pagos_LOGICA", "ModuloPagos", "obtener_estadisticas_pagos"),
+    ("estadisticas_garantias", "modulos.garantias_LOGICA", "ModuloGarantias", "obtener_estadisticas_garantias"),
+    ("estadisticas_remitos", "modulos.remitos_LOGICA", "ModuloRemitos", "obtener_estadisticas_remitos"),
+    ("estadisticas_auditoria", "modulos.auditoria_LOGICA", "ModuloAuditoria", "obtener_estadisticas_auditoria"),
+    ("estadisticas_backups", "modulos.backups_LOGICA", "ModuloBackups", "obtener_estadisticas_backups"),
+    ("estadisticas_usuarios", "modulos.usuarios", "ModuloUsuarios", "obtener_estadisticas_usuarios"),
+]
+
+# Barridos automáticos: modifican datos, se miden una sola vez y al final
+BARRIDOS = [
+    ("vencimientos_presupuestos", "modulos.presupuestos_LOGICA", "ModuloPresupuestos", "verificar_vencimientos"),
+    ("vencimientos_garantias", "modulos.garantias_LOGICA", "ModuloGarantias", "verificar_vencimientos"),
+    ("alertas_equipos", "modulos.equipos_LOGICA", "ModuloEquipos", "verificar_alertas_automaticas"),
+]
+
+# Números emitidos por repetición en los escenarios de numeración
+NUMEROS_POR_REPETICION = 100
+
+# Una mediana más lenta que esto respecto de la corrida anterior se marca,
+# salvo que la diferencia sea menor que el ruido de medición
+UMBRAL_REGRESION = 1.2
+DIFERENCIA_MINIMA_MS = 5
+
+
+def _funcion(modulo, clase, metodo):
+    return getattr(getattr(importlib.import_module(modulo), clase), metodo)
+
+
+def _cantidad(resultado):
+    """Filas devueltas (listas) o claves (dicts) de un resultado"""
+    if isinstance(resultado, (list, tuple, dict)):
+        return len(resultado)
+    if isinstance(resultado, int):
+        return resultado
+    return None
+
+
+@contextmanager
+def _capturar_errores(errores):
+    """Junta los mensajes ERROR que los módulos dejan en el log"""
+    guardar_log = config.guardar_log
+
+    def registrar(mensaje, tipo='INFO'):
+        if tipo == "ERROR":
+            errores.append(str(mensaje))
+        guardar_log(mensaje, tipo)
+
+    config.guardar_log = registrar
+    try:
+        yield
+    finally:
+        config.guardar_log = guardar_log
+
+
+def medir(funcion, repeticiones):
+    """
+    Mide una función varias veces
+
+    Args:
+        funcion (callable): Escenario sin argumentos
+        repeticiones (int): Cantidad de corridas
+
+    Returns:
+        dict: Tiempos en ms (mínimo, mediana, máximo), filas devueltas y errores
+    """
+    tiempos, errores, resultado = [], [], None
+
+    with _capturar_errores(errores):
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            try:
+                resultado = funcion()
+            except Exception as e:
+                errores.append(f"{type(e).__name__}: {e}")
+                break
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+
+    medicion = {
+        'repeticiones': len(tiempos),
+        'min_ms': round(min(tiempos), 3) if tiempos else None,
+        'mediana_ms': round(statistics.median(tiempos), 3) if tiempos else None,
+        'max_ms': round(max(tiempos), 3) if tiempos else None,
+        'filas': _cantidad(resultado),
+    }
+    if errores:
+        # Sin repetir el mismo error de cada corrida
+        medicion['errores'] = list(dict.fromkeys(errores))[:5]
+    return medicion
+
+
+# ----------------------------------------------------------------------
+# Escenarios que no son una llamada directa a un módulo
+# ----------------------------------------------------------------------
+
+def _numeracion(metodo):
+    """Emite NUMEROS_POR_REPETICION números, cada uno en su transacción"""
+    def escenario():
+        generar = _funcion(*metodo)
+        return [generar() for _ in range(NUMEROS_POR_REPETICION)]
+    return escenario
+
+
+def _antiguedad_saldos():
+    """Reporte de antigüedad de saldos sin su cache (la consulta de cada día)"""
+    def escenario():
+        from base_datos.conexion import db
+        from modulos.facturacion_LOGICA import ModuloFacturacion
+        return db.obtener_todos(*ModuloFacturacion.consulta_antiguedad_saldos())
+    return escenario
+
+
+def _repuestos_compatibles():
+    """Repuestos en stock para el equipo de una orden (pantalla de detalle de la orden)"""
+    def escenario():
+        from base_datos.conexion import db
+        from modulos.repuestos_LOGICA import ModuloRepuestos
+        equipo = db.obtener_uno("SELECT MAX(id_equipo) AS id_equipo FROM ordenes_trabajo")
+        return ModuloRepuestos.obtener_repuestos_compatibles(equipo['id_equipo'])
+    return escenario
+
+
+def _backup():
+    """Backup automático con ModuloBackups.crear_backup"""
+    def escenario():
+        from modulos.backups_LOGICA import ModuloBackups
+        exito, mensaje, _ = ModuloBackups.crear_backup("Automático", "Benchmark")
+        if not exito:
+            raise RuntimeError(mensaje)
+    return escenario
+
+
+def _restauracion():
+    """Restaurar el último backup con ModuloBackups.restaurar_backup (incluye el backup de seguridad)"""
+    def escenario():
+        from base_datos.conexion import db
+        from modulos.backups_LOGICA import ModuloBackups
+        from sistema_base.sesion import SESION_SISTEMA
+        ultimo = db.obtener_uno("SELECT MAX(id_backup) as id_backup FROM backups WHERE exitoso = 1")
+        exito, mensaje = ModuloBackups.restaurar_backup(ultimo['id_backup'], SESION_SISTEMA.id_usuario)
+        if not exito:
+            raise RuntimeError(mensaje)
+    return escenario
+
+
+def ejecutar_escala(nombre_escala, directorio, repeticiones, semilla, regenerar=False):
+    """
+    Corre todos los escenarios sobre una base de la escala pedida
+
+    Returns:
+        dict: Datos de la base y mediciones por escenario
+    """
+    from sistema_base.sesion import SESION_SISTEMA
+
+    base, resumen = obtener_base(directorio, nombre_escala, semilla, regenerar)
+
+    escenarios = {}
+    with copia_de_trabajo(base):
+        config.establecer_sesion(SESION_SISTEMA)
+        try:
+            for nombre, *metodo in LISTADOS + ESTADISTICAS:
+                try:
+                    # La importación no entra en la medición
+                    importlib.import_module(metodo[0])
+                except Exception:
+                    pass
+                escenarios[nombre] = medir(lambda: _funcion(*metodo)(), repeticiones)
+                print(f"  {nombre:<28} {_formato(escenarios[nombre])}", flush=True)
+
+            otros = [
+                ("numeracion_remitos", _numeracion(("modulos.remitos_LOGICA", "ModuloRemitos", "generar_numero_remito")), repeticiones),
+                ("numeracion_facturas", _numeracion(("modulos.facturacion_LOGICA", "ModuloFacturacion", "generar_numero_factura")), repeticiones),
+                ("antiguedad_saldos", _antiguedad_saldos(), repeticiones),
+                ("repuestos_compatibles", _repuestos_compatibles(), repeticiones),
+                ("backup", _backup(), repeticiones),
+                ("restauracion", _restauracion(), repeticiones),
+            ]
+            otros += [(nombre, (lambda m=metodo: _funcion(*m)()), 1) for nombre, *metodo in BARRIDOS]
+
+            for nombre, escenario, veces in otros:
+                escenarios[nombre] = medir(escenario, veces)
+                print(f"  {nombre:<28} {_formato(escenarios[nombre])}", flush=True)
+        finally:
+            config.cerrar_sesion()
+
+    resumen['escenarios'] = escenarios
+    return resumen
+
+
+def _formato(medicion):
+    if medicion['mediana_ms'] is None:
+        return "✗ " + medicion['errores'][0]
+    texto = f"{medicion['mediana_ms']:>10.1f} ms  filas={medicion['filas']}"
+    return texto + ("  ⚠ errores en el log" if medicion.get('errores') else "")
+
+
+def comparar(actual, anterior, metricas=("mediana_ms",)):
+    """
+    Imprime la relación de tiempos contra una corrida anterior
+
+    Args:
+        actual (dict): Resultados de esta corrida
+        anterior (dict): Resultados cargados del JSON anterior
+        metricas (tuple): Claves de cada escenario a comparar
+
+    Returns:
+        int: Cantidad de mediciones más lentas que UMBRAL_REGRESION
+    """
+    regresiones = 0
+    print(f"\nComparación con {anterior.get('version')} ({anterior.get('fecha')})")
+    print(f"{'Escala':<6} {'Escenario':<40} {'Antes':>10} {'Ahora':>10} {'Relación':>9}")
+
+    for escala, datos in actual['escalas'].items():
+        previos = anterior.get('escalas', {}).get(escala, {}).get('escenarios', {})
+        for nombre, medicion in datos['escenarios'].items():
+            previo = previos.get(nombre) or {}
+            for metrica in metricas:
+                antes, ahora = previo.get(metrica), medicion.get(metrica)
+                if not antes or not ahora:
+                    continue
+                relacion = ahora / antes
+                marca = "  ⚠" if relacion > UMBRAL_REGRESION and ahora - antes > DIFERENCIA_MINIMA_MS else ""
+                regresiones += bool(marca)
+                etiqueta = nombre if len(metricas) == 1 else f"{nombre}.{metrica}"
+                print(f"{escala:<6} {etiqueta:<40} {antes:>10.1f} {ahora:>10.1f} {relacion:>8.2f}x{marca}")
+
+    return regresiones
+
+
+def datos_de_la_corrida(argumentos):
+    """Encabezado común de los resultados (versión, entorno, parámetros)"""
+    return {
+        'version': VERSION,
+        'fecha': datetime.now().isoformat(timespec="seconds"),
+        'python': sys.version.split()[0],
+        'sqlite': sqlite3.sqlite_version,
+        'plataforma': platform.platform(),
+        'semilla': argumentos.semilla,
+        'repeticiones': argumentos.repeticiones,
+        'escalas': {},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los módulos de negocio")
+    parser.add_argument("--escalas", nargs="*", default=["1k", "100k"],
+                        help=f"Escalas a medir ({', '.join(ESCALAS)} o una cantidad de equipos)")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--directorio", type=Path, default=Path(tempfile.gettempdir()) / "techmanager_benchmarks",
+                        help="Carpeta donde se guardan y reutilizan las bases generadas")
+    parser.add_argument("--regenerar", action="store_true", help="Volver a generar las bases")
+    parser.add_argument("--salida", type=Path, help="Archivo JSON con los resultados")
+    parser.add_argument("--comparar", type=Path, help="JSON de una corrida anterior")
+    argumentos = parser.parse_args()
+
+    directorio = argumentos.directorio.resolve()
+    directorio.mkdir(parents=True, exist_ok=True)
+    config.ruta_logs = directorio
+
+    resultados = datos_de_la_corrida(argumentos)
+
+    for escala in argumentos.escalas:
+        print(f"\nEscala {escala}")
+        resultados['escalas'][escala] = ejecutar_escala(
+            escala, directorio, argumentos.repeticiones, argumentos.semilla, argumentos.regenerar
+        )
+
+    if argumentos.salida:
+        argumentos.salida.write_text(json.dumps(resultados, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n✓ Resultados en {argumentos.salida}")
+
+    if argumentos.comparar:
+        anterior = json.loads(argumentos.comparar.read_text(encoding="utf-8"))
+        if comparar(resultados, anterior):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - PRUEBA DE ESTRÉS DE NUMERACIÓN
+============================================================================
+Varios procesos (como varias terminales sobre la misma base) emiten
+remitos al mismo tiempo. Compara el método anterior (buscar el último
+número con LIKE y sumar uno) con base_datos.secuencias, y verifica que
+con las secuencias no haya números repetidos ni saltos.
+
+Usa una base temporal; no toca los datos del sistema.
+
+Uso:
+    python -m benchmarks.secuencias --procesos 8 --numeros 500
+============================================================================
+"""
+
+import argparse
+import multiprocessing
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from sistema_base.configuracion import config
+
+
+def _preparar_base(ruta):
+    """
+    Crea la base temporal con el esquema real y el cliente y el equipo a
+    los que se emiten los remitos
+    """
+    config.ruta_datos = ruta.parent
+    config.ruta_base_datos = ruta
+    config.ruta_logs = ruta.parent
+
+    from base_datos.crear_tablas import inicializar_base_datos
+    from base_datos.conexion import db
+
+    inicializar_base_datos()
+    with db.transaccion() as cursor:
+        cursor.execute(
+            "INSERT INTO clientes (id_cliente, nombre, apellido, telefono) VALUES (1, 'Estrés', 'Prueba', '0')"
+        )
+        cursor.execute("""
+            INSERT INTO equipos (id_equipo, id_cliente, tipo_dispositivo, marca, modelo,
+                                 estado_fisico, falla_declarada)
+            VALUES (1, 1, 'Celular', 'Prueba', 'Estrés', 'Bueno', 'Ninguna')
+        """)
+    db.desconectar()
+
+
+# Remito de la prueba: el número más el equipo, el cliente y el usuario del sistema
+INSERTAR_REMITO = """
+    INSERT INTO remitos (numero_remito, id_equipo, id_cliente, id_usuario)
+    VALUES (?, 1, 1, 0)
+"""
+
+
+def _emitir_con_like(conexion, cursor):
+    """Método anterior: último número del día + 1 (lectura y escritura separadas)"""
+    prefijo = f"R-{time.strftime('%Y%m%d')}-"
+    ultimo = conexion.execute(
+        "SELECT numero_remito FROM remitos WHERE numero_remito LIKE ? ORDER BY numero_remito DESC LIMIT 1",
+        (f"{prefijo}%",)
+    ).fetchone()
+    numero = f"{prefijo}{(int(ultimo[0].split('-')[-1]) + 1 if ultimo else 1):04d}"
+    cursor.execute(INSERTAR_REMITO, (numero,))
+
+
+def _emitir_con_secuencia(conexion, cursor):
+    """Método nuevo: contador atómico dentro de la misma transacción"""
+    from base_datos.secuencias import siguiente_numero_remito
+    cursor.execute(INSERTAR_REMITO, (siguiente_numero_remito(cursor),))
+
+
+def _trabajador(ruta, metodo, cantidad, inicio):
+    """
+    Emite 'cantidad' remitos con su propia conexión
+
+    Returns:
+        tuple: (emitidos, colisiones, otros_errores)
+    """
+    config.ruta_datos = ruta.parent
+    config.ruta_base_datos = ruta
+    config.ruta_logs = ruta.parent
+
+    from base_datos.conexion import db
+    conexion = db.conectar()
+    conexion.execute("PRAGMA busy_timeout = 30000")
+    emitir = _emitir_con_like if metodo == "like" else _emitir_con_secuencia
+
+    emitidos = colisiones = otros = 0
+    inicio.wait()
+
+    for _ in range(cantidad):
+        cursor = conexion.cursor()
+        try:
+            emitir(conexion, cursor)
+            conexion.commit()
+            emitidos += 1
+        except sqlite3.IntegrityError:
+            conexion.rollback()
+            colisiones += 1
+        except sqlite3.Error:
+            conexion.rollback()
+            otros += 1
+        finally:
+            cursor.close()
+
+    return emitidos, colisiones, otros
+
+
+def ejecutar(metodo, procesos, cantidad):
+    """
+    Corre la prueba con un método de numeración
+
+    Returns:
+        dict: Resultados de la corrida
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = Path(directorio) / "estres.db"
+        _preparar_base(ruta)
+
+        with multiprocessing.Manager() as administrador:
+            inicio = administrador.Event()
+            with multiprocessing.Pool(procesos) as pool:
+                tareas = [pool.apply_async(_trabajador, (ruta, metodo, cantidad, inicio)) for _ in range(procesos)]
+                comienzo = time.perf_counter()
+                inicio.set()
+                resultados = [tarea.get() for tarea in tareas]
+                segundos = time.perf_counter() - comienzo
+
+        conexion = sqlite3.connect(str(ruta))
+        numeros = [int(fila[0].split("-")[-1]) for fila in conexion.execute("SELECT numero_remito FROM remitos")]
+        conexion.close()
+
+    emitidos = sum(r[0] for r in resultados)
+    return {
+        'metodo': metodo,
+        'emitidos': emitidos,
+        'colisiones': sum(r[1] for r in resultados),
+        'otros_errores': sum(r[2] for r in resultados),
+        'segundos': segundos,
+        'correlativos': sorted(numeros) == list(range(1, len(numeros) + 1)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de estrés de numeración de remitos")
+    parser.add_argument("--procesos", type=int, default=8)
+    parser.add_argument("--numeros", type=int, default=500, help="Remitos a emitir por proceso")
+    argumentos = parser.parse_args()
+
+    total = argumentos.procesos * argumentos.numeros
+    print(f"Procesos: {argumentos.procesos} - Remitos pedidos: {total}")
+    print(f"{'Método':<11} {'Emitidos':>9} {'Colisiones':>11} {'Errores':>8} {'Remitos/s':>10} {'Correlativos':>13}")
+
+    fallo = False
+    for metodo in ("like", "secuencia"):
+        r = ejecutar(metodo, argumentos.procesos, argumentos.numeros)
+        print(f"{metodo:<11} {r['emitidos']:>9} {r['colisiones']:>11} {r['otros_errores']:>8} "
+              f"{r['emitidos'] / r['segundos']:>10.0f} {'sí' if r['correlativos'] else 'no':>13}")
+
+        if metodo == "secuencia":
+            fallo = r['emitidos'] != total or r['colisiones'] or r['otros_errores'] or not r['correlativos']
+
+    if fallo:
+        print("\n✗ La numeración con secuencias perdió o repitió números")
+        raise SystemExit(1)
+    print("\n✓ Numeración con secuencias sin colisiones ni saltos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - PRUEBA DE CARGA DEL MODO SERVIDOR
+============================================================================
+Levanta el servidor (servidor.servidor) sobre una base sintética y simula
+las estaciones del local trabajando al mismo tiempo:
+
+- mostrador: busca clientes, lista equipos y emite remitos
+- banco: lista órdenes y repuestos y actualiza los equipos que repara
+
+Cada "pantalla" es el grupo de operaciones que necesita una ventana. Se
+mide dos veces: enviando la pantalla en un solo lote y enviando cada
+operación por separado, para ver cuánto ahorra el agrupamiento.
+
+    python -m benchmarks.servidor --escalas 1k 100k --estaciones 1 2 --salida srv_v1.json
+    python -m benchmarks.servidor --escalas 1k 100k --estaciones 1 2 --comparar srv_v1.json
+
+Las sesiones de las estaciones se crean directamente en el servidor: el
+costo del login (bcrypt) no es parte de esta prueba.
+============================================================================
+"""
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from sistema_base.configuracion import config
+from benchmarks.datos_sinteticos import ESCALAS, obtener_base, copia_de_trabajo
+from benchmarks.modulos import comparar, datos_de_la_corrida
+
+
+def _llamada(modulo, clase, metodo, *args, **kwargs):
+    return {'tipo': "llamada", 'modulo': modulo, 'clase': clase, 'metodo': metodo,
+            'args': list(args), 'kwargs': kwargs}
+
+
+def _sql(accion, consulta, *parametros):
+    return {'tipo': "sql", 'accion': accion, 'consulta': consulta, 'parametros': list(parametros) or None}
+
+
+# Pantallas de cada perfil: función (azar, id de equipo al azar) -> operaciones
+PANTALLAS = {
+    "mostrador": [
+        lambda azar, id_equipo: [
+            _llamada("clientes", "ModuloClientes", "listar_clientes", azar.choice(["", "Gar", "Rod", "Mar"])),
+            _llamada("clientes", "ModuloClientes", "obtener_estadisticas_clientes"),
+        ],
+        lambda azar, id_equipo: [
+            _llamada("equipos_LOGICA", "ModuloEquipos", "listar_equipos"),
+            _llamada("equipos_LOGICA", "ModuloEquipos", "obtener_estadisticas_equipos"),
+        ],
+        lambda azar, id_equipo: [
+            _llamada("remitos_LOGICA", "ModuloRemitos", "generar_numero_remito"),
+            _sql("obtener_uno", "SELECT * FROM equipos WHERE id_equipo = ?", id_equipo),
+        ],
+    ],
+    "banco": [
+        lambda azar, id_equipo: [
+            _llamada("ordenes_LOGICA", "ModuloOrdenes", "listar_ordenes"),
+            _llamada("ordenes_LOGICA", "ModuloOrdenes", "obtener_estadisticas_ordenes"),
+        ],
+        lambda azar, id_equipo: [
+            _llamada("repuestos_LOGICA", "ModuloRepuestos", "listar_repuestos"),
+            _llamada("repuestos_LOGICA", "ModuloRepuestos", "obtener_estadisticas_repuestos"),
+        ],
+        lambda azar, id_equipo: [
+            _sql("ejecutar", "UPDATE equipos SET fecha_ultimo_movimiento = CURRENT_TIMESTAMP WHERE id_equipo = ?",
+                 id_equipo),
+            _sql("obtener_todos", "SELECT * FROM historial_notas WHERE modulo = 'Equipos' AND id_registro = ?",
+                 id_equipo),
+        ],
+    ],
+}
+
+
+class Estacion(threading.Thread):
+    """Una PC del local mostrando pantallas una tras otra"""
+
+    def __init__(self, nombre, perfil, url, token, pantallas, en_lote, ids_equipos, semilla):
+        super().__init__(name=nombre, daemon=True)
+        from servidor.cliente import ClienteServidor
+        self.perfil = perfil
+        self.cliente = ClienteServidor(url)
+        self.cliente.token = token
+        self.pantallas = pantallas
+        self.en_lote = en_lote
+        self.ids_equipos = ids_equipos
+        self.azar = random.Random(semilla)
+        self.tiempos = []
+        self.errores = []
+
+    def run(self):
+        for _ in range(self.pantallas):
+            operaciones = self.azar.choice(PANTALLAS[self.perfil])(self.azar, self.azar.choice(self.ids_equipos))
+            inicio = time.perf_counter()
+            try:
+                if self.en_lote:
+                    respuestas = self.cliente.enviar(operaciones)
+                else:
+                    respuestas = [self.cliente.enviar([operacion])[0] for operacion in operaciones]
+                self.errores += [r['error'] for r in respuestas if not r.get('ok')]
+            except Exception as e:
+                self.errores.append(f"{type(e).__name__}: {e}")
+            self.tiempos.append((time.perf_counter() - inicio) * 1000)
+
+
+def _percentil(valores, proporcion):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * proporcion))]
+
+
+def simular(url, tokens, estaciones_por_perfil, pantallas, en_lote, ids_equipos, semilla):
+    """
+    Corre todas las estaciones a la vez
+
+    Returns:
+        dict: Mediciones por perfil y del conjunto
+    """
+    estaciones = []
+    for perfil in PANTALLAS:
+        for numero in range(estaciones_por_perfil):
+            estaciones.append(Estacion(f"{perfil}{numero + 1}", perfil, url, tokens[perfil], pantallas,
+                                       en_lote, ids_equipos, semilla + len(estaciones)))
+
+    inicio = time.perf_counter()
+    for estacion in estaciones:
+        estacion.start()
+    for estacion in estaciones:
+        estacion.join()
+    segundos = time.perf_counter() - inicio
+
+    resultado = {}
+    for perfil in PANTALLAS:
+        tiempos = [t for e in estaciones if e.perfil == perfil for t in e.tiempos]
+        errores = [x for e in estaciones if e.perfil == perfil for x in e.errores]
+        resultado[perfil] = {
+            'pantallas': len(tiempos),
+            'p50_ms': round(statistics.median(tiempos), 3),
+            'p95_ms': round(_percentil(tiempos, 0.95), 3),
+            'max_ms': round(max(tiempos), 3),
+        }
+        if errores:
+            resultado[perfil]['errores'] = list(dict.fromkeys(errores))[:5]
+
+    resultado['total'] = {
+        'estaciones': len(estaciones),
+        'segundos': round(segundos, 3),
+        'pantallas_por_segundo': round(sum(len(e.tiempos) for e in estaciones) / segundos, 1),
+    }
+    return resultado
+
+
+def ejecutar_escala(nombre_escala, directorio, estaciones, pantallas, semilla, regenerar=False):
+    """
+    Prueba de carga sobre una base de la escala pedida
+
+    Returns:
+        dict: Datos de la base y mediciones por cantidad de estaciones y modo
+    """
+    from base_datos.conexion import db
+    from servidor.servidor import iniciar_en_hilo
+    from sistema_base.sesion import Sesion
+
+    base, resumen = obtener_base(directorio, nombre_escala, semilla, regenerar)
+
+    escenarios = {}
+    with copia_de_trabajo(base):
+        ids_equipos = [fila[0] for fila in db.conectar().execute("SELECT id_equipo FROM equipos LIMIT 5000")]
+        db.desconectar()
+
+        servidor, puerto, detener = iniciar_en_hilo()
+        try:
+            # Usuarios de la base sintética: administrador (1) y técnico (2)
+            servidor.sesiones["mostrador"] = Sesion(1, "admin", "Administrador", "admin")
+            servidor.sesiones["banco"] = Sesion(2, "tecnico1", "Técnico 1", "tecnico")
+            tokens = {"mostrador": "mostrador", "banco": "banco"}
+            url = f"http://127.0.0.1:{puerto}"
+
+            for cantidad in estaciones:
+                for en_lote in (True, False):
+                    modo = "lotes" if en_lote else "individual"
+                    cache_antes = dict(servidor.cache.resumen())
+                    medicion = simular(url, tokens, cantidad, pantallas, en_lote, ids_equipos, semilla)
+                    cache = servidor.cache.resumen()
+                    aciertos = cache['aciertos'] - cache_antes['aciertos']
+                    consultas = aciertos + cache['fallos'] - cache_antes['fallos']
+                    medicion['total']['tasa_aciertos_cache'] = round(aciertos / consultas, 3) if consultas else None
+
+                    for perfil, datos in medicion.items():
+                        escenarios[f"{perfil}_x{cantidad}_{modo}"] = datos
+                    total = medicion['total']
+                    print(f"  {cantidad} por perfil, {modo:<10} {total['pantallas_por_segundo']:>8.1f} pantallas/s  "
+                          f"mostrador p95 {medicion['mostrador']['p95_ms']:>7.1f} ms  "
+                          f"banco p95 {medicion['banco']['p95_ms']:>7.1f} ms  "
+                          f"caché {total['tasa_aciertos_cache']}", flush=True)
+        finally:
+            detener()
+
+    resumen['escenarios'] = escenarios
+    return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del modo servidor")
+    parser.add_argument("--escalas", nargs="*", default=["1k"],
+                        help=f"Escalas a medir ({', '.join(ESCALAS)} o una cantidad de equipos)")
+    parser.add_argument("--estaciones", nargs="*", type=int, default=[1, 2],
+                        help="Estaciones por perfil (1 = un mostrador y un banco)")
+    parser.add_argument("--repeticiones", type=int, default=50, help="Pantallas que muestra cada estación")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--directorio", type=Path, default=Path(tempfile.gettempdir()) / "techmanager_benchmarks",
+                        help="Carpeta donde se guardan y reutilizan las bases generadas")
+    parser.add_argument("--regenerar", action="store_true", help="Volver a generar las bases")
+    parser.add_argument("--salida", type=Path, help="Archivo JSON con los resultados")
+    parser.add_argument("--comparar", type=Path, help="JSON de una corrida anterior")
+    argumentos = parser.parse_args()
+
+    directorio = argumentos.directorio.resolve()
+    directorio.mkdir(parents=True, exist_ok=True)
+    config.ruta_logs = directorio
+
+    resultados = datos_de_la_corrida(argumentos)
+    for escala in argumentos.escalas:
+        print(f"\nEscala {escala}")
+        resultados['escalas'][escala] = ejecutar_escala(
+            escala, directorio, argumentos.estaciones, argumentos.repeticiones, argumentos.semilla, argumentos.regenerar
+        )
+
+    if argumentos.salida:
+        argumentos.salida.write_text(json.dumps(resultados, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n✓ Resultados en {argumentos.salida}")
+
+    if argumentos.comparar:
+        anterior = json.loads(argumentos.comparar.read_text(encoding="utf-8"))
+        if comparar(resultados, anterior, ("p50_ms", "p95_ms")):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - BENCHMARK DE VENTANAS (SIN PANTALLA)
+============================================================================
+Arma cada ventana de interfaz/ventanas sobre una base sintética y mide:
+
+- construcción: crear la ventana (incluye su primera carga de datos)
+- primer pintado: desde show() hasta el primer evento Paint
+- llenado de la tabla: volver a llamar a cargar_*, en ms cada 1000 filas
+- memoria: lo que crece el proceso con la ventana y el pico del proceso
+
+Corre con la plataforma 'offscreen' de Qt, así que funciona en un
+servidor de CI sin pantalla. Los resultados se guardan en JSON con el
+mismo formato que benchmarks.modulos y se comparan igual:
+
+    python -m benchmarks.ventanas --escalas 1k 100k --salida ui_v1.json
+    python -m benchmarks.ventanas --escalas 1k 100k --comparar ui_v1.json
+============================================================================
+"""
+
+import os
+
+# Antes de importar PyQt5: sin pantalla
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import gc
+import importlib
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PyQt5.QtCore import QEvent, QObject
+from PyQt5.QtWidgets import QApplication
+
+from sistema_base.configuracion import config
+from benchmarks.datos_sinteticos import ESCALAS, obtener_base, copia_de_trabajo
+from benchmarks.modulos import comparar, datos_de_la_corrida
+
+
+# Ventanas de módulos: (nombre, módulo, clase, método que llena la tabla)
+VENTANAS = [
+    ("VentanaClientes", "interfaz.ventanas.clientes", "VentanaClientes", "cargar_clientes"),
+    ("VentanaEquipos", "interfaz.ventanas.equipos", "VentanaEquipos", "cargar_equipos"),
+    ("VentanaPresupuestos", "interfaz.ventanas.presupuestos", "VentanaPresupuestos", "cargar_presupuestos"),
+    ("VentanaOrdenes", "interfaz.ventanas.ordenes", "VentanaOrdenes", "cargar_ordenes"),
+    ("VentanaRepuestos", "interfaz.ventanas.repuestos", "VentanaRepuestos", "cargar_repuestos"),
+    ("VentanaRemitos", "interfaz.ventanas.remitos", "VentanaRemitos", "cargar_remitos"),
+    ("VentanaGarantias", "interfaz.ventanas.garantias", "VentanaGarantias", "cargar_garantias"),
+    ("TabFacturas", "interfaz.ventanas.facturacion_pagos", "TabFacturas", "cargar_facturas"),
+    ("TabPagos", "interfaz.ventanas.facturacion_pagos", "TabPagos", "cargar_pagos"),
+    ("VentanaAuditoria", "interfaz.ventanas.auditoria", "VentanaAuditoria", "cargar_auditoria"),
+    ("VentanaBackups", "interfaz.ventanas.backups", "VentanaBackups", "cargar_backups"),
+    ("VentanaUsuarios", "interfaz.ventanas.usuarios", "VentanaUsuarios", "cargar_usuarios"),
+    ("VentanaConfiguracion", "interfaz.ventanas.configuracion", "VentanaConfiguracion", None),
+]
+
+# Diálogos de detalle: (nombre, módulo, clase, consulta del registro a mostrar)
+# Se abre el registro con más historia para medir el peor caso habitual
+DIALOGOS = [
+    ("DialogoDetalleEquipo", "interfaz.ventanas.equipos", "DialogoDetalleEquipo",
+     "SELECT id_equipo FROM remitos GROUP BY id_equipo ORDER BY COUNT(*) DESC, id_equipo LIMIT 1"),
+    ("DialogoDetalleCliente", "interfaz.ventanas.clientes", "DialogoDetalleCliente",
+     "SELECT id_cliente FROM equipos GROUP BY id_cliente ORDER BY COUNT(*) DESC, id_cliente LIMIT 1"),
+]
+
+# Tamaño de ventana de referencia (el mínimo de la ventana principal)
+ANCHO, ALTO = 1280, 800
+
+# Espera máxima del primer pintado antes de forzarlo con grab()
+ESPERA_PINTADO_S = 5
+
+
+class DetectorPintado(QObject):
+    """Filtro de eventos que anota cuándo llega el primer Paint"""
+
+    def __init__(self):
+        super().__init__()
+        self.momento = None
+
+    def eventFilter(self, objeto, evento):
+        if evento.type() == QEvent.Paint and self.momento is None:
+            self.momento = time.perf_counter()
+        return False
+
+
+def pico_memoria_mb():
+    """Pico de memoria física del proceso desde que arrancó"""
+    try:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa KB, macOS bytes
+        return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+    except ImportError:
+        from interfaz.componentes.registro_ventanas import memoria_proceso_mb
+        return memoria_proceso_mb()
+
+
+def medir_primer_pintado(app, ventana):
+    """
+    Muestra la ventana y espera su primer pintado
+
+    Returns:
+        float: Milisegundos desde show() hasta el primer Paint
+    """
+    detector = DetectorPintado()
+    ventana.installEventFilter(detector)
+    ventana.resize(ANCHO, ALTO)
+
+    inicio = time.perf_counter()
+    ventana.show()
+    while detector.momento is None and time.perf_counter() - inicio < ESPERA_PINTADO_S:
+        app.processEvents()
+
+    if detector.momento is None:
+        # Plataforma que no pinta ventanas ocultas: forzar el render
+        ventana.grab()
+        detector.momento = time.perf_counter()
+
+    ventana.removeEventFilter(detector)
+    return (detector.momento - inicio) * 1000
+
+
+def medir_ventana(app, clase, metodo_carga, argumentos, repeticiones):
+    """
+    Mide una ventana completa
+
+    Args:
+        app (QApplication): Aplicación
+        clase (type): Clase de la ventana
+        metodo_carga (str): Método que vuelve a llenar la tabla (o None)
+        argumentos (tuple): Argumentos del constructor
+        repeticiones (int): Veces que se repite el llenado de la tabla
+
+    Returns:
+        dict: Mediciones
+    """
+    from interfaz.componentes.registro_ventanas import memoria_proceso_mb
+
+    gc.collect()
+    app.processEvents()
+    memoria_antes = memoria_proceso_mb()
+
+    inicio = time.perf_counter()
+    ventana = clase(*argumentos)
+    medicion = {'construccion_ms': round((time.perf_counter() - inicio) * 1000, 3)}
+
+    medicion['primer_pintado_ms'] = round(medir_primer_pintado(app, ventana), 3)
+
+    tabla = getattr(ventana, "tabla", None)
+    if metodo_carga and tabla is not None:
+        cargar = getattr(ventana, metodo_carga)
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            cargar()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+
+        filas = tabla.rowCount()
+        mediana = statistics.median(tiempos)
+        medicion['llenado_ms'] = round(mediana, 3)
+        medicion['filas'] = filas
+        medicion['ms_por_1k_filas'] = round(mediana / filas * 1000, 3) if filas else None
+
+    app.processEvents()
+    medicion['memoria_mb'] = round(memoria_proceso_mb() - memoria_antes, 1)
+    medicion['pico_proceso_mb'] = round(pico_memoria_mb(), 1)
+
+    ventana.close()
+    ventana.deleteLater()
+    app.processEvents()
+    return medicion
+
+
+def ejecutar_escala(app, nombre_escala, directorio, repeticiones, semilla, regenerar=False):
+    """
+    Mide todas las ventanas sobre una base de la escala pedida
+
+    Returns:
+        dict: Datos de la base y mediciones por ventana
+    """
+    from base_datos.conexion import db
+    from sistema_base.sesion import Sesion
+
+    base, resumen = obtener_base(directorio, nombre_escala, semilla, regenerar)
+
+    escenarios = {}
+    with copia_de_trabajo(base):
+        # El administrador de la base sintética (id 1)
+        config.establecer_sesion(Sesion(1, "admin", "Administrador", "admin"))
+        try:
+            casos = [(nombre, modulo, clase, carga, ()) for nombre, modulo, clase, carga in VENTANAS]
+            for nombre, modulo, clase, consulta in DIALOGOS:
+                registro = db.conectar().execute(consulta).fetchone()
+                if registro:
+                    casos.append((nombre, modulo, clase, None, (registro[0],)))
+            casos.append(("VentanaPrincipal", "interfaz.ventanas.ventana_principal", "VentanaPrincipal", None,
+                          (config.sesion.como_dict(),)))
+
+            for nombre, modulo, clase, carga, argumentos in casos:
+                try:
+                    # La importación se mide aparte (ver --perfil-arranque)
+                    clase_ventana = getattr(importlib.import_module(modulo), clase)
+                    escenarios[nombre] = medir_ventana(app, clase_ventana, carga, argumentos, repeticiones)
+                except Exception as e:
+                    escenarios[nombre] = {'error': f"{type(e).__name__}: {e}"}
+                print(f"  {nombre:<24} {_formato(escenarios[nombre])}", flush=True)
+        finally:
+            config.cerrar_sesion()
+
+    resumen['escenarios'] = escenarios
+    return resumen
+
+
+def _formato(medicion):
+    if 'error' in medicion:
+        return "✗ " + medicion['error']
+    texto = (f"construcción {medicion['construccion_ms']:>9.1f} ms  "
+             f"pintado {medicion['primer_pintado_ms']:>7.1f} ms  ")
+    if medicion.get('ms_por_1k_filas') is not None:
+        texto += f"tabla {medicion['ms_por_1k_filas']:>7.1f} ms/1k ({medicion['filas']} filas)  "
+    return texto + f"+{medicion['memoria_mb']} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de ventanas sin pantalla")
+    parser.add_argument("--escalas", nargs="*", default=["1k", "100k"],
+                        help=f"Escalas a medir ({', '.join(ESCALAS)} o una cantidad de equipos)")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Llenados de tabla por ventana")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--directorio", type=Path, default=Path(tempfile.gettempdir()) / "techmanager_benchmarks",
+                        help="Carpeta donde se guardan y reutilizan las bases generadas")
+    parser.add_argument("--regenerar", action="store_true", help="Volver a generar las bases")
+    parser.add_argument("--salida", type=Path, help="Archivo JSON con los resultados")
+    parser.add_argument("--comparar", type=Path, help="JSON de una corrida anterior")
+    argumentos = parser.parse_args()
+
+    directorio = argumentos.directorio.resolve()
+    directorio.mkdir(parents=True, exist_ok=True)
+    config.ruta_logs = directorio
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    from interfaz.estilos.tema import aplicar_tema
+    aplicar_tema()
+
+    resultados = datos_de_la_corrida(argumentos)
+    resultados['plataforma_qt'] = app.platformName()
+
+    for escala in argumentos.escalas:
+        print(f"\nEscala {escala}")
+        resultados['escalas'][escala] = ejecutar_escala(
+            app, escala, directorio, argumentos.repeticiones, argumentos.semilla, argumentos.regenerar
+        )
+
+    if argumentos.salida:
+        argumentos.salida.write_text(json.dumps(resultados, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n✓ Resultados en {argumentos.salida}")
+
+    if argumentos.comparar:
+        anterior = json.loads(argumentos.comparar.read_text(encoding="utf-8"))
+        if comparar(resultados, anterior, ("construccion_ms", "primer_pintado_ms", "ms_por_1k_filas")):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
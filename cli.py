@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - LÍNEA DE COMANDOS
+============================================================================
+Tareas de mantenimiento sin interfaz gráfica, para el cron o el
+Programador de tareas de Windows:
+
+    python cli.py backup crear --descripcion "Cierre del día"
+    python cli.py backup listar
+    python cli.py backup verificar --todos
+    python cli.py backup restaurar 12 --confirmar
+    python cli.py backup limpiar --dias 30
+    python cli.py vencimientos
+    python cli.py estadisticas equipos facturas
+    python cli.py exportar pagos --salida pagos.xlsx --desde 2025-01-01
+    python cli.py exportar antiguedad --salida deudores.xlsx
+    python cli.py archivar --anios 2
+    python cli.py auditoria --retencion 24
+    python cli.py contadores
+    python cli.py saldos
+    python cli.py stock
+
+Reutiliza la lógica de modulos/* sin importar PyQt5. Cada subcomando
+importa solo los módulos que usa, así el arranque queda muy por debajo
+del segundo. Las tareas corren con la sesión del sistema y quedan en la
+auditoría como el usuario 'sistema'.
+
+Código de salida: 0 si la tarea terminó bien, 1 si falló.
+============================================================================
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+# Agregar el directorio raíz al path de Python
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+# Estadísticas disponibles: nombre -> (módulo, clase, método)
+ESTADISTICAS = {
+    "clientes": ("modulos.clientes", "ModuloClientes", "obtener_estadisticas_clientes"),
+    "equipos": ("modulos.equipos_LOGICA", "ModuloEquipos", "obtener_estadisticas_equipos"),
+    "presupuestos": ("modulos.presupuestos_LOGICA", "ModuloPresupuestos", "obtener_estadisticas_presupuestos"),
+    "ordenes": ("modulos.ordenes_LOGICA", "ModuloOrdenes", "obtener_estadisticas_ordenes"),
+    "repuestos": ("modulos.repuestos_LOGICA", "ModuloRepuestos", "obtener_estadisticas_repuestos"),
+    "facturas": ("modulos.facturacion_LOGICA", "ModuloFacturacion", "obtener_estadisticas_facturas"),
+    "pagos": ("modulos.pagos_LOGICA", "ModuloPagos", "obtener_estadisticas_pagos"),
+    "garantias": ("modulos.garantias_LOGICA", "ModuloGarantias", "obtener_estadisticas_garantias"),
+    "remitos": ("modulos.remitos_LOGICA", "ModuloRemitos", "obtener_estadisticas_remitos"),
+    "auditoria": ("modulos.auditoria_LOGICA", "ModuloAuditoria", "obtener_estadisticas_auditoria"),
+    "backups": ("modulos.backups_LOGICA", "ModuloBackups", "obtener_estadisticas_backups"),
+}
+
+# Listados exportables: nombre -> (módulo, clase, método que arma la consulta[, atributo de columnas])
+EXPORTACIONES = {
+    "clientes": ("modulos.clientes", "ModuloClientes", "consulta_listar_clientes"),
+    "equipos": ("modulos.equipos_LOGICA", "ModuloEquipos", "consulta_listar_equipos"),
+    "presupuestos": ("modulos.presupuestos_LOGICA", "ModuloPresupuestos", "consulta_listar_presupuestos"),
+    "ordenes": ("modulos.ordenes_LOGICA", "ModuloOrdenes", "consulta_listar_ordenes"),
+    "repuestos": ("modulos.repuestos_LOGICA", "ModuloRepuestos", "consulta_listar_repuestos"),
+    "garantias": ("modulos.garantias_LOGICA", "ModuloGarantias", "consulta_listar_garantias"),
+    "usuarios": ("modulos.usuarios", "ModuloUsuarios", "consulta_listar_usuarios"),
+    "remitos": ("modulos.remitos_LOGICA", "ModuloRemitos", "consulta_listar_remitos"),
+    "pagos": ("modulos.pagos_LOGICA", "ModuloPagos", "consulta_listar_pagos"),
+    "auditoria": ("modulos.auditoria_LOGICA", "ModuloAuditoria", "consulta_listar_auditoria"),
+    "antiguedad": ("modulos.facturacion_LOGICA", "ModuloFacturacion", "consulta_antiguedad_saldos",
+                   "COLUMNAS_ANTIGUEDAD"),
+}
+
+
+def _clase(modulo, clase):
+    return getattr(importlib.import_module(modulo), clase)
+
+
+def _fecha(texto):
+    """Tipo de argparse para fechas AAAA-MM-DD"""
+    try:
+        return datetime.strptime(texto, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Fecha inválida (use AAAA-MM-DD): {texto}")
+
+
+def _modulo_estadisticas(nombre):
+    """Tipo de argparse para los módulos de ESTADISTICAS"""
+    if nombre not in ESTADISTICAS:
+        raise argparse.ArgumentTypeError(f"Módulo desconocido: {nombre} (opciones: {', '.join(ESTADISTICAS)})")
+    return nombre
+
+
+def _serializable(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    return str(valor)
+
+
+class Salida:
+    """Imprime los resultados como texto o como JSON (--json)"""
+
+    def __init__(self, como_json):
+        self.como_json = como_json
+        self.resultado = {}
+
+    def mensaje(self, texto, exito=True):
+        if self.como_json:
+            self.resultado.setdefault('mensajes', []).append(texto)
+        else:
+            print(("✓ " if exito else "✗ ") + texto)
+
+    def datos(self, clave, valor):
+        if self.como_json:
+            self.resultado[clave] = valor
+        elif isinstance(valor, dict):
+            print(f"{clave}:")
+            for nombre, dato in valor.items():
+                print(f"  {nombre:<28} {dato}")
+        elif isinstance(valor, list):
+            for fila in valor:
+                print("  " + "  ".join(str(dato) for dato in fila.values()))
+        else:
+            print(f"{clave}: {valor}")
+
+    def terminar(self, exito):
+        if self.como_json:
+            self.resultado['exito'] = exito
+            print(json.dumps(self.resultado, ensure_ascii=False, indent=2, default=_serializable))
+        return 0 if exito else 1
+
+
+# ----------------------------------------------------------------------
+# Subcomandos
+# ----------------------------------------------------------------------
+
+def comando_backup(argumentos, salida):
+    from modulos.backups_LOGICA import ModuloBackups
+    from sistema_base.sesion import SESION_SISTEMA
+
+    id_usuario = SESION_SISTEMA.id_usuario
+
+    if argumentos.accion == "crear":
+        exito, mensaje, id_backup = ModuloBackups.crear_backup(
+            "Manual" if argumentos.manual else "Automático", argumentos.descripcion, id_usuario
+        )
+        salida.mensaje(mensaje, exito)
+        if exito:
+            salida.datos("id_backup", id_backup)
+            if argumentos.verificar:
+                exito, mensaje = ModuloBackups.verificar_integridad_backup(id_backup, id_usuario)
+                salida.mensaje(mensaje, exito)
+        return exito
+
+    if argumentos.accion == "listar":
+        backups = ModuloBackups.listar_backups(argumentos.limite)
+        salida.datos("backups", [
+            {'id_backup': b['id_backup'], 'fecha_hora': b['fecha_hora'], 'tipo': b['tipo'],
+             'tamanio_mb': round(b['tamanio_mb'], 2), 'verificado': bool(b['verificado']),
+             'existe': b['existe'], 'nombre_archivo': b['nombre_archivo']}
+            for b in backups if b['exitoso']
+        ])
+        return True
+
+    if argumentos.accion == "verificar":
+        if argumentos.todos:
+            ids = [b['id_backup'] for b in ModuloBackups.listar_backups(None) if b['exitoso']]
+        elif argumentos.id_backup is not None:
+            ids = [argumentos.id_backup]
+        else:
+            salida.mensaje("Indique el ID del backup o --todos", False)
+            return False
+
+        todos_bien = True
+        for id_backup in ids:
+            exito, mensaje = ModuloBackups.verificar_integridad_backup(id_backup, id_usuario)
+            salida.mensaje(f"#{id_backup}: {mensaje}", exito)
+            todos_bien = todos_bien and exito
+        return todos_bien
+
+    if argumentos.accion == "restaurar":
+        if not argumentos.confirmar:
+            salida.mensaje("La restauración reemplaza todos los datos actuales. Repita con --confirmar", False)
+            return False
+        exito, mensaje = ModuloBackups.restaurar_backup(argumentos.id_backup, id_usuario)
+        salida.mensaje(mensaje, exito)
+        return exito
+
+    if argumentos.accion == "limpiar":
+        exito, mensaje, _ = ModuloBackups.limpiar_backups_antiguos(id_usuario, argumentos.dias)
+        salida.mensaje(mensaje, exito)
+        return exito
+
+    return False
+
+
+def comando_vencimientos(argumentos, salida):
+    from modulos.presupuestos_LOGICA import ModuloPresupuestos
+    from modulos.garantias_LOGICA import ModuloGarantias
+    from modulos.equipos_LOGICA import ModuloEquipos
+
+    resumen = {
+        'presupuestos_vencidos': ModuloPresupuestos.verificar_vencimientos(),
+        'garantias_vencidas': ModuloGarantias.verificar_vencimientos(),
+    }
+    alertas = ModuloEquipos.verificar_alertas_automaticas()
+    resumen['equipos_estancados'] = alertas['estancados']
+    resumen['equipos_abandonados'] = alertas['abandonados']
+
+    salida.datos("vencimientos", resumen)
+    return True
+
+
+def comando_estadisticas(argumentos, salida):
+    nombres = argumentos.modulos or list(ESTADISTICAS)
+    for nombre in nombres:
+        metodo = getattr(_clase(*ESTADISTICAS[nombre][:2]), ESTADISTICAS[nombre][2])
+        salida.datos(nombre, metodo())
+    return True
+
+
+def comando_exportar(argumentos, salida):
+    from modulos.exportacion_LOGICA import ModuloExportacion
+
+    modulo, clase, metodo, *columnas = EXPORTACIONES[argumentos.listado]
+    clase = _clase(modulo, clase)
+    columnas = getattr(clase, columnas[0] if columnas else "COLUMNAS_EXPORTACION")
+
+    filtros = {'fecha_desde': argumentos.desde, 'fecha_hasta': argumentos.hasta}
+    if argumentos.listado == "auditoria":
+        filtros['limite'] = None
+    elif argumentos.listado == "antiguedad":
+        # Saldos a la fecha de corte (--hasta; por defecto hoy)
+        filtros = {'fecha_corte': argumentos.hasta}
+    consulta, parametros = getattr(clase, metodo)(**filtros)
+
+    def progreso(procesados, total):
+        if not salida.como_json:
+            print(f"\r  {procesados}/{total} registros", end="", file=sys.stderr, flush=True)
+
+    exito, mensaje, cantidad = ModuloExportacion.exportar_consulta(
+        consulta, parametros, columnas, str(argumentos.salida),
+        callback_progreso=progreso, titulo_hoja=argumentos.listado.capitalize()
+    )
+    if not salida.como_json:
+        print(file=sys.stderr)
+
+    salida.mensaje(f"{mensaje} en {argumentos.salida}" if exito else mensaje, exito)
+    salida.datos("registros", cantidad)
+    return exito
+
+
+def comando_archivar(argumentos, salida):
+    from modulos.archivo_LOGICA import ModuloArchivo
+    from sistema_base.sesion import SESION_SISTEMA
+
+    exito, mensaje, movidas = ModuloArchivo.archivar(argumentos.anios, SESION_SISTEMA.id_usuario)
+    salida.mensaje(mensaje, exito)
+    if exito:
+        salida.datos("archivados", movidas)
+        salida.datos("archivo", ModuloArchivo.obtener_estadisticas_archivo())
+    return exito
+
+
+def comando_auditoria(argumentos, salida):
+    from modulos.auditoria_LOGICA import ModuloAuditoria
+    from sistema_base.sesion import SESION_SISTEMA
+
+    exito, mensaje, resumen = ModuloAuditoria.mantener_auditoria(argumentos.retencion, SESION_SISTEMA.id_usuario)
+    salida.mensaje(mensaje, exito)
+    if exito:
+        salida.datos("rotados", resumen['rotados'])
+        salida.datos("eliminadas", ", ".join(resumen['eliminadas']) or "-")
+    return exito
+
+
+def comando_contadores(argumentos, salida):
+    from modulos.clientes import ModuloClientes
+    from sistema_base.sesion import SESION_SISTEMA
+
+    exito, mensaje, corregidos = ModuloClientes.recalcular_contadores(SESION_SISTEMA.id_usuario)
+    salida.mensaje(mensaje, exito)
+    salida.datos("clientes_corregidos", corregidos)
+    return exito
+
+
+def comando_saldos(argumentos, salida):
+    from modulos.facturacion_LOGICA import ModuloFacturacion
+    from sistema_base.sesion import SESION_SISTEMA
+
+    exito, mensaje, corregidas = ModuloFacturacion.verificar_saldos(SESION_SISTEMA.id_usuario)
+    salida.mensaje(mensaje, exito)
+    salida.datos("facturas_corregidas", len(corregidas))
+    return exito
+
+
+def comando_stock(argumentos, salida):
+    from modulos.repuestos_LOGICA import ModuloRepuestos
+    from sistema_base.sesion import SESION_SISTEMA
+
+    exito, mensaje, corregidos = ModuloRepuestos.verificar_stock(SESION_SISTEMA.id_usuario)
+    salida.mensaje(mensaje, exito)
+    salida.datos("repuestos_corregidos", len(corregidos))
+    return exito
+
+
+COMANDOS = {
+    "backup": comando_backup,
+    "vencimientos": comando_vencimientos,
+    "estadisticas": comando_estadisticas,
+    "exportar": comando_exportar,
+    "archivar": comando_archivar,
+    "auditoria": comando_auditoria,
+    "contadores": comando_contadores,
+    "saldos": comando_saldos,
+    "stock": comando_stock,
+}
+
+
+# ----------------------------------------------------------------------
+# Arranque
+# ----------------------------------------------------------------------
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog="techmanager", description="Tareas de TechManager sin interfaz gráfica")
+    parser.add_argument("--base", type=Path, help="Archivo de la base de datos (por defecto, el de la instalación)")
+    parser.add_argument("--json", action="store_true", help="Imprimir el resultado en JSON")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    backup = subparsers.add_parser("backup", help="Copias de seguridad")
+    acciones = backup.add_subparsers(dest="accion", required=True)
+    crear = acciones.add_parser("crear", help="Crear un backup")
+    crear.add_argument("--descripcion", default="Backup programado")
+    crear.add_argument("--manual", action="store_true",
+                       help="Registrarlo como manual (los automáticos se borran con 'limpiar')")
+    crear.add_argument("--verificar", action="store_true", help="Verificar el backup recién creado")
+    listar = acciones.add_parser("listar", help="Listar backups")
+    listar.add_argument("--limite", type=int, default=50)
+    verificar = acciones.add_parser("verificar", help="Verificar la integridad de backups")
+    verificar.add_argument("id_backup", type=int, nargs="?")
+    verificar.add_argument("--todos", action="store_true")
+    restaurar = acciones.add_parser("restaurar", help="Restaurar un backup")
+    restaurar.add_argument("id_backup", type=int)
+    restaurar.add_argument("--confirmar", action="store_true", help="Confirmar que se reemplazan los datos actuales")
+    limpiar = acciones.add_parser("limpiar", help="Borrar backups automáticos antiguos")
+    limpiar.add_argument("--dias", type=int, help="Antigüedad mínima en días (por defecto 30)")
+
+    subparsers.add_parser("vencimientos", help="Vencer presupuestos y garantías y marcar equipos abandonados")
+
+    estadisticas = subparsers.add_parser("estadisticas", help="Estadísticas de las tarjetas de cada módulo")
+    # Sin 'choices': argparse lo valida también contra la lista vacía cuando no se pasan módulos
+    estadisticas.add_argument("modulos", nargs="*", type=_modulo_estadisticas, metavar="MODULO",
+                              help=f"Módulos ({', '.join(ESTADISTICAS)}); por defecto todos")
+
+    exportar = subparsers.add_parser("exportar", help="Exportar un listado a CSV o Excel")
+    exportar.add_argument("listado", choices=list(EXPORTACIONES))
+    exportar.add_argument("--salida", type=Path, required=True, help="Archivo .csv o .xlsx")
+    exportar.add_argument("--desde", type=_fecha, help="Fecha desde (AAAA-MM-DD)")
+    exportar.add_argument("--hasta", type=_fecha, help="Fecha hasta (AAAA-MM-DD; en 'antiguedad', la de corte)")
+
+    archivar = subparsers.add_parser("archivar", help="Pasar los datos viejos al archivo histórico")
+    archivar.add_argument("--anios", type=int, help="Años desde la entrega (por defecto, los de la configuración)")
+
+    auditoria = subparsers.add_parser("auditoria", help="Pasar los meses cerrados del log de auditoría a sus particiones")
+    auditoria.add_argument("--retencion", type=int,
+                           help="Meses a conservar además del actual; borra los anteriores (0 = todos)")
+
+    subparsers.add_parser("contadores", help="Recalcular los contadores de clientes (equipos, órdenes, saldo)")
+    subparsers.add_parser("saldos", help="Verificar lo pagado y adeudado de las facturas contra sus pagos")
+    subparsers.add_parser("stock", help="Verificar el stock de repuestos contra el libro de movimientos y las reservas")
+
+    return parser
+
+
+def preparar_base(ruta_base=None):
+    """
+    Abre la base, la actualiza si hace falta y carga la configuración
+
+    Args:
+        ruta_base (Path): Base a usar en lugar de la de la instalación
+    """
+    from sistema_base.configuracion import config
+    from base_datos.conexion import db
+    from base_datos.crear_tablas import inicializar_base_datos
+
+    config.crear_directorios()
+    if ruta_base is not None:
+        config.ruta_base_datos = Path(ruta_base).resolve()
+
+    # Los mensajes de creación de tablas no deben mezclarse con la salida
+    with contextlib.redirect_stdout(sys.stderr):
+        inicializar_base_datos()
+
+    datos = db.obtener_uno("SELECT * FROM configuracion_sistema WHERE id_config = 1")
+    if datos:
+        config.cargar_configuracion_bd(datos)
+
+
+def main(argv=None):
+    argumentos = crear_parser().parse_args(argv)
+    salida = Salida(argumentos.json)
+    inicio = time.perf_counter()
+
+    from sistema_base.configuracion import config
+    from sistema_base.sesion import SESION_SISTEMA
+
+    try:
+        preparar_base(argumentos.base)
+        config.establecer_sesion(SESION_SISTEMA)
+        exito = COMANDOS[argumentos.comando](argumentos, salida)
+    except Exception as e:
+        config.guardar_log(f"Error en la línea de comandos ({argumentos.comando}): {e}", "ERROR")
+        salida.mensaje(f"Error: {e}", False)
+        exito = False
+    finally:
+        config.cerrar_sesion()
+
+    config.guardar_log(
+        f"Línea de comandos: {argumentos.comando} {'OK' if exito else 'con errores'} "
+        f"en {(time.perf_counter() - inicio) * 1000:.0f} ms",
+        "INFO" if exito else "ERROR"
+    )
+    return salida.terminar(exito)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
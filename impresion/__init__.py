@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo de impresión y generación de documentos
+"""
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - EXPORTACIÓN DE DOCUMENTOS EN LOTE
+============================================================================
+Exporta a PDF todos los presupuestos, facturas y remitos de un rango de
+fechas (cierre de mes, envío al contador).
+
+Las filas se leen de la base en forma incremental y el armado de cada
+PDF (reportlab, uso intensivo de CPU) se reparte en un pool de procesos.
+El resultado se guarda en un ZIP o en una carpeta dentro de
+config.ruta_exportaciones. Admite informe de progreso y cancelación.
+============================================================================
+"""
+
+import io
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta
+
+from base_datos.conexion import db
+from sistema_base.configuracion import config
+
+
+# Tipos de documento exportables: consulta base, columna de fecha,
+# plantilla de impresion/plantillas.py y nombre de archivo
+TIPOS_DOCUMENTO = {
+    "presupuestos": {
+        "plantilla": "presupuesto",
+        "columna_fecha": "p.fecha_creacion",
+        "archivo": "presupuesto_{id_presupuesto}.pdf",
+        "consulta": """
+            SELECT
+                p.*,
+                e.tipo_dispositivo,
+                e.marca,
+                e.modelo,
+                e.identificador,
+                c.nombre || ' ' || c.apellido as cliente_nombre,
+                c.telefono as cliente_telefono,
+                c.direccion as cliente_direccion
+            FROM presupuestos p
+            INNER JOIN equipos e ON p.id_equipo = e.id_equipo
+            INNER JOIN clientes c ON p.id_cliente = c.id_cliente
+        """,
+    },
+    "facturas": {
+        "plantilla": "factura",
+        "columna_fecha": "f.fecha_emision",
+        "archivo": "factura_{numero_factura}.pdf",
+        # Las facturas anteriores a la numeración no tienen número: se usa el ID
+        "consulta": """
+            SELECT
+                f.id_factura,
+                COALESCE(f.numero_factura, '#' || f.id_factura) as numero_factura,
+                f.id_orden,
+                f.fecha_emision,
+                f.monto_total,
+                f.monto_pagado,
+                f.monto_adeudado,
+                f.descuento_aplicado,
+                f.estado_cobro,
+                o.descripcion_reparacion,
+                e.tipo_dispositivo,
+                e.marca,
+                e.modelo,
+                e.identificador,
+                c.nombre || ' ' || c.apellido as cliente_nombre,
+                c.telefono as cliente_telefono,
+                c.direccion as cliente_direccion
+            FROM facturacion f
+            INNER JOIN clientes c ON f.id_cliente = c.id_cliente
+            LEFT JOIN ordenes_trabajo o ON f.id_orden = o.id_orden
+            LEFT JOIN equipos e ON o.id_equipo = e.id_equipo
+        """,
+    },
+    "remitos": {
+        "plantilla": "remito",
+        "columna_fecha": "r.fecha_emision",
+        "archivo": "remito_{numero_remito}.pdf",
+        "consulta": """
+            SELECT
+                r.id_remito,
+                r.numero_remito,
+                r.fecha_emision,
+                r.observaciones,
+                e.tipo_dispositivo,
+                e.marca,
+                e.modelo,
+                e.identificador,
+                e.color,
+                e.estado_fisico,
+                e.accesorios,
+                e.falla_declarada,
+                c.nombre || ' ' || c.apellido as cliente_nombre,
+                c.telefono as cliente_telefono,
+                c.direccion as cliente_direccion
+            FROM remitos r
+            INNER JOIN equipos e ON r.id_equipo = e.id_equipo
+            INNER JOIN clientes c ON r.id_cliente = c.id_cliente
+        """,
+    },
+}
+
+# Atributos de config que necesitan los procesos de trabajo para armar
+# los documentos (en Windows los procesos arrancan sin la configuración
+# cargada desde la base)
+ATRIBUTOS_CONFIG_DOCUMENTOS = (
+    "nombre_negocio", "telefono_contacto", "direccion", "email",
+    "color_primario", "color_secundario",
+    "texto_pie_presupuesto", "texto_pie_remito", "texto_pie_factura",
+    "texto_garantia",
+)
+
+
+# ============================================================================
+# FUNCIONES DE LOS PROCESOS DE TRABAJO
+# ============================================================================
+
+def _inicializar_proceso(datos_config):
+    """Copia la configuración del negocio en el proceso de trabajo"""
+    for atributo, valor in datos_config.items():
+        setattr(config, atributo, valor)
+
+
+def _renderizar_documento(plantilla, datos, ruta_archivo):
+    """
+    Arma un PDF dentro de un proceso de trabajo
+
+    Args:
+        plantilla (str): Nombre de la plantilla
+        datos (dict): Datos del documento
+        ruta_archivo (str): Ruta destino, o None para devolver los bytes
+
+    Returns:
+        bytes: Contenido del PDF (None si se escribió en ruta_archivo)
+    """
+    from impresion.motor_documentos import MotorDocumentos
+
+    if ruta_archivo:
+        MotorDocumentos.generar_pdf(plantilla, datos, ruta_archivo)
+        return None
+
+    buffer = io.BytesIO()
+    MotorDocumentos.generar_pdf(plantilla, datos, buffer)
+    return buffer.getvalue()
+
+
+def _nombre_archivo_seguro(nombre):
+    """Reemplaza caracteres no válidos en nombres de archivo"""
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in nombre)
+
+
+def renderizar_en_paralelo(documentos, destino, procesos=None, evento_cancelacion=None,
+                           callback_progreso=None, total=0):
+    """
+    Arma los PDF de una secuencia de documentos usando un pool de procesos.
+    La secuencia se consume de a poco: nunca hay más de unos pocos
+    documentos por proceso en vuelo.
+
+    Args:
+        documentos: Iterable de tuplas (plantilla, datos, nombre_archivo)
+        destino: zipfile.ZipFile abierto o ruta de carpeta (Path)
+        procesos (int): Cantidad de procesos (None = núcleos disponibles)
+        evento_cancelacion (threading.Event): Se detiene al activarse
+        callback_progreso (callable): Función (procesados, total)
+        total (int): Total esperado (solo para informar progreso)
+
+    Returns:
+        int: Cantidad de documentos generados
+    """
+    procesos = procesos or os.cpu_count() or 1
+    max_en_vuelo = procesos * 4
+    es_zip = isinstance(destino, zipfile.ZipFile)
+    datos_config = {
+        atributo: getattr(config, atributo, "")
+        for atributo in ATRIBUTOS_CONFIG_DOCUMENTOS
+    }
+
+    procesados = 0
+    pendientes = {}
+
+    def recolectar(terminados):
+        nonlocal procesados
+        for futuro in terminados:
+            nombre_archivo = pendientes.pop(futuro)
+            contenido = futuro.result()
+            if es_zip:
+                destino.writestr(nombre_archivo, contenido)
+            procesados += 1
+            if callback_progreso:
+                callback_progreso(procesados, total)
+
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso,
+                             initargs=(datos_config,)) as pool:
+        try:
+            for plantilla, datos, nombre_archivo in documentos:
+                if evento_cancelacion is not None and evento_cancelacion.is_set():
+                    break
+
+                ruta = None if es_zip else str(destino / nombre_archivo)
+                futuro = pool.submit(_renderizar_documento, plantilla, datos, ruta)
+                pendientes[futuro] = nombre_archivo
+
+                if len(pendientes) >= max_en_vuelo:
+                    terminados, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                    recolectar(terminados)
+
+            while pendientes:
+                if evento_cancelacion is not None and evento_cancelacion.is_set():
+                    break
+                terminados, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                recolectar(terminados)
+        finally:
+            for futuro in pendientes:
+                futuro.cancel()
+
+    return procesados
+
+
+# ============================================================================
+# TRABAJO DE EXPORTACIÓN
+# ============================================================================
+
+class ExportacionLote:
+    """Trabajo de exportación de documentos a PDF por rango de fechas"""
+
+    def __init__(self, tipos, fecha_desde, fecha_hasta, comprimir=True, procesos=None):
+        """
+        Inicializa el trabajo
+
+        Args:
+            tipos (list): Tipos a exportar ('presupuestos', 'facturas', 'remitos')
+            fecha_desde (date): Fecha inicial (inclusive)
+            fecha_hasta (date): Fecha final (inclusive)
+            comprimir (bool): True = un ZIP, False = una carpeta
+            procesos (int): Cantidad de procesos (None = núcleos disponibles)
+        """
+        self.tipos = [tipo for tipo in tipos if tipo in TIPOS_DOCUMENTO]
+        self.fecha_desde = fecha_desde
+        self.fecha_hasta = fecha_hasta
+        self.comprimir = comprimir
+        self.procesos = procesos
+        self._cancelacion = threading.Event()
+
+    def cancelar(self):
+        """Solicita la cancelación del trabajo en curso"""
+        self._cancelacion.set()
+
+    @property
+    def cancelado(self):
+        return self._cancelacion.is_set()
+
+    def _filtro_fechas(self, tipo):
+        """Arma la consulta filtrada por el rango de fechas"""
+        definicion = TIPOS_DOCUMENTO[tipo]
+        columna = definicion["columna_fecha"]
+        desde = self.fecha_desde.strftime("%Y-%m-%d")
+        hasta = (self.fecha_hasta + timedelta(days=1)).strftime("%Y-%m-%d")
+        filtro = f" WHERE {columna} >= ? AND {columna} < ?"
+        return filtro, (desde, hasta)
+
+    def contar_documentos(self):
+        """
+        Cuenta los documentos que se van a exportar
+
+        Returns:
+            int: Total de documentos
+        """
+        total = 0
+        for tipo in self.tipos:
+            filtro, parametros = self._filtro_fechas(tipo)
+            consulta = f"SELECT COUNT(*) as total FROM ({TIPOS_DOCUMENTO[tipo]['consulta']}{filtro})"
+            resultado = db.obtener_uno(consulta, parametros)
+            total += resultado['total'] if resultado else 0
+        return total
+
+    def iterar_documentos(self):
+        """
+        Recorre los documentos del rango sin cargarlos todos en memoria
+
+        Yields:
+            tuple: (plantilla, datos, nombre_archivo)
+        """
+        for tipo in self.tipos:
+            definicion = TIPOS_DOCUMENTO[tipo]
+            filtro, parametros = self._filtro_fechas(tipo)
+            consulta = f"{definicion['consulta']}{filtro} ORDER BY {definicion['columna_fecha']}"
+
+            for datos in db.iterar_consulta(consulta, parametros):
+                if self.cancelado:
+                    return
+                nombre_archivo = _nombre_archivo_seguro(definicion["archivo"].format(**datos))
+                yield definicion["plantilla"], datos, f"{tipo}/{nombre_archivo}"
+
+    def ejecutar(self, callback_progreso=None):
+        """
+        Ejecuta la exportación. Pensado para correr en un hilo de trabajo.
+
+        Args:
+            callback_progreso (callable): Función (procesados, total)
+
+        Returns:
+            tuple: (exito, mensaje, ruta_resultado)
+        """
+        try:
+            if not self.tipos:
+                return False, "Debe seleccionar al menos un tipo de documento", None
+
+            total = self.contar_documentos()
+            if total == 0:
+                return False, "No hay documentos en el rango de fechas seleccionado", None
+
+            marca_tiempo = datetime.now().strftime("%Y%m%d_%H%M%S")
+            nombre = f"documentos_{self.fecha_desde:%Y%m%d}_{self.fecha_hasta:%Y%m%d}_{marca_tiempo}"
+            config.ruta_exportaciones.mkdir(parents=True, exist_ok=True)
+
+            if self.comprimir:
+                ruta_resultado = config.ruta_exportaciones / f"{nombre}.zip"
+                with zipfile.ZipFile(ruta_resultado, "w", zipfile.ZIP_DEFLATED) as archivo_zip:
+                    generados = renderizar_en_paralelo(
+                        self.iterar_documentos(), archivo_zip, self.procesos,
+                        self._cancelacion, callback_progreso, total
+                    )
+            else:
+                ruta_resultado = config.ruta_exportaciones / nombre
+                for tipo in self.tipos:
+                    (ruta_resultado / tipo).mkdir(parents=True, exist_ok=True)
+                generados = renderizar_en_paralelo(
+                    self.iterar_documentos(), ruta_resultado, self.procesos,
+                    self._cancelacion, callback_progreso, total
+                )
+
+            if self.cancelado:
+                config.guardar_log(f"Exportación en lote cancelada ({generados}/{total})", "WARNING")
+                return False, f"Exportación cancelada: {generados} de {total} documentos generados", str(ruta_resultado)
+
+            config.guardar_log(f"Exportación en lote: {generados} documentos en {ruta_resultado}", "INFO")
+            return True, f"{generados} documentos exportados", str(ruta_resultado)
+
+        except ImportError:
+            return False, "Error: La librería reportlab no está instalada. Ejecute: pip install reportlab", None
+        except Exception as e:
+            config.guardar_log(f"Error en exportación en lote: {e}", "ERROR")
+            return False, f"Error: {str(e)}", None
@@ -0,0 +1,491 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - MOTOR DE DOCUMENTOS
+============================================================================
+Compila las plantillas de impresion/plantillas.py y genera los documentos
+en HTML (vista previa), PDF (reportlab) e impresora (Qt).
+
+La compilación se hace una sola vez por plantilla: el marcado estático,
+los estilos de reportlab y los anchos de columna quedan en caché y cada
+documento solo combina los datos. La caché se invalida sola cuando
+cambian los datos del negocio o los colores de la configuración.
+============================================================================
+"""
+
+import html
+import threading
+from string import Template
+
+from sistema_base.configuracion import config
+from sistema_base.utilidades import formatear_fecha, formatear_fecha_hora, formatear_dinero
+from impresion.plantillas import (obtener_plantilla, FORMATO_FECHA,
+                                  FORMATO_FECHA_HORA, FORMATO_DINERO)
+
+
+# Caché de plantillas compiladas: {nombre: PlantillaCompilada}
+_cache_plantillas = {}
+_bloqueo_cache = threading.Lock()
+
+
+def formatear_valor(valor, formato):
+    """
+    Convierte un valor de los datos a texto según el formato del campo
+
+    Args:
+        valor: Valor a formatear
+        formato (str): Formato del campo
+
+    Returns:
+        str: Valor formateado ('' si está vacío)
+    """
+    if valor is None or valor == "":
+        return ""
+
+    try:
+        if formato == FORMATO_DINERO:
+            return formatear_dinero(valor)
+        if formato == FORMATO_FECHA:
+            return formatear_fecha(valor)
+        if formato == FORMATO_FECHA_HORA:
+            return formatear_fecha_hora(valor)
+    except Exception:
+        pass
+
+    return str(valor)
+
+
+def _firma_configuracion(plantilla):
+    """
+    Datos de configuración que quedan fijos en una plantilla compilada.
+    Si alguno cambia, la plantilla se vuelve a compilar.
+    """
+    return (
+        config.nombre_negocio,
+        config.direccion,
+        config.telefono_contacto,
+        config.email,
+        config.color_primario,
+        config.color_secundario,
+        getattr(config, plantilla.clave_texto_pie, "") if plantilla.clave_texto_pie else "",
+    )
+
+
+def _escapar(texto):
+    """Escapa texto para HTML conservando saltos de línea"""
+    return html.escape(str(texto)).replace("\n", "<br>")
+
+
+def _literal(texto):
+    """Escapa texto fijo que se incrusta en un fragmento de Template"""
+    return _escapar(texto).replace("$", "$$")
+
+
+class PlantillaCompilada:
+    """Plantilla lista para combinar con datos"""
+
+    def __init__(self, plantilla, firma):
+        self.plantilla = plantilla
+        self.firma = firma
+        self.texto_pie = firma[-1] or ""
+        self.claves = self._recolectar_claves()
+        self.partes_html = self._compilar_html()
+        self._estilos_pdf = None
+
+    # ------------------------------------------------------------------
+    # Compilación
+    # ------------------------------------------------------------------
+
+    def _recolectar_claves(self):
+        """Devuelve {clave: formato} de todos los campos de la plantilla"""
+        plantilla = self.plantilla
+        claves = {
+            plantilla.campo_numero: "texto",
+            plantilla.campo_fecha: plantilla.formato_fecha,
+        }
+
+        for seccion in plantilla.secciones:
+            if seccion['tipo'] == 'campos':
+                for _, clave, formato in seccion['campos']:
+                    claves[clave] = formato
+            elif seccion['tipo'] == 'texto':
+                claves[seccion['clave']] = "texto"
+            elif seccion['tipo'] == 'montos':
+                for _, clave in seccion['filas'] + [seccion['total']]:
+                    claves[clave] = FORMATO_DINERO
+
+        return claves
+
+    def _compilar_html(self):
+        """
+        Genera la lista de fragmentos HTML de la plantilla.
+
+        Returns:
+            list: Tuplas (claves_condicion, Template). El fragmento se
+                  incluye si alguna de las claves tiene valor (None = siempre)
+        """
+        plantilla = self.plantilla
+        color = html.escape(config.color_primario)
+        partes = []
+
+        def agregar(fragmento, condicion=None):
+            partes.append((condicion, Template(fragmento)))
+
+        encabezado = (
+            "<div style='font-family: Arial, sans-serif;'>"
+            f"<div style='text-align: center; border-bottom: 3px solid {color}; "
+            "padding-bottom: 15px; margin-bottom: 20px;'>"
+            f"<h1 style='color: {color}; margin: 5px;'>{_literal(config.nombre_negocio)}</h1>"
+        )
+        if config.direccion:
+            encabezado += f"<p style='margin: 3px; font-size: 10pt;'>{_literal(config.direccion)}</p>"
+        if config.telefono_contacto:
+            encabezado += f"<p style='margin: 3px; font-size: 10pt;'>Tel: {_literal(config.telefono_contacto)}</p>"
+        if config.email:
+            encabezado += f"<p style='margin: 3px; font-size: 10pt;'>Email: {_literal(config.email)}</p>"
+        encabezado += (
+            f"<h2 style='color: #dc3545; margin-top: 15px;'>{_literal(plantilla.titulo)}</h2>"
+            "<p style='font-size: 14pt; font-weight: bold; margin: 5px;'>"
+            f"{_literal(plantilla.prefijo_numero)}${plantilla.campo_numero}</p>"
+            "</div>"
+        )
+        agregar(encabezado)
+        agregar(
+            f"<p style='margin: 5px;'><b>Fecha:</b> ${plantilla.campo_fecha}</p>",
+            (plantilla.campo_fecha,)
+        )
+
+        for seccion in plantilla.secciones:
+            titulo = _literal(seccion['titulo'])
+
+            if seccion['tipo'] == 'campos':
+                claves = tuple(clave for _, clave, _ in seccion['campos'])
+                agregar(
+                    "<div style='background-color: #f8f9fa; padding: 15px; margin: 15px 0;'>"
+                    f"<h3 style='color: {color}; margin-top: 0;'>{titulo}</h3>",
+                    claves
+                )
+                for etiqueta, clave, _ in seccion['campos']:
+                    agregar(
+                        f"<p style='margin: 5px;'><b>{_literal(etiqueta)}:</b> ${clave}</p>",
+                        (clave,)
+                    )
+                agregar("</div>", claves)
+
+            elif seccion['tipo'] == 'texto':
+                if seccion['destacado']:
+                    estilo = "background-color: #fff3cd; border: 2px solid #ffc107;"
+                    color_titulo = "#856404"
+                else:
+                    estilo = "background-color: #f8f9fa;"
+                    color_titulo = color
+                agregar(
+                    f"<div style='{estilo} padding: 15px; margin: 15px 0;'>"
+                    f"<h3 style='color: {color_titulo}; margin-top: 0;'>{titulo}</h3>"
+                    f"<p style='margin: 5px;'>${seccion['clave']}</p></div>",
+                    (seccion['clave'],)
+                )
+
+            elif seccion['tipo'] == 'montos':
+                filas = "".join(
+                    f"<tr><td style='padding: 6px;'>{_literal(concepto)}</td>"
+                    f"<td style='padding: 6px;' align='right'>${clave}</td></tr>"
+                    for concepto, clave in seccion['filas']
+                )
+                concepto_total, clave_total = seccion['total']
+                agregar(
+                    f"<h3 style='color: {color};'>{titulo}</h3>"
+                    "<table width='100%' border='1' cellspacing='0' cellpadding='6'>"
+                    f"{filas}"
+                    f"<tr style='background-color: #f0f0f0;'><td><b>{_literal(concepto_total)}</b></td>"
+                    f"<td align='right'><b>${clave_total}</b></td></tr></table>"
+                )
+
+        if self.texto_pie:
+            agregar(
+                "<div style='margin-top: 30px; padding-top: 20px; border-top: 2px solid #dee2e6;'>"
+                f"<p style='font-size: 9pt; color: #6c757d; text-align: center;'>"
+                f"{_literal(self.texto_pie)}</p></div>"
+            )
+
+        if plantilla.texto_firma:
+            agregar(
+                "<div style='margin-top: 40px; text-align: center;'>"
+                "<p style='margin: 30px 0 5px 0;'>_________________________________</p>"
+                f"<p style='margin: 0; font-weight: bold;'>{_literal(plantilla.texto_firma)}</p></div>"
+            )
+
+        agregar("</div>")
+        return partes
+
+    def estilos_pdf(self):
+        """
+        Estilos de reportlab de la plantilla. Se construyen una sola vez
+        (la primera vez que se genera un PDF con esta plantilla).
+
+        Returns:
+            dict: Estilos de párrafo, estilos de tabla y anchos de columna
+        """
+        if self._estilos_pdf is not None:
+            return self._estilos_pdf
+
+        from reportlab.lib import colors
+        from reportlab.lib.units import inch
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.enums import TA_CENTER
+        from reportlab.platypus import TableStyle
+
+        estilos_base = getSampleStyleSheet()
+        color_primario = colors.HexColor(config.color_primario)
+
+        self._estilos_pdf = {
+            'titulo': ParagraphStyle(
+                'TituloDocumento', parent=estilos_base['Heading1'],
+                fontSize=20, textColor=color_primario, spaceAfter=6, alignment=TA_CENTER
+            ),
+            'subtitulo': ParagraphStyle(
+                'SubtituloDocumento', parent=estilos_base['Heading2'],
+                textColor=colors.HexColor('#dc3545'), alignment=TA_CENTER
+            ),
+            'negocio': ParagraphStyle(
+                'NegocioDocumento', parent=estilos_base['Normal'],
+                fontSize=10, alignment=TA_CENTER
+            ),
+            'seccion': ParagraphStyle(
+                'SeccionDocumento', parent=estilos_base['Heading3'],
+                textColor=color_primario
+            ),
+            'normal': estilos_base['Normal'],
+            'pie': ParagraphStyle(
+                'PieDocumento', parent=estilos_base['Normal'],
+                fontSize=8, textColor=colors.HexColor('#6c757d'), alignment=TA_CENTER
+            ),
+            'tabla_campos': TableStyle([
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+                ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f8f9fa')),
+                ('FONTSIZE', (0, 0), (-1, -1), 10),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('LEFTPADDING', (0, 0), (-1, -1), 8),
+                ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+                ('TOPPADDING', (0, 0), (-1, -1), 5),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
+            ]),
+            'tabla_montos': TableStyle([
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+                ('FONTSIZE', (0, 0), (-1, -1), 11),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#f0f0f0')),
+                ('FONTSIZE', (0, -1), (-1, -1), 13),
+                ('LEFTPADDING', (0, 0), (-1, -1), 10),
+                ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+                ('TOPPADDING', (0, 0), (-1, -1), 8),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ]),
+            'anchos_campos': [1.8 * inch, 4.7 * inch],
+            'anchos_montos': [4.5 * inch, 2 * inch],
+            'espacio': 0.25 * inch,
+        }
+        return self._estilos_pdf
+
+    # ------------------------------------------------------------------
+    # Combinación con datos
+    # ------------------------------------------------------------------
+
+    def valores(self, datos):
+        """
+        Formatea los datos de un documento según los campos de la plantilla
+
+        Args:
+            datos (dict): Datos del documento
+
+        Returns:
+            dict: {clave: texto formateado}
+        """
+        return {
+            clave: formatear_valor(datos.get(clave), formato)
+            for clave, formato in self.claves.items()
+        }
+
+    def generar_html(self, datos):
+        """
+        Combina la plantilla con los datos
+
+        Args:
+            datos (dict): Datos del documento
+
+        Returns:
+            str: Documento en HTML
+        """
+        valores = self.valores(datos)
+        escapados = {clave: _escapar(valor) for clave, valor in valores.items()}
+
+        return "".join(
+            fragmento.safe_substitute(escapados)
+            for condicion, fragmento in self.partes_html
+            if condicion is None or any(valores.get(clave) for clave in condicion)
+        )
+
+    def generar_elementos_pdf(self, datos):
+        """
+        Genera los elementos de reportlab del documento
+
+        Args:
+            datos (dict): Datos del documento
+
+        Returns:
+            list: Lista de flowables
+        """
+        from reportlab.platypus import Table, Paragraph, Spacer
+
+        estilos = self.estilos_pdf()
+        plantilla = self.plantilla
+        valores = self.valores(datos)
+        elementos = []
+
+        elementos.append(Paragraph(f"<b>{_escapar(config.nombre_negocio)}</b>", estilos['titulo']))
+        for linea in (config.direccion,
+                      f"Tel: {config.telefono_contacto}" if config.telefono_contacto else "",
+                      f"Email: {config.email}" if config.email else ""):
+            if linea:
+                elementos.append(Paragraph(_escapar(linea), estilos['negocio']))
+
+        numero = f"{plantilla.prefijo_numero}{valores[plantilla.campo_numero]}"
+        elementos.append(Paragraph(
+            f"{_escapar(plantilla.titulo)} {_escapar(numero)}", estilos['subtitulo']
+        ))
+        if valores[plantilla.campo_fecha]:
+            elementos.append(Paragraph(
+                f"<b>Fecha:</b> {_escapar(valores[plantilla.campo_fecha])}", estilos['negocio']
+            ))
+        elementos.append(Spacer(1, estilos['espacio']))
+
+        for seccion in plantilla.secciones:
+            if seccion['tipo'] == 'campos':
+                filas = [
+                    [Paragraph(f"<b>{_escapar(etiqueta)}</b>", estilos['normal']),
+                     Paragraph(_escapar(valores[clave]), estilos['normal'])]
+                    for etiqueta, clave, _ in seccion['campos'] if valores[clave]
+                ]
+                if not filas:
+                    continue
+                elementos.append(Paragraph(_escapar(seccion['titulo']), estilos['seccion']))
+                tabla = Table(filas, colWidths=estilos['anchos_campos'])
+                tabla.setStyle(estilos['tabla_campos'])
+                elementos.append(tabla)
+
+            elif seccion['tipo'] == 'texto':
+                if not valores[seccion['clave']]:
+                    continue
+                elementos.append(Paragraph(_escapar(seccion['titulo']), estilos['seccion']))
+                elementos.append(Paragraph(_escapar(valores[seccion['clave']]), estilos['normal']))
+
+            elif seccion['tipo'] == 'montos':
+                concepto_total, clave_total = seccion['total']
+                filas = [[concepto, valores[clave]] for concepto, clave in seccion['filas']]
+                filas.append([
+                    Paragraph(f"<b>{_escapar(concepto_total)}</b>", estilos['normal']),
+                    Paragraph(f"<b>{_escapar(valores[clave_total])}</b>", estilos['normal'])
+                ])
+                elementos.append(Paragraph(_escapar(seccion['titulo']), estilos['seccion']))
+                tabla = Table(filas, colWidths=estilos['anchos_montos'])
+                tabla.setStyle(estilos['tabla_montos'])
+                elementos.append(tabla)
+
+            elementos.append(Spacer(1, estilos['espacio']))
+
+        if self.texto_pie:
+            elementos.append(Paragraph(_escapar(self.texto_pie), estilos['pie']))
+
+        if plantilla.texto_firma:
+            elementos.append(Spacer(1, estilos['espacio'] * 3))
+            elementos.append(Paragraph("_________________________________", estilos['negocio']))
+            elementos.append(Paragraph(f"<b>{_escapar(plantilla.texto_firma)}</b>", estilos['negocio']))
+
+        return elementos
+
+
+class MotorDocumentos:
+    """Punto de entrada para generar documentos desde las plantillas"""
+
+    @staticmethod
+    def obtener_compilada(nombre):
+        """
+        Obtiene la plantilla compilada, compilándola si es necesario
+
+        Args:
+            nombre (str): Nombre de la plantilla
+
+        Returns:
+            PlantillaCompilada: Plantilla lista para usar
+        """
+        plantilla = obtener_plantilla(nombre)
+        firma = _firma_configuracion(plantilla)
+
+        with _bloqueo_cache:
+            compilada = _cache_plantillas.get(nombre)
+            if compilada is None or compilada.firma != firma:
+                compilada = PlantillaCompilada(plantilla, firma)
+                _cache_plantillas[nombre] = compilada
+
+        return compilada
+
+    @staticmethod
+    def invalidar_cache():
+        """Descarta todas las plantillas compiladas"""
+        with _bloqueo_cache:
+            _cache_plantillas.clear()
+
+    @staticmethod
+    def generar_html(nombre, datos):
+        """
+        Genera la vista previa HTML de un documento
+
+        Args:
+            nombre (str): Nombre de la plantilla
+            datos (dict): Datos del documento
+
+        Returns:
+            str: Documento en HTML
+        """
+        return MotorDocumentos.obtener_compilada(nombre).generar_html(datos)
+
+    @staticmethod
+    def generar_pdf(nombre, datos, destino):
+        """
+        Genera un documento en PDF
+
+        Args:
+            nombre (str): Nombre de la plantilla
+            datos (dict): Datos del documento
+            destino: Ruta del PDF a generar o archivo binario abierto
+
+        Returns:
+            Ruta del archivo generado (o el mismo archivo recibido)
+        """
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate
+
+        if not hasattr(destino, "write"):
+            destino = str(destino)
+
+        compilada = MotorDocumentos.obtener_compilada(nombre)
+        documento = SimpleDocTemplate(destino, pagesize=A4)
+        documento.build(compilada.generar_elementos_pdf(datos))
+        return destino
+
+    @staticmethod
+    def imprimir(nombre, datos, impresora):
+        """
+        Envía un documento a una impresora de Qt
+
+        Args:
+            nombre (str): Nombre de la plantilla
+            datos (dict): Datos del documento
+            impresora (QPrinter): Impresora ya configurada
+        """
+        from PyQt5.QtGui import QTextDocument
+
+        documento = QTextDocument()
+        documento.setHtml(MotorDocumentos.generar_html(nombre, datos))
+        documento.print_(impresora)
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - PLANTILLAS DE DOCUMENTOS
+============================================================================
+Definición declarativa de los documentos imprimibles del sistema
+(presupuestos, remitos, facturas, comprobantes de entrega y recibos
+de pago).
+
+Cada plantilla se define una sola vez; el motor de documentos la compila
+la primera vez que se usa y todas las salidas (HTML, PDF e impresora)
+se generan a partir de esa misma versión compilada.
+============================================================================
+"""
+
+
+# Formatos de campo soportados por el motor
+FORMATO_TEXTO = "texto"
+FORMATO_FECHA = "fecha"
+FORMATO_FECHA_HORA = "fecha_hora"
+FORMATO_DINERO = "dinero"
+
+
+class PlantillaDocumento:
+    """Definición de un documento imprimible"""
+
+    def __init__(self, nombre, titulo, campo_numero, campo_fecha, secciones,
+                 prefijo_numero="", formato_fecha=FORMATO_FECHA_HORA,
+                 clave_texto_pie=None, texto_firma=None):
+        """
+        Inicializa la plantilla
+
+        Args:
+            nombre (str): Identificador de la plantilla
+            titulo (str): Título que se muestra en el encabezado
+            campo_numero (str): Clave de los datos con el número del documento
+            campo_fecha (str): Clave de los datos con la fecha del documento
+            secciones (list): Secciones del cuerpo (ver funciones seccion_*)
+            prefijo_numero (str): Texto antepuesto al número (ej: '#')
+            formato_fecha (str): Formato de la fecha del encabezado
+            clave_texto_pie (str): Atributo de config con el texto del pie
+            texto_firma (str): Leyenda de la línea de firma (None = sin firma)
+        """
+        self.nombre = nombre
+        self.titulo = titulo
+        self.campo_numero = campo_numero
+        self.campo_fecha = campo_fecha
+        self.secciones = secciones
+        self.prefijo_numero = prefijo_numero
+        self.formato_fecha = formato_fecha
+        self.clave_texto_pie = clave_texto_pie
+        self.texto_firma = texto_firma
+
+
+def seccion_campos(titulo, campos):
+    """
+    Sección con pares etiqueta/valor. Los campos vacíos no se muestran.
+
+    Args:
+        titulo (str): Título de la sección
+        campos (list): Lista de tuplas (etiqueta, clave[, formato])
+
+    Returns:
+        dict: Definición de la sección
+    """
+    campos_normalizados = []
+    for campo in campos:
+        etiqueta, clave = campo[0], campo[1]
+        formato = campo[2] if len(campo) > 2 else FORMATO_TEXTO
+        campos_normalizados.append((etiqueta, clave, formato))
+
+    return {'tipo': 'campos', 'titulo': titulo, 'campos': campos_normalizados}
+
+
+def seccion_texto(titulo, clave, destacado=False):
+    """
+    Sección con un texto libre. Se omite si el texto está vacío.
+
+    Args:
+        titulo (str): Título de la sección
+        clave (str): Clave de los datos con el texto
+        destacado (bool): Mostrar con fondo de advertencia
+
+    Returns:
+        dict: Definición de la sección
+    """
+    return {'tipo': 'texto', 'titulo': titulo, 'clave': clave, 'destacado': destacado}
+
+
+def seccion_montos(titulo, filas, fila_total):
+    """
+    Sección con detalle de montos y una fila de total
+
+    Args:
+        titulo (str): Título de la sección
+        filas (list): Lista de tuplas (concepto, clave)
+        fila_total (tuple): Tupla (concepto, clave) del total
+
+    Returns:
+        dict: Definición de la sección
+    """
+    return {'tipo': 'montos', 'titulo': titulo, 'filas': list(filas), 'total': fila_total}
+
+
+# ============================================================================
+# SECCIONES COMUNES
+# ============================================================================
+
+_SECCION_CLIENTE = seccion_campos("DATOS DEL CLIENTE", [
+    ("Nombre", "cliente_nombre"),
+    ("Teléfono", "cliente_telefono"),
+    ("Dirección", "cliente_direccion"),
+])
+
+_SECCION_EQUIPO = seccion_campos("DATOS DEL EQUIPO", [
+    ("Tipo", "tipo_dispositivo"),
+    ("Marca", "marca"),
+    ("Modelo", "modelo"),
+    ("IMEI/Serie", "identificador"),
+    ("Color", "color"),
+    ("Estado físico", "estado_fisico"),
+    ("Accesorios", "accesorios"),
+])
+
+
+# ============================================================================
+# PLANTILLAS DEL SISTEMA
+# ============================================================================
+
+PLANTILLAS = {
+    "presupuesto": PlantillaDocumento(
+        nombre="presupuesto",
+        titulo="PRESUPUESTO",
+        campo_numero="id_presupuesto",
+        prefijo_numero="#",
+        campo_fecha="fecha_creacion",
+        formato_fecha=FORMATO_FECHA,
+        secciones=[
+            _SECCION_CLIENTE,
+            _SECCION_EQUIPO,
+            seccion_campos("VIGENCIA", [
+                ("Vencimiento", "fecha_vencimiento", FORMATO_FECHA),
+                ("Estado", "estado"),
+            ]),
+            seccion_texto("DESCRIPCIÓN DEL TRABAJO", "descripcion_trabajo"),
+            seccion_montos("DETALLE", [
+                ("Mano de obra y reparación", "monto_sin_recargo"),
+                ("Recargo por transferencia", "recargo_transferencia"),
+            ], ("TOTAL", "monto_total")),
+        ],
+        clave_texto_pie="texto_pie_presupuesto",
+    ),
+
+    "remito": PlantillaDocumento(
+        nombre="remito",
+        titulo="REMITO DE INGRESO",
+        campo_numero="numero_remito",
+        campo_fecha="fecha_emision",
+        secciones=[
+            _SECCION_CLIENTE,
+            _SECCION_EQUIPO,
+            seccion_texto("FALLA REPORTADA", "falla_declarada", destacado=True),
+            seccion_texto("OBSERVACIONES", "observaciones"),
+        ],
+        clave_texto_pie="texto_pie_remito",
+        texto_firma="Firma del Cliente",
+    ),
+
+    "comprobante_entrega": PlantillaDocumento(
+        nombre="comprobante_entrega",
+        titulo="COMPROBANTE DE ENTREGA",
+        campo_numero="id_comprobante",
+        prefijo_numero="#",
+        campo_fecha="fecha_entrega",
+        secciones=[
+            _SECCION_CLIENTE,
+            _SECCION_EQUIPO,
+            seccion_texto("TRABAJO REALIZADO", "descripcion_reparacion"),
+            seccion_montos("SALDO", [
+                ("Total facturado", "monto_total"),
+                ("Pagado", "monto_pagado"),
+            ], ("SALDO PENDIENTE", "monto_adeudado")),
+            seccion_texto("OBSERVACIONES", "observaciones"),
+        ],
+        clave_texto_pie="texto_garantia",
+        texto_firma="Recibí conforme",
+    ),
+
+    "factura": PlantillaDocumento(
+        nombre="factura",
+        titulo="FACTURA",
+        campo_numero="numero_factura",
+        campo_fecha="fecha_emision",
+        formato_fecha=FORMATO_FECHA,
+        secciones=[
+            _SECCION_CLIENTE,
+            seccion_campos("DATOS DEL EQUIPO", [
+                ("Tipo", "tipo_dispositivo"),
+                ("Marca", "marca"),
+                ("Modelo", "modelo"),
+                ("IMEI/Serie", "identificador"),
+            ]),
+            seccion_texto("TRABAJO REALIZADO", "descripcion_reparacion"),
+            seccion_montos("DETALLE", [
+                ("Descuento aplicado", "descuento_aplicado"),
+                ("Pagado", "monto_pagado"),
+                ("Adeudado", "monto_adeudado"),
+            ], ("TOTAL", "monto_total")),
+            seccion_campos("ESTADO", [
+                ("Estado de cobro", "estado_cobro"),
+            ]),
+        ],
+        clave_texto_pie="texto_pie_factura",
+    ),
+
+    "recibo_pago": PlantillaDocumento(
+        nombre="recibo_pago",
+        titulo="RECIBO DE PAGO",
+        campo_numero="id_pago",
+        prefijo_numero="#",
+        campo_fecha="fecha_pago",
+        secciones=[
+            seccion_campos("DATOS DEL CLIENTE", [
+                ("Nombre", "cliente_nombre"),
+                ("Teléfono", "cliente_telefono"),
+            ]),
+            seccion_campos("DETALLE DEL PAGO", [
+                ("Orden", "id_orden"),
+                ("Método de pago", "metodo_pago"),
+                ("Observaciones", "observaciones"),
+            ]),
+            seccion_montos("IMPORTE", [], ("MONTO RECIBIDO", "monto")),
+        ],
+        clave_texto_pie="texto_pie_factura",
+    ),
+}
+
+
+def obtener_plantilla(nombre):
+    """
+    Obtiene la definición de una plantilla
+
+    Args:
+        nombre (str): Nombre de la plantilla
+
+    Returns:
+        PlantillaDocumento: Definición de la plantilla
+
+    Raises:
+        KeyError: Si la plantilla no existe
+    """
+    if nombre not in PLANTILLAS:
+        raise KeyError(f"Plantilla de documento inexistente: {nombre}")
+    return PLANTILLAS[nombre]
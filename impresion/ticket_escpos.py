@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - IMPRESIÓN DE TICKETS ESC/POS
+============================================================================
+Impresión directa en impresoras térmicas de mostrador para remitos,
+comprobantes de entrega y recibos de pago.
+
+El ticket se arma a partir de la misma plantilla compilada que usan el
+PDF y la vista previa (impresion/motor_documentos.py). El cuerpo va como
+comandos de texto ESC/POS; solo el logo se envía como imagen y queda
+rasterizado en caché. Los trabajos se encolan y se envían desde un hilo
+de fondo, así la interfaz no espera a la impresora.
+============================================================================
+"""
+
+import hashlib
+import io
+import queue
+import socket
+import textwrap
+import threading
+
+from sistema_base.configuracion import config
+from impresion.motor_documentos import MotorDocumentos
+
+
+# ============================================================================
+# COMANDOS ESC/POS
+# ============================================================================
+
+ESC = b"\x1b"
+GS = b"\x1d"
+
+CMD_INICIALIZAR = ESC + b"@"
+CMD_CODEPAGE_PC858 = ESC + b"t\x13"
+CMD_ALINEAR_IZQUIERDA = ESC + b"a\x00"
+CMD_ALINEAR_CENTRO = ESC + b"a\x01"
+CMD_NEGRITA_ON = ESC + b"E\x01"
+CMD_NEGRITA_OFF = ESC + b"E\x00"
+CMD_TAMANIO_NORMAL = GS + b"!\x00"
+CMD_TAMANIO_DOBLE = GS + b"!\x11"
+CMD_CORTE_PARCIAL = GS + b"V\x42\x00"
+
+CODIFICACION = "cp858"
+
+# Ancho del papel: (caracteres por línea, puntos de ancho para imágenes)
+ANCHOS_PAPEL = {
+    58: (32, 384),
+    80: (48, 576),
+}
+
+# Logo de configuración que usa cada plantilla
+LOGO_POR_PLANTILLA = {
+    "remito": "logo_remito",
+    "comprobante_entrega": "logo_comprobante",
+    "recibo_pago": "logo_comprobante",
+}
+
+# Caché de logos rasterizados: {(hash_imagen, ancho_puntos): bytes}
+_cache_logos = {}
+_bloqueo_logos = threading.Lock()
+
+
+def rasterizar_logo(imagen_bytes, ancho_puntos):
+    """
+    Convierte una imagen al comando de imagen rasterizada (GS v 0).
+    El resultado queda en caché mientras la imagen no cambie.
+
+    Args:
+        imagen_bytes (bytes): Imagen original (PNG, JPG, etc.)
+        ancho_puntos (int): Ancho máximo imprimible en puntos
+
+    Returns:
+        bytes: Comando ESC/POS listo para enviar (b'' si no se pudo)
+    """
+    if not imagen_bytes:
+        return b""
+
+    clave = (hashlib.md5(imagen_bytes).hexdigest(), ancho_puntos)
+
+    with _bloqueo_logos:
+        if clave in _cache_logos:
+            return _cache_logos[clave]
+
+    try:
+        from PIL import Image, ImageOps
+
+        imagen = Image.open(io.BytesIO(imagen_bytes)).convert("L")
+
+        # El logo ocupa como máximo la mitad del ancho del papel
+        ancho = min(imagen.width, ancho_puntos // 2)
+        ancho -= ancho % 8
+        alto = max(1, int(imagen.height * ancho / imagen.width))
+        imagen = imagen.resize((ancho, alto))
+
+        # En ESC/POS el bit 1 es un punto negro
+        imagen = ImageOps.invert(imagen).convert("1")
+        datos = imagen.tobytes()
+
+        bytes_por_fila = ancho // 8
+        comando = (
+            GS + b"v0\x00"
+            + bytes([bytes_por_fila % 256, bytes_por_fila // 256, alto % 256, alto // 256])
+            + datos
+        )
+    except Exception as e:
+        config.guardar_log(f"No se pudo rasterizar el logo del ticket: {e}", "WARNING")
+        comando = b""
+
+    with _bloqueo_logos:
+        _cache_logos[clave] = comando
+
+    return comando
+
+
+class RenderizadorEscPos:
+    """Arma tickets ESC/POS a partir de las plantillas de documentos"""
+
+    def __init__(self, ancho_papel=80, incluir_logo=True):
+        """
+        Args:
+            ancho_papel (int): Ancho del papel en mm (58 u 80)
+            incluir_logo (bool): Imprimir el logo configurado
+        """
+        self.columnas, self.ancho_puntos = ANCHOS_PAPEL.get(ancho_papel, ANCHOS_PAPEL[80])
+        self.incluir_logo = incluir_logo
+
+    def _texto(self, texto):
+        """Codifica texto para la impresora"""
+        return str(texto).encode(CODIFICACION, errors="replace")
+
+    def _lineas(self, texto, sangria=""):
+        """Parte un texto en líneas del ancho del papel"""
+        lineas = []
+        for parrafo in str(texto).splitlines() or [""]:
+            lineas.extend(textwrap.wrap(parrafo, self.columnas, subsequent_indent=sangria) or [""])
+        return lineas
+
+    def _renglon(self, izquierda, derecha):
+        """Renglón con texto a la izquierda y valor alineado a la derecha"""
+        espacio = self.columnas - len(derecha) - 1
+        return f"{izquierda[:espacio]:<{espacio}} {derecha}"
+
+    def generar(self, nombre_plantilla, datos):
+        """
+        Genera el ticket completo
+
+        Args:
+            nombre_plantilla (str): Nombre de la plantilla
+            datos (dict): Datos del documento
+
+        Returns:
+            bytes: Comandos ESC/POS del ticket
+        """
+        compilada = MotorDocumentos.obtener_compilada(nombre_plantilla)
+        plantilla = compilada.plantilla
+        valores = compilada.valores(datos)
+        separador = "-" * self.columnas
+        salida = [CMD_INICIALIZAR, CMD_CODEPAGE_PC858, CMD_ALINEAR_CENTRO]
+
+        def linea(texto=""):
+            salida.append(self._texto(texto) + b"\n")
+
+        # Encabezado
+        if self.incluir_logo:
+            atributo_logo = LOGO_POR_PLANTILLA.get(nombre_plantilla, "logo_sistema")
+            salida.append(rasterizar_logo(getattr(config, atributo_logo, None), self.ancho_puntos))
+
+        salida += [CMD_TAMANIO_DOBLE, CMD_NEGRITA_ON]
+        linea(config.nombre_negocio[:self.columnas // 2])
+        salida += [CMD_TAMANIO_NORMAL, CMD_NEGRITA_OFF]
+        if config.direccion:
+            for texto in self._lineas(config.direccion):
+                linea(texto)
+        if config.telefono_contacto:
+            linea(f"Tel: {config.telefono_contacto}")
+
+        linea()
+        salida.append(CMD_NEGRITA_ON)
+        linea(plantilla.titulo)
+        linea(f"{plantilla.prefijo_numero}{valores[plantilla.campo_numero]}")
+        salida.append(CMD_NEGRITA_OFF)
+        if valores[plantilla.campo_fecha]:
+            linea(valores[plantilla.campo_fecha])
+
+        salida.append(CMD_ALINEAR_IZQUIERDA)
+        linea(separador)
+
+        # Cuerpo
+        for seccion in plantilla.secciones:
+            if seccion['tipo'] == 'campos':
+                campos = [(etiqueta, valores[clave]) for etiqueta, clave, _ in seccion['campos']
+                          if valores[clave]]
+                if not campos:
+                    continue
+                salida.append(CMD_NEGRITA_ON)
+                linea(seccion['titulo'])
+                salida.append(CMD_NEGRITA_OFF)
+                for etiqueta, valor in campos:
+                    for texto in self._lineas(f"{etiqueta}: {valor}", sangria="  "):
+                        linea(texto)
+
+            elif seccion['tipo'] == 'texto':
+                if not valores[seccion['clave']]:
+                    continue
+                salida.append(CMD_NEGRITA_ON)
+                linea(seccion['titulo'])
+                salida.append(CMD_NEGRITA_OFF)
+                for texto in self._lineas(valores[seccion['clave']]):
+                    linea(texto)
+
+            elif seccion['tipo'] == 'montos':
+                for concepto, clave in seccion['filas']:
+                    linea(self._renglon(concepto, valores[clave]))
+                concepto_total, clave_total = seccion['total']
+                salida.append(CMD_NEGRITA_ON)
+                linea(self._renglon(concepto_total, valores[clave_total]))
+                salida.append(CMD_NEGRITA_OFF)
+
+            linea(separador)
+
+        # Pie y firma
+        salida.append(CMD_ALINEAR_CENTRO)
+        if compilada.texto_pie:
+            for texto in self._lineas(compilada.texto_pie):
+                linea(texto)
+
+        if plantilla.texto_firma:
+            linea()
+            linea()
+            linea("_" * min(32, self.columnas))
+            linea(plantilla.texto_firma)
+
+        salida.append(b"\n" * 4 + CMD_CORTE_PARCIAL)
+        return b"".join(salida)
+
+
+# ============================================================================
+# DESTINOS DE IMPRESIÓN
+# ============================================================================
+
+class DestinoArchivo:
+    """Escribe los tickets en un archivo o dispositivo (ej: /dev/usb/lp0, LPT1)"""
+
+    def __init__(self, ruta, agregar=False):
+        self.ruta = ruta
+        self.modo = "ab" if agregar else "wb"
+
+    def enviar(self, datos):
+        with open(self.ruta, self.modo) as archivo:
+            archivo.write(datos)
+
+
+class DestinoRed:
+    """Envía los tickets a una impresora de red (puerto RAW 9100)"""
+
+    def __init__(self, host, puerto=9100, tiempo_espera=5):
+        self.host = host
+        self.puerto = puerto
+        self.tiempo_espera = tiempo_espera
+
+    def enviar(self, datos):
+        with socket.create_connection((self.host, self.puerto), timeout=self.tiempo_espera) as conexion:
+            conexion.sendall(datos)
+
+
+class DestinoEscpos:
+    """Envía los tickets por una impresora de la librería python-escpos (USB, serie)"""
+
+    def __init__(self, impresora):
+        self.impresora = impresora
+
+    def enviar(self, datos):
+        self.impresora._raw(datos)
+
+
+class DestinoMemoria:
+    """Guarda los tickets en memoria (pruebas y diagnóstico)"""
+
+    def __init__(self):
+        self.tickets = []
+
+    def enviar(self, datos):
+        self.tickets.append(datos)
+
+
+def crear_destino_configurado():
+    """
+    Crea el destino de impresión según la configuración del sistema
+
+    Returns:
+        Destino de impresión (DestinoMemoria si no hay impresora configurada)
+    """
+    tipo = getattr(config, "impresora_termica_tipo", "")
+    destino = getattr(config, "impresora_termica_destino", "")
+
+    if tipo == "red" and destino:
+        host, _, puerto = destino.partition(":")
+        return DestinoRed(host, int(puerto or 9100))
+
+    if tipo == "archivo" and destino:
+        return DestinoArchivo(destino)
+
+    if tipo == "usb" and destino:
+        from escpos.printer import Usb
+        id_fabricante, _, id_producto = destino.partition(":")
+        return DestinoEscpos(Usb(int(id_fabricante, 16), int(id_producto, 16)))
+
+    return DestinoMemoria()
+
+
+# ============================================================================
+# COLA DE IMPRESIÓN
+# ============================================================================
+
+class ColaImpresion:
+    """Cola de tickets atendida por un hilo de fondo"""
+
+    def __init__(self, destino, renderizador=None):
+        """
+        Args:
+            destino: Destino de impresión (objeto con método enviar(bytes))
+            renderizador (RenderizadorEscPos): Armador de tickets
+        """
+        self.destino = destino
+        self.renderizador = renderizador or RenderizadorEscPos(
+            getattr(config, "ancho_papel_ticket", 80)
+        )
+        self._cola = queue.Queue()
+        self._hilo = threading.Thread(target=self._atender, name="ColaImpresion", daemon=True)
+        self._hilo.start()
+
+    def encolar(self, nombre_plantilla, datos, callback=None):
+        """
+        Agrega un ticket a la cola
+
+        Args:
+            nombre_plantilla (str): Nombre de la plantilla
+            datos (dict): Datos del documento
+            callback (callable): Función (exito, mensaje) al terminar
+        """
+        self._cola.put((nombre_plantilla, dict(datos), callback))
+
+    def esperar(self):
+        """Bloquea hasta que se imprimieron todos los tickets encolados"""
+        self._cola.join()
+
+    def _atender(self):
+        """Bucle del hilo de impresión"""
+        while True:
+            nombre_plantilla, datos, callback = self._cola.get()
+            try:
+                ticket = self.renderizador.generar(nombre_plantilla, datos)
+                self.destino.enviar(ticket)
+                resultado = (True, "Ticket impreso")
+            except Exception as e:
+                config.guardar_log(f"Error al imprimir ticket ({nombre_plantilla}): {e}", "ERROR")
+                resultado = (False, f"Error: {str(e)}")
+            finally:
+                self._cola.task_done()
+
+            if callback:
+                try:
+                    callback(*resultado)
+                except Exception as e:
+                    config.guardar_log(f"Error en aviso de impresión: {e}", "ERROR")
+
+
+_cola_global = None
+_bloqueo_cola = threading.Lock()
+
+
+def obtener_cola_impresion():
+    """
+    Devuelve la cola de impresión de la aplicación (se crea al primer uso)
+
+    Returns:
+        ColaImpresion: Cola de tickets
+    """
+    global _cola_global
+
+    with _bloqueo_cola:
+        if _cola_global is None:
+            _cola_global = ColaImpresion(crear_destino_configurado())
+        return _cola_global
@@ -9,12 +9,15 @@ Maneja el flujo completo de la aplicación: primer usuario, login, ventana princ
 
 import sys
 from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
 from PyQt5.QtGui import QIcon
 from interfaz.ventanas.login import VentanaLogin
-from interfaz.ventanas.primer_usuario import VentanaPrimerUsuario
-from interfaz.ventanas.cambio_obligatorio import DialogoCambioObligatorio
-from interfaz.ventanas.ventana_principal import VentanaPrincipal
+from interfaz.estilos.tema import aplicar_tema
+from interfaz.componentes.precarga import (PrecargaSegundoPlano, MODULOS_PRECARGA,
+                                           ESTADISTICAS_PRECARGA)
 from sistema_base.configuracion import config
+from sistema_base.perfil_arranque import perfil
+from sistema_base.constantes import ID_USUARIO_SISTEMA
 from base_datos.conexion import db
 
 
@@ -22,9 +25,28 @@ class AplicacionPrincipal:
     """Clase principal que maneja el flujo de la aplicación"""
     
     def __init__(self):
-        self.app = QApplication(sys.argv)
+        # main.py crea la QApplication antes, para mostrar el splash
+        self.app = QApplication.instance() or QApplication(sys.argv)
         self.app.setApplicationName("TechManager")
         self.ventana_principal = None
+        self.precargas = []
+        self.app.aboutToQuit.connect(self.detener_precargas)
+        self.aplicar_tema_configurado()
+    
+    def aplicar_tema_configurado(self):
+        """Compila la hoja de estilos de la aplicación con los colores guardados"""
+        try:
+            if db.tabla_existe('configuracion_sistema'):
+                colores = db.obtener_uno(
+                    "SELECT color_primario, color_secundario FROM configuracion_sistema WHERE id_config = 1"
+                )
+                if colores:
+                    config.color_primario = colores['color_primario'] or config.color_primario
+                    config.color_secundario = colores['color_secundario'] or config.color_secundario
+            
+            aplicar_tema()
+        except Exception as e:
+            config.guardar_log(f"Error al aplicar el tema: {e}", "ERROR")
     
     def verificar_primer_uso(self):
         """Verifica si es la primera vez que se usa el sistema"""
@@ -34,28 +56,43 @@ class AplicacionPrincipal:
                 return True
             
             # Si existe, contar usuarios
-            consulta = "SELECT COUNT(*) as total FROM usuarios"
-            resultado = db.obtener_uno(consulta)
+            # El usuario reservado 'sistema' no cuenta
+            consulta = "SELECT COUNT(*) as total FROM usuarios WHERE id_usuario != ?"
+            resultado = db.obtener_uno(consulta, (ID_USUARIO_SISTEMA,))
             return resultado['total'] == 0
         except Exception as e:
             # Si hay cualquier error, asumir primera vez
             print(f"Error al verificar primer uso: {e}")
             return True
     
-    def iniciar(self):
-        """Inicia la aplicación"""
+    def iniciar(self, splash=None):
+        """
+        Inicia la aplicación
+        
+        Args:
+            splash (QSplashScreen): Splash de carga, se cierra al mostrar la primera ventana
+        """
+        # El perfil de arranque termina cuando aparece la primera ventana
+        QTimer.singleShot(0, perfil.finalizar)
+        
         # Verificar si es primera vez
         if self.verificar_primer_uso():
             # Mostrar ventana de creación de primer usuario
+            from interfaz.ventanas.primer_usuario import VentanaPrimerUsuario
             ventana_primer_usuario = VentanaPrimerUsuario()
+            self.cerrar_splash(splash, ventana_primer_usuario)
             resultado = ventana_primer_usuario.exec_()
             
             if resultado != ventana_primer_usuario.Accepted:
                 # Usuario cerró sin crear el administrador
+                self.detener_precargas()
                 sys.exit(0)
         
-        # Mostrar ventana de login
+        # Mostrar ventana de login y, mientras el usuario escribe, importar
+        # las ventanas y librerías pesadas en segundo plano
         ventana_login = VentanaLogin()
+        self.cerrar_splash(splash, ventana_login)
+        QTimer.singleShot(0, lambda: self.iniciar_precarga(modulos=MODULOS_PRECARGA))
         resultado = ventana_login.exec_()
         
         if resultado == ventana_login.Accepted:
@@ -66,6 +103,7 @@ class AplicacionPrincipal:
                 # Verificar si es primer login
                 if usuario['primer_login'] == 1:
                     # Mostrar cambio obligatorio de contraseña
+                    from interfaz.ventanas.cambio_obligatorio import DialogoCambioObligatorio
                     ventana_cambio = DialogoCambioObligatorio(usuario)
                     resultado_cambio = ventana_cambio.exec_()
                     
@@ -74,18 +112,55 @@ class AplicacionPrincipal:
                         self.abrir_ventana_principal(usuario)
                     else:
                         # Usuario canceló el cambio (no debería pasar)
+                        self.detener_precargas()
                         sys.exit(0)
                 else:
                     # Login normal, abrir ventana principal
                     self.abrir_ventana_principal(usuario)
         else:
             # Usuario cerró el login sin autenticarse
+            self.detener_precargas()
             sys.exit(0)
         
         # Ejecutar la aplicación
         sys.exit(self.app.exec_())
     
+    def cerrar_splash(self, splash, ventana):
+        """Cierra el splash cuando la ventana indicada queda visible"""
+        if splash is not None and splash.isVisible():
+            splash.finish(ventana)
+    
+    def iniciar_precarga(self, modulos=(), estadisticas=()):
+        """Lanza una precarga en segundo plano (ver interfaz.componentes.precarga)"""
+        precarga = PrecargaSegundoPlano(modulos, estadisticas)
+        self.precargas.append(precarga)
+        precarga.iniciar()
+    
+    def detener_precargas(self):
+        """Espera a que terminen las precargas antes de salir"""
+        for precarga in self.precargas:
+            precarga.detener()
+    
     def abrir_ventana_principal(self, usuario):
         """Abre la ventana principal del sistema"""
+        # Las estadísticas se precalculan recién ahora, después de las
+        # escrituras del login, para que sigan vigentes al abrir un módulo
+        self.iniciar_precarga(estadisticas=ESTADISTICAS_PRECARGA)
+        
+        from interfaz.ventanas.ventana_principal import VentanaPrincipal
         self.ventana_principal = VentanaPrincipal(usuario)
         self.ventana_principal.show()
+        
+        if usuario['rol'] == 'admin':
+            self.avisar_conflicto_usuario_sistema()
+    
+    def avisar_conflicto_usuario_sistema(self):
+        """Muestra al admin si el ID del usuario 'sistema' lo ocupa otra cuenta"""
+        try:
+            from base_datos.crear_tablas import verificar_usuario_sistema
+            exito, mensaje = verificar_usuario_sistema()
+            if not exito:
+                from interfaz.componentes.componentes import Mensaje
+                Mensaje.advertencia("Usuario del sistema", mensaje, self.ventana_principal)
+        except Exception as e:
+            config.guardar_log(f"Error al verificar el usuario del sistema: {e}", "ERROR")
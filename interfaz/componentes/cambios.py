@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - CAMBIOS DE DATOS EN LAS VENTANAS
+============================================================================
+Lleva los eventos de base_datos.eventos al hilo de la interfaz. Los
+cambios que llegan juntos (un guardado suele tocar varias tablas) se
+entregan en una sola señal, para que la ventana actualice una vez.
+============================================================================
+"""
+
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+from base_datos.eventos import bus_cambios
+
+
+class ReceptorCambios(QObject):
+    """
+    Recibe los cambios de ciertas tablas y los entrega en el hilo de la interfaz
+
+    Args:
+        tablas (iterable): Tablas de interés (ver TABLAS_OBSERVADAS)
+        demora_ms (int): Tiempo para juntar cambios antes de avisar
+    """
+
+    # list[EventoCambio]
+    cambios = pyqtSignal(list)
+    _recibidos = pyqtSignal(list)
+
+    def __init__(self, tablas, parent=None, demora_ms=50):
+        super().__init__(parent)
+        self.pendientes = []
+
+        self.temporizador = QTimer(self)
+        self.temporizador.setSingleShot(True)
+        self.temporizador.setInterval(demora_ms)
+        self.temporizador.timeout.connect(self._entregar)
+
+        # El commit puede ocurrir en un hilo de trabajo: pasar por la cola de Qt
+        self._recibidos.connect(self._acumular, Qt.QueuedConnection)
+        bus_cambios.suscribir(self._publicados, tablas)
+
+    def _publicados(self, eventos):
+        self._recibidos.emit(list(eventos))
+
+    def _acumular(self, eventos):
+        self.pendientes.extend(eventos)
+        if not self.temporizador.isActive():
+            self.temporizador.start()
+
+    def _entregar(self):
+        eventos, self.pendientes = self.pendientes, []
+        if eventos:
+            self.cambios.emit(eventos)
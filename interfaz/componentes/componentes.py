@@ -10,7 +10,7 @@ Componentes de interfaz profesionales con diseño moderno
 from PyQt5.QtWidgets import (QPushButton, QLineEdit, QLabel, QMessageBox, 
                              QComboBox, QTextEdit)
 from PyQt5.QtCore import Qt
-from interfaz.estilos.estilos import Estilos
+from interfaz.estilos.tema import marcar
 
 
 class Boton(QPushButton):
@@ -24,17 +24,8 @@ class Boton(QPushButton):
         self.setMinimumHeight(42)
     
     def aplicar_estilo(self, tipo):
-        """Aplica el estilo según el tipo de botón"""
-        if tipo == "primario":
-            self.setStyleSheet(Estilos.boton_primario())
-        elif tipo == "secundario":
-            self.setStyleSheet(Estilos.boton_secundario())
-        elif tipo == "exito":
-            self.setStyleSheet(Estilos.boton_exito())
-        elif tipo == "peligro":
-            self.setStyleSheet(Estilos.boton_peligro())
-        elif tipo == "neutro":
-            self.setStyleSheet(Estilos.boton_neutro())
+        """Aplica el estilo según el tipo de botón (primario, secundario, exito, peligro, neutro)"""
+        marcar(self, tipo)
 
 
 class CampoTexto(QLineEdit):
@@ -43,7 +34,7 @@ class CampoTexto(QLineEdit):
     def __init__(self, placeholder="", parent=None):
         super().__init__(parent)
         self.setPlaceholderText(placeholder)
-        self.setStyleSheet(Estilos.campo_entrada())
+        marcar(self, "campo")
         # Altura más generosa
         self.setMinimumHeight(44)
 
@@ -55,7 +46,7 @@ class CampoContrasena(QLineEdit):
         super().__init__(parent)
         self.setPlaceholderText(placeholder)
         self.setEchoMode(QLineEdit.Password)
-        self.setStyleSheet(Estilos.campo_entrada())
+        marcar(self, "campo")
         self.setMinimumHeight(44)
 
 
@@ -65,7 +56,7 @@ class CampoTextoMultilinea(QTextEdit):
     def __init__(self, placeholder="", parent=None):
         super().__init__(parent)
         self.setPlaceholderText(placeholder)
-        self.setStyleSheet(Estilos.campo_texto_multilinea())
+        marcar(self, "campo")
         self.setMinimumHeight(120)
 
 
@@ -74,7 +65,7 @@ class ListaDesplegable(QComboBox):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setStyleSheet(Estilos.combobox())
+        marcar(self, "campo")
         self.setMinimumHeight(44)
 
 
@@ -88,155 +79,53 @@ class Etiqueta(QLabel):
         self.setTextInteractionFlags(Qt.TextSelectableByMouse)
     
     def aplicar_estilo(self, tipo):
-        """Aplica el estilo según el tipo de etiqueta"""
-        if tipo == "titulo":
-            self.setStyleSheet(Estilos.etiqueta_titulo())
-        elif tipo == "subtitulo":
-            self.setStyleSheet(Estilos.etiqueta_subtitulo())
-        elif tipo == "normal":
-            self.setStyleSheet(Estilos.etiqueta_normal())
-        elif tipo == "error":
-            self.setStyleSheet(Estilos.etiqueta_error())
-        elif tipo == "exito":
-            self.setStyleSheet(Estilos.etiqueta_exito())
+        """Aplica el estilo según el tipo de etiqueta (titulo, subtitulo, normal, error, exito)"""
+        marcar(self, tipo)
 
 
 class Mensaje:
     """Clase para mostrar mensajes modernos al usuario"""
     
     @staticmethod
-    def exito(titulo, mensaje, parent=None):
-        """Muestra un mensaje de éxito moderno"""
+    def crear(icono, nombre, titulo, mensaje, parent=None):
+        """
+        Crea un QMessageBox con el estilo del tema
+        
+        Args:
+            icono (QMessageBox.Icon): Icono del mensaje
+            nombre (str): objectName que elige el estilo (ver tema.MENSAJES)
+            titulo (str): Título de la ventana
+            mensaje (str): Texto del mensaje
+            parent (QWidget): Ventana padre
+        """
         msg = QMessageBox(parent)
-        msg.setIcon(QMessageBox.Information)
+        msg.setObjectName(nombre)
+        msg.setIcon(icono)
         msg.setWindowTitle(titulo)
         msg.setText(mensaje)
-        msg.setStyleSheet(f"""
-            QMessageBox {{
-                background-color: {Estilos.COLOR_FONDO_CLARO};
-                min-width: 400px;
-            }}
-            QLabel {{
-                font-size: {Estilos.TAMANO_NORMAL}pt;
-                font-family: '{Estilos.FUENTE_PRINCIPAL}', Arial;
-                color: {Estilos.COLOR_TEXTO};
-                padding: {Estilos.ESPACIADO_LG};
-            }}
-            QPushButton {{
-                background-color: {Estilos.COLOR_EXITO};
-                color: white;
-                border: none;
-                padding: 10px 24px;
-                font-size: {Estilos.TAMANO_NORMAL}pt;
-                font-weight: 600;
-                min-width: 80px;
-            }}
-            QPushButton:hover {{
-                background-color: {Estilos.COLOR_EXITO_HOVER};
-            }}
-        """)
-        msg.exec_()
+        return msg
+    
+    @staticmethod
+    def exito(titulo, mensaje, parent=None):
+        """Muestra un mensaje de éxito moderno"""
+        Mensaje.crear(QMessageBox.Information, "mensaje_exito", titulo, mensaje, parent).exec_()
     
     @staticmethod
     def error(titulo, mensaje, parent=None):
         """Muestra un mensaje de error moderno"""
-        msg = QMessageBox(parent)
-        msg.setIcon(QMessageBox.Critical)
-        msg.setWindowTitle(titulo)
-        msg.setText(mensaje)
-        msg.setStyleSheet(f"""
-            QMessageBox {{
-                background-color: {Estilos.COLOR_FONDO_CLARO};
-                min-width: 400px;
-            }}
-            QLabel {{
-                font-size: {Estilos.TAMANO_NORMAL}pt;
-                font-family: '{Estilos.FUENTE_PRINCIPAL}', Arial;
-                color: {Estilos.COLOR_TEXTO};
-                padding: {Estilos.ESPACIADO_LG};
-            }}
-            QPushButton {{
-                background-color: {Estilos.COLOR_ERROR};
-                color: white;
-                border: none;
-                padding: 10px 24px;
-                font-size: {Estilos.TAMANO_NORMAL}pt;
-                font-weight: 600;
-                min-width: 80px;
-            }}
-            QPushButton:hover {{
-                background-color: {Estilos.COLOR_ERROR_HOVER};
-            }}
-        """)
-        msg.exec_()
+        Mensaje.crear(QMessageBox.Critical, "mensaje_error", titulo, mensaje, parent).exec_()
     
     @staticmethod
     def advertencia(titulo, mensaje, parent=None):
         """Muestra un mensaje de advertencia moderno"""
-        msg = QMessageBox(parent)
-        msg.setIcon(QMessageBox.Warning)
-        msg.setWindowTitle(titulo)
-        msg.setText(mensaje)
-        msg.setStyleSheet(f"""
-            QMessageBox {{
-                background-color: {Estilos.COLOR_FONDO_CLARO};
-                min-width: 400px;
-            }}
-            QLabel {{
-                font-size: {Estilos.TAMANO_NORMAL}pt;
-                font-family: '{Estilos.FUENTE_PRINCIPAL}', Arial;
-                color: {Estilos.COLOR_TEXTO};
-                padding: {Estilos.ESPACIADO_LG};
-            }}
-            QPushButton {{
-                background-color: {Estilos.COLOR_ADVERTENCIA};
-                color: white;
-                border: none;
-                padding: 10px 24px;
-                font-size: {Estilos.TAMANO_NORMAL}pt;
-                font-weight: 600;
-                min-width: 80px;
-            }}
-            QPushButton:hover {{
-                background-color: {Estilos.COLOR_ADVERTENCIA_HOVER};
-            }}
-        """)
-        msg.exec_()
+        Mensaje.crear(QMessageBox.Warning, "mensaje_advertencia", titulo, mensaje, parent).exec_()
     
     @staticmethod
     def confirmacion(titulo, mensaje, parent=None):
         """Muestra un mensaje de confirmación moderno y retorna True/False"""
-        msg = QMessageBox(parent)
-        msg.setIcon(QMessageBox.Question)
-        msg.setWindowTitle(titulo)
-        msg.setText(mensaje)
+        msg = Mensaje.crear(QMessageBox.Question, "mensaje_confirmacion", titulo, mensaje, parent)
         msg.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
         msg.setDefaultButton(QMessageBox.No)
-        msg.setStyleSheet(f"""
-            QMessageBox {{
-                background-color: {Estilos.COLOR_FONDO_CLARO};
-                min-width: 400px;
-            }}
-            QLabel {{
-                font-size: {Estilos.TAMANO_NORMAL}pt;
-                font-family: '{Estilos.FUENTE_PRINCIPAL}', Arial;
-                color: {Estilos.COLOR_TEXTO};
-                padding: {Estilos.ESPACIADO_LG};
-            }}
-            QPushButton {{
-                background-color: {Estilos.COLOR_PRIMARIO};
-                color: white;
-                border: none;
-                padding: 10px 24px;
-                font-size: {Estilos.TAMANO_NORMAL}pt;
-                font-weight: 600;
-                min-width: 80px;
-                margin: 4px;
-            }}
-            QPushButton:hover {{
-                background-color: {Estilos.COLOR_PRIMARIO_HOVER};
-            }}
-        """)
         
         # Traducir botones
         boton_si = msg.button(QMessageBox.Yes)
@@ -250,32 +139,4 @@ class Mensaje:
     @staticmethod
     def informacion(titulo, mensaje, parent=None):
         """Muestra un mensaje informativo moderno"""
-        msg = QMessageBox(parent)
-        msg.setIcon(QMessageBox.Information)
-        msg.setWindowTitle(titulo)
-        msg.setText(mensaje)
-        msg.setStyleSheet(f"""
-            QMessageBox {{
-                background-color: {Estilos.COLOR_FONDO_CLARO};
-                min-width: 400px;
-            }}
-            QLabel {{
-                font-size: {Estilos.TAMANO_NORMAL}pt;
-                font-family: '{Estilos.FUENTE_PRINCIPAL}', Arial;
-                color: {Estilos.COLOR_TEXTO};
-                padding: {Estilos.ESPACIADO_LG};
-            }}
-            QPushButton {{
-                background-color: {Estilos.COLOR_INFO};
-                color: white;
-                border: none;
-                padding: 10px 24px;
-                font-size: {Estilos.TAMANO_NORMAL}pt;
-                font-weight: 600;
-                min-width: 80px;
-            }}
-            QPushButton:hover {{
-                background-color: {Estilos.COLOR_INFO_HOVER};
-            }}
-        """)
-        msg.exec_()
+        Mensaje.crear(QMessageBox.Information, "mensaje_informacion", titulo, mensaje, parent).exec_()
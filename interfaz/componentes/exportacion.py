@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - DIÁLOGO DE EXPORTACIÓN DE LISTADOS
+============================================================================
+Exporta el listado de cualquier ventana a CSV o Excel en un hilo de
+trabajo, con barra de progreso y cancelación
+============================================================================
+"""
+
+import threading
+from datetime import datetime
+
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
+                             QProgressBar, QFileDialog)
+from interfaz.componentes.componentes import Boton, Etiqueta, Mensaje
+from interfaz.componentes.trabajos import TrabajoSegundoPlano
+from modulos.exportacion_LOGICA import ModuloExportacion
+from sistema_base.configuracion import config
+
+
+class DialogoExportacion(QDialog):
+    """
+    Diálogo de exportación de un listado.
+
+    Recibe la consulta armada por el módulo (consulta_listar_*) y las
+    columnas a exportar como tuplas (clave, encabezado[, formateador]).
+    """
+
+    def __init__(self, titulo, consulta, parametros, columnas, nombre_archivo, parent=None):
+        super().__init__(parent)
+        self.titulo = titulo
+        self.consulta = consulta
+        self.parametros = parametros
+        self.columnas = columnas
+        self.nombre_archivo = nombre_archivo
+        self.trabajo = None
+        self.evento_cancelacion = threading.Event()
+        self.inicializar_ui()
+
+    @staticmethod
+    def exportar(titulo, consulta, parametros, columnas, nombre_archivo, parent=None):
+        """
+        Pide el archivo destino y exporta el listado
+
+        Args:
+            titulo (str): Título del diálogo
+            consulta (str): Consulta SQL del listado
+            parametros (tuple): Parámetros de la consulta
+            columnas (list): Tuplas (clave, encabezado[, formateador])
+            nombre_archivo (str): Nombre sugerido, sin extensión
+            parent (QWidget): Ventana padre
+        """
+        nombre = f"{nombre_archivo}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+        archivo, filtro = QFileDialog.getSaveFileName(
+            parent,
+            titulo,
+            str(config.ruta_exportaciones / f"{nombre}.xlsx"),
+            "Excel (*.xlsx);;CSV (*.csv)"
+        )
+
+        if not archivo:
+            return
+
+        # Completar la extensión según el filtro elegido
+        if not archivo.lower().endswith((".xlsx", ".csv")):
+            archivo += ".csv" if filtro.startswith("CSV") else ".xlsx"
+
+        dialogo = DialogoExportacion(titulo, consulta, parametros, columnas, nombre, parent)
+        dialogo.iniciar_exportacion(archivo)
+        dialogo.exec_()
+
+    def inicializar_ui(self):
+        """Inicializa la interfaz"""
+        self.setWindowTitle(self.titulo)
+        self.setMinimumWidth(420)
+        self.setModal(True)
+
+        layout = QVBoxLayout()
+        layout.setSpacing(15)
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        layout.addWidget(Etiqueta(self.titulo, "subtitulo"))
+
+        self.barra_progreso = QProgressBar()
+        self.barra_progreso.setValue(0)
+        layout.addWidget(self.barra_progreso)
+
+        self.label_estado = QLabel("")
+        self.label_estado.setStyleSheet("color: #6c757d;")
+        layout.addWidget(self.label_estado)
+
+        layout_botones = QHBoxLayout()
+
+        self.boton_cancelar = Boton("Cancelar", "peligro")
+        self.boton_cancelar.clicked.connect(self.cancelar_exportacion)
+        layout_botones.addWidget(self.boton_cancelar)
+
+        layout_botones.addStretch()
+
+        self.boton_cerrar = Boton("Cerrar", "neutro")
+        self.boton_cerrar.clicked.connect(self.reject)
+        layout_botones.addWidget(self.boton_cerrar)
+
+        layout.addLayout(layout_botones)
+        self.setLayout(layout)
+
+    def iniciar_exportacion(self, archivo):
+        """Inicia la exportación en un hilo de trabajo"""
+        self.archivo = archivo
+        self.evento_cancelacion.clear()
+
+        self.trabajo = TrabajoSegundoPlano(
+            ModuloExportacion.exportar_consulta,
+            self.consulta,
+            self.parametros,
+            self.columnas,
+            archivo,
+            evento_cancelacion=self.evento_cancelacion,
+            titulo_hoja=self.titulo,
+            parent=self
+        )
+        self.trabajo.progreso.connect(self.actualizar_progreso)
+        self.trabajo.terminado.connect(self.exportacion_terminada)
+
+        self.boton_cerrar.setEnabled(False)
+        self.boton_cancelar.setEnabled(True)
+        self.barra_progreso.setMaximum(0)
+        self.label_estado.setText("Preparando exportación...")
+        self.trabajo.start()
+
+    def actualizar_progreso(self, procesados, total):
+        """Actualiza la barra de progreso"""
+        self.barra_progreso.setMaximum(max(total, 1))
+        self.barra_progreso.setValue(min(procesados, max(total, 1)))
+        self.label_estado.setText(f"{procesados} de {total} registros")
+
+    def cancelar_exportacion(self):
+        """Cancela la exportación en curso"""
+        self.evento_cancelacion.set()
+        self.boton_cancelar.setEnabled(False)
+        self.label_estado.setText("Cancelando...")
+
+    def exportacion_terminada(self, resultado):
+        """Muestra el resultado de la exportación"""
+        exito, mensaje, _ = resultado
+
+        self.boton_cerrar.setEnabled(True)
+        self.boton_cancelar.setEnabled(False)
+        self.barra_progreso.setMaximum(max(self.barra_progreso.maximum(), 1))
+        self.label_estado.setText(mensaje)
+
+        if exito:
+            Mensaje.exito("✓ Exportado", f"{mensaje} a:\n{self.archivo}", self)
+            self.accept()
+        else:
+            Mensaje.advertencia(self.titulo, mensaje, self)
+
+    def reject(self):
+        """Evita cerrar el diálogo con una exportación en curso"""
+        if self.trabajo and self.trabajo.isRunning():
+            return
+        super().reject()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - PRECARGA EN SEGUNDO PLANO
+============================================================================
+Mientras la ventana de login espera al usuario, importa en un hilo las
+librerías pesadas (reportlab, openpyxl) y las ventanas más usadas. Al
+entrar, mientras se arma la ventana principal, deja calculadas las
+estadísticas de sus tarjetas. Así la primera ventana que se abre después
+del login no paga esos costos.
+
+Las estadísticas precargadas se usan una sola vez y solo si siguen
+vigentes: si pasó demasiado tiempo o hubo escrituras en la base desde
+que se calcularon, la ventana las vuelve a consultar.
+============================================================================
+"""
+
+import importlib
+import threading
+import time
+
+from PyQt5.QtCore import QThread
+from base_datos.conexion import db
+from sistema_base.configuracion import config
+
+
+# Librerías y ventanas a importar, en orden de prioridad
+MODULOS_PRECARGA = [
+    "interfaz.ventanas.ventana_principal",
+    "interfaz.ventanas.equipos",
+    "interfaz.ventanas.clientes",
+    "interfaz.ventanas.presupuestos",
+    "interfaz.ventanas.ordenes",
+    "interfaz.ventanas.repuestos",
+    "reportlab.platypus",
+    "reportlab.lib.styles",
+    "reportlab.lib.pagesizes",
+    "impresion.motor_documentos",
+    "openpyxl",
+]
+
+# Estadísticas de las tarjetas: clave -> (módulo, clase, método)
+ESTADISTICAS_PRECARGA = {
+    "equipos": ("modulos.equipos_LOGICA", "ModuloEquipos", "obtener_estadisticas_equipos"),
+    "clientes": ("modulos.clientes", "ModuloClientes", "obtener_estadisticas_clientes"),
+    "presupuestos": ("modulos.presupuestos_LOGICA", "ModuloPresupuestos", "obtener_estadisticas_presupuestos"),
+    "ordenes": ("modulos.ordenes_LOGICA", "ModuloOrdenes", "obtener_estadisticas_ordenes"),
+    "repuestos": ("modulos.repuestos_LOGICA", "ModuloRepuestos", "obtener_estadisticas_repuestos"),
+}
+
+# Segundos que una estadística precargada sigue siendo válida
+VIGENCIA_ESTADISTICAS = 300
+
+# clave -> (momento, cambios_en_la_base, estadisticas)
+_estadisticas = {}
+_candado = threading.Lock()
+
+
+def _cambios_en_la_base():
+    """Filas modificadas por esta conexión desde que se abrió"""
+    return db.conectar().total_changes
+
+
+def obtener_estadisticas(clave, funcion):
+    """
+    Devuelve las estadísticas precargadas de una ventana, o las consulta
+
+    Args:
+        clave (str): Clave en ESTADISTICAS_PRECARGA
+        funcion (callable): Consulta a usar si no hay una precarga vigente
+
+    Returns:
+        dict: Estadísticas
+    """
+    with _candado:
+        precargada = _estadisticas.pop(clave, None)
+
+    if precargada is not None:
+        momento, cambios, datos = precargada
+        if time.monotonic() - momento < VIGENCIA_ESTADISTICAS and cambios == _cambios_en_la_base():
+            return datos
+
+    return funcion()
+
+
+class PrecargaSegundoPlano(QThread):
+    """
+    Hilo que importa módulos y precalcula estadísticas
+
+    Args:
+        modulos (list): Módulos a importar (ver MODULOS_PRECARGA)
+        estadisticas (list): Claves de ESTADISTICAS_PRECARGA a calcular
+    """
+
+    def __init__(self, modulos=(), estadisticas=(), parent=None):
+        super().__init__(parent)
+        self.modulos = list(modulos)
+        self.estadisticas = list(estadisticas)
+
+    def iniciar(self):
+        """Arranca con prioridad baja, para no competir con la ventana de login"""
+        self.start(QThread.LowPriority)
+
+    def detener(self):
+        """Pide que termine después del paso en curso y lo espera"""
+        if self.isRunning():
+            self.requestInterruption()
+            self.wait()
+
+    def run(self):
+        """Ejecuta la precarga; cada paso es opcional y no interrumpe a los demás"""
+        inicio = time.perf_counter()
+
+        for modulo in self.modulos:
+            if self.isInterruptionRequested():
+                return
+            try:
+                importlib.import_module(modulo)
+            except ImportError:
+                # Dependencia opcional no instalada: se informa al usarla
+                pass
+            except Exception as e:
+                config.guardar_log(f"Precarga: error al importar {modulo}: {e}", "WARNING")
+
+        for clave in self.estadisticas:
+            if self.isInterruptionRequested():
+                return
+            modulo, clase, metodo = ESTADISTICAS_PRECARGA[clave]
+            try:
+                funcion = getattr(getattr(importlib.import_module(modulo), clase), metodo)
+                cambios = _cambios_en_la_base()
+                datos = funcion()
+                with _candado:
+                    _estadisticas[clave] = (time.monotonic(), cambios, datos)
+            except Exception as e:
+                config.guardar_log(f"Precarga: error en estadísticas de {clave}: {e}", "WARNING")
+
+        config.guardar_log(f"Precarga en segundo plano completada en {(time.perf_counter() - inicio) * 1000:.0f} ms", "INFO")
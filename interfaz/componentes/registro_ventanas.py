@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - REGISTRO DE VENTANAS DE MÓDULOS
+============================================================================
+Mantiene abiertas las ventanas de módulos del QStackedWidget principal:
+al volver a un módulo se reutiliza su ventana y solo se recargan sus
+datos, en lugar de construirla de nuevo.
+
+Cuando hay más ventanas que el máximo configurado, o la memoria del
+proceso supera el presupuesto, se cierra la usada hace más tiempo (LRU).
+Cada apertura registra en el log cuánto tardó y la memoria en uso.
+============================================================================
+"""
+
+import ctypes
+import sys
+import time
+from collections import OrderedDict
+
+from sistema_base.configuracion import config
+
+
+def memoria_proceso_mb():
+    """
+    Memoria física en uso por el proceso (working set / RSS)
+
+    Returns:
+        float: Megabytes, o 0 si no se puede medir en esta plataforma
+    """
+    try:
+        if sys.platform == "win32":
+            from ctypes import wintypes
+
+            class CONTADORES(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            contadores = CONTADORES()
+            contadores.cb = ctypes.sizeof(CONTADORES)
+            proceso = ctypes.windll.kernel32.GetCurrentProcess()
+            ctypes.windll.psapi.GetProcessMemoryInfo(proceso, ctypes.byref(contadores), contadores.cb)
+            return contadores.WorkingSetSize / (1024 * 1024)
+
+        with open("/proc/self/statm") as archivo:
+            paginas = int(archivo.read().split()[1])
+        import resource
+        return paginas * resource.getpagesize() / (1024 * 1024)
+    except Exception:
+        return 0.0
+
+
+class RegistroVentanas:
+    """
+    Caché LRU de ventanas de módulos
+
+    Args:
+        stacked_widget (QStackedWidget): Contenedor de las ventanas (el
+            índice 0 es el dashboard y nunca se cierra)
+        maximo_ventanas (int): Ventanas de módulos abiertas como máximo
+        memoria_maxima_mb (int): Presupuesto de memoria del proceso (0 = sin límite)
+    """
+
+    def __init__(self, stacked_widget, maximo_ventanas=None, memoria_maxima_mb=None):
+        self.stacked_widget = stacked_widget
+        self.maximo_ventanas = max(1, maximo_ventanas or config.maximo_ventanas_abiertas)
+        self.memoria_maxima_mb = config.memoria_maxima_ventanas_mb if memoria_maxima_mb is None else memoria_maxima_mb
+        self.ventanas = OrderedDict()    # id_modulo -> ventana, de la menos a la más usada
+        self.metricas = {}               # id_modulo -> dict de aperturas y tiempos
+
+    def abrir(self, id_modulo, fabrica):
+        """
+        Muestra la ventana de un módulo, reutilizándola si ya está abierta
+
+        Args:
+            id_modulo (str): Identificador del módulo
+            fabrica (callable): Crea la ventana; recibe el QStackedWidget
+
+        Returns:
+            QWidget: Ventana mostrada
+        """
+        inicio = time.perf_counter()
+        ventana = self.ventanas.get(id_modulo)
+        reutilizada = ventana is not None
+
+        if reutilizada:
+            self.ventanas.move_to_end(id_modulo)
+            # Solo recargar los datos, la interfaz ya está armada
+            if hasattr(ventana, "refrescar_datos"):
+                ventana.refrescar_datos()
+        else:
+            ventana = fabrica(self.stacked_widget)
+            self.stacked_widget.addWidget(ventana)
+            self.ventanas[id_modulo] = ventana
+
+        self.stacked_widget.setCurrentWidget(ventana)
+        self.liberar_excedentes()
+
+        self.registrar_apertura(id_modulo, reutilizada, time.perf_counter() - inicio)
+        return ventana
+
+    def liberar_excedentes(self):
+        """Cierra las ventanas menos usadas que exceden el máximo o la memoria"""
+        while len(self.ventanas) > self.maximo_ventanas:
+            self.cerrar_menos_usada()
+
+        # La memoria liberada tarda en reflejarse (deleteLater, allocador),
+        # así que por exceso de memoria se cierra una sola ventana por apertura
+        if self.memoria_maxima_mb and memoria_proceso_mb() > self.memoria_maxima_mb:
+            self.cerrar_menos_usada()
+
+    def cerrar_menos_usada(self):
+        """Cierra la ventana usada hace más tiempo, salvo la que está a la vista"""
+        if len(self.ventanas) <= 1:
+            return
+
+        id_modulo, ventana = next(iter(self.ventanas.items()))
+        if ventana is not self.stacked_widget.currentWidget():
+            self.cerrar(id_modulo)
+
+    def cerrar(self, id_modulo):
+        """
+        Quita una ventana del registro y la destruye
+
+        Args:
+            id_modulo (str): Identificador del módulo
+        """
+        ventana = self.ventanas.pop(id_modulo, None)
+        if ventana is None:
+            return
+
+        self.stacked_widget.removeWidget(ventana)
+        ventana.deleteLater()
+        config.guardar_log(f"Ventana de {id_modulo} cerrada por el registro de ventanas", "INFO")
+
+    def cerrar_todas(self):
+        """Cierra todas las ventanas de módulos"""
+        for id_modulo in list(self.ventanas):
+            self.cerrar(id_modulo)
+
+    def registrar_apertura(self, id_modulo, reutilizada, segundos):
+        """Acumula las métricas de apertura y las deja en el log"""
+        metrica = self.metricas.setdefault(id_modulo, {
+            'creaciones': 0, 'reutilizaciones': 0, 'ms_creacion': 0.0, 'ms_reutilizacion': 0.0
+        })
+        tipo = 'reutilizacion' if reutilizada else 'creacion'
+        metrica['reutilizaciones' if reutilizada else 'creaciones'] += 1
+        metrica[f'ms_{tipo}'] += segundos * 1000
+
+        config.guardar_log(
+            f"Módulo {id_modulo} {'reutilizado' if reutilizada else 'creado'} en {segundos * 1000:.0f} ms "
+            f"({len(self.ventanas)} ventanas abiertas, {memoria_proceso_mb():.0f} MB en uso)",
+            "INFO"
+        )
+
+    def resumen(self):
+        """
+        Métricas de apertura por módulo
+
+        Returns:
+            list: Dicts con id_modulo, creaciones, reutilizaciones y tiempos promedio (ms)
+        """
+        filas = []
+        for id_modulo, m in self.metricas.items():
+            filas.append({
+                'id_modulo': id_modulo,
+                'abierta': id_modulo in self.ventanas,
+                'creaciones': m['creaciones'],
+                'reutilizaciones': m['reutilizaciones'],
+                'ms_creacion': m['ms_creacion'] / m['creaciones'] if m['creaciones'] else 0,
+                'ms_reutilizacion': m['ms_reutilizacion'] / m['reutilizaciones'] if m['reutilizaciones'] else 0,
+            })
+        return filas
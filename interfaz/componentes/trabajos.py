@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - TRABAJOS EN SEGUNDO PLANO
+============================================================================
+Ejecuta tareas largas (exportaciones, importaciones, etc.) fuera del hilo
+de la interfaz para que la ventana no se congele
+============================================================================
+"""
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class TrabajoSegundoPlano(QThread):
+    """
+    Hilo que ejecuta una función y avisa progreso y resultado por señales.
+
+    La función recibe un argumento 'callback_progreso' (procesados, total)
+    además de los argumentos indicados.
+    """
+
+    progreso = pyqtSignal(int, int)
+    terminado = pyqtSignal(object)
+
+    def __init__(self, funcion, *args, parent=None, **kwargs):
+        super().__init__(parent)
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        """Ejecuta la función en el hilo de trabajo"""
+        try:
+            resultado = self.funcion(
+                *self.args,
+                callback_progreso=self.progreso.emit,
+                **self.kwargs
+            )
+        except Exception as e:
+            resultado = (False, f"Error: {str(e)}", None)
+        self.terminado.emit(resultado)
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - TEMA DE LA APLICACIÓN
+============================================================================
+Compila una única hoja de estilos para toda la aplicación a partir de los
+estilos de Estilos y de los colores configurados.
+
+Los componentes ya no llaman a setStyleSheet: marcan su variante con la
+propiedad dinámica 'tipo' (Boton "primario", Etiqueta "titulo", tabla
+"tabla", ...) o con su objectName (mensajes), y Qt aplica la regla que
+corresponde desde la hoja de la aplicación. Así cada estilo se interpreta
+una sola vez, y cambiar los colores repinta todo sin reconstruir ventanas.
+============================================================================
+"""
+
+import re
+
+from interfaz.estilos.estilos import Estilos
+from sistema_base.configuracion import config
+
+
+# Variantes por propiedad 'tipo': (clase Qt, tipo, estilo de Estilos)
+VARIANTES = [
+    ("QPushButton", "primario", Estilos.boton_primario),
+    ("QPushButton", "secundario", Estilos.boton_secundario),
+    ("QPushButton", "exito", Estilos.boton_exito),
+    ("QPushButton", "peligro", Estilos.boton_peligro),
+    ("QPushButton", "neutro", Estilos.boton_neutro),
+    ("QLineEdit", "campo", Estilos.campo_entrada),
+    ("QTextEdit", "campo", Estilos.campo_texto_multilinea),
+    ("QComboBox", "campo", Estilos.combobox),
+    ("QLabel", "titulo", Estilos.etiqueta_titulo),
+    ("QLabel", "subtitulo", Estilos.etiqueta_subtitulo),
+    ("QLabel", "normal", Estilos.etiqueta_normal),
+    ("QLabel", "error", Estilos.etiqueta_error),
+    ("QLabel", "exito", Estilos.etiqueta_exito),
+    ("QTableWidget", "tabla", Estilos.tabla),
+]
+
+# Mensajes (QMessageBox por objectName): nombre -> atributos de color de Estilos
+MENSAJES = {
+    "mensaje_exito": ("COLOR_EXITO", "COLOR_EXITO_HOVER"),
+    "mensaje_error": ("COLOR_ERROR", "COLOR_ERROR_HOVER"),
+    "mensaje_advertencia": ("COLOR_ADVERTENCIA", "COLOR_ADVERTENCIA_HOVER"),
+    "mensaje_confirmacion": ("COLOR_PRIMARIO", "COLOR_PRIMARIO_HOVER"),
+    "mensaje_informacion": ("COLOR_INFO", "COLOR_INFO_HOVER"),
+}
+
+_REGLA = re.compile(r"([^{}]+)\{([^{}]*)\}")
+
+# Hojas ya compiladas por par de colores
+_compiladas = {}
+
+
+def oscurecer(color, factor):
+    """
+    Oscurece un color hexadecimal
+
+    Args:
+        color (str): Color '#rrggbb'
+        factor (float): Proporción a quitar (0.1 = 10 % más oscuro)
+
+    Returns:
+        str: Color '#rrggbb'
+    """
+    color = color.lstrip("#")
+    canales = [int(color[i:i + 2], 16) for i in (0, 2, 4)]
+    return "#" + "".join(f"{int(c * (1 - factor)):02x}" for c in canales)
+
+
+def _acotar_selector(selector, clase, condicion):
+    """
+    Restringe un selector de Estilos a una variante
+
+    'QPushButton:hover' -> 'QPushButton[tipo="primario"]:hover'
+    'QHeaderView::section' -> 'QTableWidget[tipo="tabla"] QHeaderView::section'
+    """
+    selector = selector.strip()
+    if re.match(rf"{clase}\b", selector):
+        return f"{clase}{condicion}{selector[len(clase):]}"
+    return f"{clase}{condicion} {selector}"
+
+
+def _compilar_estilo(css, clase, condicion):
+    """Reescribe cada regla de un estilo para que aplique solo a la variante"""
+    reglas = []
+    for selectores, cuerpo in _REGLA.findall(css):
+        acotados = ", ".join(_acotar_selector(s, clase, condicion) for s in selectores.split(","))
+        declaraciones = " ".join(linea.strip() for linea in cuerpo.strip().splitlines())
+        reglas.append(f"{acotados} {{ {declaraciones} }}")
+    return reglas
+
+
+def _estilo_mensaje(color, color_hover):
+    """Estilo común de los QMessageBox (antes repetido en cada Mensaje)"""
+    return f"""
+        QMessageBox {{
+            background-color: {Estilos.COLOR_FONDO_CLARO};
+            min-width: 400px;
+        }}
+        QLabel {{
+            font-size: {Estilos.TAMANO_NORMAL}pt;
+            font-family: '{Estilos.FUENTE_PRINCIPAL}', Arial;
+            color: {Estilos.COLOR_TEXTO};
+            padding: {Estilos.ESPACIADO_LG};
+        }}
+        QPushButton {{
+            background-color: {color};
+            color: white;
+            border: none;
+            padding: 10px 24px;
+            font-size: {Estilos.TAMANO_NORMAL}pt;
+            font-weight: 600;
+            min-width: 80px;
+            margin: 4px;
+        }}
+        QPushButton:hover {{
+            background-color: {color_hover};
+        }}
+    """
+
+
+def establecer_colores(color_primario, color_secundario):
+    """
+    Actualiza la paleta de Estilos con los colores de marca
+
+    Los estilos que todavía se aplican por widget (Estilos.xxx()) también
+    toman los colores nuevos a partir de este momento.
+    """
+    Estilos.COLOR_PRIMARIO = color_primario
+    Estilos.COLOR_PRIMARIO_HOVER = oscurecer(color_primario, 0.12)
+    Estilos.COLOR_PRIMARIO_ACTIVE = oscurecer(color_primario, 0.24)
+    Estilos.COLOR_SECUNDARIO = color_secundario
+    Estilos.COLOR_SECUNDARIO_HOVER = oscurecer(color_secundario, 0.15)
+
+
+def compilar_hoja_estilos(color_primario=None, color_secundario=None):
+    """
+    Arma la hoja de estilos de la aplicación
+
+    Args:
+        color_primario (str): Color primario (por defecto el configurado)
+        color_secundario (str): Color secundario (por defecto el configurado)
+
+    Returns:
+        str: Hoja de estilos completa
+    """
+    color_primario = color_primario or config.color_primario
+    color_secundario = color_secundario or config.color_secundario
+    clave = (color_primario.lower(), color_secundario.lower())
+
+    if clave not in _compiladas:
+        establecer_colores(color_primario, color_secundario)
+
+        reglas = []
+        for clase, tipo, estilo in VARIANTES:
+            reglas += _compilar_estilo(estilo(), clase, f'[tipo="{tipo}"]')
+
+        for nombre, (color, color_hover) in MENSAJES.items():
+            css = _estilo_mensaje(getattr(Estilos, color), getattr(Estilos, color_hover))
+            reglas += _compilar_estilo(css, "QMessageBox", f"#{nombre}")
+
+        _compiladas[clave] = "\n".join(reglas)
+
+    return _compiladas[clave]
+
+
+def aplicar_tema(color_primario=None, color_secundario=None):
+    """
+    Aplica (o cambia en vivo) el tema de toda la aplicación
+
+    Qt vuelve a pulir los widgets existentes con la hoja nueva, así que
+    las ventanas abiertas cambian de color sin reconstruirse.
+
+    Args:
+        color_primario (str): Color primario (por defecto el configurado)
+        color_secundario (str): Color secundario (por defecto el configurado)
+    """
+    from PyQt5.QtWidgets import QApplication
+
+    hoja = compilar_hoja_estilos(color_primario, color_secundario)
+    if color_primario:
+        config.color_primario = color_primario
+    if color_secundario:
+        config.color_secundario = color_secundario
+    establecer_colores(config.color_primario, config.color_secundario)
+
+    aplicacion = QApplication.instance()
+    if aplicacion is not None:
+        aplicacion.setStyleSheet(hoja)
+
+
+def marcar(widget, tipo):
+    """
+    Asigna la variante de estilo de un widget
+
+    Args:
+        widget (QWidget): Widget a marcar
+        tipo (str): Variante (ver VARIANTES)
+    """
+    widget.setProperty("tipo", tipo)
+
+    # Un widget ya pulido no relee sus propiedades por sí solo
+    if widget.isVisible():
+        widget.style().unpolish(widget)
+        widget.style().polish(widget)
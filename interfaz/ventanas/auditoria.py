@@ -10,16 +10,16 @@ Consulta avanzada de logs de auditoría del sistema
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
                              QTableWidgetItem, QHeaderView, QDialog, QLabel,
                              QFrame, QAbstractItemView, QDateEdit, QCheckBox,
-                             QSpinBox, QFileDialog)
+                             QSpinBox)
 from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QColor, QFont
 from interfaz.componentes.componentes import (Boton, CampoTexto, Etiqueta,
                                               Mensaje, ListaDesplegable)
 from interfaz.estilos.estilos import Estilos
+from interfaz.estilos.tema import marcar
 from modulos.auditoria_LOGICA import ModuloAuditoria
 from sistema_base.configuracion import config
 from datetime import datetime, timedelta
-import csv
 
 
 class VentanaAuditoria(QWidget):
@@ -271,7 +271,7 @@ class VentanaAuditoria(QWidget):
         header.setSectionResizeMode(6, QHeaderView.Fixed)
         tabla.setColumnWidth(6, 100)
         
-        tabla.setStyleSheet(Estilos.tabla())
+        marcar(tabla, "tabla")
         return tabla
     
     def cargar_auditoria(self):
@@ -389,51 +389,30 @@ class VentanaAuditoria(QWidget):
         dialogo.exec_()
     
     def exportar_csv(self):
-        """Exporta los registros a CSV"""
-        if not self.registros_actuales:
-            Mensaje.advertencia("Sin Datos", "No hay registros para exportar", self)
-            return
-        
-        archivo, _ = QFileDialog.getSaveFileName(
-            self,
-            "Exportar Auditoría",
-            f"auditoria_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            "CSV (*.csv)"
+        """Exporta los registros filtrados a CSV o Excel (sin límite de cantidad)"""
+        from interfaz.componentes.exportacion import DialogoExportacion
+        
+        fecha_desde = None
+        fecha_hasta = None
+        if self.check_filtro_fecha.isChecked():
+            fecha_desde = self.fecha_desde.date().toPyDate()
+            fecha_hasta = self.fecha_hasta.date().toPyDate()
+        
+        consulta, parametros = ModuloAuditoria.consulta_listar_auditoria(
+            filtro_modulo=self.combo_modulo.currentData(),
+            filtro_accion=self.combo_accion.currentData(),
+            busqueda=self.campo_busqueda.text().strip(),
+            limite=None,
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta,
+            solo_criticas=self.check_criticas.isChecked()
         )
         
-        if archivo:
-            try:
-                with open(archivo, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    
-                    # Encabezados
-                    writer.writerow([
-                        "Fecha/Hora", "Usuario", "Módulo", "Acción", 
-                        "ID Registro", "Motivo"
-                    ])
-                    
-                    # Datos
-                    for reg in self.registros_actuales:
-                        try:
-                            fecha = datetime.fromisoformat(str(reg['fecha_hora']).replace('Z', '+00:00'))
-                            fecha_texto = fecha.strftime('%d/%m/%Y %H:%M:%S')
-                        except:
-                            fecha_texto = str(reg['fecha_hora'])
-                        
-                        writer.writerow([
-                            fecha_texto,
-                            reg['usuario_nombre'] if reg['usuario_nombre'] else "Sistema",
-                            reg['modulo'],
-                            reg['accion'],
-                            reg['id_registro'],
-                            reg['motivo'] if reg['motivo'] else ""
-                        ])
-                
-                Mensaje.exito("✓ Exportado", f"Se exportaron {len(self.registros_actuales)} registros a:\n{archivo}", self)
-            
-            except Exception as e:
-                config.guardar_log(f"Error al exportar CSV: {e}", "ERROR")
-                Mensaje.error("Error", f"Error al exportar: {str(e)}", self)
+        DialogoExportacion.exportar("Exportar Auditoría", consulta, parametros, ModuloAuditoria.COLUMNAS_EXPORTACION, "auditoria", self)
+    
+    def refrescar_datos(self):
+        """Recarga los datos al volver a mostrar la ventana (ver RegistroVentanas)"""
+        self.cargar_auditoria()
     
     def volver_dashboard(self):
         """Vuelve al dashboard principal"""
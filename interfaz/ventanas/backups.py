@@ -15,6 +15,8 @@ from PyQt5.QtGui import QColor, QFont
 from interfaz.componentes.componentes import (Boton, CampoTexto, Etiqueta,
                                               Mensaje, CampoTextoMultilinea)
 from interfaz.estilos.estilos import Estilos
+from interfaz.estilos.tema import marcar
+from interfaz.componentes.cambios import ReceptorCambios
 from modulos.backups_LOGICA import ModuloBackups
 from sistema_base.configuracion import config
 from datetime import datetime
@@ -28,6 +30,10 @@ class VentanaBackups(QWidget):
         super().__init__(parent)
         self.inicializar_ui()
         self.cargar_backups()
+        
+        # Recargar cuando cambian los datos que muestra (ver base_datos.eventos)
+        self.receptor_cambios = ReceptorCambios(("backups",), self)
+        self.receptor_cambios.cambios.connect(self.recibir_cambios)
     
     def inicializar_ui(self):
         """Inicializa la interfaz"""
@@ -215,7 +221,7 @@ class VentanaBackups(QWidget):
         header.setSectionResizeMode(6, QHeaderView.Fixed)
         tabla.setColumnWidth(6, 220)
         
-        tabla.setStyleSheet(Estilos.tabla())
+        marcar(tabla, "tabla")
         return tabla
     
     def cargar_backups(self):
@@ -414,6 +420,15 @@ class VentanaBackups(QWidget):
         else:
             Mensaje.error("Error", mensaje, self)
     
+    def recibir_cambios(self, eventos):
+        """Recarga si la ventana está a la vista; si no, lo hace refrescar_datos al volver a mostrarla"""
+        if self.isVisible():
+            self.refrescar_datos()
+    
+    def refrescar_datos(self):
+        """Recarga los datos al volver a mostrar la ventana (ver RegistroVentanas)"""
+        self.cargar_backups()
+    
     def volver_dashboard(self):
         """Vuelve al dashboard principal"""
         self.parent().setCurrentIndex(0)
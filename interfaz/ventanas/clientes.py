@@ -7,17 +7,22 @@ Ventana de gestión de clientes del sistema
 ============================================================================
 """
 
+import bisect
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
                              QTableWidgetItem, QHeaderView, QDialog, QLabel,
-                             QFrame, QAbstractItemView, QTextEdit, QScrollArea)
+                             QFrame, QAbstractItemView, QTextEdit, QScrollArea,
+                             QCheckBox)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QColor
 from interfaz.componentes.componentes import (Boton, CampoTexto, Etiqueta,
                                               Mensaje, CampoTextoMultilinea)
 from interfaz.estilos.estilos import Estilos
+from interfaz.estilos.tema import marcar
+from interfaz.componentes.precarga import obtener_estadisticas
+from interfaz.componentes.cambios import ReceptorCambios
 from modulos.clientes import ModuloClientes
 from sistema_base.configuracion import config
-from sistema_base.utilidades import formatear_dinero
+from sistema_base.utilidades import formatear_dinero, formatear_fecha
 
 
 class VentanaClientes(QWidget):
@@ -25,8 +30,13 @@ class VentanaClientes(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.cambios_pendientes = []
         self.inicializar_ui()
         self.cargar_clientes()
+        
+        # Actualizar solo las filas que cambian (ver base_datos.eventos)
+        self.receptor_cambios = ReceptorCambios(("clientes",), self)
+        self.receptor_cambios.cambios.connect(self.recibir_cambios)
     
     def inicializar_ui(self):
         """Inicializa la interfaz de usuario"""
@@ -91,6 +101,11 @@ class VentanaClientes(QWidget):
         boton_actualizar.clicked.connect(self.cargar_clientes)
         layout.addWidget(boton_actualizar)
         
+        # Botón Exportar
+        boton_exportar = Boton("📊 Exportar", "neutro")
+        boton_exportar.clicked.connect(self.exportar_clientes)
+        layout.addWidget(boton_exportar)
+        
         barra.setLayout(layout)
         return barra
     
@@ -102,7 +117,7 @@ class VentanaClientes(QWidget):
         layout.setSpacing(15)
         
         # Obtener estadísticas
-        stats = ModuloClientes.obtener_estadisticas_clientes()
+        stats = obtener_estadisticas("clientes", ModuloClientes.obtener_estadisticas_clientes)
         
         # Tarjeta Total
         tarjeta_total = self.crear_tarjeta_estadistica(
@@ -226,10 +241,18 @@ class VentanaClientes(QWidget):
         header.setSectionResizeMode(6, QHeaderView.ResizeToContents)  # Deuda
         
         # Aplicar estilos
-        tabla.setStyleSheet(Estilos.tabla())
+        marcar(tabla, "tabla")
         
         return tabla
     
+    def exportar_clientes(self):
+        """Exporta los clientes filtrados a CSV o Excel"""
+        from interfaz.componentes.exportacion import DialogoExportacion
+        
+        consulta, parametros = ModuloClientes.consulta_listar_clientes(busqueda=self.campo_busqueda.text().strip())
+        
+        DialogoExportacion.exportar("Exportar Clientes", consulta, parametros, ModuloClientes.COLUMNAS_EXPORTACION, "clientes", self)
+    
     def cargar_clientes(self):
         """Carga los clientes en la tabla"""
         try:
@@ -238,71 +261,117 @@ class VentanaClientes(QWidget):
             
             # Obtener clientes
             clientes = ModuloClientes.listar_clientes(busqueda=busqueda)
+            self.cambios_pendientes = []
             
             # Limpiar tabla
             self.tabla.setRowCount(0)
+            self.tabla.setRowCount(len(clientes))
             
             # Llenar tabla
-            for cliente in clientes:
-                fila = self.tabla.rowCount()
-                self.tabla.insertRow(fila)
-                
-                # ID
-                self.tabla.setItem(fila, 0, QTableWidgetItem(str(cliente['id_cliente'])))
-                
-                # Nombre completo (Apellido, Nombre)
-                nombre_completo = f"{cliente.get('apellido', '')}, {cliente.get('nombre', '')}".strip(", ")
-                item_nombre = QTableWidgetItem(nombre_completo)
-                # Si es incobrable, marcar en rojo
-                if cliente.get('es_incobrable'):
-                    item_nombre.setForeground(QColor("#dc3545"))
-                self.tabla.setItem(fila, 1, item_nombre)
-                
-                # Teléfono
-                self.tabla.setItem(fila, 2, QTableWidgetItem(cliente['telefono']))
-                
-                # Dirección
-                direccion = cliente.get('direccion', '-')
-                direccion = direccion if direccion else "-"
-                self.tabla.setItem(fila, 3, QTableWidgetItem(direccion))
-                
-                # Estado del cliente
-                estado = cliente.get('estado_cliente', 'Nuevo')
-                item_estado = QTableWidgetItem(estado)
-                
-                if estado == "Nuevo":
-                    item_estado.setForeground(QColor("#6c757d"))
-                elif estado == "Buen Pagador":
-                    item_estado.setForeground(QColor("#28a745"))
-                elif estado == "Deudor":
-                    item_estado.setForeground(QColor("#ffc107"))
-                elif estado == "Moroso":
-                    item_estado.setForeground(QColor("#fd7e14"))
-                elif estado == "Incobrable":
-                    item_estado.setForeground(QColor("#dc3545"))
-                
-                self.tabla.setItem(fila, 4, item_estado)
-                
-                # Observaciones
-                observaciones = cliente.get('observaciones', '')
-                obs_texto = observaciones[:50] + "..." if len(observaciones) > 50 else observaciones
-                obs_texto = obs_texto if obs_texto else "-"
-                self.tabla.setItem(fila, 5, QTableWidgetItem(obs_texto))
-                
-                # Deuda (solo Sí/No)
-                tiene_deuda = cliente.get('tiene_incobrables', False) or cliente.get('total_incobrables', 0) > 0
-                if tiene_deuda:
-                    item_deuda = QTableWidgetItem("Sí")
-                    item_deuda.setForeground(QColor("#dc3545"))
-                else:
-                    item_deuda = QTableWidgetItem("No")
-                    item_deuda.setForeground(QColor("#28a745"))
-                self.tabla.setItem(fila, 6, item_deuda)
+            for fila, cliente in enumerate(clientes):
+                self.llenar_fila(fila, cliente)
             
         except Exception as e:
             config.guardar_log(f"Error al cargar clientes: {e}", "ERROR")
             Mensaje.error("Error", f"Error al cargar clientes: {str(e)}", self)
     
+    def llenar_fila(self, fila, cliente):
+        """Escribe los datos de un cliente en una fila de la tabla"""
+        # ID
+        self.tabla.setItem(fila, 0, QTableWidgetItem(str(cliente['id_cliente'])))
+        
+        # Nombre completo (Apellido, Nombre)
+        nombre_completo = f"{cliente.get('apellido', '')}, {cliente.get('nombre', '')}".strip(", ")
+        item_nombre = QTableWidgetItem(nombre_completo)
+        # Orden del listado (apellido, nombre), para ubicar filas nuevas
+        item_nombre.setData(Qt.UserRole, (cliente.get('apellido') or "", cliente.get('nombre') or ""))
+        # Si es incobrable, marcar en rojo
+        if cliente.get('es_incobrable'):
+            item_nombre.setForeground(QColor("#dc3545"))
+        self.tabla.setItem(fila, 1, item_nombre)
+        
+        # Teléfono
+        self.tabla.setItem(fila, 2, QTableWidgetItem(cliente['telefono']))
+        
+        # Dirección
+        direccion = cliente.get('direccion', '-')
+        direccion = direccion if direccion else "-"
+        self.tabla.setItem(fila, 3, QTableWidgetItem(direccion))
+        
+        # Estado del cliente
+        estado = cliente.get('estado_cliente', 'Nuevo')
+        item_estado = QTableWidgetItem(estado)
+        
+        if estado == "Nuevo":
+            item_estado.setForeground(QColor("#6c757d"))
+        elif estado == "Buen Pagador":
+            item_estado.setForeground(QColor("#28a745"))
+        elif estado == "Deudor":
+            item_estado.setForeground(QColor("#ffc107"))
+        elif estado == "Moroso":
+            item_estado.setForeground(QColor("#fd7e14"))
+        elif estado == "Incobrable":
+            item_estado.setForeground(QColor("#dc3545"))
+        
+        self.tabla.setItem(fila, 4, item_estado)
+        
+        # Observaciones
+        observaciones = cliente.get('observaciones', '')
+        obs_texto = observaciones[:50] + "..." if len(observaciones) > 50 else observaciones
+        obs_texto = obs_texto if obs_texto else "-"
+        self.tabla.setItem(fila, 5, QTableWidgetItem(obs_texto))
+        
+        # Deuda: saldo de facturas; en rojo si además tiene incobrables
+        tiene_deuda = cliente.get('tiene_incobrables', False) or cliente.get('total_incobrables', 0) > 0
+        saldo = cliente.get('saldo_adeudado') or 0
+        if saldo > 0:
+            item_deuda = QTableWidgetItem(formatear_dinero(saldo))
+            item_deuda.setForeground(QColor("#dc3545" if tiene_deuda else "#fd7e14"))
+        elif tiene_deuda:
+            item_deuda = QTableWidgetItem("Sí")
+            item_deuda.setForeground(QColor("#dc3545"))
+        else:
+            item_deuda = QTableWidgetItem("No")
+            item_deuda.setForeground(QColor("#28a745"))
+        self.tabla.setItem(fila, 6, item_deuda)
+    
+    def recibir_cambios(self, eventos):
+        """Aplica los cambios de la base; si la ventana está oculta, los guarda para cuando se muestre"""
+        self.cambios_pendientes.extend(eventos)
+        if self.isVisible():
+            self.aplicar_cambios_pendientes()
+    
+    def aplicar_cambios_pendientes(self):
+        """Actualiza solo las filas de los clientes que cambiaron"""
+        eventos, self.cambios_pendientes = self.cambios_pendientes, []
+        if not eventos:
+            return
+        
+        if any(evento.id_registro is None for evento in eventos):
+            self.cargar_clientes()
+            return
+        
+        try:
+            ids = {evento.id_registro for evento in eventos}
+            clientes = ModuloClientes.listar_clientes(busqueda=self.campo_busqueda.text().strip(), ids=ids)
+            
+            # Quitar las filas de los clientes cambiados (de abajo hacia arriba)...
+            for fila in reversed(range(self.tabla.rowCount())):
+                if int(self.tabla.item(fila, 0).text()) in ids:
+                    self.tabla.removeRow(fila)
+            
+            # ...y volver a insertar los que siguen en el listado, en su lugar alfabético
+            nombres = [self.tabla.item(fila, 1).data(Qt.UserRole) for fila in range(self.tabla.rowCount())]
+            for cliente in clientes:
+                clave = (cliente.get('apellido') or "", cliente.get('nombre') or "")
+                fila = bisect.bisect_right(nombres, clave)
+                nombres.insert(fila, clave)
+                self.tabla.insertRow(fila)
+                self.llenar_fila(fila, cliente)
+            
+        except Exception as e:
+            config.guardar_log(f"Error al actualizar clientes: {e}", "ERROR")
+    
     
     def buscar_clientes(self):
         """Busca clientes según el texto ingresado"""
@@ -316,15 +385,12 @@ class VentanaClientes(QWidget):
     
     def abrir_dialogo_nuevo_cliente(self):
         """Abre el diálogo para crear un nuevo cliente"""
-        dialogo = DialogoNuevoCliente(self)
-        if dialogo.exec_() == QDialog.Accepted:
-            self.cargar_clientes()
+        # La tabla se actualiza sola con el cliente nuevo (ver recibir_cambios)
+        DialogoNuevoCliente(self).exec_()
     
     def abrir_dialogo_editar_cliente(self, id_cliente):
         """Abre el diálogo para editar un cliente"""
-        dialogo = DialogoEditarCliente(id_cliente, self)
-        if dialogo.exec_() == QDialog.Accepted:
-            self.cargar_clientes()
+        DialogoEditarCliente(id_cliente, self).exec_()
     
     def ver_detalle_cliente(self, id_cliente):
         """Muestra el detalle completo de un cliente"""
@@ -366,7 +432,6 @@ class VentanaClientes(QWidget):
             
             if exito:
                 Mensaje.exito("Cliente Eliminado", mensaje, self)
-                self.cargar_clientes()
             else:
                 Mensaje.error("Error", mensaje, self)
     
@@ -442,7 +507,6 @@ class VentanaClientes(QWidget):
             if exito:
                 Mensaje.exito("Estado Cambiado", mensaje, dialogo)
                 dialogo.accept()
-                self.cargar_clientes()
             else:
                 Mensaje.error("Error", mensaje, dialogo)
         
@@ -456,9 +520,11 @@ class VentanaClientes(QWidget):
     
     def marcar_incobrable(self, id_cliente):
         """Marca una deuda como incobrable"""
-        dialogo = DialogoMarcarIncobrable(id_cliente, self)
-        if dialogo.exec_() == QDialog.Accepted:
-            self.cargar_clientes()
+        DialogoMarcarIncobrable(id_cliente, self).exec_()
+    
+    def refrescar_datos(self):
+        """Al volver a mostrar la ventana (ver RegistroVentanas) aplica los cambios ocurridos mientras estaba oculta"""
+        self.aplicar_cambios_pendientes()
     
     def volver_dashboard(self):
         """Vuelve al dashboard principal"""
@@ -1095,6 +1161,17 @@ class DialogoDetalleCliente(QDialog):
         rec_deuda.layout().addWidget(self.label_deuda)
         layout_principal.addWidget(rec_deuda)
         
+        # Contadores del cliente (los mantiene la base, sin consultas extra)
+        self.labels_resumen = {}
+        for clave, titulo in (("equipos_activos", "En Taller"), ("ordenes_abiertas", "Órdenes Abiertas"),
+                              ("saldo_adeudado", "Saldo"), ("fecha_ultima_visita", "Última Visita")):
+            recuadro = self.crear_recuadro_dato(titulo)
+            label = QLabel()
+            label.setStyleSheet(Estilos.label_info_normal())
+            recuadro.layout().addWidget(label)
+            layout_principal.addWidget(recuadro)
+            self.labels_resumen[clave] = label
+        
         # Widget contenedor
         widget = QWidget()
         widget.setLayout(layout_principal)
@@ -1150,6 +1227,11 @@ class DialogoDetalleCliente(QDialog):
         layout = QVBoxLayout()
         layout.setContentsMargins(10, 10, 10, 10)
         
+        # Los equipos viejos están en el archivo histórico: leerlos solo si se pide
+        self.check_archivo = QCheckBox("Incluir archivo histórico")
+        self.check_archivo.toggled.connect(self.cargar_equipos)
+        layout.addWidget(self.check_archivo)
+        
         # Tabla de equipos
         self.tabla_equipos = QTableWidget()
         self.tabla_equipos.setColumnCount(6)
@@ -1172,7 +1254,7 @@ class DialogoDetalleCliente(QDialog):
         header.setSectionResizeMode(4, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(5, QHeaderView.ResizeToContents)
         
-        self.tabla_equipos.setStyleSheet(Estilos.tabla())
+        marcar(self.tabla_equipos, "tabla")
         
         layout.addWidget(self.tabla_equipos)
         
@@ -1260,6 +1342,19 @@ class DialogoDetalleCliente(QDialog):
         else:
             self.label_deuda.setText("<span style='color: #28a745;'>Sin deuda</span>")
         
+        # Contadores
+        self.labels_resumen['equipos_activos'].setText(str(self.cliente.get('equipos_activos') or 0))
+        self.labels_resumen['ordenes_abiertas'].setText(str(self.cliente.get('ordenes_abiertas') or 0))
+        saldo = self.cliente.get('saldo_adeudado') or 0
+        self.labels_resumen['saldo_adeudado'].setText(
+            f"<span style='color: #fd7e14; font-weight: bold;'>{formatear_dinero(saldo)}</span>" if saldo > 0
+            else formatear_dinero(0)
+        )
+        ultima_visita = self.cliente.get('fecha_ultima_visita')
+        self.labels_resumen['fecha_ultima_visita'].setText(
+            formatear_fecha(ultima_visita) if ultima_visita else "-"
+        )
+        
         # Cargar equipos
         self.cargar_equipos()
         
@@ -1268,7 +1363,7 @@ class DialogoDetalleCliente(QDialog):
     
     def cargar_equipos(self):
         """Carga los equipos del cliente"""
-        equipos = ModuloClientes.obtener_equipos_cliente(self.id_cliente)
+        equipos = ModuloClientes.obtener_equipos_cliente(self.id_cliente, self.check_archivo.isChecked())
         
         self.tabla_equipos.setRowCount(0)
         
@@ -9,15 +9,20 @@ Panel completo de configuración del sistema
 
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QFrame, QTabWidget, QSpinBox, QFileDialog,
-                             QScrollArea, QColorDialog, QPushButton)
+                             QScrollArea, QColorDialog, QPushButton,
+                             QDialog, QProgressBar, QTextEdit)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QPixmap, QColor
 from interfaz.componentes.componentes import (Boton, CampoTexto, Etiqueta,
-                                              Mensaje, CampoTextoMultilinea)
+                                              Mensaje, CampoTextoMultilinea,
+                                              ListaDesplegable)
 from interfaz.estilos.estilos import Estilos
+from interfaz.estilos.tema import aplicar_tema
 from modulos.configuracion_LOGICA import ModuloConfiguracion
+from sistema_base.constantes import COLOR_PRIMARIO_DEFECTO, COLOR_SECUNDARIO_DEFECTO
 from sistema_base.configuracion import config
 import os
+import threading
 
 
 class VentanaConfiguracion(QWidget):
@@ -520,41 +525,103 @@ class VentanaConfiguracion(QWidget):
         titulo = Etiqueta("Personalización de Colores", "titulo")
         layout.addWidget(titulo)
         
-        info = QLabel("Próximamente podrá personalizar los colores del sistema")
-        info.setStyleSheet("""
-            QLabel {
-                padding: 20px;
-                background-color: #fff3cd;
-                border-radius: 8px;
-                color: #856404;
-                font-size: 11pt;
-            }
-        """)
+        info = QLabel("Los cambios se ven al instante en todas las ventanas abiertas. Guarde para conservarlos al reiniciar.")
         info.setWordWrap(True)
+        info.setStyleSheet("color: #6c757d; font-style: italic;")
         layout.addWidget(info)
         
-        # Color primario (placeholder)
-        frame1 = self.crear_frame_config(
-            "🎨 Color Primario:",
-            "Color principal usado en botones, encabezados y elementos destacados"
-        )
+        self.colores_tema = {
+            'primario': config.color_primario,
+            'secundario': config.color_secundario
+        }
+        self.botones_color = {}
+        self.labels_color = {}
+        
+        opciones = [
+            ('primario', "🎨 Color Primario:",
+             "Color principal usado en botones, encabezados y elementos destacados"),
+            ('secundario', "🎨 Color Secundario:",
+             "Color de elementos secundarios"),
+        ]
+        
+        for clave, titulo_opcion, descripcion in opciones:
+            frame = self.crear_frame_config(titulo_opcion, descripcion)
+            
+            layout_color = QHBoxLayout()
+            boton_color = QPushButton()
+            boton_color.setFixedSize(100, 40)
+            boton_color.setCursor(Qt.PointingHandCursor)
+            boton_color.clicked.connect(lambda checked, c=clave: self.elegir_color(c))
+            layout_color.addWidget(boton_color)
+            
+            label_color = QLabel()
+            layout_color.addWidget(label_color)
+            layout_color.addStretch()
+            frame.layout().addLayout(layout_color)
+            layout.addWidget(frame)
+            
+            self.botones_color[clave] = boton_color
+            self.labels_color[clave] = label_color
         
-        layout_color1 = QHBoxLayout()
-        self.boton_color_primario = QPushButton()
-        self.boton_color_primario.setFixedSize(100, 40)
-        self.boton_color_primario.setStyleSheet("background-color: #2563eb; border-radius: 5px;")
-        self.boton_color_primario.setEnabled(False)
-        layout_color1.addWidget(self.boton_color_primario)
-        layout_color1.addWidget(QLabel("#2563eb (Por defecto)"))
-        layout_color1.addStretch()
-        frame1.layout().addLayout(layout_color1)
-        layout.addWidget(frame1)
+        self.actualizar_muestras_color()
+        
+        layout_botones = QHBoxLayout()
         
+        boton_restaurar = Boton("↺ Colores por defecto", "neutro")
+        boton_restaurar.clicked.connect(self.restaurar_colores)
+        layout_botones.addWidget(boton_restaurar)
+        
+        layout_botones.addStretch()
+        
+        boton_guardar = Boton("💾 Guardar Colores", "primario")
+        boton_guardar.clicked.connect(self.guardar_colores)
+        layout_botones.addWidget(boton_guardar)
+        
+        layout.addLayout(layout_botones)
         layout.addStretch()
         
         widget.setLayout(layout)
         return widget
     
+    def actualizar_muestras_color(self):
+        """Muestra los colores elegidos en los botones de muestra"""
+        for clave, color in self.colores_tema.items():
+            self.botones_color[clave].setStyleSheet(f"background-color: {color}; border-radius: 5px;")
+            self.labels_color[clave].setText(color)
+    
+    def elegir_color(self, clave):
+        """Abre el selector de color y aplica el tema en vivo"""
+        color = QColorDialog.getColor(QColor(self.colores_tema[clave]), self, "Elegir color")
+        
+        if not color.isValid():
+            return
+        
+        self.colores_tema[clave] = color.name()
+        self.actualizar_muestras_color()
+        aplicar_tema(self.colores_tema['primario'], self.colores_tema['secundario'])
+    
+    def restaurar_colores(self):
+        """Vuelve a los colores de fábrica (sin guardar)"""
+        self.colores_tema = {'primario': COLOR_PRIMARIO_DEFECTO, 'secundario': COLOR_SECUNDARIO_DEFECTO}
+        self.actualizar_muestras_color()
+        aplicar_tema(COLOR_PRIMARIO_DEFECTO, COLOR_SECUNDARIO_DEFECTO)
+    
+    def guardar_colores(self):
+        """Guarda los colores del tema"""
+        from sistema_base.seguridad import obtener_usuario_actual
+        usuario_actual = obtener_usuario_actual()
+        
+        exito, mensaje = ModuloConfiguracion.actualizar_colores(
+            self.colores_tema['primario'],
+            self.colores_tema['secundario'],
+            usuario_actual['id_usuario']
+        )
+        
+        if exito:
+            Mensaje.exito("✓ Guardado", mensaje, self)
+        else:
+            Mensaje.error("Error", mensaje, self)
+    
     def crear_tab_backups(self):
         """Tab configuración de backups"""
         widget = QWidget()
@@ -648,6 +715,33 @@ class VentanaConfiguracion(QWidget):
         frame1.setLayout(layout1)
         layout.addWidget(frame1)
         
+        # Importación masiva
+        frame2 = QFrame()
+        frame2.setStyleSheet("""
+            QFrame {
+                background-color: #e7f1ff;
+                border: 2px solid #2563eb;
+                border-radius: 10px;
+                padding: 20px;
+            }
+        """)
+        layout2 = QVBoxLayout()
+        
+        label2 = QLabel("<b style='font-size: 11pt; color: #1e40af;'>📥 Importar Datos</b>")
+        layout2.addWidget(label2)
+        
+        info2 = QLabel("Carga masiva de clientes, equipos o repuestos desde una planilla CSV o Excel (por ejemplo, al migrar desde otro sistema). Las filas con errores se informan y no se importan.")
+        info2.setWordWrap(True)
+        info2.setStyleSheet("color: #1e40af;")
+        layout2.addWidget(info2)
+        
+        boton_importar = Boton("📥 Importar desde Archivo", "primario")
+        boton_importar.clicked.connect(self.importar_datos)
+        layout2.addWidget(boton_importar)
+        
+        frame2.setLayout(layout2)
+        layout.addWidget(frame2)
+        
         layout.addStretch()
         
         widget.setLayout(layout)
@@ -894,6 +988,193 @@ class VentanaConfiguracion(QWidget):
         if confirmacion:
             Mensaje.informacion("Funcionalidad", "La eliminación de logos estará disponible próximamente", self)
     
+    def importar_datos(self):
+        """Abre el diálogo de importación masiva"""
+        dialogo = DialogoImportacion(self)
+        dialogo.exec_()
+    
     def volver_dashboard(self):
         """Vuelve al dashboard principal"""
         self.parent().setCurrentIndex(0)
+
+
+class DialogoImportacion(QDialog):
+    """Diálogo de importación masiva de clientes, equipos y repuestos"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.trabajo = None
+        self.archivo = None
+        self.evento_cancelacion = threading.Event()
+        self.inicializar_ui()
+    
+    def inicializar_ui(self):
+        """Inicializa la interfaz"""
+        self.setWindowTitle("Importar Datos")
+        self.setMinimumWidth(550)
+        self.setModal(True)
+        
+        layout = QVBoxLayout()
+        layout.setSpacing(15)
+        layout.setContentsMargins(20, 20, 20, 20)
+        
+        titulo = Etiqueta("Importar desde CSV / Excel", "subtitulo")
+        layout.addWidget(titulo)
+        
+        # Entidad
+        layout_entidad = QHBoxLayout()
+        layout_entidad.addWidget(QLabel("Importar:"))
+        self.combo_entidad = ListaDesplegable()
+        self.combo_entidad.addItem("Clientes", "clientes")
+        self.combo_entidad.addItem("Equipos", "equipos")
+        self.combo_entidad.addItem("Repuestos", "repuestos")
+        self.combo_entidad.currentIndexChanged.connect(self.actualizar_columnas)
+        layout_entidad.addWidget(self.combo_entidad, 1)
+        layout.addLayout(layout_entidad)
+        
+        self.label_columnas = QLabel("")
+        self.label_columnas.setWordWrap(True)
+        self.label_columnas.setStyleSheet("color: #6c757d;")
+        layout.addWidget(self.label_columnas)
+        
+        # Archivo
+        layout_archivo = QHBoxLayout()
+        self.label_archivo = QLabel("Ningún archivo seleccionado")
+        layout_archivo.addWidget(self.label_archivo, 1)
+        boton_archivo = Boton("📂 Elegir Archivo", "secundario")
+        boton_archivo.clicked.connect(self.elegir_archivo)
+        layout_archivo.addWidget(boton_archivo)
+        layout.addLayout(layout_archivo)
+        
+        # Progreso
+        self.barra_progreso = QProgressBar()
+        self.barra_progreso.setValue(0)
+        layout.addWidget(self.barra_progreso)
+        
+        self.label_estado = QLabel("")
+        self.label_estado.setStyleSheet("color: #6c757d;")
+        layout.addWidget(self.label_estado)
+        
+        # Errores por fila
+        self.texto_errores = QTextEdit()
+        self.texto_errores.setReadOnly(True)
+        self.texto_errores.setVisible(False)
+        layout.addWidget(self.texto_errores)
+        
+        # Botones
+        layout_botones = QHBoxLayout()
+        
+        self.boton_importar = Boton("📥 Importar", "primario")
+        self.boton_importar.clicked.connect(self.iniciar_importacion)
+        layout_botones.addWidget(self.boton_importar)
+        
+        self.boton_cancelar = Boton("Cancelar", "peligro")
+        self.boton_cancelar.clicked.connect(self.cancelar_importacion)
+        self.boton_cancelar.setEnabled(False)
+        layout_botones.addWidget(self.boton_cancelar)
+        
+        layout_botones.addStretch()
+        
+        self.boton_cerrar = Boton("Cerrar", "neutro")
+        self.boton_cerrar.clicked.connect(self.reject)
+        layout_botones.addWidget(self.boton_cerrar)
+        
+        layout.addLayout(layout_botones)
+        self.setLayout(layout)
+        
+        self.actualizar_columnas()
+    
+    def actualizar_columnas(self):
+        """Muestra las columnas que debe tener el archivo"""
+        from modulos.importacion_LOGICA import ModuloImportacion
+        
+        columnas = ModuloImportacion.ENTIDADES[self.combo_entidad.currentData()]['columnas']
+        self.label_columnas.setText(
+            "La primera fila del archivo debe tener los nombres de las columnas: " + ", ".join(columnas)
+        )
+    
+    def elegir_archivo(self):
+        """Selecciona el archivo a importar"""
+        archivo, _ = QFileDialog.getOpenFileName(
+            self,
+            "Seleccionar Archivo",
+            "",
+            "Planillas (*.csv *.xlsx)"
+        )
+        
+        if archivo:
+            self.archivo = archivo
+            self.label_archivo.setText(os.path.basename(archivo))
+    
+    def iniciar_importacion(self):
+        """Inicia la importación en un hilo de trabajo"""
+        from modulos.importacion_LOGICA import ModuloImportacion
+        from interfaz.componentes.trabajos import TrabajoSegundoPlano
+        from sistema_base.seguridad import obtener_usuario_actual
+        
+        if not self.archivo:
+            Mensaje.advertencia("Importar", "Seleccione el archivo a importar", self)
+            return
+            
+        usuario_actual = obtener_usuario_actual()
+        
+        self.evento_cancelacion.clear()
+        self.trabajo = TrabajoSegundoPlano(
+            ModuloImportacion.importar,
+            self.combo_entidad.currentData(),
+            self.archivo,
+            usuario_actual['id_usuario'],
+            evento_cancelacion=self.evento_cancelacion,
+            parent=self
+        )
+        self.trabajo.progreso.connect(self.actualizar_progreso)
+        self.trabajo.terminado.connect(self.importacion_terminada)
+        
+        self.boton_importar.setEnabled(False)
+        self.boton_cerrar.setEnabled(False)
+        self.boton_cancelar.setEnabled(True)
+        self.texto_errores.setVisible(False)
+        self.barra_progreso.setValue(0)
+        self.label_estado.setText("Leyendo archivo...")
+        self.trabajo.start()
+    
+    def actualizar_progreso(self, procesadas, total):
+        """Actualiza la barra de progreso"""
+        self.barra_progreso.setMaximum(max(total, 1))
+        self.barra_progreso.setValue(min(procesadas, max(total, 1)))
+        self.label_estado.setText(f"{procesadas} de {total} filas")
+    
+    def cancelar_importacion(self):
+        """Cancela la importación en curso (lo ya confirmado queda guardado)"""
+        self.evento_cancelacion.set()
+        self.boton_cancelar.setEnabled(False)
+        self.label_estado.setText("Cancelando...")
+    
+    def importacion_terminada(self, resultado):
+        """Muestra el resultado y los errores por fila"""
+        exito, mensaje, resumen = resultado
+        
+        self.boton_importar.setEnabled(True)
+        self.boton_cerrar.setEnabled(True)
+        self.boton_cancelar.setEnabled(False)
+        self.label_estado.setText(mensaje.split("\n")[0])
+        
+        if resumen and resumen['errores']:
+            lineas = [f"Fila {fila}: {error}" for fila, error in resumen['errores']]
+            if resumen['con_error'] > len(resumen['errores']):
+                lineas.append(f"... y {resumen['con_error'] - len(resumen['errores'])} filas más")
+            if resumen['archivo_errores']:
+                lineas.append(f"\nDetalle completo en:\n{resumen['archivo_errores']}")
+            self.texto_errores.setPlainText("\n".join(lineas))
+            self.texto_errores.setVisible(True)
+            
+        if exito:
+            Mensaje.exito("✓ Importación", mensaje, self)
+        else:
+            Mensaje.advertencia("Importación", mensaje, self)
+    
+    def reject(self):
+        """Evita cerrar el diálogo con una importación en curso"""
+        if self.trabajo and self.trabajo.isRunning():
+            return
+        super().reject()
@@ -7,16 +7,20 @@ Ventana de gestión de equipos/dispositivos
 ============================================================================
 """
 
+from datetime import datetime
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
                              QTableWidgetItem, QHeaderView, QDialog, QLabel,
                              QFrame, QAbstractItemView, QComboBox, QScrollArea,
-                             QTextEdit)
+                             QTextEdit, QCheckBox)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QColor
 from interfaz.componentes.componentes import (Boton, CampoTexto, Etiqueta,
                                               Mensaje, CampoTextoMultilinea,
                                               ListaDesplegable)
 from interfaz.estilos.estilos import Estilos
+from interfaz.estilos.tema import marcar
+from interfaz.componentes.precarga import obtener_estadisticas
+from interfaz.componentes.cambios import ReceptorCambios
 from modulos.equipos_LOGICA import ModuloEquipos
 from modulos.clientes import ModuloClientes
 from sistema_base.configuracion import config
@@ -27,8 +31,14 @@ class VentanaEquipos(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.cambios_pendientes = []
+        self.version_listado = None
         self.inicializar_ui()
         self.cargar_equipos()
+        
+        # Actualizar solo las filas que cambian (ver base_datos.eventos)
+        self.receptor_cambios = ReceptorCambios(("equipos", "clientes"), self)
+        self.receptor_cambios.cambios.connect(self.recibir_cambios)
     
     def inicializar_ui(self):
         """Inicializa la interfaz de usuario"""
@@ -99,6 +109,11 @@ class VentanaEquipos(QWidget):
         self.combo_tipo.currentIndexChanged.connect(self.cargar_equipos)
         layout.addWidget(self.combo_tipo)
         
+        # Equipos entregados hace años (archivo histórico)
+        self.check_archivo = QCheckBox("Incluir archivo")
+        self.check_archivo.toggled.connect(self.cargar_equipos)
+        layout.addWidget(self.check_archivo)
+        
         # Botón Ingresar Equipo
         boton_nuevo = Boton("➕ Ingresar Equipo", "exito")
         boton_nuevo.clicked.connect(self.abrir_dialogo_ingresar_equipo)
@@ -106,9 +121,14 @@ class VentanaEquipos(QWidget):
         
         # Botón Actualizar
         boton_actualizar = Boton("🔄 Actualizar", "primario")
-        boton_actualizar.clicked.connect(self.cargar_equipos)
+        boton_actualizar.clicked.connect(self.actualizar_equipos)
         layout.addWidget(boton_actualizar)
         
+        # Botón Exportar
+        boton_exportar = Boton("📊 Exportar", "neutro")
+        boton_exportar.clicked.connect(self.exportar_equipos)
+        layout.addWidget(boton_exportar)
+        
         barra.setLayout(layout)
         return barra
     
@@ -120,7 +140,7 @@ class VentanaEquipos(QWidget):
         layout.setSpacing(15)
         
         # Obtener estadísticas
-        stats = ModuloEquipos.obtener_estadisticas_equipos()
+        stats = obtener_estadisticas("equipos", ModuloEquipos.obtener_estadisticas_equipos)
         
         # Tarjeta Total
         tarjeta_total = self.crear_tarjeta_estadistica(
@@ -242,7 +262,7 @@ class VentanaEquipos(QWidget):
         header.setSectionResizeMode(7, QHeaderView.ResizeToContents)  # Ingreso
         
         # Aplicar estilos
-        tabla.setStyleSheet(Estilos.tabla())
+        marcar(tabla, "tabla")
         
         # Conectar doble clic para ver detalles
         tabla.cellDoubleClicked.connect(lambda fila: self.ver_detalle_equipo_desde_tabla(fila))
@@ -257,128 +277,195 @@ class VentanaEquipos(QWidget):
         except Exception as e:
             config.guardar_log(f"Error al abrir detalle: {e}", "ERROR")
     
+    def filtros_listado(self):
+        """Filtros de la barra de herramientas, como argumentos de listar_equipos"""
+        # Normalizar filtro_estado: None o "" = "Todos los estados" (sin filtro)
+        # ("En taller" excluye entregados; "Todos" muestra todos)
+        return {
+            'filtro_estado': self.combo_estado.currentData() or "",
+            'filtro_tipo': self.combo_tipo.currentData(),
+            'busqueda': self.campo_busqueda.text().strip(),
+            'incluir_archivo': self.check_archivo.isChecked(),
+        }
+    
+    def exportar_equipos(self):
+        """Exporta los equipos filtrados a CSV o Excel"""
+        from interfaz.componentes.exportacion import DialogoExportacion
+        
+        consulta, parametros = ModuloEquipos.consulta_listar_equipos(**self.filtros_listado())
+        
+        DialogoExportacion.exportar("Exportar Equipos", consulta, parametros, ModuloEquipos.COLUMNAS_EXPORTACION, "equipos", self)
+    
     def cargar_equipos(self):
         """Carga los equipos en la tabla"""
         try:
-            # Obtener filtros
-            busqueda = self.campo_busqueda.text().strip()
-            filtro_estado = self.combo_estado.currentData()
-            filtro_tipo = self.combo_tipo.currentData()
-            
-            # Normalizar filtro_estado: None o "" = "Todos los estados" (sin filtro)
-            if filtro_estado is None:
-                filtro_estado = ""
-            
-            # Obtener equipos ("En taller" excluye entregados; "Todos" muestra todos)
-            equipos = ModuloEquipos.listar_equipos(
-                filtro_estado=filtro_estado,
-                filtro_tipo=filtro_tipo,
-                busqueda=busqueda
-            )
-            
-            # Se obtuvieron equipos
+            listado = ModuloEquipos.listar_equipos_desde(None, **self.filtros_listado())
+            equipos = listado['cambios']
+            self.version_listado = listado['version']
+            self.cambios_pendientes = []
             
             # Limpiar tabla
             self.tabla.setRowCount(0)
+            self.tabla.setRowCount(len(equipos))
             
             # Llenar tabla
-            for equipo in equipos:
-                # Procesando equipo
-                fila = self.tabla.rowCount()
-                self.tabla.insertRow(fila)
-                
-                # ID
-                self.tabla.setItem(fila, 0, QTableWidgetItem(str(equipo['id_equipo'])))
-                
-                # Cliente
-                item_cliente = QTableWidgetItem(equipo['cliente_nombre'])
-                # Si cliente tiene deudas, marcar en rojo
-                if equipo['tiene_incobrables']:
-                    item_cliente.setForeground(QColor("#dc3545"))
-                    item_cliente.setText(f"⚠️ {equipo['cliente_nombre']}")
-                self.tabla.setItem(fila, 1, item_cliente)
-                
-                # Tipo
-                self.tabla.setItem(fila, 2, QTableWidgetItem(equipo['tipo_dispositivo']))
-                
-                # Marca
-                self.tabla.setItem(fila, 3, QTableWidgetItem(equipo['marca']))
-                
-                # Modelo
-                self.tabla.setItem(fila, 4, QTableWidgetItem(equipo['modelo']))
-                
-                # Estado
-                item_estado = QTableWidgetItem(equipo['estado_actual'])
-                # Color según estado
-                if equipo['estado_actual'] == "Listo":
-                    item_estado.setForeground(QColor("#28a745"))
-                elif equipo['estado_actual'] == "En reparación":
-                    item_estado.setForeground(QColor("#ffc107"))
-                elif equipo['estado_actual'] == "Abandonado":
-                    item_estado.setForeground(QColor("#6c757d"))
-                elif equipo['estado_actual'] == "Sin reparación":
-                    item_estado.setForeground(QColor("#dc3545"))
-                
-                self.tabla.setItem(fila, 5, item_estado)
-                
-                # Días sin movimiento
-                dias = equipo['dias_sin_movimiento']
-                item_dias = QTableWidgetItem(str(dias))
-                
-                # Alertas visuales
-                if equipo['alerta_abandonado']:
-                    item_dias.setForeground(QColor("#dc3545"))
-                    item_dias.setText(f"🚨 {dias}")
-                    item_dias.setToolTip("Más de 90 días sin movimiento")
-                elif equipo['alerta_estancado']:
-                    item_dias.setForeground(QColor("#ffc107"))
-                    item_dias.setText(f"⚠️ {dias}")
-                    item_dias.setToolTip("Más de 48 horas sin movimiento")
-                
-                self.tabla.setItem(fila, 6, item_dias)
-                
-                # Fecha ingreso
-                fecha_str = equipo['fecha_ingreso']
-                if isinstance(fecha_str, str):
-                    try:
-                        from datetime import datetime
-                        fecha = datetime.fromisoformat(fecha_str.replace('Z', '+00:00'))
-                        fecha_formateada = fecha.strftime('%d/%m/%Y')
-                    except:
-                        fecha_formateada = fecha_str
-                else:
-                    fecha_formateada = str(fecha_str)
-                
-                self.tabla.setItem(fila, 7, QTableWidgetItem(fecha_formateada))
+            for fila, equipo in enumerate(equipos):
+                self.llenar_fila(fila, equipo)
             
         except Exception as e:
-            import traceback
-            error_completo = traceback.format_exc()
-            print(f"DEBUG ERROR: {error_completo}")  # DEBUG
             config.guardar_log(f"Error al cargar equipos: {e}", "ERROR")
             Mensaje.error("Error", f"Error al cargar equipos: {str(e)}", self)
     
+    def llenar_fila(self, fila, equipo):
+        """Escribe los datos de un equipo en una fila de la tabla"""
+        # ID
+        self.tabla.setItem(fila, 0, QTableWidgetItem(str(equipo['id_equipo'])))
+        
+        # Cliente (se guarda su ID para actualizar la fila si cambia el cliente)
+        item_cliente = QTableWidgetItem(equipo['cliente_nombre'])
+        item_cliente.setData(Qt.UserRole, equipo['id_cliente'])
+        # Si cliente tiene deudas, marcar en rojo
+        if equipo['tiene_incobrables']:
+            item_cliente.setForeground(QColor("#dc3545"))
+            item_cliente.setText(f"⚠️ {equipo['cliente_nombre']}")
+        self.tabla.setItem(fila, 1, item_cliente)
+        
+        # Tipo
+        self.tabla.setItem(fila, 2, QTableWidgetItem(equipo['tipo_dispositivo']))
+        
+        # Marca
+        self.tabla.setItem(fila, 3, QTableWidgetItem(equipo['marca']))
+        
+        # Modelo
+        self.tabla.setItem(fila, 4, QTableWidgetItem(equipo['modelo']))
+        
+        # Estado
+        item_estado = QTableWidgetItem(equipo['estado_actual'])
+        # Color según estado
+        if equipo['estado_actual'] == "Listo":
+            item_estado.setForeground(QColor("#28a745"))
+        elif equipo['estado_actual'] == "En reparación":
+            item_estado.setForeground(QColor("#ffc107"))
+        elif equipo['estado_actual'] == "Abandonado":
+            item_estado.setForeground(QColor("#6c757d"))
+        elif equipo['estado_actual'] == "Sin reparación":
+            item_estado.setForeground(QColor("#dc3545"))
+        
+        self.tabla.setItem(fila, 5, item_estado)
+        
+        # Días sin movimiento
+        dias = equipo['dias_sin_movimiento']
+        item_dias = QTableWidgetItem(str(dias))
+        
+        # Alertas visuales
+        if equipo['alerta_abandonado']:
+            item_dias.setForeground(QColor("#dc3545"))
+            item_dias.setText(f"🚨 {dias}")
+            item_dias.setToolTip("Más de 90 días sin movimiento")
+        elif equipo['alerta_estancado']:
+            item_dias.setForeground(QColor("#ffc107"))
+            item_dias.setText(f"⚠️ {dias}")
+            item_dias.setToolTip("Más de 48 horas sin movimiento")
+        
+        self.tabla.setItem(fila, 6, item_dias)
+        
+        # Fecha ingreso
+        fecha_str = equipo['fecha_ingreso']
+        if isinstance(fecha_str, str):
+            try:
+                fecha = datetime.fromisoformat(fecha_str.replace('Z', '+00:00'))
+                fecha_formateada = fecha.strftime('%d/%m/%Y')
+            except ValueError:
+                fecha_formateada = fecha_str
+        else:
+            fecha_formateada = str(fecha_str)
+        
+        self.tabla.setItem(fila, 7, QTableWidgetItem(fecha_formateada))
+    
+    def recibir_cambios(self, eventos):
+        """Aplica los cambios de la base; si la ventana está oculta, los guarda para cuando se muestre"""
+        self.cambios_pendientes.extend(eventos)
+        if self.isVisible():
+            self.aplicar_cambios_pendientes()
+    
+    def aplicar_cambios_pendientes(self):
+        """Actualiza solo las filas de los equipos que cambiaron"""
+        eventos, self.cambios_pendientes = self.cambios_pendientes, []
+        if not eventos:
+            return
+        
+        if any(evento.id_registro is None for evento in eventos):
+            self.cargar_equipos()
+            return
+        
+        try:
+            # Fila de cada equipo mostrado
+            filas = {int(self.tabla.item(fila, 0).text()): fila for fila in range(self.tabla.rowCount())}
+            
+            ids = {evento.id_registro for evento in eventos if evento.tabla == "equipos"}
+            clientes = {evento.id_registro for evento in eventos if evento.tabla == "clientes"}
+            if clientes:
+                for id_equipo, fila in filas.items():
+                    if self.tabla.item(fila, 1).data(Qt.UserRole) in clientes:
+                        ids.add(id_equipo)
+            if ids:
+                self.actualizar_filas(ids, ModuloEquipos.listar_equipos(**self.filtros_listado(), ids=ids))
+            
+        except Exception as e:
+            config.guardar_log(f"Error al actualizar equipos: {e}", "ERROR")
+    
+    def actualizar_equipos(self):
+        """Trae solo lo que cambió desde la última carga (botón Actualizar)"""
+        try:
+            delta = ModuloEquipos.listar_equipos_desde(self.version_listado, **self.filtros_listado())
+            ids = set(delta['eliminados']) | {equipo['id_equipo'] for equipo in delta['cambios']}
+            self.actualizar_filas(ids, delta['cambios'])
+            self.version_listado = delta['version']
+            
+        except Exception as e:
+            config.guardar_log(f"Error al actualizar equipos: {e}", "ERROR")
+            Mensaje.error("Error", f"Error al actualizar equipos: {str(e)}", self)
+    
+    def actualizar_filas(self, ids, equipos):
+        """
+        Actualiza las filas de ciertos equipos
+        
+        Args:
+            ids (set): Equipos a actualizar
+            equipos (list): Los de 'ids' que siguen en el listado, con sus datos
+        """
+        equipos = {equipo['id_equipo']: equipo for equipo in equipos}
+        filas = {int(self.tabla.item(fila, 0).text()): fila for fila in range(self.tabla.rowCount())}
+        
+        # Quitar los que ya no pasan los filtros (de abajo hacia arriba)
+        for fila in sorted((filas[i] for i in ids if i in filas and i not in equipos), reverse=True):
+            self.tabla.removeRow(fila)
+        
+        filas = {int(self.tabla.item(fila, 0).text()): fila for fila in range(self.tabla.rowCount())}
+        for id_equipo, equipo in equipos.items():
+            if id_equipo not in filas:
+                # Equipo nuevo en el listado: arriba, como el orden por fecha de ingreso
+                self.tabla.insertRow(0)
+                filas = {i: fila + 1 for i, fila in filas.items()}
+                filas[id_equipo] = 0
+            self.llenar_fila(filas[id_equipo], equipo)
+    
     def buscar_equipos(self):
         """Busca equipos según el texto ingresado"""
         self.cargar_equipos()
     
     def abrir_dialogo_ingresar_equipo(self):
         """Abre el diálogo para ingresar un nuevo equipo"""
-        dialogo = DialogoIngresarEquipo(self)
-        if dialogo.exec_() == QDialog.Accepted:
-            self.cargar_equipos()
+        # La tabla se actualiza sola con el equipo nuevo (ver recibir_cambios)
+        DialogoIngresarEquipo(self).exec_()
     
     def ver_detalle_equipo(self, id_equipo):
         """Muestra el detalle completo de un equipo"""
-        dialogo = DialogoDetalleEquipo(id_equipo, self)
-        dialogo.exec_()
-        self.cargar_equipos()  # Recargar por si hubo cambios
+        DialogoDetalleEquipo(id_equipo, self).exec_()
     
     def cambiar_estado(self, id_equipo):
         """Abre diálogo para cambiar el estado de un equipo"""
-        dialogo = DialogoCambiarEstado(id_equipo, self)
-        if dialogo.exec_() == QDialog.Accepted:
-            self.cargar_equipos()
+        DialogoCambiarEstado(id_equipo, self).exec_()
     
     def ver_remito(self, id_equipo):
         """Muestra el remito del equipo"""
@@ -388,6 +475,10 @@ class VentanaEquipos(QWidget):
             self
         )
     
+    def refrescar_datos(self):
+        """Al volver a mostrar la ventana (ver RegistroVentanas) aplica los cambios ocurridos mientras estaba oculta"""
+        self.aplicar_cambios_pendientes()
+    
     def volver_dashboard(self):
         """Vuelve al dashboard principal"""
         self.parent().setCurrentIndex(0)
@@ -701,7 +792,7 @@ class DialogoSeleccionarCliente(QDialog):
         tabla.setEditTriggers(QAbstractItemView.NoEditTriggers)
         tabla.verticalHeader().setVisible(False)
         tabla.horizontalHeader().setStretchLastSection(True)
-        tabla.setStyleSheet(Estilos.tabla())
+        marcar(tabla, "tabla")
         
         # Llenar tabla
         for cliente in self.clientes:
@@ -17,6 +17,8 @@ from interfaz.componentes.componentes import (Boton, CampoTexto, Etiqueta,
                                               Mensaje, ListaDesplegable,
                                               CampoTextoMultilinea)
 from interfaz.estilos.estilos import Estilos
+from interfaz.estilos.tema import marcar
+from interfaz.componentes.cambios import ReceptorCambios
 from modulos.facturacion_LOGICA import ModuloFacturacion
 from modulos.pagos_LOGICA import ModuloPagos
 from sistema_base.configuracion import config
@@ -30,6 +32,10 @@ class VentanaFacturacionPagos(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.inicializar_ui()
+        
+        # Recargar cuando cambian los datos que muestra (ver base_datos.eventos)
+        self.receptor_cambios = ReceptorCambios(("facturacion", "pagos", "clientes"), self)
+        self.receptor_cambios.cambios.connect(self.recibir_cambios)
     
     def inicializar_ui(self):
         """Inicializa la interfaz"""
@@ -78,6 +84,16 @@ class VentanaFacturacionPagos(QWidget):
         layout.addWidget(tabs)
         self.setLayout(layout)
     
+    def recibir_cambios(self, eventos):
+        """Recarga si la ventana está a la vista; si no, lo hace refrescar_datos al volver a mostrarla"""
+        if self.isVisible():
+            self.refrescar_datos()
+    
+    def refrescar_datos(self):
+        """Recarga los datos al volver a mostrar la ventana (ver RegistroVentanas)"""
+        self.tab_facturas.cargar_facturas()
+        self.tab_pagos.cargar_pagos()
+    
     def volver_dashboard(self):
         """Vuelve al dashboard principal"""
         self.parent().setCurrentIndex(0)
@@ -143,6 +159,11 @@ class TabFacturas(QWidget):
         self.combo_estado.currentIndexChanged.connect(self.cargar_facturas)
         layout.addWidget(self.combo_estado)
         
+        # Cuentas por cobrar (de la mayor deuda a la menor)
+        self.check_adeudadas = QCheckBox("Solo con saldo")
+        self.check_adeudadas.stateChanged.connect(self.cargar_facturas)
+        layout.addWidget(self.check_adeudadas)
+        
         # Filtro de fechas
         self.check_filtro_fecha = QCheckBox("Filtrar por fecha")
         self.check_filtro_fecha.stateChanged.connect(self.toggle_filtro_fecha)
@@ -171,6 +192,11 @@ class TabFacturas(QWidget):
         boton_actualizar.clicked.connect(self.cargar_facturas)
         layout.addWidget(boton_actualizar)
         
+        boton_antiguedad = Boton("📅 Antigüedad de saldos", "secundario")
+        boton_antiguedad.setToolTip("Deudas por cliente según los días desde la emisión")
+        boton_antiguedad.clicked.connect(self.ver_antiguedad_saldos)
+        layout.addWidget(boton_antiguedad)
+        
         barra.setLayout(layout)
         return barra
     
@@ -181,6 +207,11 @@ class TabFacturas(QWidget):
         self.fecha_hasta.setEnabled(activo)
         self.cargar_facturas()
     
+    def ver_antiguedad_saldos(self):
+        """Abre el reporte de antigüedad de saldos"""
+        dialogo = DialogoAntiguedadSaldos(self)
+        dialogo.exec_()
+    
     def actualizar_estadisticas(self):
         """Actualiza tarjetas de estadísticas"""
         # Limpiar layout
@@ -270,7 +301,7 @@ class TabFacturas(QWidget):
         header.setSectionResizeMode(5, QHeaderView.Fixed)
         tabla.setColumnWidth(5, 280)
         
-        tabla.setStyleSheet(Estilos.tabla())
+        marcar(tabla, "tabla")
         return tabla
     
     def cargar_facturas(self):
@@ -290,7 +321,8 @@ class TabFacturas(QWidget):
                 filtro_estado=filtro_estado,
                 busqueda=busqueda,
                 fecha_desde=fecha_desde,
-                fecha_hasta=fecha_hasta
+                fecha_hasta=fecha_hasta,
+                solo_adeudadas=self.check_adeudadas.isChecked()
             )
             
             self.tabla.setRowCount(0)
@@ -308,7 +340,7 @@ class TabFacturas(QWidget):
                 self.tabla.setItem(fila, 1, QTableWidgetItem(factura['cliente_nombre']))
                 
                 # Total
-                self.tabla.setItem(fila, 2, QTableWidgetItem(formatear_dinero(factura['total'])))
+                self.tabla.setItem(fila, 2, QTableWidgetItem(formatear_dinero(factura['monto_total'])))
                 
                 # Estado
                 item_estado = QTableWidgetItem(factura['estado_cobro'])
@@ -488,6 +520,13 @@ class TabPagos(QWidget):
         boton_actualizar.clicked.connect(self.cargar_pagos)
         layout.addWidget(boton_actualizar)
         
+        # Botón exportar
+        boton_exportar = Boton("📊", "neutro")
+        boton_exportar.setMaximumWidth(50)
+        boton_exportar.setToolTip("Exportar a CSV / Excel")
+        boton_exportar.clicked.connect(self.exportar_pagos)
+        layout.addWidget(boton_exportar)
+        
         barra.setLayout(layout)
         return barra
     
@@ -572,7 +611,7 @@ class TabPagos(QWidget):
         header.setSectionResizeMode(5, QHeaderView.Stretch)
         header.setSectionResizeMode(6, QHeaderView.ResizeToContents)
         
-        tabla.setStyleSheet(Estilos.tabla())
+        marcar(tabla, "tabla")
         return tabla
     
     def cargar_pagos(self):
@@ -603,14 +642,14 @@ class TabPagos(QWidget):
                 
                 # Fecha
                 try:
-                    fecha = datetime.fromisoformat(str(pago['fecha_hora_pago']).replace('Z', '+00:00'))
+                    fecha = datetime.fromisoformat(str(pago['fecha_pago']).replace('Z', '+00:00'))
                     fecha_texto = fecha.strftime('%d/%m/%Y %H:%M')
                 except:
-                    fecha_texto = str(pago['fecha_hora_pago'])
+                    fecha_texto = str(pago['fecha_pago'])
                 self.tabla.setItem(fila, 0, QTableWidgetItem(fecha_texto))
                 
                 # Factura
-                item_factura = QTableWidgetItem(pago['numero_factura'])
+                item_factura = QTableWidgetItem(pago['numero_factura'] or "-")
                 item_factura.setFont(QFont("Courier", 10, QFont.Bold))
                 self.tabla.setItem(fila, 1, item_factura)
                 
@@ -627,7 +666,7 @@ class TabPagos(QWidget):
                 self.tabla.setItem(fila, 4, QTableWidgetItem(pago['metodo_pago']))
                 
                 # Referencia
-                self.tabla.setItem(fila, 5, QTableWidgetItem(pago['referencia'] if pago['referencia'] else "-"))
+                self.tabla.setItem(fila, 5, QTableWidgetItem(pago['observaciones'] if pago['observaciones'] else "-"))
                 
                 # Usuario
                 self.tabla.setItem(fila, 6, QTableWidgetItem(pago['usuario_nombre'] if pago['usuario_nombre'] else "-"))
@@ -638,6 +677,25 @@ class TabPagos(QWidget):
         except Exception as e:
             config.guardar_log(f"Error al cargar pagos: {e}", "ERROR")
             Mensaje.error("Error", f"Error al cargar pagos: {str(e)}", self)
+    
+    def exportar_pagos(self):
+        """Exporta los pagos filtrados a CSV o Excel"""
+        from interfaz.componentes.exportacion import DialogoExportacion
+        
+        fecha_desde = None
+        fecha_hasta = None
+        if self.check_filtro_fecha.isChecked():
+            fecha_desde = self.fecha_desde.date().toPyDate()
+            fecha_hasta = self.fecha_hasta.date().toPyDate()
+        
+        consulta, parametros = ModuloPagos.consulta_listar_pagos(
+            busqueda=self.campo_busqueda.text().strip(),
+            metodo_pago=self.combo_metodo.currentData(),
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta
+        )
+        
+        DialogoExportacion.exportar("Exportar Pagos", consulta, parametros, ModuloPagos.COLUMNAS_EXPORTACION, "pagos", self)
 
 
 class DialogoRegistrarPago(QDialog):
@@ -741,11 +799,11 @@ class DialogoRegistrarPago(QDialog):
         
         if self.factura:
             total_pagado = ModuloPagos.obtener_total_pagado(self.id_factura)
-            self.pendiente = self.factura['total'] - total_pagado
+            self.pendiente = self.factura['monto_total'] - total_pagado
             
             texto = f"<b>Factura:</b> {self.factura['numero_factura']}<br>"
             texto += f"<b>Cliente:</b> {self.factura['cliente_nombre']}<br><br>"
-            texto += f"<b>Total factura:</b> {formatear_dinero(self.factura['total'])}<br>"
+            texto += f"<b>Total factura:</b> {formatear_dinero(self.factura['monto_total'])}<br>"
             texto += f"<b>Ya pagado:</b> {formatear_dinero(total_pagado)}<br>"
             texto += f"<b>Pendiente:</b> <span style='color: #dc3545; font-size: 14pt; font-weight: bold;'>{formatear_dinero(self.pendiente)}</span>"
             
@@ -784,6 +842,7 @@ class DialogoRegistrarPago(QDialog):
         )
         
         if exito:
+            self.imprimir_recibo(id_pago, monto)
             Mensaje.exito("✓ Pago Registrado", mensaje, self)
             self.accept()
         else:
@@ -793,6 +852,24 @@ class DialogoRegistrarPago(QDialog):
             self.boton_registrar.setText("💰 Registrar Pago")
 
 
+    def imprimir_recibo(self, id_pago, monto):
+        """Encola el recibo del pago en la impresora térmica (si hay una configurada)"""
+        if not config.impresora_termica_tipo:
+            return
+        
+        from impresion.ticket_escpos import obtener_cola_impresion
+        
+        datos_recibo = {
+            'id_pago': id_pago,
+            'fecha_pago': datetime.now(),
+            'cliente_nombre': self.factura['cliente_nombre'] if self.factura else '',
+            'metodo_pago': self.combo_metodo.currentData(),
+            'observaciones': self.campo_referencia.text().strip(),
+            'monto': monto
+        }
+        obtener_cola_impresion().encolar("recibo_pago", datos_recibo)
+
+
 class DialogoMarcarIncobrable(QDialog):
     """Diálogo para marcar factura como incobrable"""
     
@@ -896,7 +973,7 @@ class DialogoMarcarIncobrable(QDialog):
         
         if self.factura:
             total_pagado = ModuloPagos.obtener_total_pagado(self.id_factura)
-            pendiente = self.factura['total'] - total_pagado
+            pendiente = self.factura['monto_total'] - total_pagado
             
             texto = f"<b>Factura:</b> {self.factura['numero_factura']}<br>"
             texto += f"<b>Cliente:</b> {self.factura['cliente_nombre']}<br>"
@@ -1010,7 +1087,7 @@ class DialogoDetalleFactura(QDialog):
         self.tabla_pagos.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.tabla_pagos.verticalHeader().setVisible(False)
         self.tabla_pagos.setMaximumHeight(300)
-        self.tabla_pagos.setStyleSheet(Estilos.tabla())
+        marcar(self.tabla_pagos, "tabla")
         
         header = self.tabla_pagos.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
@@ -1056,7 +1133,7 @@ class DialogoDetalleFactura(QDialog):
         
         # Info general
         total_pagado = ModuloPagos.obtener_total_pagado(self.id_factura)
-        pendiente = self.factura['total'] - total_pagado
+        pendiente = self.factura['monto_total'] - total_pagado
         
         try:
             fecha = datetime.fromisoformat(str(self.factura['fecha_emision']).replace('Z', '+00:00'))
@@ -1070,7 +1147,7 @@ class DialogoDetalleFactura(QDialog):
         texto = f"<b>Cliente:</b> {self.factura['cliente_nombre']}<br>"
         texto += f"<b>Teléfono:</b> {self.factura['cliente_telefono']}<br>"
         texto += f"<b>Fecha emisión:</b> {fecha_texto}<br><br>"
-        texto += f"<b>Total factura:</b> {formatear_dinero(self.factura['total'])}<br>"
+        texto += f"<b>Total factura:</b> {formatear_dinero(self.factura['monto_total'])}<br>"
         texto += f"<b>Pagado:</b> {formatear_dinero(total_pagado)}<br>"
         texto += f"<b>Pendiente:</b> <span style='color: {estado_color}; font-size: 14pt; font-weight: bold;'>{formatear_dinero(pendiente)}</span><br><br>"
         texto += f"<b>Estado:</b> <span style='color: {estado_color}; font-weight: bold; font-size: 12pt;'>{self.factura['estado_cobro']}</span>"
@@ -1095,10 +1172,10 @@ class DialogoDetalleFactura(QDialog):
             
             # Fecha
             try:
-                fecha = datetime.fromisoformat(str(pago['fecha_hora_pago']).replace('Z', '+00:00'))
+                fecha = datetime.fromisoformat(str(pago['fecha_pago']).replace('Z', '+00:00'))
                 fecha_texto = fecha.strftime('%d/%m/%Y %H:%M')
             except:
-                fecha_texto = str(pago['fecha_hora_pago'])
+                fecha_texto = str(pago['fecha_pago'])
             self.tabla_pagos.setItem(fila, 0, QTableWidgetItem(fecha_texto))
             
             # Monto
@@ -1111,7 +1188,7 @@ class DialogoDetalleFactura(QDialog):
             self.tabla_pagos.setItem(fila, 2, QTableWidgetItem(pago['metodo_pago']))
             
             # Referencia
-            self.tabla_pagos.setItem(fila, 3, QTableWidgetItem(pago['referencia'] if pago['referencia'] else "-"))
+            self.tabla_pagos.setItem(fila, 3, QTableWidgetItem(pago['observaciones'] if pago['observaciones'] else "-"))
             
             # Usuario
             self.tabla_pagos.setItem(fila, 4, QTableWidgetItem(pago['usuario_nombre'] if pago['usuario_nombre'] else "-"))
@@ -1133,3 +1210,115 @@ class DialogoDetalleFactura(QDialog):
             dialogo.exec_()
         else:
             Mensaje.informacion("Sin Orden", "Esta factura no tiene una orden asociada", self)
+
+
+class DialogoAntiguedadSaldos(QDialog):
+    """Diálogo con la antigüedad de saldos (cuentas por cobrar) por cliente"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.inicializar_ui()
+        self.cargar_datos()
+    
+    def inicializar_ui(self):
+        """Inicializa la interfaz"""
+        self.setWindowTitle("Antigüedad de Saldos")
+        self.setMinimumSize(1000, 650)
+        self.setModal(True)
+        
+        layout = QVBoxLayout()
+        layout.setSpacing(15)
+        layout.setContentsMargins(30, 30, 30, 30)
+        
+        layout.addWidget(Etiqueta("📅 Antigüedad de Saldos por Cliente", "titulo"))
+        
+        # Fecha de corte
+        layout_corte = QHBoxLayout()
+        layout_corte.addWidget(QLabel("Saldos al:"))
+        self.fecha_corte = QDateEdit()
+        self.fecha_corte.setCalendarPopup(True)
+        self.fecha_corte.setDate(QDate.currentDate())
+        self.fecha_corte.setMaximumDate(QDate.currentDate())
+        self.fecha_corte.dateChanged.connect(self.cargar_datos)
+        layout_corte.addWidget(self.fecha_corte)
+        layout_corte.addStretch()
+        layout.addLayout(layout_corte)
+        
+        # Tabla: cliente, facturas, un tramo por columna, total
+        tramos = ModuloFacturacion.TRAMOS_ANTIGUEDAD
+        self.tabla = QTableWidget()
+        self.tabla.setColumnCount(4 + len(tramos))
+        self.tabla.setHorizontalHeaderLabels(
+            ["Cliente", "Teléfono", "Facturas"] + [titulo for _, titulo, _, _ in tramos] + ["Total"]
+        )
+        self.tabla.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tabla.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tabla.verticalHeader().setVisible(False)
+        self.tabla.setAlternatingRowColors(True)
+        marcar(self.tabla, "tabla")
+        
+        header = self.tabla.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(0, QHeaderView.Stretch)
+        
+        layout.addWidget(self.tabla, 1)
+        
+        # Botones
+        layout_botones = QHBoxLayout()
+        
+        boton_exportar = Boton("📤 Exportar", "secundario")
+        boton_exportar.setToolTip("Exportar a CSV / Excel")
+        boton_exportar.clicked.connect(self.exportar)
+        layout_botones.addWidget(boton_exportar)
+        
+        layout_botones.addStretch()
+        
+        boton_cerrar = Boton("Cerrar", "neutro")
+        boton_cerrar.clicked.connect(self.accept)
+        layout_botones.addWidget(boton_cerrar)
+        
+        layout.addLayout(layout_botones)
+        
+        self.setLayout(layout)
+    
+    def cargar_datos(self):
+        """Carga el reporte a la fecha de corte"""
+        reporte = ModuloFacturacion.obtener_antiguedad_saldos(self.fecha_corte.date().toPyDate())
+        filas = reporte['clientes'] + ([reporte['totales']] if reporte['totales'] else [])
+        claves = [clave for clave, _, _, _ in ModuloFacturacion.TRAMOS_ANTIGUEDAD] + ["total"]
+        tramo_mas_viejo = ModuloFacturacion.TRAMOS_ANTIGUEDAD[-1][0]
+        
+        self.tabla.setRowCount(0)
+        for registro in filas:
+            fila = self.tabla.rowCount()
+            self.tabla.insertRow(fila)
+            es_total = registro['id_cliente'] is None
+            
+            self.tabla.setItem(fila, 0, QTableWidgetItem(registro['cliente_nombre']))
+            self.tabla.setItem(fila, 1, QTableWidgetItem(registro['telefono'] or ""))
+            self.tabla.setItem(fila, 2, QTableWidgetItem(str(registro['facturas'])))
+            
+            for columna, clave in enumerate(claves, start=3):
+                item = QTableWidgetItem(formatear_dinero(registro[clave]) if registro[clave] else "-")
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                # Lo que pasó los 90 días, en rojo
+                if clave == tramo_mas_viejo and registro[clave]:
+                    item.setForeground(QColor("#dc3545"))
+                self.tabla.setItem(fila, columna, item)
+            
+            if es_total:
+                for columna in range(self.tabla.columnCount()):
+                    item = self.tabla.item(fila, columna)
+                    if item:
+                        item.setFont(QFont("Arial", 10, QFont.Bold))
+    
+    def exportar(self):
+        """Exporta el reporte a CSV o Excel"""
+        from interfaz.componentes.exportacion import DialogoExportacion
+        
+        consulta, parametros = ModuloFacturacion.consulta_antiguedad_saldos(
+            self.fecha_corte.date().toPyDate()
+        )
+        
+        DialogoExportacion.exportar("Exportar Antigüedad de Saldos", consulta, parametros,
+                                    ModuloFacturacion.COLUMNAS_ANTIGUEDAD, "antiguedad_saldos", self)
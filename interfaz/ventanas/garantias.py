@@ -17,6 +17,8 @@ from interfaz.componentes.componentes import (Boton, CampoTexto, Etiqueta,
                                               Mensaje, ListaDesplegable,
                                               CampoTextoMultilinea)
 from interfaz.estilos.estilos import Estilos
+from interfaz.estilos.tema import marcar
+from interfaz.componentes.cambios import ReceptorCambios
 from modulos.garantias_LOGICA import ModuloGarantias
 from modulos.equipos_LOGICA import ModuloEquipos
 from modulos.ordenes_LOGICA import ModuloOrdenes
@@ -31,6 +33,10 @@ class VentanaGarantias(QWidget):
         super().__init__(parent)
         self.inicializar_ui()
         self.cargar_garantias()
+        
+        # Recargar cuando cambian los datos que muestra (ver base_datos.eventos)
+        self.receptor_cambios = ReceptorCambios(("garantias", "equipos", "clientes"), self)
+        self.receptor_cambios.cambios.connect(self.recibir_cambios)
     
     def inicializar_ui(self):
         """Inicializa la interfaz"""
@@ -129,6 +135,12 @@ class VentanaGarantias(QWidget):
         boton_actualizar.clicked.connect(self.cargar_garantias)
         layout.addWidget(boton_actualizar)
         
+        boton_exportar = Boton("📊", "neutro")
+        boton_exportar.setMaximumWidth(50)
+        boton_exportar.setToolTip("Exportar")
+        boton_exportar.clicked.connect(self.exportar_garantias)
+        layout.addWidget(boton_exportar)
+        
         barra.setLayout(layout)
         return barra
     
@@ -224,14 +236,28 @@ class VentanaGarantias(QWidget):
         header.setSectionResizeMode(7, QHeaderView.Fixed)
         tabla.setColumnWidth(7, 200)
         
-        tabla.setStyleSheet(Estilos.tabla())
+        marcar(tabla, "tabla")
         return tabla
     
+    def exportar_garantias(self):
+        """Exporta las garantías filtradas a CSV o Excel"""
+        from interfaz.componentes.exportacion import DialogoExportacion
+        
+        consulta, parametros = ModuloGarantias.consulta_listar_garantias(
+            filtro_estado=self.combo_estado.currentData(),
+            busqueda=self.campo_busqueda.text().strip()
+        )
+        
+        DialogoExportacion.exportar("Exportar Garantías", consulta, parametros, ModuloGarantias.COLUMNAS_EXPORTACION, "garantias", self)
+    
     def cargar_garantias(self):
         """Carga las garantías"""
         try:
-            # Por ahora sin filtros complejos - solo traer todas
-            garantias = ModuloGarantias.listar_garantias()
+            # Filtros por estado y búsqueda (los de fecha todavía no se aplican)
+            garantias = ModuloGarantias.listar_garantias(
+                filtro_estado=self.combo_estado.currentData(),
+                busqueda=self.campo_busqueda.text().strip()
+            )
             
             self.tabla.setRowCount(0)
             
@@ -364,6 +390,15 @@ class VentanaGarantias(QWidget):
             Mensaje.informacion("Sin Orden", 
                               "Esta garantía no tiene una orden de reparación asociada.", self)
     
+    def recibir_cambios(self, eventos):
+        """Recarga si la ventana está a la vista; si no, lo hace refrescar_datos al volver a mostrarla"""
+        if self.isVisible():
+            self.refrescar_datos()
+    
+    def refrescar_datos(self):
+        """Recarga los datos al volver a mostrar la ventana (ver RegistroVentanas)"""
+        self.cargar_garantias()
+    
     def volver_dashboard(self):
         """Vuelve al dashboard principal"""
         self.parent().setCurrentIndex(0)
@@ -9,7 +9,7 @@ Ventana de inicio de sesión con diseño profesional
 
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                              QWidget)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QFont, QPixmap
 from interfaz.componentes.componentes import (Boton, CampoTexto, CampoContrasena,
                                               Etiqueta, Mensaje)
@@ -19,12 +19,36 @@ from sistema_base.configuracion import config
 from sistema_base.constantes import NOMBRE_COMPLETO, VERSION
 
 
+class TrabajoAutenticacion(QThread):
+    """
+    Verifica las credenciales fuera del hilo de la interfaz
+    (bcrypt tarda a propósito y congelaría la ventana)
+    """
+    
+    terminado = pyqtSignal(object)
+    
+    def __init__(self, username, password, parent=None):
+        super().__init__(parent)
+        self.username = username
+        self.password = password
+    
+    def run(self):
+        """Autentica y emite los datos del usuario (o None)"""
+        try:
+            usuario = autenticar_usuario(self.username, self.password)
+        except Exception as e:
+            usuario = e
+        self.password = None
+        self.terminado.emit(usuario)
+
+
 class VentanaLogin(QDialog):
     """Ventana de login del sistema con diseño moderno"""
     
     def __init__(self):
         super().__init__()
         self.usuario_autenticado = None
+        self.trabajo_autenticacion = None
         self.inicializar_ui()
     
     def inicializar_ui(self):
@@ -267,37 +291,49 @@ class VentanaLogin(QDialog):
             self.mostrar_error("Por favor complete todos los campos")
             return
         
-        # Deshabilitar botón mientras se procesa
-        self.boton_login.setEnabled(False)
-        self.boton_login.setText("Iniciando sesión...")
+        # Evitar un segundo intento mientras se verifica el primero
+        if self.trabajo_autenticacion and self.trabajo_autenticacion.isRunning():
+            return
         
-        # Autenticar usuario
-        try:
-            usuario = autenticar_usuario(username, password)
-            
-            if usuario:
-                # Login exitoso
-                self.usuario_autenticado = usuario
-                
-                # Verificar si es primer login
-                if usuario['primer_login'] == 1:
-                    # Debe cambiar contraseña obligatoriamente
-                    self.accept()  # Cerrar ventana de login
-                else:
-                    # Login normal
-                    self.accept()
-            else:
-                # Credenciales incorrectas
-                self.mostrar_error("Usuario o contraseña incorrectos")
-                self.boton_login.setEnabled(True)
-                self.boton_login.setText("Iniciar Sesión")
-                self.campo_contrasena.clear()
-                self.campo_contrasena.setFocus()
-                
-        except Exception as e:
-            self.mostrar_error(f"Error al iniciar sesión: {str(e)}")
-            self.boton_login.setEnabled(True)
-            self.boton_login.setText("Iniciar Sesión")
+        # Deshabilitar formulario mientras se procesa
+        self.habilitar_formulario(False)
+        self.label_error.setVisible(False)
+        
+        # Autenticar usuario en un hilo de trabajo
+        self.trabajo_autenticacion = TrabajoAutenticacion(username, password, self)
+        self.trabajo_autenticacion.terminado.connect(self.autenticacion_terminada)
+        self.trabajo_autenticacion.start()
+    
+    def autenticacion_terminada(self, usuario):
+        """Recibe el resultado de la autenticación"""
+        if isinstance(usuario, Exception):
+            self.mostrar_error(f"Error al iniciar sesión: {str(usuario)}")
+            self.habilitar_formulario(True)
+            return
+        
+        if usuario:
+            # Login exitoso (el cambio obligatorio de primer login lo maneja AplicacionPrincipal)
+            self.usuario_autenticado = usuario
+            self.accept()
+        else:
+            # Credenciales incorrectas
+            self.mostrar_error("Usuario o contraseña incorrectos")
+            self.habilitar_formulario(True)
+            self.campo_contrasena.clear()
+            self.campo_contrasena.setFocus()
+    
+    def habilitar_formulario(self, habilitado):
+        """Habilita o deshabilita los campos y el botón de login"""
+        self.campo_usuario.setEnabled(habilitado)
+        self.campo_contrasena.setEnabled(habilitado)
+        self.boton_login.setEnabled(habilitado)
+        self.boton_login.setText("Iniciar Sesión" if habilitado else "Iniciando sesión...")
+    
+    def reject(self):
+        """Evita cerrar la ventana con una verificación en curso"""
+        if self.trabajo_autenticacion and self.trabajo_autenticacion.isRunning():
+            return
+        super().reject()
     
     def mostrar_error(self, mensaje):
         """Muestra un mensaje de error"""
@@ -16,9 +16,14 @@ from interfaz.componentes.componentes import (Boton, CampoTexto, Etiqueta,
                                               Mensaje, CampoTextoMultilinea,
                                               ListaDesplegable)
 from interfaz.estilos.estilos import Estilos
+from interfaz.estilos.tema import marcar
+from interfaz.componentes.precarga import obtener_estadisticas
+from interfaz.componentes.cambios import ReceptorCambios
 from modulos.ordenes_LOGICA import ModuloOrdenes
 from modulos.equipos_LOGICA import ModuloEquipos
+from modulos.repuestos_LOGICA import ModuloRepuestos
 from sistema_base.configuracion import config
+from sistema_base.utilidades import formatear_dinero
 from datetime import datetime
 
 
@@ -29,6 +34,10 @@ class VentanaOrdenes(QWidget):
         super().__init__(parent)
         self.inicializar_ui()
         self.cargar_ordenes()
+        
+        # Recargar cuando cambian los datos que muestra (ver base_datos.eventos)
+        self.receptor_cambios = ReceptorCambios(("ordenes_trabajo", "equipos", "clientes", "usuarios"), self)
+        self.receptor_cambios.cambios.connect(self.recibir_cambios)
     
     def inicializar_ui(self):
         """Inicializa la interfaz"""
@@ -53,8 +62,8 @@ class VentanaOrdenes(QWidget):
         layout.addWidget(barra)
         
         # Tarjetas estadísticas
-        tarjetas = self.crear_tarjetas_estadisticas()
-        layout.addWidget(tarjetas)
+        self.tarjetas = self.crear_tarjetas_estadisticas()
+        layout.addWidget(self.tarjetas)
         
         # Tabla
         self.tabla = self.crear_tabla_ordenes()
@@ -104,6 +113,10 @@ class VentanaOrdenes(QWidget):
         boton_actualizar.clicked.connect(self.cargar_ordenes)
         layout.addWidget(boton_actualizar)
         
+        boton_exportar = Boton("📊 Exportar", "neutro")
+        boton_exportar.clicked.connect(self.exportar_ordenes)
+        layout.addWidget(boton_exportar)
+        
         barra.setLayout(layout)
         return barra
     
@@ -114,7 +127,7 @@ class VentanaOrdenes(QWidget):
         layout = QHBoxLayout()
         layout.setSpacing(15)
         
-        stats = ModuloOrdenes.obtener_estadisticas_ordenes()
+        stats = obtener_estadisticas("ordenes", ModuloOrdenes.obtener_estadisticas_ordenes)
         
         # Total
         t1 = self.crear_tarjeta("Total", str(stats.get('total', 0)), "#3498db")
@@ -202,9 +215,20 @@ class VentanaOrdenes(QWidget):
         header.setSectionResizeMode(6, QHeaderView.Fixed)
         tabla.setColumnWidth(6, 250)
         
-        tabla.setStyleSheet(Estilos.tabla())
+        marcar(tabla, "tabla")
         return tabla
     
+    def exportar_ordenes(self):
+        """Exporta las órdenes filtradas a CSV o Excel"""
+        from interfaz.componentes.exportacion import DialogoExportacion
+        
+        consulta, parametros = ModuloOrdenes.consulta_listar_ordenes(
+            filtro_estado=self.combo_estado.currentData(),
+            busqueda=self.campo_busqueda.text().strip()
+        )
+        
+        DialogoExportacion.exportar("Exportar Órdenes", consulta, parametros, ModuloOrdenes.COLUMNAS_EXPORTACION, "ordenes", self)
+    
     def cargar_ordenes(self):
         """Carga las órdenes"""
         try:
@@ -320,6 +344,20 @@ class VentanaOrdenes(QWidget):
         if dialogo.exec_() == QDialog.Accepted:
             self.cargar_ordenes()
     
+    def recibir_cambios(self, eventos):
+        """Recarga si la ventana está a la vista; si no, lo hace refrescar_datos al volver a mostrarla"""
+        if self.isVisible():
+            self.refrescar_datos()
+    
+    def refrescar_datos(self):
+        """Recarga los datos al volver a mostrar la ventana (ver RegistroVentanas)"""
+        # Las tarjetas se arman una vez: reemplazarlas con valores nuevos
+        tarjetas = self.crear_tarjetas_estadisticas()
+        self.layout().replaceWidget(self.tarjetas, tarjetas)
+        self.tarjetas.deleteLater()
+        self.tarjetas = tarjetas
+        self.cargar_ordenes()
+    
     def volver_dashboard(self):
         """Vuelve al dashboard principal"""
         self.parent().setCurrentIndex(0)
@@ -727,7 +765,7 @@ class DialogoDetalleOrden(QDialog):
     def inicializar_ui(self):
         """Inicializa la interfaz"""
         self.setWindowTitle("Detalle de Orden")
-        self.setMinimumSize(700, 500)
+        self.setMinimumSize(700, 650)
         self.setModal(True)
         
         layout = QVBoxLayout()
@@ -766,7 +804,25 @@ class DialogoDetalleOrden(QDialog):
         self.frame_datos.setLayout(layout_datos)
         layout.addWidget(self.frame_datos)
         
-        layout.addStretch()
+        # Repuestos en stock que le sirven al equipo
+        layout.addWidget(Etiqueta("Repuestos compatibles en stock", "subtitulo"))
+        
+        self.tabla_compatibles = QTableWidget()
+        self.tabla_compatibles.setColumnCount(5)
+        self.tabla_compatibles.setHorizontalHeaderLabels([
+            "Repuesto", "Tipo", "Disponible", "Precio", "Acciones"
+        ])
+        self.tabla_compatibles.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tabla_compatibles.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tabla_compatibles.verticalHeader().setVisible(False)
+        
+        header = self.tabla_compatibles.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Stretch)
+        for columna in range(1, 5):
+            header.setSectionResizeMode(columna, QHeaderView.ResizeToContents)
+        
+        marcar(self.tabla_compatibles, "tabla")
+        layout.addWidget(self.tabla_compatibles)
         
         # Botón cerrar
         layout_botones = QHBoxLayout()
@@ -811,3 +867,44 @@ class DialogoDetalleOrden(QDialog):
             self.label_fechas.setText(fechas_texto)
         except:
             self.label_fechas.setText("")
+        
+        self.cargar_compatibles()
+    
+    def cargar_compatibles(self):
+        """Carga los repuestos en stock compatibles con el equipo de la orden"""
+        repuestos = ModuloRepuestos.obtener_repuestos_compatibles(self.orden['id_equipo'])
+        
+        self.tabla_compatibles.setRowCount(len(repuestos))
+        for fila, repuesto in enumerate(repuestos):
+            self.tabla_compatibles.setItem(fila, 0, QTableWidgetItem(repuesto['nombre']))
+            self.tabla_compatibles.setItem(fila, 1, QTableWidgetItem(repuesto['tipo']))
+            
+            item_stock = QTableWidgetItem(str(repuesto['cantidad_disponible']))
+            if repuesto['stock_bajo']:
+                item_stock.setForeground(QColor("#dc3545"))
+            self.tabla_compatibles.setItem(fila, 2, item_stock)
+            
+            self.tabla_compatibles.setItem(fila, 3, QTableWidgetItem(formatear_dinero(repuesto['precio_referencia'] or 0)))
+            
+            boton_reservar = Boton("📌 Reservar", "secundario")
+            boton_reservar.setToolTip("Apartar una unidad para esta orden")
+            boton_reservar.clicked.connect(lambda _, r=repuesto: self.reservar(r))
+            self.tabla_compatibles.setCellWidget(fila, 4, boton_reservar)
+    
+    def reservar(self, repuesto):
+        """Reserva una unidad del repuesto para la orden"""
+        from sistema_base.seguridad import obtener_usuario_actual
+        usuario_actual = obtener_usuario_actual()
+        
+        exito, mensaje = ModuloRepuestos.reservar_repuesto(
+            self.id_orden,
+            repuesto['id_repuesto'],
+            1,
+            usuario_actual['id_usuario']
+        )
+        
+        if exito:
+            Mensaje.exito("Repuesto Reservado", f"{repuesto['nombre']}: {mensaje}", self)
+            self.cargar_compatibles()
+        else:
+            Mensaje.error("Error", mensaje, self)
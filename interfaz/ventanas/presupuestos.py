@@ -16,6 +16,9 @@ from PyQt5.QtGui import QColor
 from interfaz.componentes.componentes import (Boton, CampoTexto, Etiqueta,
                                               ListaDesplegable, Mensaje)
 from interfaz.estilos.estilos import Estilos
+from interfaz.estilos.tema import marcar
+from interfaz.componentes.precarga import obtener_estadisticas
+from interfaz.componentes.cambios import ReceptorCambios
 from modulos.presupuestos_LOGICA import ModuloPresupuestos
 from modulos.equipos_LOGICA import ModuloEquipos
 from sistema_base.configuracion import config
@@ -30,6 +33,10 @@ class VentanaPresupuestos(QWidget):
         self.parent_window = parent
         self.inicializar_ui()
         self.cargar_presupuestos()
+        
+        # Recargar cuando cambian los datos que muestra (ver base_datos.eventos)
+        self.receptor_cambios = ReceptorCambios(("presupuestos", "equipos", "clientes"), self)
+        self.receptor_cambios.cambios.connect(self.recibir_cambios)
     
     def inicializar_ui(self):
         """Inicializa la interfaz de usuario"""
@@ -110,6 +117,10 @@ class VentanaPresupuestos(QWidget):
         boton_actualizar.clicked.connect(self.cargar_presupuestos)
         layout.addWidget(boton_actualizar)
         
+        boton_exportar = Boton("📊 Exportar", "neutro")
+        boton_exportar.clicked.connect(self.exportar_presupuestos)
+        layout.addWidget(boton_exportar)
+        
         barra.setLayout(layout)
         return barra
     
@@ -120,7 +131,7 @@ class VentanaPresupuestos(QWidget):
         layout = QHBoxLayout()
         layout.setSpacing(15)
         
-        stats = ModuloPresupuestos.obtener_estadisticas_presupuestos()
+        stats = obtener_estadisticas("presupuestos", ModuloPresupuestos.obtener_estadisticas_presupuestos)
         
         # Total
         t1 = self.crear_tarjeta("Total Presupuestos", str(stats['total']), "#3498db")
@@ -214,9 +225,21 @@ class VentanaPresupuestos(QWidget):
         header.setSectionResizeMode(7, QHeaderView.Fixed)
         tabla.setColumnWidth(7, 320)
         
-        tabla.setStyleSheet(Estilos.tabla())
+        marcar(tabla, "tabla")
         return tabla
     
+    def exportar_presupuestos(self):
+        """Exporta los presupuestos filtrados a CSV o Excel"""
+        from interfaz.componentes.exportacion import DialogoExportacion
+        
+        consulta, parametros = ModuloPresupuestos.consulta_listar_presupuestos(
+            filtro_estado=self.combo_estado.currentData(),
+            solo_vencidos=self.check_vencidos.isChecked(),
+            busqueda=self.campo_busqueda.text().strip()
+        )
+        
+        DialogoExportacion.exportar("Exportar Presupuestos", consulta, parametros, ModuloPresupuestos.COLUMNAS_EXPORTACION, "presupuestos", self)
+    
     def cargar_presupuestos(self):
         """Carga los presupuestos en la tabla"""
         try:
@@ -400,6 +423,15 @@ class VentanaPresupuestos(QWidget):
         except Exception as e:
             Mensaje.error("Error", f"Error al generar PDF: {str(e)}", self)
     
+    def recibir_cambios(self, eventos):
+        """Recarga si la ventana está a la vista; si no, lo hace refrescar_datos al volver a mostrarla"""
+        if self.isVisible():
+            self.refrescar_datos()
+    
+    def refrescar_datos(self):
+        """Recarga los datos al volver a mostrar la ventana (ver RegistroVentanas)"""
+        self.cargar_presupuestos()
+    
     def volver_dashboard(self):
         """Vuelve al dashboard principal"""
         self.parent().setCurrentIndex(0)
@@ -435,7 +467,7 @@ class DialogoNuevoPresupuesto(QDialog):
         layout.addWidget(Etiqueta("Descripción del Trabajo:"))
         self.texto_descripcion = QTextEdit()
         self.texto_descripcion.setMinimumHeight(100)
-        self.texto_descripcion.setStyleSheet(Estilos.campo_texto_multilinea())
+        marcar(self.texto_descripcion, "campo")
         layout.addWidget(self.texto_descripcion)
         
         # Monto sin recargo
@@ -11,9 +11,8 @@ from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QLabel, QWidget)
 from PyQt5.QtCore import Qt
 from interfaz.componentes.componentes import Boton, CampoTexto, CampoContrasena, Mensaje
 from interfaz.estilos.estilos import Estilos
-from sistema_base.seguridad import crear_usuario
+from sistema_base.seguridad import crear_usuario, encriptar_contrasena
 from base_datos.conexion import db
-import bcrypt
 
 
 class VentanaPrimerUsuario(QDialog):
@@ -270,8 +269,8 @@ class VentanaPrimerUsuario(QDialog):
             return
         
         try:
-            # Hashear contraseña
-            password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+            # Hashear contraseña (con el costo calibrado para esta instalación)
+            password_hash = encriptar_contrasena(password)
             
             # Insertar en base de datos
             consulta = """
@@ -281,7 +280,7 @@ class VentanaPrimerUsuario(QDialog):
             
             db.ejecutar_consulta(
                 consulta,
-                (nombre, username, password_hash.decode('utf-8'), "admin", 1, 0)
+                (nombre, username, password_hash, "admin", 1, 0)
             )
             
             Mensaje.exito(
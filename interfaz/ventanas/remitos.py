@@ -16,8 +16,11 @@ from PyQt5.QtGui import QColor, QFont
 from interfaz.componentes.componentes import (Boton, CampoTexto, Etiqueta,
                                               Mensaje, ListaDesplegable)
 from interfaz.estilos.estilos import Estilos
+from interfaz.estilos.tema import marcar
+from interfaz.componentes.cambios import ReceptorCambios
 from modulos.remitos_LOGICA import ModuloRemitos
 from modulos.equipos_LOGICA import ModuloEquipos
+from impresion.motor_documentos import MotorDocumentos
 from sistema_base.configuracion import config
 from datetime import datetime
 
@@ -29,6 +32,10 @@ class VentanaRemitos(QWidget):
         super().__init__(parent)
         self.inicializar_ui()
         self.cargar_remitos()
+        
+        # Recargar cuando cambian los datos que muestra (ver base_datos.eventos)
+        self.receptor_cambios = ReceptorCambios(("remitos", "equipos", "clientes"), self)
+        self.receptor_cambios.cambios.connect(self.recibir_cambios)
     
     def inicializar_ui(self):
         """Inicializa la interfaz"""
@@ -235,7 +242,7 @@ class VentanaRemitos(QWidget):
         header.setSectionResizeMode(6, QHeaderView.Fixed)
         tabla.setColumnWidth(6, 200)
         
-        tabla.setStyleSheet(Estilos.tabla())
+        marcar(tabla, "tabla")
         return tabla
     
     def cargar_remitos(self):
@@ -377,12 +384,32 @@ class VentanaRemitos(QWidget):
         dialogo.exec_()
     
     def exportar_remitos(self):
-        """Exportar remitos a CSV"""
-        Mensaje.informacion(
-            "Exportar Remitos",
-            "La funcionalidad de exportación estará disponible próximamente.",
-            self
+        """Exporta los remitos filtrados a CSV o Excel"""
+        from interfaz.componentes.exportacion import DialogoExportacion
+        
+        fecha_desde = None
+        fecha_hasta = None
+        if self.check_filtro_fecha.isChecked():
+            fecha_desde = self.fecha_desde.date().toPyDate()
+            fecha_hasta = self.fecha_hasta.date().toPyDate()
+        
+        consulta, parametros = ModuloRemitos.consulta_listar_remitos(
+            busqueda=self.campo_busqueda.text().strip(),
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta,
+            solo_no_retirados=self.check_no_retirados.isChecked()
         )
+        
+        DialogoExportacion.exportar("Exportar Remitos", consulta, parametros, ModuloRemitos.COLUMNAS_EXPORTACION, "remitos", self)
+    
+    def recibir_cambios(self, eventos):
+        """Recarga si la ventana está a la vista; si no, lo hace refrescar_datos al volver a mostrarla"""
+        if self.isVisible():
+            self.refrescar_datos()
+    
+    def refrescar_datos(self):
+        """Recarga los datos al volver a mostrar la ventana (ver RegistroVentanas)"""
+        self.cargar_remitos()
     
     def volver_dashboard(self):
         """Vuelve al dashboard principal"""
@@ -699,6 +726,11 @@ class DialogoReimprimirRemito(QDialog):
         boton_imprimir.clicked.connect(self.imprimir)
         layout_botones.addWidget(boton_imprimir)
         
+        boton_ticket = Boton("🧾 Ticket", "secundario")
+        boton_ticket.setToolTip("Imprimir en la impresora térmica")
+        boton_ticket.clicked.connect(self.imprimir_ticket)
+        layout_botones.addWidget(boton_ticket)
+        
         layout_botones.addStretch()
         
         boton_cerrar = Boton("Cerrar", "neutro")
@@ -725,79 +757,68 @@ class DialogoReimprimirRemito(QDialog):
             config.guardar_log(f"Error al cargar remito para impresión: {e}", "ERROR")
     
     def generar_contenido_remito(self):
-        """Genera el contenido HTML del remito"""
-        try:
-            fecha = datetime.fromisoformat(str(self.remito['fecha_ingreso']).replace('Z', '+00:00'))
-            fecha_texto = fecha.strftime('%d/%m/%Y - %H:%M')
-        except:
-            fecha_texto = str(self.remito['fecha_ingreso'])
-        
-        html = f"""
-        <div style='font-family: Arial, sans-serif;'>
-            <div style='text-align: center; border-bottom: 3px solid #2563eb; padding-bottom: 15px; margin-bottom: 20px;'>
-                <h1 style='color: #2563eb; margin: 5px;'>{config.nombre_negocio}</h1>
-                <p style='margin: 3px; font-size: 10pt;'>{config.direccion_negocio}</p>
-                <p style='margin: 3px; font-size: 10pt;'>Tel: {config.telefono_negocio}</p>
-                <h2 style='color: #dc3545; margin-top: 15px;'>REMITO DE INGRESO</h2>
-                <p style='font-size: 14pt; font-weight: bold; margin: 5px;'>{self.remito['numero_remito']}</p>
-            </div>
-            
-            <div style='margin: 20px 0;'>
-                <p style='margin: 5px;'><b>Fecha de ingreso:</b> {fecha_texto}</p>
-            </div>
-            
-            <div style='background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 15px 0;'>
-                <h3 style='color: #2563eb; margin-top: 0;'>DATOS DEL CLIENTE</h3>
-                <p style='margin: 5px;'><b>Nombre:</b> {self.remito['cliente_nombre']}</p>
-                <p style='margin: 5px;'><b>Teléfono:</b> {self.remito['cliente_telefono']}</p>
-                {'<p style="margin: 5px;"><b>Dirección:</b> ' + self.remito.get('cliente_direccion', 'N/A') + '</p>' if self.remito.get('cliente_direccion') else ''}
-            </div>
-            
-            <div style='background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 15px 0;'>
-                <h3 style='color: #2563eb; margin-top: 0;'>DATOS DEL EQUIPO</h3>
-                <p style='margin: 5px;'><b>Tipo:</b> {self.remito['tipo_dispositivo']}</p>
-                <p style='margin: 5px;'><b>Marca:</b> {self.remito['marca']}</p>
-                <p style='margin: 5px;'><b>Modelo:</b> {self.remito['modelo']}</p>
-                {'<p style="margin: 5px;"><b>IMEI/Serie:</b> ' + self.remito.get('identificador', 'N/A') + '</p>' if self.remito.get('identificador') else ''}
-                {'<p style="margin: 5px;"><b>Accesorios:</b> ' + self.remito.get('accesorios', 'Ninguno') + '</p>' if self.remito.get('accesorios') else ''}
-                {'<p style="margin: 5px;"><b>Patrón/PIN:</b> ' + self.remito.get('patron_bloqueo', 'N/A') + '</p>' if self.remito.get('patron_bloqueo') else ''}
-            </div>
-            
-            <div style='background-color: #fff3cd; padding: 15px; border-radius: 5px; border: 2px solid #ffc107; margin: 15px 0;'>
-                <h3 style='color: #856404; margin-top: 0;'>FALLA REPORTADA</h3>
-                <p style='margin: 5px;'>{self.remito['falla_reportada']}</p>
-            </div>
-            
-            {'<div style="background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 15px 0;"><h3 style="color: #2563eb; margin-top: 0;">OBSERVACIONES</h3><p style="margin: 5px;">' + self.remito.get('observaciones_ingreso', '') + '</p></div>' if self.remito.get('observaciones_ingreso') else ''}
-            
-            <div style='margin-top: 30px; padding-top: 20px; border-top: 2px solid #dee2e6;'>
-                <p style='font-size: 9pt; color: #6c757d; text-align: center;'>{config.texto_pie_remito}</p>
-            </div>
-            
-            <div style='margin-top: 40px; text-align: center;'>
-                <p style='margin: 30px 0 5px 0;'>_________________________________</p>
-                <p style='margin: 0; font-weight: bold;'>Firma del Cliente</p>
-            </div>
-        </div>
-        """
-        
-        return html
+        """Genera el contenido HTML del remito desde la plantilla compilada"""
+        return MotorDocumentos.generar_html("remito", self.remito)
     
     def exportar_pdf(self):
         """Exportar a PDF"""
-        Mensaje.informacion(
-            "Exportar a PDF",
-            "La funcionalidad de exportación a PDF estará disponible próximamente.\n\nPor ahora puede usar el botón 'Imprimir' y seleccionar 'Guardar como PDF'.",
-            self
+        if not self.remito:
+            return
+        
+        from PyQt5.QtWidgets import QFileDialog
+        
+        ruta_sugerida = str(config.ruta_exportaciones / f"remito_{self.remito['numero_remito']}.pdf")
+        ruta_archivo, _ = QFileDialog.getSaveFileName(
+            self,
+            "Exportar Remito",
+            ruta_sugerida,
+            "Archivos PDF (*.pdf)"
         )
+        
+        if not ruta_archivo:
+            return
+        
+        try:
+            MotorDocumentos.generar_pdf("remito", self.remito, ruta_archivo)
+            config.guardar_log(f"Remito {self.remito['numero_remito']} exportado a PDF: {ruta_archivo}", "INFO")
+            Mensaje.exito("Exportar a PDF", f"Remito exportado a:\n{ruta_archivo}", self)
+        except ImportError:
+            Mensaje.error(
+                "Exportar a PDF",
+                "La librería reportlab no está instalada. Ejecute: pip install reportlab",
+                self
+            )
+        except Exception as e:
+            config.guardar_log(f"Error al exportar remito a PDF: {e}", "ERROR")
+            Mensaje.error("Error", f"Error al exportar: {str(e)}", self)
     
     def imprimir(self):
         """Imprimir el remito"""
         from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
         
+        if not self.remito:
+            return
+        
         printer = QPrinter(QPrinter.HighResolution)
         dialog = QPrintDialog(printer, self)
         
         if dialog.exec_() == QPrintDialog.Accepted:
-            self.texto_remito.print_(printer)
+            MotorDocumentos.imprimir("remito", self.remito, printer)
             Mensaje.exito("Impresión", "Remito enviado a imprimir", self)
+    
+    def imprimir_ticket(self):
+        """Imprime el remito en la impresora térmica (ESC/POS)"""
+        if not self.remito:
+            return
+        
+        if not config.impresora_termica_tipo:
+            Mensaje.advertencia(
+                "Impresora térmica",
+                "No hay una impresora térmica configurada.",
+                self
+            )
+            return
+        
+        from impresion.ticket_escpos import obtener_cola_impresion
+        obtener_cola_impresion().encolar("remito", self.remito)
+        Mensaje.exito("Impresión", "Ticket enviado a la impresora térmica", self)
@@ -8,7 +8,8 @@ Visualización de estadísticas y reportes del negocio
 """
 
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-                             QFrame, QTabWidget, QDateEdit, QCheckBox)
+                             QFrame, QTabWidget, QDateEdit, QCheckBox,
+                             QDialog, QProgressBar)
 from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QFont
 from interfaz.componentes.componentes import (Boton, Etiqueta, Mensaje)
@@ -86,6 +87,11 @@ class VentanaReportes(QWidget):
         boton_generar.clicked.connect(self.generar_reporte)
         layout.addWidget(boton_generar)
         
+        # Botón Exportar documentos
+        boton_exportar = Boton("📄 Exportar PDFs", "secundario")
+        boton_exportar.clicked.connect(self.exportar_documentos)
+        layout.addWidget(boton_exportar)
+        
         barra.setLayout(layout)
         return barra
     
@@ -288,6 +294,167 @@ class VentanaReportes(QWidget):
             self
         )
     
+    def exportar_documentos(self):
+        """Abre el diálogo de exportación de documentos en lote"""
+        dialogo = DialogoExportacionLote(
+            self.fecha_desde.date().toPyDate(),
+            self.fecha_hasta.date().toPyDate(),
+            self
+        )
+        dialogo.exec_()
+    
     def volver_dashboard(self):
         """Vuelve al dashboard principal"""
         self.parent().setCurrentIndex(0)
+
+
+class DialogoExportacionLote(QDialog):
+    """Diálogo para exportar a PDF los documentos de un rango de fechas"""
+    
+    def __init__(self, fecha_desde, fecha_hasta, parent=None):
+        super().__init__(parent)
+        self.trabajo = None
+        self.exportacion = None
+        self.inicializar_ui(fecha_desde, fecha_hasta)
+    
+    def inicializar_ui(self, fecha_desde, fecha_hasta):
+        """Inicializa la interfaz"""
+        self.setWindowTitle("Exportar Documentos a PDF")
+        self.setMinimumWidth(450)
+        self.setModal(True)
+        
+        layout = QVBoxLayout()
+        layout.setSpacing(15)
+        layout.setContentsMargins(20, 20, 20, 20)
+        
+        titulo = Etiqueta("Exportar documentos a PDF", "subtitulo")
+        layout.addWidget(titulo)
+        
+        # Rango de fechas
+        layout_fechas = QHBoxLayout()
+        layout_fechas.addWidget(QLabel("Desde:"))
+        self.fecha_desde = QDateEdit()
+        self.fecha_desde.setDate(QDate(fecha_desde.year, fecha_desde.month, fecha_desde.day))
+        self.fecha_desde.setCalendarPopup(True)
+        layout_fechas.addWidget(self.fecha_desde)
+        layout_fechas.addWidget(QLabel("Hasta:"))
+        self.fecha_hasta = QDateEdit()
+        self.fecha_hasta.setDate(QDate(fecha_hasta.year, fecha_hasta.month, fecha_hasta.day))
+        self.fecha_hasta.setCalendarPopup(True)
+        layout_fechas.addWidget(self.fecha_hasta)
+        layout.addLayout(layout_fechas)
+        
+        # Tipos de documento
+        self.check_presupuestos = QCheckBox("Presupuestos")
+        self.check_presupuestos.setChecked(True)
+        layout.addWidget(self.check_presupuestos)
+        
+        self.check_facturas = QCheckBox("Facturas")
+        self.check_facturas.setChecked(True)
+        layout.addWidget(self.check_facturas)
+        
+        self.check_remitos = QCheckBox("Remitos")
+        self.check_remitos.setChecked(True)
+        layout.addWidget(self.check_remitos)
+        
+        self.check_zip = QCheckBox("Comprimir en un archivo ZIP")
+        self.check_zip.setChecked(True)
+        layout.addWidget(self.check_zip)
+        
+        # Progreso
+        self.barra_progreso = QProgressBar()
+        self.barra_progreso.setValue(0)
+        layout.addWidget(self.barra_progreso)
+        
+        self.label_estado = QLabel("")
+        self.label_estado.setStyleSheet("color: #6c757d;")
+        layout.addWidget(self.label_estado)
+        
+        # Botones
+        layout_botones = QHBoxLayout()
+        
+        self.boton_exportar = Boton("📄 Exportar", "primario")
+        self.boton_exportar.clicked.connect(self.iniciar_exportacion)
+        layout_botones.addWidget(self.boton_exportar)
+        
+        self.boton_cancelar = Boton("Cancelar", "peligro")
+        self.boton_cancelar.clicked.connect(self.cancelar_exportacion)
+        self.boton_cancelar.setEnabled(False)
+        layout_botones.addWidget(self.boton_cancelar)
+        
+        layout_botones.addStretch()
+        
+        self.boton_cerrar = Boton("Cerrar", "neutro")
+        self.boton_cerrar.clicked.connect(self.reject)
+        layout_botones.addWidget(self.boton_cerrar)
+        
+        layout.addLayout(layout_botones)
+        self.setLayout(layout)
+    
+    def iniciar_exportacion(self):
+        """Inicia la exportación en un hilo de trabajo"""
+        from impresion.exportacion_lote import ExportacionLote
+        from interfaz.componentes.trabajos import TrabajoSegundoPlano
+        
+        tipos = []
+        if self.check_presupuestos.isChecked():
+            tipos.append("presupuestos")
+        if self.check_facturas.isChecked():
+            tipos.append("facturas")
+        if self.check_remitos.isChecked():
+            tipos.append("remitos")
+        
+        if not tipos:
+            Mensaje.advertencia("Exportar", "Seleccione al menos un tipo de documento", self)
+            return
+        
+        self.exportacion = ExportacionLote(
+            tipos,
+            self.fecha_desde.date().toPyDate(),
+            self.fecha_hasta.date().toPyDate(),
+            comprimir=self.check_zip.isChecked()
+        )
+        
+        self.trabajo = TrabajoSegundoPlano(self.exportacion.ejecutar, parent=self)
+        self.trabajo.progreso.connect(self.actualizar_progreso)
+        self.trabajo.terminado.connect(self.exportacion_terminada)
+        
+        self.boton_exportar.setEnabled(False)
+        self.boton_cerrar.setEnabled(False)
+        self.boton_cancelar.setEnabled(True)
+        self.barra_progreso.setValue(0)
+        self.label_estado.setText("Preparando documentos...")
+        self.trabajo.start()
+    
+    def actualizar_progreso(self, procesados, total):
+        """Actualiza la barra de progreso"""
+        self.barra_progreso.setMaximum(max(total, 1))
+        self.barra_progreso.setValue(procesados)
+        self.label_estado.setText(f"{procesados} de {total} documentos")
+    
+    def cancelar_exportacion(self):
+        """Cancela la exportación en curso"""
+        if self.exportacion:
+            self.exportacion.cancelar()
+            self.boton_cancelar.setEnabled(False)
+            self.label_estado.setText("Cancelando...")
+    
+    def exportacion_terminada(self, resultado):
+        """Muestra el resultado de la exportación"""
+        exito, mensaje, ruta = resultado
+        
+        self.boton_exportar.setEnabled(True)
+        self.boton_cerrar.setEnabled(True)
+        self.boton_cancelar.setEnabled(False)
+        self.label_estado.setText(mensaje)
+        
+        if exito:
+            Mensaje.exito("Exportar", f"{mensaje}\n\nUbicación:\n{ruta}", self)
+        else:
+            Mensaje.advertencia("Exportar", mensaje, self)
+    
+    def reject(self):
+        """Evita cerrar el diálogo con una exportación en curso"""
+        if self.trabajo and self.trabajo.isRunning():
+            return
+        super().reject()
@@ -16,6 +16,9 @@ from interfaz.componentes.componentes import (Boton, CampoTexto, Etiqueta,
                                               Mensaje, CampoTextoMultilinea,
                                               ListaDesplegable)
 from interfaz.estilos.estilos import Estilos
+from interfaz.estilos.tema import marcar
+from interfaz.componentes.precarga import obtener_estadisticas
+from interfaz.componentes.cambios import ReceptorCambios
 from modulos.repuestos_LOGICA import ModuloRepuestos
 from modulos.equipos_LOGICA import ModuloEquipos
 from sistema_base.configuracion import config
@@ -29,6 +32,10 @@ class VentanaRepuestos(QWidget):
         super().__init__(parent)
         self.inicializar_ui()
         self.cargar_repuestos()
+        
+        # Recargar cuando cambian los datos que muestra (ver base_datos.eventos)
+        self.receptor_cambios = ReceptorCambios(("repuestos", "repuestos_usados"), self)
+        self.receptor_cambios.cambios.connect(self.recibir_cambios)
     
     def inicializar_ui(self):
         """Inicializa la interfaz"""
@@ -53,8 +60,8 @@ class VentanaRepuestos(QWidget):
         layout.addWidget(barra)
         
         # Tarjetas estadísticas
-        tarjetas = self.crear_tarjetas_estadisticas()
-        layout.addWidget(tarjetas)
+        self.tarjetas = self.crear_tarjetas_estadisticas()
+        layout.addWidget(self.tarjetas)
         
         # Tabla
         self.tabla = self.crear_tabla_repuestos()
@@ -112,6 +119,10 @@ class VentanaRepuestos(QWidget):
         boton_actualizar.clicked.connect(self.cargar_repuestos)
         layout.addWidget(boton_actualizar)
         
+        boton_exportar = Boton("📊 Exportar", "neutro")
+        boton_exportar.clicked.connect(self.exportar_repuestos)
+        layout.addWidget(boton_exportar)
+        
         barra.setLayout(layout)
         return barra
     
@@ -122,7 +133,7 @@ class VentanaRepuestos(QWidget):
         layout = QHBoxLayout()
         layout.setSpacing(15)
         
-        stats = ModuloRepuestos.obtener_estadisticas_repuestos()
+        stats = obtener_estadisticas("repuestos", ModuloRepuestos.obtener_estadisticas_repuestos)
         
         # Total items
         t1 = self.crear_tarjeta("Items Diferentes", str(stats.get('total_items', 0)), "#3498db")
@@ -215,9 +226,21 @@ class VentanaRepuestos(QWidget):
         header.setSectionResizeMode(7, QHeaderView.Fixed)
         tabla.setColumnWidth(7, 200)
         
-        tabla.setStyleSheet(Estilos.tabla())
+        marcar(tabla, "tabla")
         return tabla
     
+    def exportar_repuestos(self):
+        """Exporta los repuestos filtrados a CSV o Excel"""
+        from interfaz.componentes.exportacion import DialogoExportacion
+        
+        consulta, parametros = ModuloRepuestos.consulta_listar_repuestos(
+            filtro_tipo_repuesto=self.combo_tipo_repuesto.currentData(),
+            filtro_origen=self.combo_origen.currentData(),
+            busqueda=self.campo_busqueda.text().strip()
+        )
+        
+        DialogoExportacion.exportar("Exportar Repuestos", consulta, parametros, ModuloRepuestos.COLUMNAS_EXPORTACION, "repuestos", self)
+    
     def cargar_repuestos(self):
         """Carga los repuestos"""
         try:
@@ -332,6 +355,20 @@ class VentanaRepuestos(QWidget):
         dialogo = DialogoHistorialRepuesto(id_repuesto, self)
         dialogo.exec_()
     
+    def recibir_cambios(self, eventos):
+        """Recarga si la ventana está a la vista; si no, lo hace refrescar_datos al volver a mostrarla"""
+        if self.isVisible():
+            self.refrescar_datos()
+    
+    def refrescar_datos(self):
+        """Recarga los datos al volver a mostrar la ventana (ver RegistroVentanas)"""
+        # Las tarjetas se arman una vez: reemplazarlas con valores nuevos
+        tarjetas = self.crear_tarjetas_estadisticas()
+        self.layout().replaceWidget(self.tarjetas, tarjetas)
+        self.tarjetas.deleteLater()
+        self.tarjetas = tarjetas
+        self.cargar_repuestos()
+    
     def volver_dashboard(self):
         """Vuelve al dashboard principal"""
         self.parent().setCurrentIndex(0)
@@ -743,6 +780,8 @@ class DialogoDetalleRepuesto(QDialog):
         texto += f"<b>Modelos compatibles:</b> {self.repuesto['modelos_compatibles'] if self.repuesto['modelos_compatibles'] else 'N/A'}<br>"
         texto += f"<b>Origen:</b> {self.repuesto['origen']}<br>"
         texto += f"<b>Stock disponible:</b> {self.repuesto['cantidad_disponible']}<br>"
+        if self.repuesto['cantidad_reservada']:
+            texto += f"<b>Reservado para órdenes:</b> {self.repuesto['cantidad_reservada']}<br>"
         texto += f"<b>Estado:</b> {self.repuesto['estado']}<br>"
         texto += f"<b>Precio referencia:</b> {formatear_dinero(self.repuesto['precio_referencia'])}<br>"
         
@@ -793,7 +832,7 @@ class DialogoHistorialRepuesto(QDialog):
         header.setSectionResizeMode(3, QHeaderView.Stretch)
         header.setSectionResizeMode(4, QHeaderView.ResizeToContents)
         
-        self.tabla.setStyleSheet(Estilos.tabla())
+        marcar(self.tabla, "tabla")
         layout.addWidget(self.tabla, 1)
         
         # Botón cerrar
@@ -16,6 +16,8 @@ from PyQt5.QtGui import QColor, QPixmap
 from interfaz.componentes.componentes import (Boton, CampoTexto, Etiqueta,
                                               ListaDesplegable, Mensaje)
 from interfaz.estilos.estilos import Estilos
+from interfaz.estilos.tema import marcar
+from interfaz.componentes.cambios import ReceptorCambios
 from modulos.usuarios import ModuloUsuarios
 from sistema_base.seguridad import generar_contrasena_temporal
 from sistema_base.configuracion import config
@@ -26,8 +28,13 @@ class VentanaUsuarios(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.estadisticas_vencidas = False
         self.inicializar_ui()
         self.cargar_usuarios()
+        
+        # Las tarjetas se actualizan solas cuando cambia un usuario (ver base_datos.eventos)
+        self.receptor_cambios = ReceptorCambios(("usuarios",), self)
+        self.receptor_cambios.cambios.connect(self.recibir_cambios)
     
     def inicializar_ui(self):
         """Inicializa la interfaz de usuario"""
@@ -90,6 +97,11 @@ class VentanaUsuarios(QWidget):
         boton_actualizar.clicked.connect(self.cargar_usuarios)
         layout.addWidget(boton_actualizar)
         
+        # Botón Exportar
+        boton_exportar = Boton("📊 Exportar", "neutro")
+        boton_exportar.clicked.connect(self.exportar_usuarios)
+        layout.addWidget(boton_exportar)
+        
         # Botón Volver
         boton_volver = Boton("← Volver", "primario")
         boton_volver.clicked.connect(self.volver_dashboard)
@@ -107,6 +119,7 @@ class VentanaUsuarios(QWidget):
         
         # Obtener estadísticas
         stats = ModuloUsuarios.obtener_estadisticas_usuarios()
+        self.valores_estadisticas = {}
         
         # Tarjeta Total
         tarjeta_total = self.crear_tarjeta_estadistica(
@@ -114,6 +127,7 @@ class VentanaUsuarios(QWidget):
             str(stats.get('total', 0)),
             "#3498db"
         )
+        self.valores_estadisticas['total'] = tarjeta_total.label_valor
         layout.addWidget(tarjeta_total)
         
         # Tarjeta Activos
@@ -122,6 +136,7 @@ class VentanaUsuarios(QWidget):
             str(stats.get('activos', 0)),
             "#28a745"
         )
+        self.valores_estadisticas['activos'] = tarjeta_activos.label_valor
         layout.addWidget(tarjeta_activos)
         
         # Tarjeta Inactivos
@@ -130,6 +145,7 @@ class VentanaUsuarios(QWidget):
             str(stats.get('inactivos', 0)),
             "#dc3545"
         )
+        self.valores_estadisticas['inactivos'] = tarjeta_inactivos.label_valor
         layout.addWidget(tarjeta_inactivos)
         
         # Tarjeta Administradores
@@ -138,6 +154,7 @@ class VentanaUsuarios(QWidget):
             str(stats.get('administradores', 0)),
             "#ffc107"
         )
+        self.valores_estadisticas['administradores'] = tarjeta_admin.label_valor
         layout.addWidget(tarjeta_admin)
         
         # Tarjeta Técnicos
@@ -146,6 +163,7 @@ class VentanaUsuarios(QWidget):
             str(stats.get('tecnicos', 0)),
             "#17a2b8"
         )
+        self.valores_estadisticas['tecnicos'] = tarjeta_tecnicos.label_valor
         layout.addWidget(tarjeta_tecnicos)
         
         contenedor.setLayout(layout)
@@ -198,6 +216,7 @@ class VentanaUsuarios(QWidget):
         layout.addWidget(label_valor)
         
         tarjeta.setLayout(layout)
+        tarjeta.label_valor = label_valor
         return tarjeta
     
     def crear_tabla_usuarios(self):
@@ -227,10 +246,18 @@ class VentanaUsuarios(QWidget):
         tabla.setColumnWidth(6, 300)
         
         # Aplicar estilos
-        tabla.setStyleSheet(Estilos.tabla())
+        marcar(tabla, "tabla")
         
         return tabla
     
+    def exportar_usuarios(self):
+        """Exporta los usuarios filtrados a CSV o Excel"""
+        from interfaz.componentes.exportacion import DialogoExportacion
+        
+        consulta, parametros = ModuloUsuarios.consulta_listar_usuarios(busqueda=self.campo_busqueda.text().strip())
+        
+        DialogoExportacion.exportar("Exportar Usuarios", consulta, parametros, ModuloUsuarios.COLUMNAS_EXPORTACION, "usuarios", self)
+    
     def cargar_usuarios(self):
         """Carga los usuarios en la tabla"""
         try:
@@ -344,10 +371,17 @@ class VentanaUsuarios(QWidget):
         """Actualiza las tarjetas de estadísticas"""
         # Recargar estadísticas
         stats = ModuloUsuarios.obtener_estadisticas_usuarios()
+        self.estadisticas_vencidas = False
         
-        # Actualizar valores (esto requeriría acceso a las tarjetas)
-        # Por simplicidad, se puede implementar recargando toda la ventana
-        # O guardando referencias a las etiquetas de valor
+        for clave, label_valor in self.valores_estadisticas.items():
+            label_valor.setText(str(stats.get(clave, 0)))
+    
+    def recibir_cambios(self, eventos):
+        """Actualiza las tarjetas si la ventana está a la vista; si no, al volver a mostrarla"""
+        if self.isVisible():
+            self.actualizar_estadisticas()
+        else:
+            self.estadisticas_vencidas = True
     
     def abrir_dialogo_nuevo_usuario(self):
         """Abre el diálogo para crear un nuevo usuario"""
@@ -398,6 +432,12 @@ class VentanaUsuarios(QWidget):
         dialogo = DialogoHistorialUsuario(id_usuario, self)
         dialogo.exec_()
     
+    def refrescar_datos(self):
+        """Recarga los datos al volver a mostrar la ventana (ver RegistroVentanas)"""
+        self.cargar_usuarios()
+        if self.estadisticas_vencidas:
+            self.actualizar_estadisticas()
+    
     def volver_dashboard(self):
         """Vuelve al dashboard principal"""
         self.parent().setCurrentIndex(0)
@@ -1087,7 +1127,7 @@ class DialogoHistorialUsuario(QDialog):
         header.setSectionResizeMode(5, QHeaderView.Stretch)
         header.setSectionResizeMode(6, QHeaderView.ResizeToContents)
         
-        self.tabla.setStyleSheet(Estilos.tabla())
+        marcar(self.tabla, "tabla")
         
         layout.addWidget(self.tabla, 1)
         
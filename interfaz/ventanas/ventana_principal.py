@@ -7,12 +7,14 @@ Ventana principal con QStackedWidget para navegación limpia
 ============================================================================
 """
 
+import importlib
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QLabel, QPushButton, QFrame, QStackedWidget, QScrollArea,
                              QGridLayout, QGraphicsDropShadowEffect, QDialog)
 from PyQt5.QtCore import Qt, QSize
 from PyQt5.QtGui import QIcon, QFont, QColor, QPixmap
 from interfaz.componentes.componentes import Mensaje
+from interfaz.componentes.registro_ventanas import RegistroVentanas
 from interfaz.estilos.estilos import Estilos
 from sistema_base.configuracion import config
 from sistema_base.seguridad import registrar_logout
@@ -52,6 +54,9 @@ class VentanaPrincipal(QMainWindow):
         dashboard = self.crear_dashboard()
         self.stacked_widget.addWidget(dashboard)
         
+        # Ventanas de módulos abiertas (se reutilizan, ver RegistroVentanas)
+        self.registro_ventanas = RegistroVentanas(self.stacked_widget)
+        
         layout_principal.addWidget(self.stacked_widget, 1)
         
         widget_central.setLayout(layout_principal)
@@ -285,69 +290,40 @@ class VentanaPrincipal(QMainWindow):
         
         return tarjeta
     
+    # Módulo -> (módulo de interfaz, clase de la ventana)
+    VENTANAS_MODULOS = {
+        "usuarios": ("interfaz.ventanas.usuarios", "VentanaUsuarios"),
+        "clientes": ("interfaz.ventanas.clientes", "VentanaClientes"),
+        "equipos": ("interfaz.ventanas.equipos", "VentanaEquipos"),
+        "remitos": ("interfaz.ventanas.remitos", "VentanaRemitos"),
+        "presupuestos": ("interfaz.ventanas.presupuestos", "VentanaPresupuestos"),
+        "ordenes": ("interfaz.ventanas.ordenes", "VentanaOrdenes"),
+        "repuestos": ("interfaz.ventanas.repuestos", "VentanaRepuestos"),
+        "facturacion": ("interfaz.ventanas.facturacion_pagos", "VentanaFacturacionPagos"),
+        "garantias": ("interfaz.ventanas.garantias", "VentanaGarantias"),
+        "reportes": ("interfaz.ventanas.reportes", "VentanaReportes"),
+        "configuracion": ("interfaz.ventanas.configuracion", "VentanaConfiguracion"),
+        "auditoria": ("interfaz.ventanas.auditoria", "VentanaAuditoria"),
+        "backups": ("interfaz.ventanas.backups", "VentanaBackups"),
+    }
+    
     def abrir_modulo(self, id_modulo):
-        """Abre un módulo en el QStackedWidget"""
+        """Abre un módulo en el QStackedWidget (reutiliza su ventana si ya está abierta)"""
         try:
-            ventana_modulo = None
-            
-            if id_modulo == "usuarios":
-                from interfaz.ventanas.usuarios import VentanaUsuarios
-                ventana_modulo = VentanaUsuarios(self.stacked_widget)
-            
-            elif id_modulo == "clientes":
-                from interfaz.ventanas.clientes import VentanaClientes
-                ventana_modulo = VentanaClientes(self.stacked_widget)
-            
-            elif id_modulo == "equipos":
-                from interfaz.ventanas.equipos import VentanaEquipos
-                ventana_modulo = VentanaEquipos(self.stacked_widget)
-            
-            elif id_modulo == "remitos":
-                from interfaz.ventanas.remitos import VentanaRemitos
-                ventana_modulo = VentanaRemitos(self.stacked_widget)
-            
-            elif id_modulo == "presupuestos":
-                from interfaz.ventanas.presupuestos import VentanaPresupuestos
-                ventana_modulo = VentanaPresupuestos(self.stacked_widget)
-            
-            elif id_modulo == "ordenes":
-                from interfaz.ventanas.ordenes import VentanaOrdenes
-                ventana_modulo = VentanaOrdenes(self.stacked_widget)
+            # Pagos y facturación comparten ventana
+            if id_modulo == "pagos":
+                id_modulo = "facturacion"
             
-            elif id_modulo == "repuestos":
-                from interfaz.ventanas.repuestos import VentanaRepuestos
-                ventana_modulo = VentanaRepuestos(self.stacked_widget)
-            
-            elif id_modulo == "pagos" or id_modulo == "facturacion":
-                from interfaz.ventanas.facturacion_pagos import VentanaFacturacionPagos
-                ventana_modulo = VentanaFacturacionPagos(self.stacked_widget)
-            
-            elif id_modulo == "garantias":
-                from interfaz.ventanas.garantias import VentanaGarantias
-                ventana_modulo = VentanaGarantias(self.stacked_widget)
-            
-            elif id_modulo == "reportes":
-                from interfaz.ventanas.reportes import VentanaReportes
-                ventana_modulo = VentanaReportes(self.stacked_widget)
-            
-            elif id_modulo == "configuracion":
-                from interfaz.ventanas.configuracion import VentanaConfiguracion
-                ventana_modulo = VentanaConfiguracion(self.stacked_widget)
-            
-            elif id_modulo == "auditoria":
-                from interfaz.ventanas.auditoria import VentanaAuditoria
-                ventana_modulo = VentanaAuditoria(self.stacked_widget)
+            if id_modulo not in self.VENTANAS_MODULOS:
+                Mensaje.advertencia("Módulo no disponible", f"El módulo '{id_modulo}' no está implementado", self)
+                return
             
-            elif id_modulo == "backups":
-                from interfaz.ventanas.backups import VentanaBackups
-                ventana_modulo = VentanaBackups(self.stacked_widget)
+            def crear_ventana(stacked_widget):
+                nombre_modulo, nombre_clase = self.VENTANAS_MODULOS[id_modulo]
+                clase = getattr(importlib.import_module(nombre_modulo), nombre_clase)
+                return clase(stacked_widget)
             
-            if ventana_modulo:
-                # Agregar al stack y mostrar
-                self.stacked_widget.addWidget(ventana_modulo)
-                self.stacked_widget.setCurrentWidget(ventana_modulo)
-            else:
-                Mensaje.advertencia("Módulo no disponible", f"El módulo '{id_modulo}' no está implementado", self)
+            self.registro_ventanas.abrir(id_modulo, crear_ventana)
         
         except (ModuleNotFoundError, ImportError) as e:
             Mensaje.error("Error", f"No se pudo cargar el módulo: {str(e)}", self)
@@ -365,6 +341,7 @@ class VentanaPrincipal(QMainWindow):
         if confirmacion:
             registrar_logout(self.usuario['id_usuario'])
             config.cerrar_sesion()
+            self.registro_ventanas.cerrar_todas()
             self.close()
             
             from interfaz.ventanas.login import VentanaLogin
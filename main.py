@@ -21,23 +21,17 @@ sys.path.insert(0, str(Path(__file__).parent))
 def verificar_dependencias():
     """
     Verifica que todas las dependencias necesarias estén instaladas
-    """
-    dependencias_faltantes = []
     
-    try:
-        from PyQt5 import QtWidgets
-    except ImportError:
-        dependencias_faltantes.append("PyQt5")
+    Solo busca los paquetes, sin importarlos: cada uno se carga recién
+    cuando se usa, para que el splash aparezca cuanto antes.
+    """
+    from importlib.util import find_spec
     
-    try:
-        from PIL import Image
-    except ImportError:
-        dependencias_faltantes.append("Pillow")
+    dependencias_faltantes = []
     
-    try:
-        import bcrypt
-    except ImportError:
-        dependencias_faltantes.append("bcrypt")
+    for modulo, paquete in (("PyQt5", "PyQt5"), ("PIL", "Pillow"), ("bcrypt", "bcrypt")):
+        if find_spec(modulo) is None:
+            dependencias_faltantes.append(paquete)
     
     if dependencias_faltantes:
         print("=" * 70)
@@ -74,7 +68,25 @@ def crear_directorios_necesarios():
 def main():
     """
     Función principal que inicia el sistema
+    
+    Con --perfil-arranque se guarda en logs/ el tiempo de cada etapa y de
+    cada importación hasta que aparece la primera ventana.
+    
+    Con --servidor http://PC:8765 la estación trabaja contra el servidor
+    del local (python -m servidor) en lugar de abrir la base directamente.
     """
+    from sistema_base.perfil_arranque import perfil
+    
+    if "--perfil-arranque" in sys.argv:
+        sys.argv.remove("--perfil-arranque")
+        perfil.activar()
+    
+    url_servidor = None
+    if "--servidor" in sys.argv:
+        posicion = sys.argv.index("--servidor")
+        url_servidor = sys.argv[posicion + 1] if posicion + 1 < len(sys.argv) else None
+        del sys.argv[posicion:posicion + 2]
+    
     print("=" * 70)
     print("TECHMANAGER v1.0 - Sistema de Gestión para Servicio Técnico")
     print("=" * 70)
@@ -82,29 +94,59 @@ def main():
     
     # 1. Verificar dependencias
     print("  [1/4] Verificando dependencias...")
-    verificar_dependencias()
+    with perfil.etapa("Verificar dependencias"):
+        verificar_dependencias()
     
     # 2. Crear directorios necesarios
     print("  [2/4] Creando directorios necesarios...")
-    crear_directorios_necesarios()
+    with perfil.etapa("Crear directorios"):
+        crear_directorios_necesarios()
     
-    # 3. Inicializar base de datos
+    # Mostrar el splash antes de cargar el resto
+    with perfil.etapa("Iniciar Qt y mostrar splash"):
+        from PyQt5.QtWidgets import QApplication
+        app_qt = QApplication(sys.argv)
+        
+        from interfaz.splash_screen import SplashScreenModerno
+        splash = SplashScreenModerno()
+        splash.show()
+        app_qt.processEvents()
+    
+    # 3. Inicializar base de datos (o conectarse al servidor, que ya la inicializó)
     print("  [3/4] Inicializando base de datos...")
-    from base_datos.crear_tablas import inicializar_base_datos
-    inicializar_base_datos()
+    splash.actualizar_progreso(30, "Verificando base de datos...")
+    app_qt.processEvents()
+    with perfil.etapa("Base de datos"):
+        if url_servidor:
+            from servidor.cliente import instalar_cliente
+            instalar_cliente(url_servidor)
+        else:
+            from base_datos.crear_tablas import inicializar_base_datos
+            from base_datos.particiones import rotar_auditoria
+            inicializar_base_datos()
+            # Pasar el mes que cerró a su partición (no hace nada el resto del mes)
+            rotar_auditoria()
     
     # 4. Iniciar interfaz gráfica
     print("  [4/4] Iniciando interfaz gráfica...")
-    from interfaz.aplicacion import AplicacionPrincipal
+    splash.actualizar_progreso(70, "Cargando interfaz...")
+    app_qt.processEvents()
+    with perfil.etapa("Cargar interfaz"):
+        from interfaz.aplicacion import AplicacionPrincipal
+        app = AplicacionPrincipal()
     
-    app = AplicacionPrincipal()
-    app.iniciar()
+    splash.actualizar_progreso(100, "Listo")
+    app.iniciar(splash)
     
     print("\nSistema cerrado correctamente.")
     print("=" * 70)
 
 
 if __name__ == "__main__":
+    # Necesario para los procesos de trabajo en el ejecutable de Windows
+    import multiprocessing
+    multiprocessing.freeze_support()
+    
     try:
         main()
     except KeyboardInterrupt:
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - MÓDULO DE ARCHIVO HISTÓRICO
+============================================================================
+Mueve los datos viejos a una base de archivo por año, para que la base
+de trabajo (y sus backups diarios) quede chica.
+
+Se archivan los equipos entregados hace más de N años (configurable)
+que no tienen deudas ni garantías vigentes, junto con sus presupuestos,
+órdenes, repuestos usados, pagos, facturas, garantías, remitos,
+comprobantes y notas; y los meses del log de auditoría (particiones,
+ver base_datos.particiones) de la misma antigüedad. Cada registro va al
+archivo del año en que se entregó el equipo (o del mes de la partición):
+datos/archivo/techmanager_archivo_AAAA.db
+
+Las pantallas de historial leen el archivo con ATTACH cuando se pide
+incluirlo: fuente("equipos", True) devuelve una vista temporal que une
+la tabla de trabajo con la de todos los archivos.
+============================================================================
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from base_datos.conexion import db
+from base_datos.particiones import (PREFIJO_PARTICION, TABLA_ACTUAL, listar_particiones,
+                                    rotar_auditoria, actualizar_vista)
+from sistema_base.configuracion import config
+
+
+class ModuloArchivo:
+    """Clase para manejar el archivo histórico de datos"""
+
+    # Equipos a archivar en la corrida en curso (tabla temporal)
+    EQUIPOS = "(SELECT id_equipo FROM temp.equipos_a_archivar WHERE anio = ?)"
+    ORDENES = f"(SELECT id_orden FROM main.ordenes_trabajo WHERE id_equipo IN {EQUIPOS})"
+
+    # Tablas en el orden en que se mueven (primero las que referencian a otras)
+    # -> condición sobre la tabla de trabajo; cada '?' recibe el año
+    TABLAS_ARCHIVADAS = [
+        ("repuestos_usados", f"id_orden IN {ORDENES}"),
+        ("pagos", f"id_orden IN {ORDENES}"),
+        ("facturacion", f"id_orden IN {ORDENES}"),
+        ("garantias", f"id_equipo IN {EQUIPOS}"),
+        ("comprobantes_entrega", f"id_equipo IN {EQUIPOS}"),
+        ("equipos_abandonados", f"id_equipo IN {EQUIPOS}"),
+        ("ordenes_trabajo", f"id_equipo IN {EQUIPOS}"),
+        ("presupuestos", f"id_equipo IN {EQUIPOS}"),
+        ("remitos", f"id_equipo IN {EQUIPOS}"),
+        ("historial_notas", f"modulo = 'Equipos' AND id_registro IN {EQUIPOS}"),
+        ("equipos", f"id_equipo IN {EQUIPOS}"),
+    ]
+
+    # Columnas que se indexan en las tablas del archivo (si las tienen)
+    COLUMNAS_INDEXADAS = ("id_equipo", "id_orden", "id_cliente", "id_usuario")
+
+    @staticmethod
+    def carpeta_archivo():
+        """
+        Carpeta de los archivos históricos (junto a la base de datos)
+
+        Returns:
+            Path: Carpeta (se crea si no existe)
+        """
+        carpeta = Path(config.ruta_base_datos).parent / "archivo"
+        carpeta.mkdir(parents=True, exist_ok=True)
+        return carpeta
+
+    @staticmethod
+    def listar_archivos():
+        """
+        Archivos históricos existentes
+
+        Returns:
+            list: Tuplas (año, ruta), del más viejo al más nuevo
+        """
+        archivos = []
+        for ruta in sorted(ModuloArchivo.carpeta_archivo().glob("techmanager_archivo_*.db")):
+            anio = ruta.stem.rsplit("_", 1)[-1]
+            if anio.isdigit():
+                archivos.append((anio, ruta))
+        return archivos
+
+    @staticmethod
+    def _esquemas_adjuntos(conexion):
+        return {fila[1] for fila in conexion.execute("PRAGMA database_list")}
+
+    @staticmethod
+    def _columnas(conexion, esquema, tabla):
+        return [fila[1] for fila in conexion.execute(f"PRAGMA {esquema}.table_info({tabla})")]
+
+    @staticmethod
+    def _adjuntar(conexion, anio):
+        esquema = f"archivo_{anio}"
+        if esquema not in ModuloArchivo._esquemas_adjuntos(conexion):
+            ruta = ModuloArchivo.carpeta_archivo() / f"techmanager_archivo_{anio}.db"
+            conexion.execute(f"ATTACH DATABASE ? AS {esquema}", (str(ruta),))
+        return esquema
+
+    @staticmethod
+    def _soltar_archivos(conexion):
+        """Borra las vistas de historial y separa los archivos de la conexión"""
+        for (vista,) in conexion.execute(
+            "SELECT name FROM temp.sqlite_master WHERE type = 'view' AND name LIKE 'historial_%'"
+        ).fetchall():
+            conexion.execute(f"DROP VIEW temp.{vista}")
+        for esquema in ModuloArchivo._esquemas_adjuntos(conexion):
+            if esquema.startswith("archivo_"):
+                conexion.execute(f"DETACH DATABASE {esquema}")
+
+    @staticmethod
+    def fuente(tabla, incluir_archivo=False):
+        """
+        Tabla o vista a usar en el FROM de una consulta de historial
+
+        Args:
+            tabla (str): Tabla archivable (ver TABLAS_ARCHIVADAS)
+            incluir_archivo (bool): Unir también los datos archivados
+
+        Returns:
+            str: 'tabla' o 'temp.historial_tabla'
+        """
+        if not incluir_archivo:
+            return tabla
+
+        conexion = db.conectar()
+        archivos = ModuloArchivo.listar_archivos()
+        esquemas = [ModuloArchivo._adjuntar(conexion, anio) for anio, _ in archivos]
+
+        vista = f"historial_{tabla}"
+        existe = conexion.execute(
+            "SELECT sql FROM temp.sqlite_master WHERE type = 'view' AND name = ?", (vista,)
+        ).fetchone()
+
+        # La vista lleva la lista de archivos unidos: rehacerla si cambió
+        firma = f"-- {','.join(esquemas)}"
+        if existe is None or not existe[0].endswith(firma):
+            columnas = ModuloArchivo._columnas(conexion, "main", tabla)
+            partes = [f"SELECT {', '.join(columnas)} FROM main.{tabla}"]
+            for esquema in esquemas:
+                archivadas = set(ModuloArchivo._columnas(conexion, esquema, tabla))
+                if not archivadas:
+                    continue
+                # Columnas agregadas a la tabla después de archivar ese año
+                lista = ", ".join(c if c in archivadas else f"NULL AS {c}" for c in columnas)
+                partes.append(f"SELECT {lista} FROM {esquema}.{tabla}")
+
+            conexion.execute(f"DROP VIEW IF EXISTS temp.{vista}")
+            conexion.execute(f"CREATE TEMP VIEW {vista} AS {' UNION ALL '.join(partes)}\n{firma}")
+
+        return f"temp.{vista}"
+
+    @staticmethod
+    def _preparar_tabla(cursor, esquema, tabla):
+        """Crea la tabla en el archivo o le agrega las columnas nuevas de la de trabajo"""
+        columnas = ModuloArchivo._columnas(cursor.connection, "main", tabla)
+        archivadas = ModuloArchivo._columnas(cursor.connection, esquema, tabla)
+
+        if not archivadas:
+            cursor.execute(f"CREATE TABLE {esquema}.{tabla} AS SELECT * FROM main.{tabla} WHERE 0")
+            for columna in ModuloArchivo.COLUMNAS_INDEXADAS:
+                if columna in columnas:
+                    cursor.execute(
+                        f"CREATE INDEX IF NOT EXISTS {esquema}.idx_{tabla}_{columna} ON {tabla}({columna})"
+                    )
+        else:
+            for columna in columnas:
+                if columna not in archivadas:
+                    cursor.execute(f"ALTER TABLE {esquema}.{tabla} ADD COLUMN {columna}")
+        return columnas
+
+    @staticmethod
+    def _mover(cursor, esquema, tabla, condicion, parametros):
+        """Copia al archivo las filas que cumplen la condición y las borra de la base de trabajo"""
+        columnas = ", ".join(ModuloArchivo._preparar_tabla(cursor, esquema, tabla))
+        cursor.execute(
+            f"INSERT INTO {esquema}.{tabla} ({columnas}) SELECT {columnas} FROM main.{tabla} WHERE {condicion}",
+            parametros
+        )
+        cursor.execute(f"DELETE FROM main.{tabla} WHERE {condicion}", parametros)
+        return cursor.rowcount
+
+    @staticmethod
+    def _mover_particion(cursor, esquema, particion):
+        """Copia un mes del log de auditoría al logs_sistema del archivo y borra la partición"""
+        ModuloArchivo._preparar_tabla(cursor, esquema, TABLA_ACTUAL)
+        columnas = ", ".join(ModuloArchivo._columnas(cursor.connection, "main", particion))
+        cursor.execute(
+            f"INSERT INTO {esquema}.{TABLA_ACTUAL} ({columnas}) SELECT {columnas} FROM main.{particion}"
+        )
+        cantidad = cursor.rowcount
+        cursor.execute(f"DROP TABLE main.{particion}")
+        return cantidad
+
+    @staticmethod
+    def archivar(anios_antiguedad=None, id_usuario=None, compactar=True):
+        """
+        Mueve los datos viejos a los archivos por año
+
+        Args:
+            anios_antiguedad (int): Años desde la entrega (None = configuración)
+            id_usuario (int): Usuario que lo ejecuta (para auditoría)
+            compactar (bool): Compactar la base de trabajo al terminar (VACUUM)
+
+        Returns:
+            tuple: (exito, mensaje, {tabla: filas movidas})
+        """
+        try:
+            anios = anios_antiguedad or config.archivo_anios_antiguedad
+            limite = datetime.now() - timedelta(days=365 * anios)
+            conexion = db.conectar()
+            ModuloArchivo._soltar_archivos(conexion)
+
+            # Equipos entregados antes del límite, sin deudas ni garantías vigentes
+            # (ni repuestos en stock sacados de ellos, que los referencian)
+            conexion.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS equipos_a_archivar (
+                    id_equipo INTEGER PRIMARY KEY,
+                    anio TEXT NOT NULL
+                )
+            """)
+            with db.transaccion() as cursor:
+                cursor.execute("DELETE FROM temp.equipos_a_archivar")
+                cursor.execute("""
+                    INSERT INTO temp.equipos_a_archivar (id_equipo, anio)
+                    SELECT e.id_equipo, strftime('%Y', e.fecha_cambio_estado)
+                    FROM main.equipos e
+                    WHERE e.estado_actual = 'Entregado'
+                      AND e.fecha_cambio_estado < ?
+                      AND NOT EXISTS (
+                          SELECT 1 FROM main.ordenes_trabajo o
+                          INNER JOIN main.facturacion f ON f.id_orden = o.id_orden
+                          WHERE o.id_equipo = e.id_equipo AND f.monto_adeudado > 0
+                      )
+                      AND NOT EXISTS (
+                          SELECT 1 FROM main.garantias g
+                          WHERE g.id_equipo = e.id_equipo AND g.fecha_vencimiento >= ?
+                      )
+                      AND NOT EXISTS (
+                          SELECT 1 FROM main.repuestos r WHERE r.id_equipo_origen = e.id_equipo
+                      )
+                """, (limite, datetime.now()))
+
+            anios_equipos = [fila[0] for fila in conexion.execute(
+                "SELECT DISTINCT anio FROM temp.equipos_a_archivar WHERE anio IS NOT NULL"
+            )]
+
+            # Meses del log de auditoría enteramente anteriores al límite
+            rotar_auditoria()
+            mes_limite = limite.strftime("%Y_%m")
+            particiones = [p for p in listar_particiones() if p[len(PREFIJO_PARTICION):] < mes_limite]
+            anios_logs = {p[len(PREFIJO_PARTICION):][:4] for p in particiones}
+
+            movidas = {}
+            for anio in sorted(set(anios_equipos) | set(anios_logs)):
+                esquema = ModuloArchivo._adjuntar(conexion, anio)
+                try:
+                    # Todo el año o nada: si algo falla no queda nada a medio mover
+                    with db.transaccion() as cursor:
+                        for tabla, condicion in ModuloArchivo.TABLAS_ARCHIVADAS:
+                            cantidad = ModuloArchivo._mover(
+                                cursor, esquema, tabla, condicion, (anio,) * condicion.count("?")
+                            )
+                            movidas[tabla] = movidas.get(tabla, 0) + cantidad
+
+                        meses = [p for p in particiones if p[len(PREFIJO_PARTICION):].startswith(anio)]
+                        for particion in meses:
+                            cantidad = ModuloArchivo._mover_particion(cursor, esquema, particion)
+                            movidas[TABLA_ACTUAL] = movidas.get(TABLA_ACTUAL, 0) + cantidad
+                        if meses:
+                            actualizar_vista(cursor)
+                finally:
+                    conexion.execute(f"DETACH DATABASE {esquema}")
+
+            conexion.execute("DELETE FROM temp.equipos_a_archivar")
+            conexion.commit()
+            total = sum(movidas.values())
+
+            if total and compactar:
+                # Devolver al sistema el espacio liberado (la base y sus backups se achican)
+                conexion.execute("VACUUM main")
+
+            mensaje = (f"{movidas.get('equipos', 0)} equipos y {total} registros en total archivados"
+                       if total else "No hay datos para archivar")
+            config.guardar_log(f"Archivo histórico: {mensaje} (antigüedad {anios} años)", "INFO")
+
+            if total and id_usuario:
+                from sistema_base.seguridad import registrar_accion_auditoria
+                registrar_accion_auditoria(
+                    id_usuario=id_usuario,
+                    accion="Archivar",
+                    modulo="Archivo",
+                    valor_nuevo=mensaje,
+                    motivo=f"Datos con más de {anios} años"
+                )
+
+            return True, mensaje, movidas
+
+        except Exception as e:
+            config.guardar_log(f"Error al archivar datos históricos: {e}", "ERROR")
+            return False, f"Error: {str(e)}", {}
+
+    @staticmethod
+    def obtener_estadisticas_archivo():
+        """
+        Archivos históricos y su tamaño
+
+        Returns:
+            dict: Cantidad de archivos, años y tamaño total en MB
+        """
+        archivos = ModuloArchivo.listar_archivos()
+        return {
+            'archivos': len(archivos),
+            'anios': [anio for anio, _ in archivos],
+            'tamanio_mb': round(sum(ruta.stat().st_size for _, ruta in archivos) / 1048576, 2),
+        }
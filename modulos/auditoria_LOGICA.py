@@ -5,17 +5,98 @@ TECHMANAGER v1.0 - MÓDULO DE AUDITORÍA
 ============================================================================
 Lógica de negocio para consulta de auditoría
 (La escritura se hace desde sistema_base.seguridad)
+
+El log está partido por mes (ver base_datos.particiones): las consultas
+por fecha leen solo los meses del rango y la retención borra meses
+enteros.
 ============================================================================
 """
 
 from datetime import datetime
 from base_datos.conexion import db
+from base_datos.particiones import (consulta_auditoria, fuente_auditoria,
+                                    rotar_auditoria, eliminar_particiones)
 from sistema_base.configuracion import config
+from sistema_base.utilidades import formatear_fecha_hora
 
 
 class ModuloAuditoria:
     """Clase para manejar la consulta de auditoría"""
     
+    # Columnas al exportar consulta_listar_auditoria: (clave, encabezado[, formateador])
+    COLUMNAS_EXPORTACION = [
+        ("fecha_hora", "Fecha/Hora", lambda valor: formatear_fecha_hora(valor, '%d/%m/%Y %H:%M:%S')),
+        ("usuario_nombre", "Usuario", lambda valor: valor or "Sistema"),
+        ("modulo", "Módulo"),
+        ("accion", "Acción"),
+        ("id_registro", "ID Registro"),
+        ("motivo", "Motivo")
+    ]
+    
+    @staticmethod
+    def consulta_listar_auditoria(filtro_modulo="", filtro_accion="", filtro_usuario="",
+                                  fecha_desde=None, fecha_hasta=None, busqueda="",
+                                  solo_criticas=False, limite=100):
+        """
+        Arma la consulta del listado de auditoría (usada también para exportar)
+        
+        Args:
+            filtro_modulo (str): Filtrar por módulo
+            filtro_accion (str): Filtrar por acción
+            filtro_usuario (int): Filtrar por usuario
+            fecha_desde: Fecha desde
+            fecha_hasta: Fecha hasta
+            busqueda (str): Buscar en motivo, campo
+            solo_criticas (bool): Solo acciones críticas
+            limite (int): Cantidad máxima de registros (None = sin límite)
+            
+        Returns:
+            tuple: (consulta, parametros)
+        """
+        condiciones = ["1=1"]
+        parametros = []
+        
+        if filtro_modulo:
+            condiciones.append("modulo = ?")
+            parametros.append(filtro_modulo)
+        
+        if filtro_accion:
+            condiciones.append("accion = ?")
+            parametros.append(filtro_accion)
+        
+        if filtro_usuario:
+            condiciones.append("id_usuario = ?")
+            parametros.append(filtro_usuario)
+        
+        if busqueda:
+            condiciones.append("""(
+                motivo LIKE ? OR
+                campo_modificado LIKE ? OR
+                modulo LIKE ?
+            )""")
+            busqueda_param = f"%{busqueda}%"
+            parametros.extend([busqueda_param] * 3)
+        
+        if solo_criticas:
+            condiciones.append("es_critica = 1")
+        
+        # Solo los meses del rango; sin límite al exportar el listado completo
+        registros, parametros = consulta_auditoria(
+            " AND ".join(condiciones), parametros, fecha_desde, fecha_hasta, limite
+        )
+        
+        consulta = f"""
+        SELECT 
+            a.*,
+            u.nombre as usuario_nombre,
+            u.username
+        FROM ({registros}) a
+        LEFT JOIN usuarios u ON a.id_usuario = u.id_usuario
+        ORDER BY a.fecha_hora DESC
+        """
+        
+        return consulta, parametros
+    
     @staticmethod
     def listar_auditoria(filtro_modulo="", filtro_accion="", filtro_usuario="",
                         fecha_desde=None, fecha_hasta=None, busqueda="",
@@ -37,54 +118,11 @@ class ModuloAuditoria:
             list: Lista de registros de auditoría
         """
         try:
-            consulta = """
-            SELECT 
-                a.*,
-                u.nombre as usuario_nombre,
-                u.username
-            FROM auditoria a
-            LEFT JOIN usuarios u ON a.id_usuario = u.id_usuario
-            WHERE 1=1
-            """
-            
-            parametros = []
-            
-            if filtro_modulo:
-                consulta += " AND a.modulo = ?"
-                parametros.append(filtro_modulo)
-            
-            if filtro_accion:
-                consulta += " AND a.accion = ?"
-                parametros.append(filtro_accion)
-            
-            if filtro_usuario:
-                consulta += " AND a.id_usuario = ?"
-                parametros.append(filtro_usuario)
-            
-            if fecha_desde:
-                consulta += " AND a.fecha_hora >= ?"
-                parametros.append(fecha_desde)
-            
-            if fecha_hasta:
-                consulta += " AND a.fecha_hora <= ?"
-                parametros.append(fecha_hasta)
-            
-            if busqueda:
-                consulta += """ AND (
-                    a.motivo LIKE ? OR
-                    a.campo_modificado LIKE ? OR
-                    a.modulo LIKE ?
-                )"""
-                busqueda_param = f"%{busqueda}%"
-                parametros.extend([busqueda_param] * 3)
-            
-            if solo_criticas:
-                consulta += " AND a.es_critica = 1"
-            
-            consulta += " ORDER BY a.fecha_hora DESC LIMIT ?"
-            parametros.append(limite)
-            
-            return db.obtener_todos(consulta, tuple(parametros))
+            consulta, parametros = ModuloAuditoria.consulta_listar_auditoria(
+                filtro_modulo, filtro_accion, filtro_usuario,
+                fecha_desde, fecha_hasta, busqueda, solo_criticas, limite
+            )
+            return db.obtener_todos(consulta, parametros)
             
         except Exception as e:
             config.guardar_log(f"Error al listar auditoría: {e}", "ERROR")
@@ -104,18 +142,19 @@ class ModuloAuditoria:
             list: Historial del registro
         """
         try:
-            consulta = """
+            registros, parametros = consulta_auditoria(
+                "modulo = ? AND id_registro = ?", (modulo, id_registro), limite=limite
+            )
+            consulta = f"""
             SELECT 
                 a.*,
                 u.nombre as usuario_nombre
-            FROM auditoria a
+            FROM ({registros}) a
             LEFT JOIN usuarios u ON a.id_usuario = u.id_usuario
-            WHERE a.modulo = ? AND a.id_registro = ?
             ORDER BY a.fecha_hora DESC
-            LIMIT ?
             """
             
-            return db.obtener_todos(consulta, (modulo, id_registro, limite))
+            return db.obtener_todos(consulta, parametros)
             
         except Exception as e:
             config.guardar_log(f"Error al obtener auditoría por registro: {e}", "ERROR")
@@ -134,15 +173,9 @@ class ModuloAuditoria:
             list: Acciones del usuario
         """
         try:
-            consulta = """
-            SELECT *
-            FROM auditoria
-            WHERE id_usuario = ?
-            ORDER BY fecha_hora DESC
-            LIMIT ?
-            """
+            consulta, parametros = consulta_auditoria("id_usuario = ?", (id_usuario,), limite=limite)
             
-            return db.obtener_todos(consulta, (id_usuario, limite))
+            return db.obtener_todos(consulta, parametros)
             
         except Exception as e:
             config.guardar_log(f"Error al obtener auditoría por usuario: {e}", "ERROR")
@@ -199,6 +232,9 @@ class ModuloAuditoria:
         try:
             estadisticas = {}
             
+            # Solo los meses del rango (la vista completa si no hay rango)
+            auditoria = fuente_auditoria(fecha_desde, fecha_hasta)
+            
             where_fecha = ""
             parametros = []
             
@@ -211,19 +247,19 @@ class ModuloAuditoria:
                 parametros.append(fecha_hasta)
             
             # Total de acciones
-            consulta = f"SELECT COUNT(*) as total FROM auditoria WHERE 1=1 {where_fecha}"
+            consulta = f"SELECT COUNT(*) as total FROM {auditoria} WHERE 1=1 {where_fecha}"
             resultado = db.obtener_uno(consulta, tuple(parametros))
             estadisticas['total_acciones'] = resultado['total'] if resultado else 0
             
             # Acciones críticas
-            consulta = f"SELECT COUNT(*) as total FROM auditoria WHERE es_critica = 1 {where_fecha}"
+            consulta = f"SELECT COUNT(*) as total FROM {auditoria} WHERE es_critica = 1 {where_fecha}"
             resultado = db.obtener_uno(consulta, tuple(parametros))
             estadisticas['acciones_criticas'] = resultado['total'] if resultado else 0
             
             # Por módulo (top 5)
             consulta = f"""
             SELECT modulo, COUNT(*) as total 
-            FROM auditoria 
+            FROM {auditoria} 
             WHERE 1=1 {where_fecha}
             GROUP BY modulo 
             ORDER BY total DESC 
@@ -235,7 +271,7 @@ class ModuloAuditoria:
             # Por acción
             consulta = f"""
             SELECT accion, COUNT(*) as total 
-            FROM auditoria 
+            FROM {auditoria} 
             WHERE 1=1 {where_fecha}
             GROUP BY accion 
             ORDER BY total DESC
@@ -248,3 +284,49 @@ class ModuloAuditoria:
         except Exception as e:
             config.guardar_log(f"Error al obtener estadísticas de auditoría: {e}", "ERROR")
             return {'total_acciones': 0, 'acciones_criticas': 0}
+    
+    @staticmethod
+    def mantener_auditoria(meses_retencion=None, id_usuario=None):
+        """
+        Pasa los meses cerrados a sus particiones y borra los que exceden la retención
+        
+        Args:
+            meses_retencion (int): Meses a conservar además del actual
+                (None = configuración; 0 = conservar todo)
+            id_usuario (int): Usuario que lo ejecuta (para auditoría)
+            
+        Returns:
+            tuple: (exito, mensaje, {'rotados': {partición: registros}, 'eliminadas': [particiones]})
+        """
+        try:
+            if meses_retencion is None:
+                meses_retencion = config.auditoria_meses_retencion
+            
+            rotados = rotar_auditoria()
+            
+            eliminadas = []
+            if meses_retencion:
+                hoy = datetime.now()
+                meses = hoy.year * 12 + hoy.month - 1 - meses_retencion
+                eliminadas = eliminar_particiones(f"{meses // 12:04d}-{meses % 12 + 1:02d}")
+            
+            mensaje = (f"{sum(rotados.values())} registros rotados a {len(rotados)} meses, "
+                       f"{len(eliminadas)} meses eliminados")
+            config.guardar_log(f"Mantenimiento de auditoría: {mensaje}", "INFO")
+            
+            if eliminadas and id_usuario:
+                from sistema_base.seguridad import registrar_accion_auditoria
+                registrar_accion_auditoria(
+                    id_usuario=id_usuario,
+                    accion="Eliminar",
+                    modulo="Auditoría",
+                    valor_anterior=", ".join(eliminadas),
+                    motivo=f"Retención de {meses_retencion} meses",
+                    es_critica=True
+                )
+            
+            return True, mensaje, {'rotados': rotados, 'eliminadas': eliminadas}
+            
+        except Exception as e:
+            config.guardar_log(f"Error en el mantenimiento de auditoría: {e}", "ERROR")
+            return False, f"Error: {str(e)}", {'rotados': {}, 'eliminadas': []}
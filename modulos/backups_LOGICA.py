@@ -4,12 +4,18 @@
 TECHMANAGER v1.0 - MÓDULO DE BACKUPS
 ============================================================================
 Lógica de negocio para gestión de copias de seguridad
+
+Las copias se hacen con la API de backup en línea de SQLite: se obtiene
+una instantánea consistente aunque la aplicación esté usando la base, y
+la restauración escribe sobre la conexión abierta (en Windows no se
+puede reemplazar el archivo mientras está abierto).
 ============================================================================
 """
 
 import os
-import shutil
-from datetime import datetime
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
 from base_datos.conexion import db
 from sistema_base.configuracion import config
 
@@ -17,100 +23,173 @@ from sistema_base.configuracion import config
 class ModuloBackups:
     """Clase para manejar la lógica de negocio de backups"""
     
+    # Tablas que un backup válido tiene que tener
+    TABLAS_REQUERIDAS = ("usuarios", "clientes", "equipos", "configuracion_sistema")
+    
+    CONSULTA_BACKUPS = """
+    SELECT 
+        b.id_backup,
+        b.tipo,
+        b.fecha_backup as fecha_hora,
+        b.ubicacion as ruta_completa,
+        b.tamanio_archivo,
+        b.tamanio_archivo / 1048576.0 as tamanio_mb,
+        b.descripcion,
+        b.verificado,
+        b.fecha_verificacion,
+        b.exitoso,
+        b.mensaje_error,
+        b.id_usuario,
+        u.nombre as usuario_nombre
+    FROM backups b
+    LEFT JOIN usuarios u ON b.id_usuario = u.id_usuario
+    """
+    
+    @staticmethod
+    def carpeta_backups():
+        """
+        Carpeta donde se guardan los backups (configurable)
+        
+        Returns:
+            Path: Carpeta (se crea si no existe)
+        """
+        carpeta = Path(config.ruta_backup_local or config.ruta_backups)
+        carpeta.mkdir(parents=True, exist_ok=True)
+        return carpeta
+    
+    @staticmethod
+    def _completar(backup):
+        """Agrega nombre de archivo y si existe en disco a un registro"""
+        if backup:
+            backup['nombre_archivo'] = os.path.basename(backup['ruta_completa'])
+            backup['existe'] = os.path.exists(backup['ruta_completa'])
+        return backup
+    
     @staticmethod
-    def crear_backup(tipo_backup="Manual", observaciones="", id_usuario=None):
+    def crear_backup(tipo_backup="Manual", descripcion="", id_usuario=None):
         """
         Crea un backup de la base de datos
         
         Args:
             tipo_backup (str): 'Manual' o 'Automático'
-            observaciones (str): Observaciones
-            id_usuario (int): ID del usuario (si es manual)
+            descripcion (str): Descripción u observaciones
+            id_usuario (int): ID del usuario que lo genera
             
         Returns:
-            tuple: (exito, mensaje, ruta_backup)
+            tuple: (exito, mensaje, id_backup)
         """
+        ruta_backup = None
         try:
-            # Crear carpeta de backups si no existe
-            carpeta_backups = os.path.join(config.directorio_base, "backups")
-            if not os.path.exists(carpeta_backups):
-                os.makedirs(carpeta_backups)
+            if tipo_backup == "Manual" and not config.tiene_permiso("backups"):
+                return False, "Solo administradores pueden crear backups", None
             
-            # Generar nombre del archivo
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            nombre_archivo = f"backup_{timestamp}.db"
-            ruta_backup = os.path.join(carpeta_backups, nombre_archivo)
-            
-            # Obtener ruta de la base de datos
-            ruta_bd = os.path.join(config.directorio_base, "datos", "techmanager.db")
-            
-            # Copiar base de datos
-            shutil.copy2(ruta_bd, ruta_backup)
+            carpeta = ModuloBackups.carpeta_backups()
             
-            # Obtener tamaño del archivo
-            tamanio = os.path.getsize(ruta_backup)
+            # Generar nombre del archivo (sin pisar otro del mismo segundo)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            ruta_backup = carpeta / f"backup_{timestamp}.db"
+            numero = 1
+            while ruta_backup.exists():
+                numero += 1
+                ruta_backup = carpeta / f"backup_{timestamp}_{numero}.db"
+            
+            # Copiar a un temporal y renombrar: nunca queda un backup a medias
+            ruta_temporal = ruta_backup.with_suffix(".tmp")
+            destino = sqlite3.connect(str(ruta_temporal))
+            try:
+                # Solo la base de trabajo: los archivos históricos (ATTACH) no
+                # cambian y no entran en los backups diarios
+                db.conectar().backup(destino, name="main")
+            finally:
+                destino.close()
+            os.replace(ruta_temporal, ruta_backup)
+            
+            tamanio = ruta_backup.stat().st_size
             
             # Registrar backup en BD
             consulta = """
             INSERT INTO backups (
-                nombre_archivo, ruta_completa, tamanio_bytes,
-                tipo_backup, observaciones, fecha_hora_backup,
-                id_usuario_genera
+                fecha_backup, tipo, ubicacion, tamanio_archivo,
+                exitoso, descripcion, id_usuario
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, 1, ?, ?)
             """
             
             id_backup = db.ejecutar_consulta(
                 consulta,
-                (nombre_archivo, ruta_backup, tamanio, tipo_backup,
-                 observaciones, datetime.now(), id_usuario if id_usuario else None)
+                (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), tipo_backup, str(ruta_backup),
+                 tamanio, descripcion or None, id_usuario)
             )
             
             # Registrar en auditoría si es manual
-            if tipo_backup == "Manual" and id_usuario:
+            if tipo_backup == "Manual" and id_usuario is not None:
                 from sistema_base.seguridad import registrar_accion_auditoria
                 registrar_accion_auditoria(
                     id_usuario=id_usuario,
                     accion="Crear",
                     modulo="Backups",
                     id_registro=id_backup,
-                    motivo=f"Backup manual creado: {nombre_archivo}"
+                    motivo=f"Backup manual creado: {ruta_backup.name}"
                 )
             
-            config.guardar_log(f"Backup creado: {nombre_archivo} ({tamanio} bytes)", "INFO")
-            return True, f"Backup creado exitosamente: {nombre_archivo}", ruta_backup
+            config.guardar_log(f"Backup creado: {ruta_backup.name} ({tamanio} bytes)", "INFO")
+            return True, f"Backup creado exitosamente: {ruta_backup.name}", id_backup
             
         except Exception as e:
             config.guardar_log(f"Error al crear backup: {e}", "ERROR")
+            
+            # Dejar constancia del intento fallido
+            try:
+                db.ejecutar_consulta(
+                    """
+                    INSERT INTO backups (fecha_backup, tipo, ubicacion, tamanio_archivo, exitoso,
+                                         mensaje_error, descripcion, id_usuario)
+                    VALUES (?, ?, ?, 0, 0, ?, ?, ?)
+                    """,
+                    (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), tipo_backup, str(ruta_backup or ""),
+                     str(e), descripcion or None, id_usuario)
+                )
+            except Exception:
+                pass
+            
             return False, f"Error: {str(e)}", None
     
+    @staticmethod
+    def crear_backup_manual(descripcion, id_usuario):
+        """
+        Crea un backup manual
+        
+        Args:
+            descripcion (str): Descripción del backup
+            id_usuario (int): ID del usuario
+            
+        Returns:
+            tuple: (exito, mensaje, id_backup)
+        """
+        return ModuloBackups.crear_backup("Manual", descripcion, id_usuario)
+    
     @staticmethod
     def listar_backups(limite=50):
         """
         Lista todos los backups
         
         Args:
-            limite (int): Cantidad máxima de registros
+            limite (int): Cantidad máxima de registros (None = todos)
             
         Returns:
             list: Lista de backups
         """
         try:
-            consulta = """
-            SELECT 
-                b.*,
-                u.nombre as usuario_nombre
-            FROM backups b
-            LEFT JOIN usuarios u ON b.id_usuario_genera = u.id_usuario
-            ORDER BY b.fecha_hora_backup DESC
+            consulta = ModuloBackups.CONSULTA_BACKUPS + """
+            ORDER BY b.fecha_backup DESC, b.id_backup DESC
             LIMIT ?
             """
             
-            backups = db.obtener_todos(consulta, (limite,))
+            backups = db.obtener_todos(consulta, (-1 if limite is None else limite,))
             
             # Verificar que los archivos existan
             for backup in backups:
-                backup['existe'] = os.path.exists(backup['ruta_completa'])
+                ModuloBackups._completar(backup)
             
             return backups
             
@@ -130,25 +209,82 @@ class ModuloBackups:
             dict: Datos del backup o None
         """
         try:
-            consulta = """
-            SELECT 
-                b.*,
-                u.nombre as usuario_nombre
-            FROM backups b
-            LEFT JOIN usuarios u ON b.id_usuario_genera = u.id_usuario
-            WHERE b.id_backup = ?
-            """
+            consulta = ModuloBackups.CONSULTA_BACKUPS + " WHERE b.id_backup = ?"
+            return ModuloBackups._completar(db.obtener_uno(consulta, (id_backup,)))
             
-            backup = db.obtener_uno(consulta, (id_backup,))
+        except Exception as e:
+            config.guardar_log(f"Error al obtener backup: {e}", "ERROR")
+            return None
+    
+    @staticmethod
+    def verificar_archivo(ruta):
+        """
+        Verifica que un archivo sea una base de TechManager sana
+        
+        Args:
+            ruta (str): Archivo de backup
             
-            if backup:
-                backup['existe'] = os.path.exists(backup['ruta_completa'])
+        Returns:
+            tuple: (exito, mensaje)
+        """
+        if not os.path.exists(ruta):
+            return False, "El archivo de backup no existe"
+        
+        try:
+            conexion = sqlite3.connect(f"{Path(ruta).resolve().as_uri()}?mode=ro", uri=True)
+            try:
+                resultado = conexion.execute("PRAGMA integrity_check").fetchall()
+                if [fila[0] for fila in resultado] != ["ok"]:
+                    return False, f"El backup está dañado: {resultado[0][0]}"
+                
+                tablas = {fila[0] for fila in conexion.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'")}
+                faltantes = [t for t in ModuloBackups.TABLAS_REQUERIDAS if t not in tablas]
+                if faltantes:
+                    return False, f"El archivo no es una base de TechManager (faltan: {', '.join(faltantes)})"
+            finally:
+                conexion.close()
+            
+            return True, "Integridad verificada"
+            
+        except sqlite3.DatabaseError as e:
+            return False, f"El archivo no es una base de datos válida: {e}"
+    
+    @staticmethod
+    def verificar_integridad_backup(id_backup, id_usuario=None):
+        """
+        Verifica la integridad de un backup y lo marca como verificado
+        
+        Args:
+            id_backup (int): ID del backup
+            id_usuario (int): ID del usuario
             
-            return backup
+        Returns:
+            tuple: (exito, mensaje)
+        """
+        try:
+            backup = ModuloBackups.obtener_backup_por_id(id_backup)
+            
+            if not backup:
+                return False, "Backup no encontrado"
+            
+            exito, mensaje = ModuloBackups.verificar_archivo(backup['ruta_completa'])
+            
+            db.ejecutar_consulta(
+                "UPDATE backups SET verificado = ?, fecha_verificacion = ? WHERE id_backup = ?",
+                (int(exito), datetime.now().strftime("%Y-%m-%d %H:%M:%S"), id_backup)
+            )
+            
+            nivel = "INFO" if exito else "WARNING"
+            config.guardar_log(f"Verificación de {backup['nombre_archivo']}: {mensaje}", nivel)
+            
+            if exito:
+                return True, f"{mensaje}: {backup['nombre_archivo']}"
+            return False, mensaje
             
         except Exception as e:
-            config.guardar_log(f"Error al obtener backup: {e}", "ERROR")
-            return None
+            config.guardar_log(f"Error al verificar backup: {e}", "ERROR")
+            return False, f"Error: {str(e)}"
     
     @staticmethod
     def restaurar_backup(id_backup, id_usuario):
@@ -164,7 +300,7 @@ class ModuloBackups:
         """
         try:
             # Solo admin puede restaurar
-            if not config.es_admin:
+            if not config.tiene_permiso("backups"):
                 return False, "Solo administradores pueden restaurar backups"
             
             backup = ModuloBackups.obtener_backup_por_id(id_backup)
@@ -172,27 +308,39 @@ class ModuloBackups:
             if not backup:
                 return False, "Backup no encontrado"
             
-            if not backup['existe']:
-                return False, "El archivo de backup no existe"
+            # No restaurar nunca un archivo dañado
+            exito, mensaje = ModuloBackups.verificar_archivo(backup['ruta_completa'])
+            if not exito:
+                return False, mensaje
             
             # IMPORTANTE: Crear un backup antes de restaurar
-            ModuloBackups.crear_backup(
+            exito, mensaje, id_seguridad = ModuloBackups.crear_backup(
                 "Automático",
                 "Backup automático antes de restaurar",
                 id_usuario
             )
-            
-            # Obtener ruta de la base de datos actual
-            ruta_bd = os.path.join(config.directorio_base, "datos", "techmanager.db")
-            
-            # Cerrar conexión a la BD
-            db.cerrar()
-            
-            # Restaurar (copiar backup sobre la BD actual)
-            shutil.copy2(backup['ruta_completa'], ruta_bd)
-            
-            # Reconectar a la BD
-            db.conectar()
+            if not exito:
+                return False, f"No se pudo crear el backup de seguridad: {mensaje}"
+            seguridad = db.obtener_uno("SELECT * FROM backups WHERE id_backup = ?", (id_seguridad,))
+            
+            # Restaurar sobre la conexión abierta
+            fuente = sqlite3.connect(f"{Path(backup['ruta_completa']).resolve().as_uri()}?mode=ro", uri=True)
+            try:
+                fuente.backup(db.conectar())
+            finally:
+                fuente.close()
+            
+            # El backup puede ser de una versión anterior del esquema
+            from base_datos.crear_tablas import inicializar_base_datos
+            inicializar_base_datos()
+            
+            # La base restaurada no conoce el backup de seguridad recién hecho
+            del seguridad['id_backup']
+            columnas = ", ".join(seguridad)
+            db.ejecutar_consulta(
+                f"INSERT INTO backups ({columnas}) VALUES ({', '.join('?' * len(seguridad))})",
+                tuple(seguridad.values())
+            )
             
             # Registrar en auditoría
             from sistema_base.seguridad import registrar_accion_auditoria
@@ -226,7 +374,7 @@ class ModuloBackups:
         """
         try:
             # Solo admin
-            if not config.es_admin:
+            if not config.tiene_permiso("backups"):
                 return False, "Solo administradores pueden eliminar backups"
             
             backup = ModuloBackups.obtener_backup_por_id(id_backup)
@@ -260,34 +408,37 @@ class ModuloBackups:
             return False, f"Error: {str(e)}"
     
     @staticmethod
-    def limpiar_backups_antiguos(dias_antiguedad=90):
+    def limpiar_backups_antiguos(id_usuario=None, dias_antiguedad=None):
         """
         Elimina backups automáticos más antiguos que X días
+        (los manuales no se tocan)
         
         Args:
-            dias_antiguedad (int): Días de antiguedad
+            id_usuario (int): ID del usuario
+            dias_antiguedad (int): Días de antigüedad (por defecto, la retención configurada)
             
         Returns:
-            int: Cantidad de backups eliminados
+            tuple: (exito, mensaje, cantidad_eliminados)
         """
         try:
-            from datetime import timedelta
+            if dias_antiguedad is None:
+                dias_antiguedad = getattr(config, 'backup_dias_retencion', 30)
             fecha_limite = datetime.now() - timedelta(days=dias_antiguedad)
             
             # Buscar backups automáticos antiguos
             consulta = """
-            SELECT id_backup, nombre_archivo, ruta_completa
+            SELECT id_backup, ubicacion
             FROM backups
-            WHERE tipo_backup = 'Automático'
-            AND fecha_hora_backup < ?
+            WHERE tipo = 'Automático'
+            AND fecha_backup < ?
             """
             
-            backups_antiguos = db.obtener_todos(consulta, (fecha_limite,))
+            backups_antiguos = db.obtener_todos(consulta, (fecha_limite.strftime("%Y-%m-%d %H:%M:%S"),))
             
             for backup in backups_antiguos:
                 # Eliminar archivo
-                if os.path.exists(backup['ruta_completa']):
-                    os.remove(backup['ruta_completa'])
+                if backup['ubicacion'] and os.path.exists(backup['ubicacion']):
+                    os.remove(backup['ubicacion'])
                 
                 # Eliminar registro
                 consulta_delete = "DELETE FROM backups WHERE id_backup = ?"
@@ -296,11 +447,11 @@ class ModuloBackups:
             if len(backups_antiguos) > 0:
                 config.guardar_log(f"{len(backups_antiguos)} backups antiguos eliminados", "INFO")
             
-            return len(backups_antiguos)
+            return True, f"{len(backups_antiguos)} backups eliminados", len(backups_antiguos)
             
         except Exception as e:
             config.guardar_log(f"Error al limpiar backups antiguos: {e}", "ERROR")
-            return 0
+            return False, f"Error: {str(e)}", 0
     
     @staticmethod
     def obtener_estadisticas_backups():
@@ -311,39 +462,19 @@ class ModuloBackups:
             dict: Estadísticas
         """
         try:
-            estadisticas = {}
-            
-            # Total de backups
-            consulta = "SELECT COUNT(*) as total FROM backups"
-            resultado = db.obtener_uno(consulta)
-            estadisticas['total'] = resultado['total'] if resultado else 0
-            
-            # Por tipo
-            consulta = "SELECT COUNT(*) as total FROM backups WHERE tipo_backup = 'Manual'"
-            resultado = db.obtener_uno(consulta)
-            estadisticas['manuales'] = resultado['total'] if resultado else 0
-            
-            consulta = "SELECT COUNT(*) as total FROM backups WHERE tipo_backup = 'Automático'"
-            resultado = db.obtener_uno(consulta)
-            estadisticas['automaticos'] = resultado['total'] if resultado else 0
-            
-            # Tamaño total
-            consulta = "SELECT SUM(tamanio_bytes) as total FROM backups"
-            resultado = db.obtener_uno(consulta)
-            estadisticas['tamanio_total'] = resultado['total'] if resultado and resultado['total'] else 0
-            
-            # Último backup
             consulta = """
-            SELECT fecha_hora_backup 
-            FROM backups 
-            ORDER BY fecha_hora_backup DESC 
-            LIMIT 1
+            SELECT 
+                COUNT(*) as total_backups,
+                COALESCE(SUM(tipo = 'Manual'), 0) as manuales,
+                COALESCE(SUM(tipo = 'Automático'), 0) as automaticos,
+                COALESCE(SUM(verificado), 0) as verificados,
+                COALESCE(SUM(tamanio_archivo), 0) / 1048576.0 as tamanio_total_mb,
+                MAX(fecha_backup) as ultimo_backup
+            FROM backups
+            WHERE exitoso = 1
             """
-            resultado = db.obtener_uno(consulta)
-            estadisticas['ultimo_backup'] = resultado['fecha_hora_backup'] if resultado else None
-            
-            return estadisticas
+            return db.obtener_uno(consulta) or {'total_backups': 0}
             
         except Exception as e:
             config.guardar_log(f"Error al obtener estadísticas de backups: {e}", "ERROR")
-            return {'total': 0}
+            return {'total_backups': 0}
@@ -9,70 +9,146 @@ Lógica de negocio para gestión de clientes
 
 from datetime import datetime
 from base_datos.conexion import db
+from base_datos.resumen_clientes import recalcular_resumen_clientes
 from sistema_base.validadores import (validar_nombre, validar_telefono, 
                                        validar_email, limpiar_telefono)
 from sistema_base.configuracion import config
+from sistema_base.utilidades import formatear_fecha_hora
+from modulos.archivo_LOGICA import ModuloArchivo
 
 
 class ModuloClientes:
     """Clase para manejar la lógica de negocio de clientes"""
     
+    # Columnas al exportar consulta_listar_clientes: (clave, encabezado[, formateador])
+    COLUMNAS_EXPORTACION = [
+        ("id_cliente", "ID"),
+        ("apellido", "Apellido"),
+        ("nombre", "Nombre"),
+        ("telefono", "Teléfono"),
+        ("direccion", "Dirección"),
+        ("email", "Email"),
+        ("estado_cliente", "Estado"),
+        ("equipos_activos", "Equipos en taller"),
+        ("saldo_adeudado", "Saldo adeudado"),
+        ("fecha_registro", "Registro", formatear_fecha_hora),
+        ("fecha_ultima_visita", "Última visita", formatear_fecha_hora)
+    ]
+    
+    @staticmethod
+    def consulta_listar_clientes(solo_activos=True, busqueda="", orden="nombre", ids=None,
+                                 con_saldo=False, con_equipos_activos=False, fecha_desde=None, fecha_hasta=None):
+        """
+        Arma la consulta del listado de clientes (usada también para exportar)
+        
+        Args:
+            solo_activos (bool): Si True, excluye clientes con equipos abandonados
+            busqueda (str): Texto para buscar en nombre, teléfono, dirección
+            orden (str): Campo por el que ordenar (nombre, fecha_registro, deuda,
+                saldo, ultima_visita)
+            ids (iterable): Solo estos clientes (para actualizar filas sueltas de un listado)
+            con_saldo (bool): Solo clientes con facturas adeudadas
+            con_equipos_activos (bool): Solo clientes con equipos en el taller
+            fecha_desde: Fecha de registro desde (opcional)
+            fecha_hasta: Fecha de registro hasta (opcional)
+            
+        Returns:
+            tuple: (consulta, parametros)
+        """
+        consulta = """
+        SELECT 
+            id_cliente,
+            nombre,
+            apellido,
+            telefono,
+            direccion,
+            email,
+            observaciones,
+            estado_cliente,
+            es_incobrable,
+            tiene_incobrables,
+            total_incobrables,
+            confiabilidad_pago,
+            fecha_registro,
+            equipos_activos,
+            ordenes_abiertas,
+            saldo_adeudado,
+            fecha_ultima_visita
+        FROM clientes
+        WHERE activo = 1
+        """
+        
+        parametros = []
+        
+        if ids is not None:
+            ids = list(ids)
+            consulta += f" AND id_cliente IN ({', '.join('?' * len(ids)) or 'NULL'})"
+            parametros.extend(ids)
+        
+        # Contadores mantenidos por triggers (ver base_datos.resumen_clientes)
+        if con_saldo:
+            consulta += " AND saldo_adeudado > 0"
+        
+        if con_equipos_activos:
+            consulta += " AND equipos_activos > 0"
+        
+        # Filtro por búsqueda
+        if busqueda:
+            consulta += """ AND (
+                nombre LIKE ? OR 
+                apellido LIKE ? OR
+                telefono LIKE ? OR 
+                direccion LIKE ? OR
+                email LIKE ?
+            )"""
+            busqueda_param = f"%{busqueda}%"
+            parametros.extend([busqueda_param, busqueda_param, busqueda_param, busqueda_param, busqueda_param])
+        
+        if fecha_desde:
+            consulta += " AND fecha_registro >= ?"
+            parametros.append(fecha_desde)
+        
+        if fecha_hasta:
+            consulta += " AND fecha_registro <= ?"
+            parametros.append(fecha_hasta)
+        
+        # Ordenamiento
+        if orden == "fecha_registro":
+            consulta += " ORDER BY fecha_registro DESC"
+        elif orden == "deuda":
+            consulta += " ORDER BY total_incobrables DESC"
+        elif orden == "saldo":
+            consulta += " ORDER BY saldo_adeudado DESC"
+        elif orden == "ultima_visita":
+            consulta += " ORDER BY fecha_ultima_visita DESC"
+        else:
+            consulta += " ORDER BY apellido ASC, nombre ASC"
+        
+        return consulta, tuple(parametros)
+    
     @staticmethod
-    def listar_clientes(solo_activos=True, busqueda="", orden="nombre"):
+    def listar_clientes(solo_activos=True, busqueda="", orden="nombre", ids=None,
+                        con_saldo=False, con_equipos_activos=False):
         """
         Lista todos los clientes
         
         Args:
             solo_activos (bool): Si True, excluye clientes con equipos abandonados
             busqueda (str): Texto para buscar en nombre, teléfono, dirección
-            orden (str): Campo por el que ordenar (nombre, fecha_registro)
+            orden (str): Campo por el que ordenar (nombre, fecha_registro, deuda,
+                saldo, ultima_visita)
+            ids (iterable): Solo estos clientes (para actualizar filas sueltas de un listado)
+            con_saldo (bool): Solo clientes con facturas adeudadas
+            con_equipos_activos (bool): Solo clientes con equipos en el taller
             
         Returns:
             list: Lista de diccionarios con datos de clientes
         """
         try:
-            consulta = """
-            SELECT 
-                id_cliente,
-                nombre,
-                apellido,
-                telefono,
-                direccion,
-                email,
-                observaciones,
-                estado_cliente,
-                es_incobrable,
-                tiene_incobrables,
-                total_incobrables,
-                confiabilidad_pago,
-                fecha_registro
-            FROM clientes
-            WHERE activo = 1
-            """
-            
-            parametros = []
-            
-            # Filtro por búsqueda
-            if busqueda:
-                consulta += """ AND (
-                    nombre LIKE ? OR 
-                    apellido LIKE ? OR
-                    telefono LIKE ? OR 
-                    direccion LIKE ? OR
-                    email LIKE ?
-                )"""
-                busqueda_param = f"%{busqueda}%"
-                parametros.extend([busqueda_param, busqueda_param, busqueda_param, busqueda_param, busqueda_param])
-            
-            # Ordenamiento
-            if orden == "fecha_registro":
-                consulta += " ORDER BY fecha_registro DESC"
-            elif orden == "deuda":
-                consulta += " ORDER BY total_incobrables DESC"
-            else:
-                consulta += " ORDER BY apellido ASC, nombre ASC"
-            
-            return db.obtener_todos(consulta, tuple(parametros))
+            consulta, parametros = ModuloClientes.consulta_listar_clientes(
+                solo_activos, busqueda, orden, ids, con_saldo, con_equipos_activos
+            )
+            return db.obtener_todos(consulta, parametros)
             
         except Exception as e:
             config.guardar_log(f"Error al listar clientes: {e}", "ERROR")
@@ -104,7 +180,11 @@ class ModuloClientes:
                 tiene_incobrables,
                 total_incobrables,
                 confiabilidad_pago,
-                fecha_registro
+                fecha_registro,
+                equipos_activos,
+                ordenes_abiertas,
+                saldo_adeudado,
+                fecha_ultima_visita
             FROM clientes
             WHERE id_cliente = ?
             """
@@ -325,7 +405,7 @@ class ModuloClientes:
         """
         try:
             # Solo admin puede marcar incobrables
-            if not config.es_admin:
+            if not config.tiene_permiso("incobrables"):
                 return False, "Solo los administradores pueden marcar deudas como incobrables"
             
             # Obtener cliente
@@ -491,18 +571,55 @@ class ModuloClientes:
             }
     
     @staticmethod
-    def obtener_equipos_cliente(id_cliente):
+    def recalcular_contadores(id_usuario=None):
+        """
+        Vuelve a calcular los contadores de todos los clientes (equipos en
+        taller, órdenes abiertas, saldo y última visita)
+        
+        Args:
+            id_usuario (int): Usuario que lo ejecuta (para auditoría)
+            
+        Returns:
+            tuple: (exito, mensaje, clientes corregidos)
+        """
+        try:
+            corregidos = recalcular_resumen_clientes()
+            
+            mensaje = (f"Contadores corregidos en {corregidos} clientes" if corregidos
+                       else "Los contadores de todos los clientes estaban al día")
+            config.guardar_log(mensaje, "WARNING" if corregidos else "INFO")
+            
+            if corregidos and id_usuario:
+                from sistema_base.seguridad import registrar_accion_auditoria
+                registrar_accion_auditoria(
+                    id_usuario=id_usuario,
+                    accion="Recalcular",
+                    modulo="Clientes",
+                    campo_modificado="contadores",
+                    valor_nuevo=str(corregidos),
+                    motivo="Contadores de clientes desfasados"
+                )
+            
+            return True, mensaje, corregidos
+            
+        except Exception as e:
+            config.guardar_log(f"Error al recalcular contadores de clientes: {e}", "ERROR")
+            return False, f"Error: {str(e)}", 0
+    
+    @staticmethod
+    def obtener_equipos_cliente(id_cliente, incluir_archivo=False):
         """
         Obtiene todos los equipos de un cliente
         
         Args:
             id_cliente (int): ID del cliente
+            incluir_archivo (bool): Incluir los equipos pasados al archivo histórico
             
         Returns:
             list: Lista de equipos del cliente
         """
         try:
-            consulta = """
+            consulta = f"""
             SELECT 
                 id_equipo,
                 tipo_dispositivo,
@@ -511,7 +628,7 @@ class ModuloClientes:
                 identificador,
                 estado_actual,
                 fecha_ingreso
-            FROM equipos
+            FROM {ModuloArchivo.fuente("equipos", incluir_archivo)}
             WHERE id_cliente = ?
             ORDER BY fecha_ingreso DESC
             """
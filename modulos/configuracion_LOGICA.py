@@ -9,9 +9,11 @@ Lógica de negocio para gestión de configuración del sistema
 """
 
 import os
+import re
 import shutil
 from base_datos.conexion import db
 from sistema_base.configuracion import config
+from sistema_base.constantes import CANTIDAD_MINIMA_STOCK_REPUESTOS
 
 
 class ModuloConfiguracion:
@@ -54,7 +56,8 @@ class ModuloConfiguracion:
             # Porcentajes y montos
             configuracion['porcentaje_recargo_transferencia'] = config.porcentaje_recargo_transferencia
             configuracion['porcentaje_minimo_anticipo'] = config.porcentaje_minimo_anticipo
-            configuracion['cantidad_minima_stock_repuestos'] = config.cantidad_minima_stock_repuestos
+            configuracion['cantidad_minima_stock_repuestos'] = getattr(
+                config, 'cantidad_minima_stock_repuestos', CANTIDAD_MINIMA_STOCK_REPUESTOS)
             
             # Textos personalizables
             configuracion['texto_pie_remito'] = config.texto_pie_remito
@@ -91,7 +94,7 @@ class ModuloConfiguracion:
         """
         try:
             # Solo admin
-            if not config.es_admin:
+            if not config.tiene_permiso("configuracion"):
                 return False, "Solo administradores pueden modificar la configuración"
             
             # Actualizar en BD
@@ -128,32 +131,37 @@ class ModuloConfiguracion:
             return False, f"Error: {str(e)}"
     
     @staticmethod
-    def actualizar_colores(color_primario, color_secundario, color_acento, id_usuario):
+    def actualizar_colores(color_primario, color_secundario, id_usuario):
         """
         Actualiza los colores del sistema
         
         Args:
             color_primario (str): Color primario (hex)
             color_secundario (str): Color secundario (hex)
-            color_acento (str): Color de acento (hex)
             id_usuario (int): ID del usuario
             
         Returns:
             tuple: (exito, mensaje)
         """
         try:
-            if not config.es_admin:
+            if not config.tiene_permiso("configuracion"):
                 return False, "Solo administradores pueden modificar la configuración"
             
-            # Actualizar en BD
-            consulta = "UPDATE configuracion_sistema SET valor = ? WHERE clave = ?"
+            for color in (color_primario, color_secundario):
+                if not re.fullmatch(r"#[0-9a-fA-F]{6}", color or ""):
+                    return False, f"Color inválido: {color}"
             
-            db.ejecutar_consulta(consulta, (color_primario, 'color_primario'))
-            db.ejecutar_consulta(consulta, (color_secundario, 'color_secundario'))
-            db.ejecutar_consulta(consulta, (color_acento, 'color_acento'))
+            anteriores = db.obtener_uno(
+                "SELECT color_primario, color_secundario FROM configuracion_sistema WHERE id_config = 1"
+            )
             
-            # Recargar
-            config.cargar_configuracion()
+            db.ejecutar_consulta(
+                "UPDATE configuracion_sistema SET color_primario = ?, color_secundario = ? WHERE id_config = 1",
+                (color_primario, color_secundario)
+            )
+            
+            config.color_primario = color_primario
+            config.color_secundario = color_secundario
             
             # Auditoría
             from sistema_base.seguridad import registrar_accion_auditoria
@@ -161,12 +169,15 @@ class ModuloConfiguracion:
                 id_usuario=id_usuario,
                 accion="Modificar",
                 modulo="Configuración",
-                id_registro=0,
+                id_registro=1,
+                campo_modificado="color_primario, color_secundario",
+                valor_anterior=f"{anteriores['color_primario']}, {anteriores['color_secundario']}" if anteriores else None,
+                valor_nuevo=f"{color_primario}, {color_secundario}",
                 motivo="Colores del sistema actualizados"
             )
             
             config.guardar_log("Colores actualizados", "INFO")
-            return True, "Colores actualizados. Reinicie para ver los cambios."
+            return True, "Colores actualizados"
             
         except Exception as e:
             config.guardar_log(f"Error al actualizar colores: {e}", "ERROR")
@@ -189,7 +200,7 @@ class ModuloConfiguracion:
             tuple: (exito, mensaje)
         """
         try:
-            if not config.es_admin:
+            if not config.tiene_permiso("configuracion"):
                 return False, "Solo administradores pueden modificar la configuración"
             
             consulta = "UPDATE configuracion_sistema SET valor = ? WHERE clave = ?"
@@ -233,7 +244,7 @@ class ModuloConfiguracion:
             tuple: (exito, mensaje)
         """
         try:
-            if not config.es_admin:
+            if not config.tiene_permiso("configuracion"):
                 return False, "Solo administradores pueden modificar la configuración"
             
             consulta = "UPDATE configuracion_sistema SET valor = ? WHERE clave = ?"
@@ -277,7 +288,7 @@ class ModuloConfiguracion:
             tuple: (exito, mensaje)
         """
         try:
-            if not config.es_admin:
+            if not config.tiene_permiso("configuracion"):
                 return False, "Solo administradores pueden modificar la configuración"
             
             consulta = "UPDATE configuracion_sistema SET valor = ? WHERE clave = ?"
@@ -319,7 +330,7 @@ class ModuloConfiguracion:
             tuple: (exito, mensaje, ruta_destino)
         """
         try:
-            if not config.es_admin:
+            if not config.tiene_permiso("configuracion"):
                 return False, "Solo administradores pueden modificar la configuración", None
             
             # Verificar que el archivo existe
@@ -381,7 +392,7 @@ class ModuloConfiguracion:
             tuple: (exito, mensaje)
         """
         try:
-            if not config.es_admin:
+            if not config.tiene_permiso("configuracion"):
                 return False, "Solo administradores pueden modificar la configuración"
             
             consulta = "UPDATE configuracion_sistema SET valor = ? WHERE clave = ?"
@@ -420,7 +431,7 @@ class ModuloConfiguracion:
             tuple: (exito, mensaje)
         """
         try:
-            if not config.es_admin:
+            if not config.tiene_permiso("configuracion"):
                 return False, "Solo administradores pueden restaurar valores"
             
             # Restaurar valores por defecto en la BD
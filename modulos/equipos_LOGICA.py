@@ -9,8 +9,12 @@ Lógica de negocio para gestión de equipos/dispositivos
 
 from datetime import datetime, timedelta
 from base_datos.conexion import db
+from base_datos.versiones import cambios_desde
 from sistema_base.validadores import validar_requerido
 from sistema_base.configuracion import config
+from sistema_base.sesion import SESION_SISTEMA
+from sistema_base.utilidades import formatear_fecha_hora
+from modulos.archivo_LOGICA import ModuloArchivo
 
 
 class ModuloEquipos:
@@ -37,10 +41,134 @@ class ModuloEquipos:
     
     # Valor especial para el filtro "solo equipos en taller (sin entregados)"
     FILTRO_EN_TALLER = "__en_taller__"
+    
+    # Columnas al exportar consulta_listar_equipos: (clave, encabezado[, formateador])
+    COLUMNAS_EXPORTACION = [
+        ("id_equipo", "ID"),
+        ("fecha_ingreso", "Ingreso", formatear_fecha_hora),
+        ("cliente_nombre", "Cliente"),
+        ("tipo_dispositivo", "Dispositivo"),
+        ("marca", "Marca"),
+        ("modelo", "Modelo"),
+        ("identificador", "IMEI/Serie"),
+        ("estado_actual", "Estado"),
+        ("falla_declarada", "Falla declarada"),
+        ("fecha_ultimo_movimiento", "Último movimiento", formatear_fecha_hora)
+    ]
+    
+    # Equipos cuya fila del listado cambió desde una versión (equipo o cliente)
+    CONSULTA_MODIFICADOS = """
+        SELECT id_equipo FROM equipos WHERE version > ?
+        UNION SELECT id_equipo FROM equipos
+        WHERE id_cliente IN (SELECT id_cliente FROM clientes WHERE version > ?)
+    """
 
+    @staticmethod
+    def consulta_listar_equipos(filtro_estado="", filtro_tipo="", filtro_cliente="", busqueda="", orden="fecha_desc",
+                                excluir_entregados=False, ids=None, desde_version=None, incluir_archivo=False,
+                                fecha_desde=None, fecha_hasta=None):
+        """
+        Arma la consulta del listado de equipos (usada también para exportar)
+        
+        Args:
+            filtro_estado (str): Filtrar por estado; FILTRO_EN_TALLER = solo no entregados
+            filtro_tipo (str): Filtrar por tipo de dispositivo
+            filtro_cliente (str): Filtrar por ID de cliente
+            busqueda (str): Buscar en marca, modelo, identificador
+            orden (str): fecha_desc, fecha_asc, cliente
+            excluir_entregados (bool): Si True, no muestra equipos con estado 'Entregado'
+            ids (iterable): Solo estos equipos (para actualizar filas sueltas de un listado)
+            desde_version (int): Solo los que cambiaron desde esa versión (ver listar_equipos_desde)
+            incluir_archivo (bool): Incluir los equipos pasados al archivo histórico
+            fecha_desde: Fecha de ingreso desde (opcional)
+            fecha_hasta: Fecha de ingreso hasta (opcional)
+            
+        Returns:
+            tuple: (consulta, parametros)
+        """
+        consulta = f"""
+        SELECT 
+            e.id_equipo,
+            e.id_cliente,
+            (c.apellido || ', ' || c.nombre) as cliente_nombre,
+            c.tiene_incobrables,
+            e.tipo_dispositivo,
+            e.marca,
+            e.modelo,
+            e.identificador,
+            e.estado_actual,
+            e.fecha_ingreso,
+            e.fecha_ultimo_movimiento,
+            e.falla_declarada
+        FROM {ModuloArchivo.fuente("equipos", incluir_archivo)} e
+        INNER JOIN clientes c ON e.id_cliente = c.id_cliente
+        WHERE e.activo = 1
+        """
+        
+        parametros = []
+        
+        # Normalizar filtro_estado: None se trata como "" (sin filtro)
+        if filtro_estado is None:
+            filtro_estado = ""
+        
+        # Filtro "en taller" (excluye entregados) o por estado concreto
+        if filtro_estado == ModuloEquipos.FILTRO_EN_TALLER or excluir_entregados:
+            # Solo equipos en taller (excluye Entregado)
+            consulta += " AND e.estado_actual != 'Entregado'"
+        elif filtro_estado and filtro_estado != ModuloEquipos.FILTRO_EN_TALLER:
+            # Filtrar por estado específico
+            consulta += " AND e.estado_actual = ?"
+            parametros.append(filtro_estado)
+        # Si filtro_estado == "" (vacío), no se aplica filtro → muestra TODOS los estados (incluyendo Entregado)
+        
+        if filtro_tipo:
+            consulta += " AND e.tipo_dispositivo = ?"
+            parametros.append(filtro_tipo)
+        
+        if filtro_cliente:
+            consulta += " AND e.id_cliente = ?"
+            parametros.append(filtro_cliente)
+        
+        if ids is not None:
+            ids = list(ids)
+            consulta += f" AND e.id_equipo IN ({', '.join('?' * len(ids)) or 'NULL'})"
+            parametros.extend(ids)
+        
+        if desde_version is not None:
+            consulta += f" AND e.id_equipo IN ({ModuloEquipos.CONSULTA_MODIFICADOS})"
+            parametros.extend([desde_version] * 2)
+        
+        if busqueda:
+            consulta += """ AND (
+                e.marca LIKE ? OR 
+                e.modelo LIKE ? OR 
+                e.identificador LIKE ? OR
+                c.nombre LIKE ?
+            )"""
+            busqueda_param = f"%{busqueda}%"
+            parametros.extend([busqueda_param, busqueda_param, busqueda_param, busqueda_param])
+        
+        if fecha_desde:
+            consulta += " AND e.fecha_ingreso >= ?"
+            parametros.append(fecha_desde)
+        
+        if fecha_hasta:
+            consulta += " AND e.fecha_ingreso <= ?"
+            parametros.append(fecha_hasta)
+        
+        # Ordenamiento
+        if orden == "fecha_asc":
+            consulta += " ORDER BY e.fecha_ingreso ASC"
+        elif orden == "cliente":
+            consulta += " ORDER BY c.nombre ASC, e.fecha_ingreso DESC"
+        else:  # fecha_desc (default)
+            consulta += " ORDER BY e.fecha_ingreso DESC"
+        
+        return consulta, tuple(parametros)
+    
     @staticmethod
     def listar_equipos(filtro_estado="", filtro_tipo="", filtro_cliente="", busqueda="", orden="fecha_desc",
-                       excluir_entregados=False):
+                       excluir_entregados=False, ids=None, desde_version=None, incluir_archivo=False):
         """
         Lista equipos (por defecto solo activos).
         
@@ -51,73 +179,19 @@ class ModuloEquipos:
             busqueda (str): Buscar en marca, modelo, identificador
             orden (str): fecha_desc, fecha_asc, cliente
             excluir_entregados (bool): Si True, no muestra equipos con estado 'Entregado'
+            ids (iterable): Solo estos equipos (para actualizar filas sueltas de un listado)
+            desde_version (int): Solo los que cambiaron desde esa versión (ver listar_equipos_desde)
+            incluir_archivo (bool): Incluir los equipos pasados al archivo histórico
             
         Returns:
             list: Lista de equipos con datos del cliente
         """
         try:
-            consulta = """
-            SELECT 
-                e.id_equipo,
-                e.id_cliente,
-                (c.apellido || ', ' || c.nombre) as cliente_nombre,
-                c.tiene_incobrables,
-                e.tipo_dispositivo,
-                e.marca,
-                e.modelo,
-                e.identificador,
-                e.estado_actual,
-                e.fecha_ingreso,
-                e.fecha_ultimo_movimiento,
-                e.falla_declarada
-            FROM equipos e
-            INNER JOIN clientes c ON e.id_cliente = c.id_cliente
-            WHERE e.activo = 1
-            """
-            
-            parametros = []
-            
-            # Normalizar filtro_estado: None se trata como "" (sin filtro)
-            if filtro_estado is None:
-                filtro_estado = ""
-            
-            # Filtro "en taller" (excluye entregados) o por estado concreto
-            if filtro_estado == ModuloEquipos.FILTRO_EN_TALLER or excluir_entregados:
-                # Solo equipos en taller (excluye Entregado)
-                consulta += " AND e.estado_actual != 'Entregado'"
-            elif filtro_estado and filtro_estado != ModuloEquipos.FILTRO_EN_TALLER:
-                # Filtrar por estado específico
-                consulta += " AND e.estado_actual = ?"
-                parametros.append(filtro_estado)
-            # Si filtro_estado == "" (vacío), no se aplica filtro → muestra TODOS los estados (incluyendo Entregado)
-            
-            if filtro_tipo:
-                consulta += " AND e.tipo_dispositivo = ?"
-                parametros.append(filtro_tipo)
-            
-            if filtro_cliente:
-                consulta += " AND e.id_cliente = ?"
-                parametros.append(filtro_cliente)
-            
-            if busqueda:
-                consulta += """ AND (
-                    e.marca LIKE ? OR 
-                    e.modelo LIKE ? OR 
-                    e.identificador LIKE ? OR
-                    c.nombre LIKE ?
-                )"""
-                busqueda_param = f"%{busqueda}%"
-                parametros.extend([busqueda_param, busqueda_param, busqueda_param, busqueda_param])
-            
-            # Ordenamiento
-            if orden == "fecha_asc":
-                consulta += " ORDER BY e.fecha_ingreso ASC"
-            elif orden == "cliente":
-                consulta += " ORDER BY c.nombre ASC, e.fecha_ingreso DESC"
-            else:  # fecha_desc (default)
-                consulta += " ORDER BY e.fecha_ingreso DESC"
-            
-            equipos = db.obtener_todos(consulta, tuple(parametros))
+            consulta, parametros = ModuloEquipos.consulta_listar_equipos(
+                filtro_estado, filtro_tipo, filtro_cliente, busqueda, orden,
+                excluir_entregados, ids, desde_version, incluir_archivo
+            )
+            equipos = db.obtener_todos(consulta, parametros)
             
             # Calcular días sin movimiento para cada equipo
             for equipo in equipos:
@@ -138,6 +212,25 @@ class ModuloEquipos:
             config.guardar_log(f"Error al listar equipos: {e}", "ERROR")
             return []
     
+    @staticmethod
+    def listar_equipos_desde(version=None, **filtros):
+        """
+        Cambios del listado de equipos desde una versión de los datos
+        
+        Args:
+            version (int): Versión devuelta por la llamada anterior (None = listado completo)
+            **filtros: Los mismos de listar_equipos
+            
+        Returns:
+            dict: 'version', 'cambios' (equipos nuevos o modificados) y
+                'eliminados' (IDs que ya no corresponden al listado)
+        """
+        return cambios_desde(
+            "equipos", version,
+            lambda desde: ModuloEquipos.listar_equipos(desde_version=desde, **filtros),
+            ModuloEquipos.CONSULTA_MODIFICADOS
+        )
+    
     @staticmethod
     def obtener_equipo_por_id(id_equipo):
         """
@@ -637,16 +730,11 @@ class ModuloEquipos:
             equipos_abandonados = db.obtener_todos(consulta_abandonados, (fecha_limite_abandonado,))
             
             # Marcar automáticamente como abandonados (solo si está "Listo" o "Sin reparación")
-            id_usuario_sistema = getattr(config, 'id_usuario_actual', None)
-            if id_usuario_sistema is None:
-                # Fallback: primer usuario admin para acciones automáticas
-                r = db.obtener_uno("SELECT id_usuario FROM usuarios WHERE rol = 'admin' AND activo = 1 LIMIT 1")
-                id_usuario_sistema = r['id_usuario'] if r else 1
             for equipo in equipos_abandonados:
                 if equipo['estado_actual'] in ['Listo', 'Sin reparación']:
                     ModuloEquipos.marcar_como_abandonado(
                         equipo['id_equipo'],
-                        id_usuario_sistema,
+                        SESION_SISTEMA.id_usuario,
                         "",
                         f"Marcado automáticamente por el sistema ({dias_abandonado}+ días sin retirar)"
                     )
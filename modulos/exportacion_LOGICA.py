@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - MÓDULO DE EXPORTACIÓN
+============================================================================
+Exportación de listados a CSV o Excel (XLSX).
+
+Trabaja sobre la consulta de cualquier listado (consulta_listar_* de cada
+módulo): las filas se leen del cursor por lotes y se escriben a medida
+que llegan, sin cargar el resultado completo en memoria. El XLSX se
+escribe con openpyxl en modo write_only (memoria constante).
+============================================================================
+"""
+
+import csv
+import os
+
+from base_datos.conexion import db
+from sistema_base.configuracion import config
+
+
+class ModuloExportacion:
+    """Clase para exportar listados a archivos"""
+
+    FORMATOS = ["csv", "xlsx"]
+
+    # Cada cuántas filas se informa el progreso
+    INTERVALO_PROGRESO = 500
+
+    @staticmethod
+    def contar_filas(consulta, parametros=None):
+        """
+        Cuenta las filas que devuelve una consulta
+
+        Args:
+            consulta (str): Consulta SQL del listado
+            parametros (tuple): Parámetros de la consulta
+
+        Returns:
+            int: Cantidad de filas
+        """
+        try:
+            resultado = db.obtener_uno(f"SELECT COUNT(*) as total FROM ({consulta})", parametros)
+            return resultado['total'] if resultado else 0
+        except Exception as e:
+            config.guardar_log(f"Error al contar filas a exportar: {e}", "ERROR")
+            return 0
+
+    @staticmethod
+    def exportar_consulta(consulta, parametros, columnas, ruta_archivo,
+                          callback_progreso=None, evento_cancelacion=None, titulo_hoja="Datos"):
+        """
+        Exporta el resultado de una consulta a CSV o XLSX
+
+        Args:
+            consulta (str): Consulta SQL del listado
+            parametros (tuple): Parámetros de la consulta
+            columnas (list): Tuplas (clave, encabezado[, formateador])
+            ruta_archivo (str): Archivo destino (.csv o .xlsx)
+            callback_progreso (callable): Función (procesados, total)
+            evento_cancelacion (threading.Event): Detiene la exportación al activarse
+            titulo_hoja (str): Nombre de la hoja (solo XLSX)
+
+        Returns:
+            tuple: (exito, mensaje, cantidad_filas)
+        """
+        formato = os.path.splitext(str(ruta_archivo))[1].lower().lstrip(".")
+
+        if formato not in ModuloExportacion.FORMATOS:
+            return False, f"Formato no soportado: {formato}", 0
+
+        total = ModuloExportacion.contar_filas(consulta, parametros) if callback_progreso else 0
+        encabezados = [columna[1] for columna in columnas]
+
+        def filas():
+            for registro in db.iterar_consulta(consulta, parametros):
+                fila = []
+                for columna in columnas:
+                    valor = registro.get(columna[0])
+                    if len(columna) > 2 and columna[2]:
+                        valor = columna[2](valor)
+                    fila.append("" if valor is None else valor)
+                yield fila
+
+        cantidad = 0
+        cancelado = False
+
+        try:
+            if formato == "csv":
+                archivo = open(ruta_archivo, "w", newline="", encoding="utf-8-sig")
+                escritor = csv.writer(archivo)
+                escribir = escritor.writerow
+            else:
+                from openpyxl import Workbook
+                libro = Workbook(write_only=True)
+                hoja = libro.create_sheet(title=titulo_hoja[:31])
+                escribir = hoja.append
+
+            try:
+                escribir(encabezados)
+
+                for fila in filas():
+                    if evento_cancelacion is not None and evento_cancelacion.is_set():
+                        cancelado = True
+                        break
+
+                    escribir(fila)
+                    cantidad += 1
+
+                    if callback_progreso and cantidad % ModuloExportacion.INTERVALO_PROGRESO == 0:
+                        callback_progreso(cantidad, total)
+
+                if formato == "xlsx" and not cancelado:
+                    libro.save(ruta_archivo)
+            finally:
+                if formato == "csv":
+                    archivo.close()
+
+            if cancelado:
+                if os.path.exists(ruta_archivo):
+                    os.remove(ruta_archivo)
+                return False, "Exportación cancelada", cantidad
+
+            if callback_progreso:
+                callback_progreso(cantidad, total)
+
+            config.guardar_log(f"Exportación de {cantidad} registros a {ruta_archivo}", "INFO")
+            return True, f"Se exportaron {cantidad} registros", cantidad
+
+        except ImportError:
+            return False, "Error: La librería openpyxl no está instalada. Ejecute: pip install openpyxl", 0
+        except Exception as e:
+            config.guardar_log(f"Error al exportar listado: {e}", "ERROR")
+            return False, f"Error: {str(e)}", cantidad
@@ -7,8 +7,9 @@ Lógica de negocio para generación y gestión de facturas
 ============================================================================
 """
 
-from datetime import datetime
+from datetime import datetime, date, timedelta
 from base_datos.conexion import db
+from base_datos.saldos_facturas import recalcular_saldos_facturas
 from sistema_base.configuracion import config
 
 
@@ -23,42 +24,89 @@ class ModuloFacturacion:
         "Incobrable"
     ]
     
+    # Tramos del reporte de antigüedad de saldos: (clave, título, desde días, hasta días)
+    TRAMOS_ANTIGUEDAD = [
+        ("dias_0_30", "0-30 días", 0, 30),
+        ("dias_31_60", "31-60 días", 31, 60),
+        ("dias_61_90", "61-90 días", 61, 90),
+        ("dias_90_mas", "Más de 90 días", 91, None)
+    ]
+    
+    # Columnas al exportar consulta_antiguedad_saldos: (clave, encabezado[, formateador])
+    COLUMNAS_ANTIGUEDAD = [
+        ("cliente_nombre", "Cliente"),
+        ("telefono", "Teléfono"),
+        ("facturas", "Facturas"),
+        ("dias_max", "Días (más vieja)")
+    ] + [(clave, titulo) for clave, titulo, _, _ in TRAMOS_ANTIGUEDAD] + [
+        ("total", "Total adeudado"),
+        ("porcentaje", "% del total")
+    ]
+    
+    # Último reporte de antigüedad: {(fecha de corte, versión de los datos): reporte}
+    _cache_antiguedad = {}
+    
     @staticmethod
-    def generar_numero_factura():
+    def generar_numero_factura(cursor=None):
         """
         Genera un número único de factura con formato: F-YYYY-####
         
+        Args:
+            cursor: Cursor de la transacción donde se inserta la factura
+                    (así el número no se consume si la inserción falla)
+        
         Returns:
             str: Número de factura generado
         """
         try:
-            anio_actual = datetime.now().year
-            prefijo = f"F-{anio_actual}-"
-            
-            # Buscar la última factura del año
-            consulta = """
-            SELECT numero_factura 
-            FROM facturas 
-            WHERE numero_factura LIKE ?
-            ORDER BY numero_factura DESC
-            LIMIT 1
-            """
-            
-            resultado = db.obtener_uno(consulta, (f"{prefijo}%",))
-            
-            if resultado:
-                ultimo_numero = resultado['numero_factura']
-                secuencial = int(ultimo_numero.split('-')[-1])
-                nuevo_secuencial = secuencial + 1
-            else:
-                nuevo_secuencial = 1
-            
-            return f"{prefijo}{nuevo_secuencial:04d}"
+            from base_datos.secuencias import siguiente_numero_factura
+            return siguiente_numero_factura(cursor)
             
         except Exception as e:
             config.guardar_log(f"Error al generar número de factura: {e}", "ERROR")
+            if cursor is not None:
+                raise
             return f"F-{datetime.now().strftime('%Y-%m%d-%H%M%S')}"
     
+    @staticmethod
+    def _obtener_orden(id_orden):
+        """Orden a facturar, con su equipo, cliente y el monto del presupuesto"""
+        consulta = """
+        SELECT o.id_orden, o.id_equipo, o.id_cliente, o.estado,
+               p.monto_total as monto_presupuesto
+        FROM ordenes_trabajo o
+        LEFT JOIN presupuestos p ON o.id_presupuesto = p.id_presupuesto
+        WHERE o.id_orden = ?
+        """
+        return db.obtener_uno(consulta, (id_orden,))
+    
+    @staticmethod
+    def _insertar_factura(orden, monto_total):
+        """
+        Numera e inserta una factura en una sola transacción
+        
+        Returns:
+            tuple: (id_factura, numero_factura)
+        """
+        consulta = """
+        INSERT INTO facturacion (
+            numero_factura, id_orden, id_cliente, monto_total,
+            monto_adeudado, estado_cobro, fecha_emision
+        )
+        VALUES (?, ?, ?, ?, ?, 'Pendiente', ?)
+        """
+        
+        # Número e inserción en la misma transacción (los anticipos de la
+        # orden los imputa el trigger saldo_factura_insert)
+        with db.transaccion() as cursor:
+            numero_factura = ModuloFacturacion.generar_numero_factura(cursor)
+            cursor.execute(
+                consulta,
+                (numero_factura, orden['id_orden'], orden['id_cliente'],
+                 monto_total, monto_total, datetime.now())
+            )
+            return cursor.lastrowid, numero_factura
+    
     @staticmethod
     def generar_factura_desde_orden(id_orden, id_usuario):
         """
@@ -73,39 +121,23 @@ class ModuloFacturacion:
         """
         try:
             # Obtener datos de la orden
-            from modulos.ordenes import ModuloOrdenes
-            orden = ModuloOrdenes.obtener_orden_por_id(id_orden)
+            orden = ModuloFacturacion._obtener_orden(id_orden)
             
             if not orden:
                 return False, "Orden no encontrada", None
             
             # Verificar que esté finalizada con reparación
-            if orden['estado_orden'] != "Finalizada con reparación":
+            # ('Finalizada' en ModuloOrdenes, 'Finalizado' en sistema_base.constantes)
+            if not (orden['estado'].startswith("Finalizad") and orden['estado'].endswith("con reparación")):
                 return False, "La orden debe estar finalizada con reparación", None
             
-            # Generar número de factura
-            numero_factura = ModuloFacturacion.generar_numero_factura()
-            
             # Obtener monto del presupuesto
             monto_total = orden['monto_presupuesto'] if orden['monto_presupuesto'] else 0.0
             
-            # Insertar factura
-            consulta = """
-            INSERT INTO facturas (
-                numero_factura, id_cliente, id_orden, total,
-                estado_cobro, fecha_emision, id_usuario_genera
-            )
-            VALUES (?, ?, ?, ?, 'Pendiente', ?, ?)
-            """
-            
-            id_nueva = db.ejecutar_consulta(
-                consulta,
-                (numero_factura, orden['id_cliente'], id_orden, 
-                 monto_total, datetime.now(), id_usuario)
-            )
+            id_nueva, numero_factura = ModuloFacturacion._insertar_factura(orden, monto_total)
             
             # Agregar nota al equipo
-            from modulos.equipos import ModuloEquipos
+            from modulos.equipos_LOGICA import ModuloEquipos
             ModuloEquipos.agregar_nota_equipo(
                 orden['id_equipo'],
                 f"Factura {numero_factura} generada: ${monto_total:.2f}",
@@ -144,29 +176,12 @@ class ModuloFacturacion:
         """
         try:
             # Obtener orden
-            from modulos.ordenes import ModuloOrdenes
-            orden = ModuloOrdenes.obtener_orden_por_id(id_orden)
+            orden = ModuloFacturacion._obtener_orden(id_orden)
             
             if not orden:
                 return False, "Orden no encontrada", None
             
-            # Generar número
-            numero_factura = ModuloFacturacion.generar_numero_factura()
-            
-            # Insertar factura
-            consulta = """
-            INSERT INTO facturas (
-                numero_factura, id_cliente, id_orden, total,
-                estado_cobro, fecha_emision, id_usuario_genera
-            )
-            VALUES (?, ?, ?, ?, 'Pendiente', ?, ?)
-            """
-            
-            id_nueva = db.ejecutar_consulta(
-                consulta,
-                (numero_factura, orden['id_cliente'], id_orden,
-                 monto_diagnostico, datetime.now(), id_usuario)
-            )
+            id_nueva, numero_factura = ModuloFacturacion._insertar_factura(orden, monto_diagnostico)
             
             config.guardar_log(f"Factura {numero_factura} de diagnóstico generada", "INFO")
             return True, f"Factura {numero_factura} generada", id_nueva
@@ -176,7 +191,8 @@ class ModuloFacturacion:
             return False, f"Error: {str(e)}", None
     
     @staticmethod
-    def listar_facturas(filtro_estado="", busqueda="", fecha_desde=None, fecha_hasta=None):
+    def listar_facturas(filtro_estado="", busqueda="", fecha_desde=None, fecha_hasta=None,
+                        solo_adeudadas=False):
         """
         Lista todas las facturas
         
@@ -185,6 +201,8 @@ class ModuloFacturacion:
             busqueda (str): Buscar en número, cliente
             fecha_desde: Fecha desde
             fecha_hasta: Fecha hasta
+            solo_adeudadas (bool): Solo las que tienen saldo por cobrar
+                (sin las incobrables), de la mayor deuda a la menor
             
         Returns:
             list: Lista de facturas
@@ -195,7 +213,7 @@ class ModuloFacturacion:
                 f.*,
                 c.nombre as cliente_nombre,
                 c.tiene_incobrables
-            FROM facturas f
+            FROM facturacion f
             INNER JOIN clientes c ON f.id_cliente = c.id_cliente
             WHERE 1=1
             """
@@ -222,7 +240,12 @@ class ModuloFacturacion:
                 consulta += " AND f.fecha_emision <= ?"
                 parametros.append(fecha_hasta)
             
-            consulta += " ORDER BY f.fecha_emision DESC"
+            # monto_adeudado lo mantienen los triggers de pagos (índice idx_facturacion_cobro)
+            if solo_adeudadas:
+                consulta += " AND f.estado_cobro IN ('Pendiente', 'Pago parcial') AND f.monto_adeudado > 0"
+                consulta += " ORDER BY f.monto_adeudado DESC"
+            else:
+                consulta += " ORDER BY f.fecha_emision DESC"
             
             return db.obtener_todos(consulta, tuple(parametros))
             
@@ -247,11 +270,9 @@ class ModuloFacturacion:
                 f.*,
                 c.nombre as cliente_nombre,
                 c.telefono as cliente_telefono,
-                c.direccion as cliente_direccion,
-                u.nombre as usuario_nombre
-            FROM facturas f
+                c.direccion as cliente_direccion
+            FROM facturacion f
             INNER JOIN clientes c ON f.id_cliente = c.id_cliente
-            LEFT JOIN usuarios u ON f.id_usuario_genera = u.id_usuario
             WHERE f.id_factura = ?
             """
             
@@ -264,7 +285,11 @@ class ModuloFacturacion:
     @staticmethod
     def actualizar_estado_cobro(id_factura):
         """
-        Actualiza el estado de cobro de una factura según los pagos
+        Verifica lo pagado, lo adeudado y el estado de cobro de una factura
+        contra sus pagos y lo corrige si quedó desfasado
+        
+        (Al registrar pagos no hace falta: lo mantienen los triggers de
+        base_datos.saldos_facturas)
         
         Args:
             id_factura (int): ID de la factura
@@ -273,32 +298,194 @@ class ModuloFacturacion:
             tuple: (exito, mensaje)
         """
         try:
-            factura = ModuloFacturacion.obtener_factura_por_id(id_factura)
+            factura = db.obtener_uno(
+                "SELECT estado_cobro FROM facturacion WHERE id_factura = ?", (id_factura,)
+            )
             if not factura:
                 return False, "Factura no encontrada"
             
-            # Obtener total pagado
-            from modulos.pagos import ModuloPagos
-            total_pagado = ModuloPagos.obtener_total_pagado(id_factura)
-            
-            # Determinar estado
-            if total_pagado == 0:
-                nuevo_estado = "Pendiente"
-            elif total_pagado >= factura['total']:
-                nuevo_estado = "Pagado"
-            else:
-                nuevo_estado = "Pago parcial"
-            
-            # Actualizar
-            consulta = "UPDATE facturas SET estado_cobro = ? WHERE id_factura = ?"
-            db.ejecutar_consulta(consulta, (nuevo_estado, id_factura))
+            if not recalcular_saldos_facturas(id_factura):
+                return True, f"Estado al día: '{factura['estado_cobro']}'"
             
-            return True, f"Estado actualizado a '{nuevo_estado}'"
+            factura = db.obtener_uno(
+                "SELECT estado_cobro FROM facturacion WHERE id_factura = ?", (id_factura,)
+            )
+            return True, f"Estado actualizado a '{factura['estado_cobro']}'"
             
         except Exception as e:
             config.guardar_log(f"Error al actualizar estado de cobro: {e}", "ERROR")
             return False, f"Error: {str(e)}"
     
+    @staticmethod
+    def verificar_saldos(id_usuario=None):
+        """
+        Verifica lo pagado y lo adeudado de todas las facturas contra sus
+        pagos y corrige las desfasadas
+        
+        Args:
+            id_usuario (int): Usuario que lo ejecuta (para auditoría)
+            
+        Returns:
+            tuple: (exito, mensaje, IDs de las facturas corregidas)
+        """
+        try:
+            corregidas = recalcular_saldos_facturas()
+            
+            mensaje = (f"Saldos corregidos en {len(corregidas)} facturas" if corregidas
+                       else "Los saldos de todas las facturas estaban al día")
+            config.guardar_log(mensaje, "WARNING" if corregidas else "INFO")
+            
+            if corregidas and id_usuario:
+                from sistema_base.seguridad import registrar_accion_auditoria
+                registrar_accion_auditoria(
+                    id_usuario=id_usuario,
+                    accion="Recalcular",
+                    modulo="Facturas",
+                    campo_modificado="monto_pagado",
+                    valor_nuevo=", ".join(str(id_factura) for id_factura in corregidas[:50]),
+                    motivo=f"Saldos de {len(corregidas)} facturas desfasados de sus pagos"
+                )
+            
+            return True, mensaje, corregidas
+            
+        except Exception as e:
+            config.guardar_log(f"Error al verificar saldos de facturas: {e}", "ERROR")
+            return False, f"Error: {str(e)}", []
+    
+    @staticmethod
+    def consulta_antiguedad_saldos(fecha_corte=None):
+        """
+        Arma la consulta de antigüedad de saldos por cliente (usada también para exportar)
+        
+        Una sola pasada: lo adeudado de cada factura a la fecha de corte
+        (hoy, monto_adeudado; antes, el total menos los pagos hasta ese
+        día) se reparte por cliente en los
+        tramos de TRAMOS_ANTIGUEDAD según los días desde su emisión, con la
+        parte de cada cliente en el total. La última fila es la de totales
+        (id_cliente NULL). No incluye las facturas incobrables.
+        
+        Args:
+            fecha_corte: Fecha a la que se calcula (None = hoy)
+            
+        Returns:
+            tuple: (consulta, parametros)
+        """
+        corte = str(fecha_corte or date.today())[:10]
+        dia_corte = datetime.strptime(corte, "%Y-%m-%d").date()
+        
+        if corte >= date.today().isoformat():
+            # Al día de hoy alcanza con lo adeudado que mantienen los triggers
+            # de pagos. Solo las pendientes, por su índice: agrupando por
+            # cliente el planificador preferiría recorrer todas las facturas
+            saldos = f"""
+            SELECT f.id_cliente, f.fecha_emision, f.monto_adeudado AS saldo
+            FROM facturacion f INDEXED BY idx_facturacion_cobro
+            WHERE f.estado_cobro IN ('Pendiente', 'Pago parcial') AND f.monto_adeudado > 0
+            """
+            parametros = []
+        else:
+            # A una fecha pasada: el total menos los pagos hasta ese día
+            saldos = f"""
+            SELECT f.id_cliente, f.fecha_emision, f.monto_total - COALESCE(SUM(p.monto), 0) AS saldo
+            FROM facturacion f
+            LEFT JOIN pagos p ON p.id_factura = f.id_factura AND p.fecha_pago < date(?, '+1 day')
+            WHERE f.estado_cobro != 'Incobrable' AND f.fecha_emision < date(?, '+1 day')
+            GROUP BY f.id_factura
+            """
+            parametros = [corte, corte]
+        
+        # Cada tramo es un rango de fechas de emisión: comparar texto es
+        # mucho más barato que calcular los días de cada factura
+        parametros.append(corte)
+        tramos = []
+        for clave, _, desde, hasta in ModuloFacturacion.TRAMOS_ANTIGUEDAD:
+            condicion = "fecha_emision < ?"
+            parametros.append((dia_corte - timedelta(days=desde - 1)).isoformat())
+            if hasta is not None:
+                condicion += " AND fecha_emision >= ?"
+                parametros.append((dia_corte - timedelta(days=hasta)).isoformat())
+            tramos.append(f"ROUND(SUM(CASE WHEN {condicion} THEN saldo ELSE 0 END), 2) AS {clave}")
+        claves = [clave for clave, _, _, _ in ModuloFacturacion.TRAMOS_ANTIGUEDAD]
+        
+        consulta = f"""
+        WITH saldos AS ({saldos}),
+        por_cliente AS (
+            SELECT
+                id_cliente,
+                COUNT(*) AS facturas,
+                CAST(julianday(?) - julianday(date(MIN(fecha_emision))) AS INTEGER) AS dias_max,
+                {', '.join(tramos)},
+                ROUND(SUM(saldo), 2) AS total
+            FROM saldos
+            WHERE saldo > 0.005
+            GROUP BY id_cliente
+        )
+        SELECT * FROM (
+            SELECT
+                pc.id_cliente,
+                c.nombre AS cliente_nombre,
+                c.telefono,
+                pc.facturas,
+                pc.dias_max,
+                {', '.join(f'pc.{clave}' for clave in claves)},
+                pc.total,
+                ROUND(100.0 * pc.total / SUM(pc.total) OVER (), 1) AS porcentaje
+            FROM por_cliente pc
+            INNER JOIN clientes c ON c.id_cliente = pc.id_cliente
+            UNION ALL
+            SELECT
+                NULL, 'TOTAL', NULL,
+                COALESCE(SUM(facturas), 0),
+                MAX(dias_max),
+                {', '.join(f'COALESCE(ROUND(SUM({clave}), 2), 0)' for clave in claves)},
+                COALESCE(ROUND(SUM(total), 2), 0),
+                100.0
+            FROM por_cliente
+        )
+        ORDER BY id_cliente IS NULL, total DESC
+        """
+        
+        return consulta, tuple(parametros)
+    
+    @staticmethod
+    def obtener_antiguedad_saldos(fecha_corte=None):
+        """
+        Reporte de antigüedad de saldos (cuentas por cobrar) por cliente
+        
+        Se calcula una vez por fecha de corte y se reutiliza mientras no se
+        escriban datos (lo detecta la versión global de base_datos.versiones).
+        
+        Args:
+            fecha_corte: Fecha a la que se calcula (None = hoy)
+            
+        Returns:
+            dict: 'fecha_corte', 'clientes' (filas de consulta_antiguedad_saldos)
+                  y 'totales' (la fila de totales)
+        """
+        try:
+            from base_datos.versiones import version_actual
+            
+            corte = str(fecha_corte or date.today())[:10]
+            clave = (corte, version_actual())
+            
+            reporte = ModuloFacturacion._cache_antiguedad.get(clave)
+            if reporte is None:
+                consulta, parametros = ModuloFacturacion.consulta_antiguedad_saldos(corte)
+                filas = db.obtener_todos(consulta, parametros)
+                reporte = {
+                    'fecha_corte': corte,
+                    'clientes': filas[:-1],
+                    'totales': filas[-1]
+                }
+                ModuloFacturacion._cache_antiguedad.clear()
+                ModuloFacturacion._cache_antiguedad[clave] = reporte
+            
+            return reporte
+            
+        except Exception as e:
+            config.guardar_log(f"Error al obtener antigüedad de saldos: {e}", "ERROR")
+            return {'fecha_corte': None, 'clientes': [], 'totales': {}}
+    
     @staticmethod
     def marcar_incobrable(id_factura, motivo, id_usuario):
         """
@@ -314,24 +501,27 @@ class ModuloFacturacion:
         """
         try:
             # Solo admin
-            if not config.es_admin:
+            if not config.tiene_permiso("incobrables"):
                 return False, "Solo administradores pueden marcar facturas como incobrables"
             
             factura = ModuloFacturacion.obtener_factura_por_id(id_factura)
             if not factura:
                 return False, "Factura no encontrada"
             
-            # Actualizar factura
-            consulta = "UPDATE facturas SET estado_cobro = 'Incobrable' WHERE id_factura = ?"
-            db.ejecutar_consulta(consulta, (id_factura,))
+            # Actualizar factura (los triggers de pagos conservan el estado Incobrable)
+            consulta = """
+            UPDATE facturacion
+            SET estado_cobro = 'Incobrable', fecha_incobrable = ?,
+                motivo_incobrable = ?, marcado_incobrable_por = ?
+            WHERE id_factura = ?
+            """
+            db.ejecutar_consulta(consulta, (datetime.now(), motivo, id_usuario, id_factura))
             
             # Marcar deuda incobrable en cliente
             from modulos.clientes import ModuloClientes
             
-            # Calcular monto pendiente
-            from modulos.pagos import ModuloPagos
-            total_pagado = ModuloPagos.obtener_total_pagado(id_factura)
-            monto_pendiente = factura['total'] - total_pagado
+            # Monto pendiente
+            monto_pendiente = factura['monto_adeudado']
             
             if monto_pendiente > 0:
                 ModuloClientes.marcar_deuda_incobrable(
@@ -390,30 +580,30 @@ class ModuloFacturacion:
                 parametros.append(fecha_hasta)
             
             # Total facturas
-            consulta = f"SELECT COUNT(*) as total FROM facturas WHERE 1=1 {where_fecha}"
+            consulta = f"SELECT COUNT(*) as total FROM facturacion WHERE 1=1 {where_fecha}"
             resultado = db.obtener_uno(consulta, tuple(parametros))
             estadisticas['total'] = resultado['total'] if resultado else 0
             
             # Por estado
             for estado in ModuloFacturacion.ESTADOS_COBRO:
-                consulta = f"SELECT COUNT(*) as total FROM facturas WHERE estado_cobro = ? {where_fecha}"
+                consulta = f"SELECT COUNT(*) as total FROM facturacion WHERE estado_cobro = ? {where_fecha}"
                 params = [estado] + parametros
                 resultado = db.obtener_uno(consulta, tuple(params))
                 key = estado.lower().replace(" ", "_")
                 estadisticas[key] = resultado['total'] if resultado else 0
             
             # Monto total facturado
-            consulta = f"SELECT SUM(total) as total FROM facturas WHERE 1=1 {where_fecha}"
+            consulta = f"SELECT SUM(monto_total) as total FROM facturacion WHERE 1=1 {where_fecha}"
             resultado = db.obtener_uno(consulta, tuple(parametros))
             estadisticas['monto_total'] = resultado['total'] if resultado and resultado['total'] else 0.0
             
-            # Monto cobrado (facturas pagadas)
-            consulta = f"SELECT SUM(total) as total FROM facturas WHERE estado_cobro = 'Pagado' {where_fecha}"
+            # Monto cobrado (lo pagado de todas las facturas)
+            consulta = f"SELECT SUM(monto_pagado) as total FROM facturacion WHERE 1=1 {where_fecha}"
             resultado = db.obtener_uno(consulta, tuple(parametros))
             estadisticas['monto_cobrado'] = resultado['total'] if resultado and resultado['total'] else 0.0
             
             # Monto pendiente
-            consulta = f"SELECT SUM(total) as total FROM facturas WHERE estado_cobro IN ('Pendiente', 'Pago parcial') {where_fecha}"
+            consulta = f"SELECT SUM(monto_adeudado) as total FROM facturacion WHERE estado_cobro IN ('Pendiente', 'Pago parcial') {where_fecha}"
             resultado = db.obtener_uno(consulta, tuple(parametros))
             estadisticas['monto_pendiente'] = resultado['total'] if resultado and resultado['total'] else 0.0
             
@@ -10,6 +10,7 @@ Lógica de negocio para gestión de garantías
 from datetime import datetime, timedelta
 from base_datos.conexion import db
 from sistema_base.configuracion import config
+from sistema_base.utilidades import formatear_fecha_hora
 
 
 class ModuloGarantias:
@@ -22,6 +23,21 @@ class ModuloGarantias:
         "Utilizada"
     ]
     
+    # Columnas al exportar consulta_listar_garantias: (clave, encabezado[, formateador])
+    COLUMNAS_EXPORTACION = [
+        ("id_garantia", "N° Garantía"),
+        ("id_orden", "Orden"),
+        ("cliente_nombre", "Cliente"),
+        ("cliente_telefono", "Teléfono"),
+        ("tipo_dispositivo", "Dispositivo"),
+        ("marca", "Marca"),
+        ("modelo", "Modelo"),
+        ("descripcion_reparacion", "Reparación"),
+        ("fecha_inicio", "Inicio", formatear_fecha_hora),
+        ("fecha_vencimiento", "Vencimiento", formatear_fecha_hora),
+        ("estado_garantia", "Estado")
+    ]
+    
     @staticmethod
     def crear_garantia(id_orden, dias_garantia=None, id_usuario=None):
         """
@@ -96,6 +112,62 @@ class ModuloGarantias:
             config.guardar_log(f"Error al crear garantía: {e}", "ERROR")
             return False, f"Error: {str(e)}", None
     
+    @staticmethod
+    def consulta_listar_garantias(filtro_estado="", busqueda="", fecha_desde=None, fecha_hasta=None):
+        """
+        Arma la consulta del listado de garantías (usada también para exportar)
+        
+        Args:
+            filtro_estado (str): Filtrar por estado
+            busqueda (str): Buscar en cliente, equipo
+            fecha_desde: Fecha de inicio desde (opcional)
+            fecha_hasta: Fecha de inicio hasta (opcional)
+            
+        Returns:
+            tuple: (consulta, parametros)
+        """
+        consulta = """
+        SELECT 
+            g.*,
+            g.estado as estado_garantia,
+            e.tipo_dispositivo,
+            e.marca,
+            e.modelo,
+            c.nombre as cliente_nombre,
+            c.telefono as cliente_telefono
+        FROM garantias g
+        INNER JOIN equipos e ON g.id_equipo = e.id_equipo
+        INNER JOIN clientes c ON e.id_cliente = c.id_cliente
+        WHERE 1=1
+        """
+        
+        parametros = []
+        
+        if filtro_estado:
+            consulta += " AND g.estado = ?"
+            parametros.append(filtro_estado)
+        
+        if busqueda:
+            consulta += """ AND (
+                c.nombre LIKE ? OR
+                e.marca LIKE ? OR
+                e.modelo LIKE ?
+            )"""
+            busqueda_param = f"%{busqueda}%"
+            parametros.extend([busqueda_param] * 3)
+        
+        if fecha_desde:
+            consulta += " AND g.fecha_inicio >= ?"
+            parametros.append(fecha_desde)
+        
+        if fecha_hasta:
+            consulta += " AND g.fecha_inicio <= ?"
+            parametros.append(fecha_hasta)
+        
+        consulta += " ORDER BY g.fecha_vencimiento ASC"
+        
+        return consulta, tuple(parametros)
+    
     @staticmethod
     def listar_garantias(filtro_estado="", busqueda=""):
         """
@@ -109,38 +181,10 @@ class ModuloGarantias:
             list: Lista de garantías
         """
         try:
-            consulta = """
-            SELECT 
-                g.*,
-                e.tipo_dispositivo,
-                e.marca,
-                e.modelo,
-                c.nombre as cliente_nombre,
-                c.telefono as cliente_telefono
-            FROM garantias g
-            INNER JOIN equipos e ON g.id_equipo = e.id_equipo
-            INNER JOIN clientes c ON e.id_cliente = c.id_cliente
-            WHERE 1=1
-            """
-            
-            parametros = []
-            
-            if filtro_estado:
-                consulta += " AND g.estado_garantia = ?"
-                parametros.append(filtro_estado)
-            
-            if busqueda:
-                consulta += """ AND (
-                    c.nombre LIKE ? OR
-                    e.marca LIKE ? OR
-                    e.modelo LIKE ?
-                )"""
-                busqueda_param = f"%{busqueda}%"
-                parametros.extend([busqueda_param] * 3)
-            
-            consulta += " ORDER BY g.fecha_vencimiento ASC"
-            
-            garantias = db.obtener_todos(consulta, tuple(parametros))
+            consulta, parametros = ModuloGarantias.consulta_listar_garantias(
+                filtro_estado, busqueda
+            )
+            garantias = db.obtener_todos(consulta, parametros)
             
             # Calcular días restantes
             for garantia in garantias:
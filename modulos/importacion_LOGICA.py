@@ -0,0 +1,561 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - MÓDULO DE IMPORTACIÓN MASIVA
+============================================================================
+Importación de clientes, equipos y repuestos desde CSV o Excel (XLSX).
+
+Las filas se validan con las reglas de sistema_base.validadores y se
+insertan por lotes: cada lote es una única transacción que incluye los
+INSERT, un registro de auditoría con el resumen del lote y el avance de
+la importación. Si la importación se corta, al volver a importar el mismo
+archivo se retoma desde el último lote confirmado.
+============================================================================
+"""
+
+import csv
+import hashlib
+import os
+from datetime import datetime
+
+from base_datos.conexion import db
+from sistema_base.configuracion import config
+from sistema_base.constantes import (LONGITUD_MAXIMA_NOMBRE,
+                                     LONGITUD_MAXIMA_NOTA)
+from sistema_base.validadores import (validar_requerido, validar_longitud,
+                                      validar_telefono, validar_email,
+                                      validar_direccion, validar_identificador,
+                                      validar_seleccion,
+                                      validar_numero_positivo,
+                                      validar_numero_entero_positivo,
+                                      limpiar_telefono)
+
+
+# ============================================================================
+# Validación y armado de filas por entidad
+# ============================================================================
+# Cada validador recibe la fila (dict con las columnas del archivo) y el
+# contexto de la importación, y retorna (errores, valores) donde valores
+# es la tupla de parámetros para el INSERT de la entidad.
+
+def _validar_campos(validaciones):
+    """Ejecuta una lista de validaciones y junta los mensajes de error"""
+    return [mensaje for es_valido, mensaje in validaciones if not es_valido]
+
+
+def _contexto_clientes():
+    """Teléfonos ya registrados (para detectar duplicados)"""
+    return {
+        'telefonos': {fila['telefono'] for fila in db.iterar_consulta("SELECT telefono FROM clientes")}
+    }
+
+
+def _validar_cliente(fila, contexto):
+    nombre = fila.get('nombre', '')
+    apellido = fila.get('apellido', '')
+    telefono = fila.get('telefono', '')
+    direccion = fila.get('direccion', '')
+    email = fila.get('email', '')
+
+    errores = _validar_campos([
+        validar_requerido(nombre, "Nombre"),
+        validar_longitud(nombre, LONGITUD_MAXIMA_NOMBRE, "Nombre"),
+        validar_requerido(apellido, "Apellido"),
+        validar_longitud(apellido, LONGITUD_MAXIMA_NOMBRE, "Apellido"),
+        validar_telefono(telefono),
+        validar_email(email),
+        validar_direccion(direccion)
+    ])
+
+    if errores:
+        return errores, None
+
+    telefono_limpio = limpiar_telefono(telefono)
+    if telefono_limpio in contexto['telefonos']:
+        return ["Ya existe un cliente con ese número de teléfono"], None
+    contexto['telefonos'].add(telefono_limpio)
+
+    return [], (
+        nombre, apellido, telefono_limpio, direccion, email,
+        fila.get('observaciones', ''), datetime.now()
+    )
+
+
+def _contexto_equipos():
+    """Clientes existentes (por ID y por teléfono) e identificadores ya usados"""
+    contexto = {'clientes': set(), 'telefonos': {}, 'identificadores': set()}
+
+    for fila in db.iterar_consulta("SELECT id_cliente, telefono FROM clientes"):
+        contexto['clientes'].add(fila['id_cliente'])
+        contexto['telefonos'][fila['telefono']] = fila['id_cliente']
+
+    for fila in db.iterar_consulta("SELECT identificador FROM equipos WHERE identificador IS NOT NULL AND identificador != ''"):
+        contexto['identificadores'].add(fila['identificador'])
+
+    return contexto
+
+
+def _validar_equipo(fila, contexto):
+    from modulos.equipos_LOGICA import ModuloEquipos
+
+    identificador = fila.get('identificador', '')
+
+    errores = _validar_campos([
+        validar_seleccion(fila.get('tipo_dispositivo', ''), ModuloEquipos.TIPOS_DISPOSITIVOS, "Tipo de dispositivo"),
+        validar_requerido(fila.get('marca', ''), "Marca"),
+        validar_requerido(fila.get('modelo', ''), "Modelo"),
+        validar_requerido(fila.get('estado_fisico', ''), "Estado físico"),
+        validar_requerido(fila.get('falla_declarada', ''), "Falla declarada"),
+        validar_identificador(identificador)
+    ])
+
+    # El cliente se indica por ID o por teléfono
+    id_cliente = None
+    if fila.get('id_cliente'):
+        try:
+            id_cliente = int(fila['id_cliente'])
+        except ValueError:
+            pass
+        if id_cliente not in contexto['clientes']:
+            errores.append(f"Cliente: No existe el cliente ID {fila['id_cliente']}")
+    elif fila.get('telefono_cliente'):
+        id_cliente = contexto['telefonos'].get(limpiar_telefono(fila['telefono_cliente']))
+        if id_cliente is None:
+            errores.append(f"Cliente: No existe un cliente con teléfono {fila['telefono_cliente']}")
+    else:
+        errores.append("Cliente: Debe indicar id_cliente o telefono_cliente")
+
+    if errores:
+        return errores, None
+
+    if identificador:
+        if identificador in contexto['identificadores']:
+            return [f"Ya existe un equipo con el identificador {identificador}"], None
+        contexto['identificadores'].add(identificador)
+
+    fecha_actual = datetime.now()
+
+    return [], (
+        id_cliente, fila['tipo_dispositivo'], fila['marca'], fila['modelo'],
+        identificador or None, fila.get('color', ''), fila['estado_fisico'],
+        fila.get('accesorios', ''), fila['falla_declarada'], fecha_actual, fecha_actual
+    )
+
+
+def _validar_repuesto(fila, contexto):
+    from modulos.repuestos_LOGICA import ModuloRepuestos
+
+    origen = fila.get('origen') or 'Nuevo'
+    estado = fila.get('estado') or 'Funcionando'
+    cantidad = fila.get('cantidad', '')
+    precio = fila.get('precio_referencia', '')
+
+    errores = _validar_campos([
+        validar_requerido(fila.get('nombre', ''), "Nombre del repuesto"),
+        validar_seleccion(fila.get('tipo', ''), ModuloRepuestos.TIPOS_REPUESTOS, "Tipo de repuesto"),
+        validar_seleccion(fila.get('tipo_dispositivo', ''), ModuloRepuestos.TIPOS_DISPOSITIVOS, "Tipo de dispositivo"),
+        validar_seleccion(origen, ['Nuevo', 'Recuperado'], "Origen"),
+        validar_seleccion(estado, ModuloRepuestos.ESTADOS_REPUESTO, "Estado"),
+        validar_numero_entero_positivo(cantidad, "Cantidad"),
+        validar_numero_positivo(precio, "Precio") if precio else (True, ""),
+        validar_longitud(fila.get('notas', ''), LONGITUD_MAXIMA_NOTA, "Notas")
+    ])
+
+    if errores:
+        return errores, None
+
+    return [], (
+        fila['nombre'], fila['tipo'], fila['tipo_dispositivo'],
+        fila.get('modelos_compatibles', ''), origen, int(cantidad), estado,
+        float(precio) if precio else None, fila.get('notas', ''), datetime.now()
+    )
+
+
+class ModuloImportacion:
+    """Clase para importar datos masivamente desde archivos"""
+
+    FORMATOS = ["csv", "xlsx"]
+
+    # Filas por transacción
+    TAMANO_LOTE = 1000
+
+    # Errores que se devuelven en el resumen (el resto queda en el archivo de errores)
+    MAXIMO_ERRORES_RESUMEN = 200
+
+    ENTIDADES = {
+        "clientes": {
+            "modulo": "Clientes",
+            "columnas": ["nombre", "apellido", "telefono", "direccion", "email", "observaciones"],
+            "contexto": _contexto_clientes,
+            "validar": _validar_cliente,
+            "consulta": """
+                INSERT INTO clientes (
+                    nombre, apellido, telefono, direccion, email, observaciones,
+                    estado_cliente, es_incobrable, tiene_incobrables, total_incobrables,
+                    confiabilidad_pago, fecha_registro
+                )
+                VALUES (?, ?, ?, ?, ?, ?, 'Nuevo', 0, 0, 0.0, 'Bueno', ?)
+            """
+        },
+        "equipos": {
+            "modulo": "Equipos",
+            "columnas": ["id_cliente", "telefono_cliente", "tipo_dispositivo", "marca", "modelo",
+                         "identificador", "color", "estado_fisico", "accesorios", "falla_declarada"],
+            "contexto": _contexto_equipos,
+            "validar": _validar_equipo,
+            "consulta": """
+                INSERT INTO equipos (
+                    id_cliente, tipo_dispositivo, marca, modelo,
+                    identificador, color, estado_fisico, accesorios,
+                    falla_declarada, fecha_ingreso, estado_actual,
+                    fecha_ultimo_movimiento, activo
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'En revisión', ?, 1)
+            """
+        },
+        "repuestos": {
+            "modulo": "Repuestos",
+            "columnas": ["nombre", "tipo", "tipo_dispositivo", "modelos_compatibles", "origen",
+                         "cantidad", "estado", "precio_referencia", "notas"],
+            "contexto": dict,
+            "validar": _validar_repuesto,
+            "consulta": """
+                INSERT INTO repuestos (
+                    nombre, tipo, tipo_dispositivo, modelos_compatibles,
+                    origen, cantidad_disponible, estado, precio_referencia,
+                    notas, fecha_ingreso
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """
+        }
+    }
+
+    @staticmethod
+    def _normalizar_valor(valor):
+        """Convierte el valor de una celda a texto sin espacios sobrantes"""
+        if valor is None:
+            return ""
+        # Excel guarda teléfonos y cantidades como números (ej: 1145678901.0)
+        if isinstance(valor, float) and valor.is_integer():
+            valor = int(valor)
+        return str(valor).strip()
+
+    @staticmethod
+    def leer_archivo(ruta_archivo):
+        """
+        Recorre las filas de datos de un archivo CSV o XLSX
+
+        La primera fila debe contener los nombres de las columnas.
+
+        Args:
+            ruta_archivo (str): Archivo a leer
+
+        Yields:
+            tuple: (indice_fila, fila) con indice_fila contado desde 1
+                   (sin el encabezado) y fila como diccionario
+        """
+        formato = os.path.splitext(str(ruta_archivo))[1].lower().lstrip(".")
+
+        if formato == "csv":
+            with open(ruta_archivo, newline="", encoding="utf-8-sig") as archivo:
+                muestra = archivo.read(4096)
+                archivo.seek(0)
+                try:
+                    dialecto = csv.Sniffer().sniff(muestra, delimiters=",;\t")
+                except csv.Error:
+                    dialecto = csv.excel
+                filas = csv.reader(archivo, dialecto)
+                yield from ModuloImportacion._filas_con_encabezado(filas)
+        else:
+            from openpyxl import load_workbook
+            libro = load_workbook(ruta_archivo, read_only=True, data_only=True)
+            try:
+                yield from ModuloImportacion._filas_con_encabezado(
+                    libro.active.iter_rows(values_only=True)
+                )
+            finally:
+                libro.close()
+
+    @staticmethod
+    def _filas_con_encabezado(filas):
+        filas = iter(filas)
+        encabezado = next(filas, None)
+        if encabezado is None:
+            return
+
+        columnas = [
+            ModuloImportacion._normalizar_valor(columna).lower().replace(" ", "_")
+            for columna in encabezado
+        ]
+
+        for indice, valores in enumerate(filas, start=1):
+            fila = {
+                columna: ModuloImportacion._normalizar_valor(valor)
+                for columna, valor in zip(columnas, valores)
+            }
+            # Filas vacías (comunes al final de las planillas)
+            if not any(fila.values()):
+                continue
+            yield indice, fila
+
+    @staticmethod
+    def contar_filas(ruta_archivo):
+        """
+        Cantidad aproximada de filas de datos (para la barra de progreso)
+
+        Args:
+            ruta_archivo (str): Archivo a leer
+
+        Returns:
+            int: Cantidad de filas sin el encabezado
+        """
+        try:
+            if str(ruta_archivo).lower().endswith(".csv"):
+                with open(ruta_archivo, "rb") as archivo:
+                    return max(sum(1 for _ in archivo) - 1, 0)
+
+            from openpyxl import load_workbook
+            libro = load_workbook(ruta_archivo, read_only=True)
+            try:
+                return max((libro.active.max_row or 1) - 1, 0)
+            finally:
+                libro.close()
+        except Exception:
+            return 0
+
+    @staticmethod
+    def calcular_huella(ruta_archivo):
+        """
+        Calcula la huella (SHA-1) del contenido de un archivo
+
+        Args:
+            ruta_archivo (str): Archivo
+
+        Returns:
+            str: Huella en hexadecimal
+        """
+        huella = hashlib.sha1()
+        with open(ruta_archivo, "rb") as archivo:
+            for bloque in iter(lambda: archivo.read(1024 * 1024), b""):
+                huella.update(bloque)
+        return huella.hexdigest()
+
+    @staticmethod
+    def obtener_importacion_previa(entidad, huella):
+        """
+        Busca la última importación del mismo archivo
+
+        Args:
+            entidad (str): clientes, equipos o repuestos
+            huella (str): Huella del archivo
+
+        Returns:
+            dict: Importación (o None si el archivo nunca se importó)
+        """
+        consulta = """
+        SELECT * FROM importaciones
+        WHERE entidad = ? AND huella_archivo = ?
+        ORDER BY id_importacion DESC
+        LIMIT 1
+        """
+        return db.obtener_uno(consulta, (entidad, huella))
+
+    @staticmethod
+    def importar(entidad, ruta_archivo, id_usuario, callback_progreso=None,
+                 evento_cancelacion=None):
+        """
+        Importa un archivo CSV o XLSX
+
+        Las filas con errores se saltean y se informan; las válidas se
+        insertan por lotes. Si el mismo archivo tiene una importación
+        sin terminar, se continúa desde la última fila confirmada.
+
+        Args:
+            entidad (str): clientes, equipos o repuestos
+            ruta_archivo (str): Archivo a importar
+            id_usuario (int): ID del usuario que importa
+            callback_progreso (callable): Función (procesadas, total)
+            evento_cancelacion (threading.Event): Detiene la importación al activarse
+
+        Returns:
+            tuple: (exito, mensaje, resumen) donde resumen es un dict con
+                   procesadas, importadas, con_error, errores [(fila, mensaje)]
+                   y archivo_errores
+        """
+        if entidad not in ModuloImportacion.ENTIDADES:
+            return False, f"Entidad no soportada: {entidad}", None
+
+        formato = os.path.splitext(str(ruta_archivo))[1].lower().lstrip(".")
+        if formato not in ModuloImportacion.FORMATOS:
+            return False, f"Formato no soportado: {formato}", None
+
+        definicion = ModuloImportacion.ENTIDADES[entidad]
+        nombre_archivo = os.path.basename(str(ruta_archivo))
+
+        try:
+            huella = ModuloImportacion.calcular_huella(ruta_archivo)
+            previa = ModuloImportacion.obtener_importacion_previa(entidad, huella)
+
+            if previa and previa['estado'] == 'Completada':
+                return False, f"Este archivo ya fue importado el {previa['fecha_fin']}", None
+
+            if previa:
+                id_importacion = previa['id_importacion']
+                filas_procesadas = previa['filas_procesadas']
+                importadas = previa['filas_importadas']
+                con_error = previa['filas_con_error']
+                db.ejecutar_consulta(
+                    "UPDATE importaciones SET estado = 'En curso', fecha_fin = NULL WHERE id_importacion = ?",
+                    (id_importacion,)
+                )
+                config.guardar_log(
+                    f"Retomando importación {id_importacion} de {entidad} desde la fila {filas_procesadas + 1}",
+                    "INFO"
+                )
+            else:
+                id_importacion = db.ejecutar_consulta(
+                    """
+                    INSERT INTO importaciones (entidad, archivo, huella_archivo, fecha_inicio, id_usuario)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (entidad, nombre_archivo, huella, datetime.now(), id_usuario)
+                )
+                filas_procesadas = importadas = con_error = 0
+
+        except ImportError:
+            return False, "Error: La librería openpyxl no está instalada. Ejecute: pip install openpyxl", None
+        except Exception as e:
+            config.guardar_log(f"Error al preparar importación de {entidad}: {e}", "ERROR")
+            return False, f"Error: {str(e)}", None
+
+        carpeta_errores = config.ruta_exportaciones / "importaciones"
+        archivo_errores = carpeta_errores / f"errores_importacion_{id_importacion}.csv"
+
+        resumen = {
+            'id_importacion': id_importacion,
+            'procesadas': filas_procesadas,
+            'importadas': importadas,
+            'con_error': con_error,
+            'errores': [],
+            'archivo_errores': str(archivo_errores) if con_error else None
+        }
+
+        def confirmar_lote(valores, errores_lote, primera_fila, ultima_fila):
+            """Inserta el lote, registra la auditoría y el avance en una sola transacción"""
+            with db.transaccion() as cursor:
+                if valores:
+                    cursor.executemany(definicion['consulta'], valores)
+                    cursor.execute(
+                        """
+                        INSERT INTO logs_sistema (
+                            id_usuario, accion, modulo, id_registro,
+                            motivo_modificacion, fecha_hora, es_accion_critica
+                        ) VALUES (?, 'Importar', ?, ?, ?, ?, 0)
+                        """,
+                        (id_usuario, definicion['modulo'], id_importacion,
+                         f"Importación masiva de {len(valores)} {entidad} "
+                         f"(filas {primera_fila + 2} a {ultima_fila + 1} de {nombre_archivo})",
+                         datetime.now())
+                    )
+                cursor.execute(
+                    """
+                    UPDATE importaciones
+                    SET filas_procesadas = ?,
+                        filas_importadas = filas_importadas + ?,
+                        filas_con_error = filas_con_error + ?
+                    WHERE id_importacion = ?
+                    """,
+                    (ultima_fila, len(valores), len(errores_lote), id_importacion)
+                )
+
+            if errores_lote:
+                carpeta_errores.mkdir(parents=True, exist_ok=True)
+                nuevo = not archivo_errores.exists()
+                with open(archivo_errores, "a", newline="", encoding="utf-8-sig") as archivo:
+                    escritor = csv.writer(archivo)
+                    if nuevo:
+                        escritor.writerow(["Fila", "Errores"])
+                    escritor.writerows(errores_lote)
+                resumen['archivo_errores'] = str(archivo_errores)
+
+                faltan = ModuloImportacion.MAXIMO_ERRORES_RESUMEN - len(resumen['errores'])
+                if faltan > 0:
+                    resumen['errores'].extend(errores_lote[:faltan])
+
+            resumen['procesadas'] = ultima_fila
+            resumen['importadas'] += len(valores)
+            resumen['con_error'] += len(errores_lote)
+
+        def finalizar(estado):
+            db.ejecutar_consulta(
+                "UPDATE importaciones SET estado = ?, fecha_fin = ? WHERE id_importacion = ?",
+                (estado, datetime.now(), id_importacion)
+            )
+
+        total = ModuloImportacion.contar_filas(ruta_archivo) if callback_progreso else 0
+        valores = []
+        errores_lote = []
+        primera_fila = ultima_fila = filas_procesadas
+
+        try:
+            contexto = definicion['contexto']()
+
+            for indice, fila in ModuloImportacion.leer_archivo(ruta_archivo):
+                # Filas ya confirmadas en un intento anterior
+                if indice <= filas_procesadas:
+                    continue
+
+                if evento_cancelacion is not None and evento_cancelacion.is_set():
+                    break
+
+                errores, fila_valores = definicion['validar'](fila, contexto)
+                if errores:
+                    # Número de fila como se ve en la planilla (el encabezado es la fila 1)
+                    errores_lote.append((indice + 1, "; ".join(errores)))
+                else:
+                    valores.append(fila_valores)
+                ultima_fila = indice
+
+                if len(valores) + len(errores_lote) >= ModuloImportacion.TAMANO_LOTE:
+                    confirmar_lote(valores, errores_lote, primera_fila, ultima_fila)
+                    valores, errores_lote = [], []
+                    primera_fila = ultima_fila
+
+                    if callback_progreso:
+                        callback_progreso(ultima_fila, total)
+
+            if valores or errores_lote:
+                confirmar_lote(valores, errores_lote, primera_fila, ultima_fila)
+
+        except ImportError:
+            finalizar('Error')
+            return False, "Error: La librería openpyxl no está instalada. Ejecute: pip install openpyxl", resumen
+        except Exception as e:
+            finalizar('Error')
+            config.guardar_log(f"Error en importación {id_importacion} de {entidad}: {e}", "ERROR")
+            return False, (
+                f"Error: {str(e)}\n\nSe importaron {resumen['importadas']} registros. "
+                "Vuelva a importar el mismo archivo para continuar desde donde quedó."
+            ), resumen
+
+        if callback_progreso:
+            callback_progreso(resumen['procesadas'], max(total, resumen['procesadas']))
+
+        if evento_cancelacion is not None and evento_cancelacion.is_set():
+            finalizar('Cancelada')
+            return False, (
+                f"Importación cancelada. Se importaron {resumen['importadas']} registros; "
+                "vuelva a importar el mismo archivo para continuar."
+            ), resumen
+
+        finalizar('Completada')
+        config.guardar_log(
+            f"Importación {id_importacion} de {entidad} completada: "
+            f"{resumen['importadas']} importados, {resumen['con_error']} con errores",
+            "INFO"
+        )
+
+        mensaje = f"Se importaron {resumen['importadas']} {entidad}"
+        if resumen['con_error']:
+            mensaje += f" ({resumen['con_error']} filas con errores)"
+        return True, mensaje, resumen
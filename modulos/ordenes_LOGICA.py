@@ -9,8 +9,12 @@ Lógica de negocio para órdenes de trabajo y reparaciones
 
 from datetime import datetime
 from base_datos.conexion import db
+from base_datos.versiones import cambios_desde
+from base_datos import stock
+from base_datos.stock import StockInsuficiente
 from sistema_base.validadores import validar_requerido
 from sistema_base.configuracion import config
+from sistema_base.utilidades import formatear_fecha_hora
 
 
 class ModuloOrdenes:
@@ -26,6 +30,31 @@ class ModuloOrdenes:
         "Finalizada sin reparación"
     ]
     
+    # Columnas al exportar consulta_listar_ordenes: (clave, encabezado[, formateador])
+    COLUMNAS_EXPORTACION = [
+        ("id_orden", "N° Orden"),
+        ("fecha_inicio", "Inicio", formatear_fecha_hora),
+        ("cliente_nombre", "Cliente"),
+        ("tipo_dispositivo", "Dispositivo"),
+        ("marca", "Marca"),
+        ("modelo", "Modelo"),
+        ("descripcion_reparacion", "Reparación"),
+        ("tecnico_nombre", "Técnico"),
+        ("estado_orden", "Estado"),
+        ("fecha_finalizacion", "Finalización", formatear_fecha_hora)
+    ]
+    
+    # Órdenes cuya fila del listado cambió desde una versión (orden, equipo, cliente o técnico)
+    CONSULTA_MODIFICADOS = """
+        SELECT id_orden FROM ordenes_trabajo WHERE version > ?
+        UNION SELECT id_orden FROM ordenes_trabajo
+        WHERE id_equipo IN (SELECT id_equipo FROM equipos WHERE version > ?
+                            UNION SELECT id_equipo FROM equipos
+                            WHERE id_cliente IN (SELECT id_cliente FROM clientes WHERE version > ?))
+        UNION SELECT id_orden FROM ordenes_trabajo
+        WHERE id_tecnico IN (SELECT id_usuario FROM usuarios WHERE version > ?)
+    """
+    
     @staticmethod
     def crear_orden_desde_presupuesto(id_presupuesto, id_usuario):
         """
@@ -163,7 +192,87 @@ class ModuloOrdenes:
             return False, f"Error: {str(e)}", None
     
     @staticmethod
-    def listar_ordenes(filtro_estado="", filtro_tecnico="", busqueda="", orden="fecha_desc"):
+    def consulta_listar_ordenes(filtro_estado="", filtro_tecnico="", busqueda="", orden="fecha_desc", desde_version=None,
+                                fecha_desde=None, fecha_hasta=None):
+        """
+        Arma la consulta del listado de órdenes (usada también para exportar)
+        
+        Args:
+            filtro_estado (str): Filtrar por estado
+            filtro_tecnico (int): Filtrar por técnico
+            busqueda (str): Buscar en descripción, cliente, equipo
+            orden (str): fecha_desc, fecha_asc
+            desde_version (int): Solo las que cambiaron desde esa versión (ver listar_ordenes_desde)
+            fecha_desde: Fecha de inicio desde (opcional)
+            fecha_hasta: Fecha de inicio hasta (opcional)
+            
+        Returns:
+            tuple: (consulta, parametros)
+        """
+        consulta = """
+        SELECT 
+            o.id_orden,
+            o.descripcion_reparacion,
+            o.estado as estado_orden,
+            o.fecha_inicio,
+            o.fecha_finalizacion,
+            o.cobro_diagnostico,
+            e.tipo_dispositivo,
+            e.marca,
+            e.modelo,
+            e.id_equipo,
+            c.nombre as cliente_nombre,
+            u.nombre as tecnico_nombre
+        FROM ordenes_trabajo o
+        INNER JOIN equipos e ON o.id_equipo = e.id_equipo
+        INNER JOIN clientes c ON e.id_cliente = c.id_cliente
+        LEFT JOIN usuarios u ON o.id_tecnico = u.id_usuario
+        WHERE 1=1
+        """
+        
+        parametros = []
+        
+        # Filtros
+        if filtro_estado:
+            consulta += " AND o.estado = ?"
+            parametros.append(filtro_estado)
+        
+        if filtro_tecnico:
+            consulta += " AND o.id_tecnico = ?"
+            parametros.append(filtro_tecnico)
+        
+        if desde_version is not None:
+            consulta += f" AND o.id_orden IN ({ModuloOrdenes.CONSULTA_MODIFICADOS})"
+            parametros.extend([desde_version] * 4)
+        
+        if busqueda:
+            consulta += """ AND (
+                o.descripcion_reparacion LIKE ? OR
+                c.nombre LIKE ? OR
+                e.marca LIKE ? OR
+                e.modelo LIKE ?
+            )"""
+            busqueda_param = f"%{busqueda}%"
+            parametros.extend([busqueda_param] * 4)
+        
+        if fecha_desde:
+            consulta += " AND o.fecha_inicio >= ?"
+            parametros.append(fecha_desde)
+        
+        if fecha_hasta:
+            consulta += " AND o.fecha_inicio <= ?"
+            parametros.append(fecha_hasta)
+        
+        # Ordenamiento
+        if orden == "fecha_asc":
+            consulta += " ORDER BY o.fecha_inicio ASC"
+        else:
+            consulta += " ORDER BY o.fecha_inicio DESC"
+        
+        return consulta, tuple(parametros)
+    
+    @staticmethod
+    def listar_ordenes(filtro_estado="", filtro_tecnico="", busqueda="", orden="fecha_desc", desde_version=None):
         """
         Lista todas las órdenes de trabajo
         
@@ -172,65 +281,40 @@ class ModuloOrdenes:
             filtro_tecnico (int): Filtrar por técnico
             busqueda (str): Buscar en descripción, cliente, equipo
             orden (str): fecha_desc, fecha_asc
+            desde_version (int): Solo las que cambiaron desde esa versión (ver listar_ordenes_desde)
             
         Returns:
             list: Lista de órdenes
         """
         try:
-            consulta = """
-            SELECT 
-                o.id_orden,
-                o.descripcion_reparacion,
-                o.estado_orden,
-                o.fecha_inicio,
-                o.fecha_finalizacion,
-                o.cobra_diagnostico,
-                e.tipo_dispositivo,
-                e.marca,
-                e.modelo,
-                e.id_equipo,
-                c.nombre as cliente_nombre,
-                u.nombre as tecnico_nombre
-            FROM ordenes_trabajo o
-            INNER JOIN equipos e ON o.id_equipo = e.id_equipo
-            INNER JOIN clientes c ON e.id_cliente = c.id_cliente
-            LEFT JOIN usuarios u ON o.id_tecnico_asignado = u.id_usuario
-            WHERE 1=1
-            """
-            
-            parametros = []
-            
-            # Filtros
-            if filtro_estado:
-                consulta += " AND o.estado_orden = ?"
-                parametros.append(filtro_estado)
-            
-            if filtro_tecnico:
-                consulta += " AND o.id_tecnico_asignado = ?"
-                parametros.append(filtro_tecnico)
-            
-            if busqueda:
-                consulta += """ AND (
-                    o.descripcion_reparacion LIKE ? OR
-                    c.nombre LIKE ? OR
-                    e.marca LIKE ? OR
-                    e.modelo LIKE ?
-                )"""
-                busqueda_param = f"%{busqueda}%"
-                parametros.extend([busqueda_param] * 4)
-            
-            # Ordenamiento
-            if orden == "fecha_asc":
-                consulta += " ORDER BY o.fecha_inicio ASC"
-            else:
-                consulta += " ORDER BY o.fecha_inicio DESC"
-            
-            return db.obtener_todos(consulta, tuple(parametros))
+            consulta, parametros = ModuloOrdenes.consulta_listar_ordenes(
+                filtro_estado, filtro_tecnico, busqueda, orden, desde_version
+            )
+            return db.obtener_todos(consulta, parametros)
             
         except Exception as e:
             config.guardar_log(f"Error al listar órdenes: {e}", "ERROR")
             return []
     
+    @staticmethod
+    def listar_ordenes_desde(version=None, **filtros):
+        """
+        Cambios del listado de órdenes desde una versión de los datos
+        
+        Args:
+            version (int): Versión devuelta por la llamada anterior (None = listado completo)
+            **filtros: Los mismos de listar_ordenes
+            
+        Returns:
+            dict: 'version', 'cambios' (órdenes nuevas o modificadas) y
+                'eliminados' (IDs que ya no corresponden al listado)
+        """
+        return cambios_desde(
+            "ordenes_trabajo", version,
+            lambda desde: ModuloOrdenes.listar_ordenes(desde_version=desde, **filtros),
+            ModuloOrdenes.CONSULTA_MODIFICADOS
+        )
+    
     @staticmethod
     def obtener_orden_por_id(id_orden):
         """
@@ -246,11 +330,11 @@ class ModuloOrdenes:
             consulta = """
             SELECT 
                 o.*,
+                o.estado as estado_orden,
                 e.tipo_dispositivo,
                 e.marca,
                 e.modelo,
                 e.identificador,
-                e.id_cliente,
                 c.nombre as cliente_nombre,
                 c.telefono as cliente_telefono,
                 u.nombre as tecnico_nombre,
@@ -258,7 +342,7 @@ class ModuloOrdenes:
             FROM ordenes_trabajo o
             INNER JOIN equipos e ON o.id_equipo = e.id_equipo
             INNER JOIN clientes c ON e.id_cliente = c.id_cliente
-            LEFT JOIN usuarios u ON o.id_tecnico_asignado = u.id_usuario
+            LEFT JOIN usuarios u ON o.id_tecnico = u.id_usuario
             LEFT JOIN presupuestos p ON o.id_presupuesto = p.id_presupuesto
             WHERE o.id_orden = ?
             """
@@ -292,19 +376,20 @@ class ModuloOrdenes:
             if not orden:
                 return False, "Orden no encontrada"
             
-            estado_anterior = orden['estado_orden']
+            estado_anterior = orden['estado']
             
-            # Actualizar estado
+            # Actualizar estado (al pasar a finalizada, el trigger
+            # stock_liberar_orden devuelve los repuestos reservados)
             consulta = """
             UPDATE ordenes_trabajo
-            SET estado_orden = ?
+            SET estado = ?
             WHERE id_orden = ?
             """
             
             db.ejecutar_consulta(consulta, (nuevo_estado, id_orden))
             
             # Agregar nota
-            from modulos.equipos import ModuloEquipos
+            from modulos.equipos_LOGICA import ModuloEquipos
             nota = f"Orden N° {id_orden}: {estado_anterior} → {nuevo_estado}"
             if observaciones:
                 nota += f" - {observaciones}"
@@ -318,7 +403,7 @@ class ModuloOrdenes:
                 accion="Modificar",
                 modulo="Órdenes",
                 id_registro=id_orden,
-                campo_modificado="estado_orden",
+                campo_modificado="estado",
                 valor_anterior=estado_anterior,
                 valor_nuevo=nuevo_estado,
                 motivo=observaciones
@@ -354,29 +439,32 @@ class ModuloOrdenes:
             if not orden:
                 return False, "Orden no encontrada"
             
-            if orden['estado_orden'].startswith('Finalizada'):
+            if orden['estado'].startswith('Finalizad'):
                 return False, "La orden ya está finalizada"
             
             # Determinar nuevo estado
             nuevo_estado = "Finalizada con reparación" if con_reparacion else "Finalizada sin reparación"
             
-            # Actualizar orden
+            # Actualizar orden (el trigger stock_liberar_orden devuelve al
+            # stock libre los repuestos que quedaron reservados sin usar)
             consulta = """
             UPDATE ordenes_trabajo
-            SET estado_orden = ?,
-                trabajo_realizado = ?,
-                observaciones_finales = ?,
+            SET estado = ?,
+                cambios_realizados = ?,
+                observaciones_tecnicas = ?,
+                tiene_reparacion = ?,
                 fecha_finalizacion = ?
             WHERE id_orden = ?
             """
             
             db.ejecutar_consulta(
                 consulta,
-                (nuevo_estado, trabajo_realizado, observaciones, datetime.now(), id_orden)
+                (nuevo_estado, trabajo_realizado, observaciones, 1 if con_reparacion else 0,
+                 datetime.now(), id_orden)
             )
             
             # Cambiar estado del equipo
-            from modulos.equipos import ModuloEquipos
+            from modulos.equipos_LOGICA import ModuloEquipos
             if con_reparacion:
                 ModuloEquipos.cambiar_estado_equipo(
                     orden['id_equipo'],
@@ -394,10 +482,10 @@ class ModuloOrdenes:
             
             # Generar factura automática si corresponde
             if con_reparacion:
-                from modulos.facturacion import ModuloFacturacion
+                from modulos.facturacion_LOGICA import ModuloFacturacion
                 ModuloFacturacion.generar_factura_desde_orden(id_orden, id_usuario)
-            elif orden['cobra_diagnostico'] and monto_diagnostico > 0:
-                from modulos.facturacion import ModuloFacturacion
+            elif orden['cobro_diagnostico'] and monto_diagnostico > 0:
+                from modulos.facturacion_LOGICA import ModuloFacturacion
                 ModuloFacturacion.generar_factura_diagnostico(
                     id_orden,
                     monto_diagnostico,
@@ -426,6 +514,10 @@ class ModuloOrdenes:
         """
         Agrega un repuesto usado a una orden
         
+        Usa primero lo reservado para la orden y después el stock libre.
+        El descuento y el registro de uso van en una sola transacción: si
+        el stock no alcanza no queda nada a medias.
+        
         Args:
             id_orden (int): ID de la orden
             id_repuesto (int): ID del repuesto
@@ -436,43 +528,61 @@ class ModuloOrdenes:
             tuple: (exito, mensaje)
         """
         try:
-            # Verificar stock
-            from modulos.repuestos import ModuloRepuestos
-            repuesto = ModuloRepuestos.obtener_repuesto_por_id(id_repuesto)
+            if cantidad <= 0:
+                return False, "La cantidad debe ser mayor a cero"
+            
+            repuesto = db.obtener_uno(
+                "SELECT nombre FROM repuestos WHERE id_repuesto = ?", (id_repuesto,)
+            )
             
             if not repuesto:
                 return False, "Repuesto no encontrado"
             
-            if repuesto['cantidad_disponible'] < cantidad:
-                return False, f"Stock insuficiente. Disponible: {repuesto['cantidad_disponible']}"
-            
-            # Registrar uso
+            # Descontar y registrar uso
             consulta = """
             INSERT INTO repuestos_usados (
-                id_orden, id_repuesto, cantidad_usada, 
-                id_usuario_uso, fecha_uso
+                id_orden, id_repuesto, cantidad, 
+                id_usuario, fecha_uso
             )
             VALUES (?, ?, ?, ?, ?)
             """
             
-            db.ejecutar_consulta(
-                consulta,
-                (id_orden, id_repuesto, cantidad, id_usuario, datetime.now())
-            )
-            
-            # Descontar del inventario
-            ModuloRepuestos.descontar_stock(id_repuesto, cantidad, id_usuario)
+            try:
+                with db.transaccion() as cursor:
+                    de_reserva, _ = stock.usar_en_orden(id_orden, id_repuesto, cantidad, id_usuario, cursor)
+                    cursor.execute(
+                        consulta,
+                        (id_orden, id_repuesto, cantidad, id_usuario, datetime.now())
+                    )
+            except StockInsuficiente as e:
+                return False, str(e)
             
             # Agregar nota
-            orden = ModuloOrdenes.obtener_orden_por_id(id_orden)
-            from modulos.equipos import ModuloEquipos
+            orden = db.obtener_uno(
+                "SELECT id_equipo FROM ordenes_trabajo WHERE id_orden = ?", (id_orden,)
+            )
+            from modulos.equipos_LOGICA import ModuloEquipos
             ModuloEquipos.agregar_nota_equipo(
                 orden['id_equipo'],
                 f"Repuesto usado: {repuesto['nombre']} x{cantidad}",
                 id_usuario
             )
             
-            config.guardar_log(f"Repuesto ID {id_repuesto} agregado a orden ID {id_orden}", "INFO")
+            detalle = f" ({de_reserva} de la reserva)" if de_reserva else ""
+            
+            # Registrar en auditoría
+            from sistema_base.seguridad import registrar_accion_auditoria
+            registrar_accion_auditoria(
+                id_usuario=id_usuario,
+                accion="Modificar",
+                modulo="Órdenes",
+                id_registro=id_orden,
+                motivo=f"Repuesto usado: {repuesto['nombre']} x{cantidad}{detalle}"
+            )
+            
+            config.guardar_log(
+                f"Repuesto ID {id_repuesto} agregado a orden ID {id_orden}: x{cantidad}{detalle}", "INFO"
+            )
             return True, "Repuesto agregado a la orden"
             
         except Exception as e:
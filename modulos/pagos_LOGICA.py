@@ -10,6 +10,7 @@ Lógica de negocio para gestión de pagos
 from datetime import datetime
 from base_datos.conexion import db
 from sistema_base.configuracion import config
+from sistema_base.utilidades import formatear_fecha_hora
 
 
 class ModuloPagos:
@@ -27,6 +28,17 @@ class ModuloPagos:
         "Crédito 12 cuotas"
     ]
     
+    # Columnas al exportar consulta_listar_pagos: (clave, encabezado[, formateador])
+    COLUMNAS_EXPORTACION = [
+        ("fecha_pago", "Fecha", formatear_fecha_hora),
+        ("numero_factura", "Factura"),
+        ("cliente_nombre", "Cliente"),
+        ("monto", "Monto"),
+        ("metodo_pago", "Método"),
+        ("observaciones", "Observaciones"),
+        ("usuario_nombre", "Usuario")
+    ]
+    
     @staticmethod
     def registrar_pago(id_factura, monto, metodo_pago, referencia, id_usuario):
         """
@@ -36,7 +48,7 @@ class ModuloPagos:
             id_factura (int): ID de la factura
             monto (float): Monto del pago
             metodo_pago (str): Método de pago
-            referencia (str): Referencia/comprobante
+            referencia (str): Referencia/comprobante (se guarda en observaciones)
             id_usuario (int): ID del usuario
             
         Returns:
@@ -50,34 +62,33 @@ class ModuloPagos:
                 return False, "Método de pago inválido", None
             
             # Obtener factura
-            from modulos.facturacion import ModuloFacturacion
+            from modulos.facturacion_LOGICA import ModuloFacturacion
             factura = ModuloFacturacion.obtener_factura_por_id(id_factura)
             
             if not factura:
                 return False, "Factura no encontrada", None
             
-            # Verificar que no se sobrepase el total
-            total_pagado_previo = ModuloPagos.obtener_total_pagado(id_factura)
-            if total_pagado_previo + monto > factura['total']:
-                return False, f"El pago supera el total de la factura. Resta: ${factura['total'] - total_pagado_previo:.2f}", None
+            # Verificar que no se sobrepase el total (lo pagado lo mantienen
+            # los triggers de pagos: ver base_datos.saldos_facturas)
+            total_pagado_previo = factura['monto_pagado'] or 0.0
+            if total_pagado_previo + monto > factura['monto_total']:
+                return False, f"El pago supera el total de la factura. Resta: ${factura['monto_total'] - total_pagado_previo:.2f}", None
             
             # Registrar pago
             consulta = """
             INSERT INTO pagos (
-                id_factura, monto, metodo_pago, referencia,
-                fecha_hora_pago, id_usuario_registra
+                id_factura, id_orden, id_cliente, monto, metodo_pago,
+                fecha_pago, observaciones, id_usuario
             )
-            VALUES (?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """
             
             id_nuevo = db.ejecutar_consulta(
                 consulta,
-                (id_factura, monto, metodo_pago, referencia, datetime.now(), id_usuario)
+                (id_factura, factura['id_orden'], factura['id_cliente'], monto, metodo_pago,
+                 datetime.now(), referencia or None, id_usuario)
             )
             
-            # Actualizar estado de factura
-            ModuloFacturacion.actualizar_estado_cobro(id_factura)
-            
             # Registrar en auditoría
             from sistema_base.seguridad import registrar_accion_auditoria
             registrar_accion_auditoria(
@@ -112,9 +123,9 @@ class ModuloPagos:
                 p.*,
                 u.nombre as usuario_nombre
             FROM pagos p
-            LEFT JOIN usuarios u ON p.id_usuario_registra = u.id_usuario
+            LEFT JOIN usuarios u ON p.id_usuario = u.id_usuario
             WHERE p.id_factura = ?
-            ORDER BY p.fecha_hora_pago DESC
+            ORDER BY p.fecha_pago DESC
             """
             
             return db.obtener_todos(consulta, (id_factura,))
@@ -135,22 +146,76 @@ class ModuloPagos:
             float: Total pagado
         """
         try:
-            consulta = "SELECT SUM(monto) as total FROM pagos WHERE id_factura = ?"
+            consulta = "SELECT monto_pagado FROM facturacion WHERE id_factura = ?"
             resultado = db.obtener_uno(consulta, (id_factura,))
             
-            return resultado['total'] if resultado and resultado['total'] else 0.0
+            return resultado['monto_pagado'] if resultado and resultado['monto_pagado'] else 0.0
             
         except Exception as e:
             config.guardar_log(f"Error al obtener total pagado: {e}", "ERROR")
             return 0.0
     
+    @staticmethod
+    def consulta_listar_pagos(busqueda="", fecha_desde=None, fecha_hasta=None, metodo_pago=""):
+        """
+        Arma la consulta del listado de pagos (usada también para exportar)
+        
+        Args:
+            busqueda (str): Buscar en observaciones, cliente, factura
+            fecha_desde: Fecha desde
+            fecha_hasta: Fecha hasta
+            metodo_pago (str): Filtrar por método
+            
+        Returns:
+            tuple: (consulta, parametros)
+        """
+        consulta = """
+        SELECT 
+            p.*,
+            f.numero_factura,
+            c.nombre as cliente_nombre,
+            u.nombre as usuario_nombre
+        FROM pagos p
+        LEFT JOIN facturacion f ON p.id_factura = f.id_factura
+        INNER JOIN clientes c ON p.id_cliente = c.id_cliente
+        LEFT JOIN usuarios u ON p.id_usuario = u.id_usuario
+        WHERE 1=1
+        """
+        
+        parametros = []
+        
+        if busqueda:
+            consulta += """ AND (
+                p.observaciones LIKE ? OR
+                c.nombre LIKE ? OR
+                f.numero_factura LIKE ?
+            )"""
+            busqueda_param = f"%{busqueda}%"
+            parametros.extend([busqueda_param] * 3)
+        
+        if fecha_desde:
+            consulta += " AND p.fecha_pago >= ?"
+            parametros.append(fecha_desde)
+        
+        if fecha_hasta:
+            consulta += " AND p.fecha_pago <= ?"
+            parametros.append(fecha_hasta)
+        
+        if metodo_pago:
+            consulta += " AND p.metodo_pago = ?"
+            parametros.append(metodo_pago)
+        
+        consulta += " ORDER BY p.fecha_pago DESC"
+        
+        return consulta, tuple(parametros)
+    
     @staticmethod
     def listar_pagos(busqueda="", fecha_desde=None, fecha_hasta=None, metodo_pago=""):
         """
         Lista todos los pagos con filtros
         
         Args:
-            busqueda (str): Buscar en referencia, cliente
+            busqueda (str): Buscar en observaciones, cliente, factura
             fecha_desde: Fecha desde
             fecha_hasta: Fecha hasta
             metodo_pago (str): Filtrar por método
@@ -159,45 +224,10 @@ class ModuloPagos:
             list: Lista de pagos
         """
         try:
-            consulta = """
-            SELECT 
-                p.*,
-                f.numero_factura,
-                c.nombre as cliente_nombre,
-                u.nombre as usuario_nombre
-            FROM pagos p
-            INNER JOIN facturas f ON p.id_factura = f.id_factura
-            INNER JOIN clientes c ON f.id_cliente = c.id_cliente
-            LEFT JOIN usuarios u ON p.id_usuario_registra = u.id_usuario
-            WHERE 1=1
-            """
-            
-            parametros = []
-            
-            if busqueda:
-                consulta += """ AND (
-                    p.referencia LIKE ? OR
-                    c.nombre LIKE ? OR
-                    f.numero_factura LIKE ?
-                )"""
-                busqueda_param = f"%{busqueda}%"
-                parametros.extend([busqueda_param] * 3)
-            
-            if fecha_desde:
-                consulta += " AND p.fecha_hora_pago >= ?"
-                parametros.append(fecha_desde)
-            
-            if fecha_hasta:
-                consulta += " AND p.fecha_hora_pago <= ?"
-                parametros.append(fecha_hasta)
-            
-            if metodo_pago:
-                consulta += " AND p.metodo_pago = ?"
-                parametros.append(metodo_pago)
-            
-            consulta += " ORDER BY p.fecha_hora_pago DESC"
-            
-            return db.obtener_todos(consulta, tuple(parametros))
+            consulta, parametros = ModuloPagos.consulta_listar_pagos(
+                busqueda, fecha_desde, fecha_hasta, metodo_pago
+            )
+            return db.obtener_todos(consulta, parametros)
             
         except Exception as e:
             config.guardar_log(f"Error al listar pagos: {e}", "ERROR")
@@ -223,11 +253,11 @@ class ModuloPagos:
             parametros = []
             
             if fecha_desde:
-                where_fecha += " AND fecha_hora_pago >= ?"
+                where_fecha += " AND fecha_pago >= ?"
                 parametros.append(fecha_desde)
             
             if fecha_hasta:
-                where_fecha += " AND fecha_hora_pago <= ?"
+                where_fecha += " AND fecha_pago <= ?"
                 parametros.append(fecha_hasta)
             
             # Total de pagos
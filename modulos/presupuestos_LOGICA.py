@@ -9,8 +9,11 @@ Lógica de negocio para gestión de presupuestos
 
 from datetime import datetime, timedelta
 from base_datos.conexion import db
+from base_datos.versiones import cambios_desde
 from sistema_base.validadores import validar_requerido
 from sistema_base.configuracion import config
+from sistema_base.sesion import SESION_SISTEMA
+from sistema_base.utilidades import formatear_fecha_hora
 
 
 class ModuloPresupuestos:
@@ -24,6 +27,29 @@ class ModuloPresupuestos:
         "Rechazado por vencimiento"
     ]
     
+    # Columnas al exportar consulta_listar_presupuestos: (clave, encabezado[, formateador])
+    COLUMNAS_EXPORTACION = [
+        ("id_presupuesto", "N° Presupuesto"),
+        ("fecha_creacion", "Fecha", formatear_fecha_hora),
+        ("nombre_cliente", "Cliente"),
+        ("tipo_dispositivo", "Dispositivo"),
+        ("marca", "Marca"),
+        ("modelo", "Modelo"),
+        ("descripcion_trabajo", "Trabajo"),
+        ("monto_total", "Monto"),
+        ("estado_presupuesto", "Estado"),
+        ("fecha_vencimiento", "Vencimiento", formatear_fecha_hora)
+    ]
+    
+    # Presupuestos cuya fila del listado cambió desde una versión (presupuesto, equipo o cliente)
+    CONSULTA_MODIFICADOS = """
+        SELECT id_presupuesto FROM presupuestos WHERE version > ?
+        UNION SELECT id_presupuesto FROM presupuestos
+        WHERE id_equipo IN (SELECT id_equipo FROM equipos WHERE version > ?
+                            UNION SELECT id_equipo FROM equipos
+                            WHERE id_cliente IN (SELECT id_cliente FROM clientes WHERE version > ?))
+    """
+    
     @staticmethod
     def crear_presupuesto(id_equipo, descripcion_trabajo, monto_sin_recargo, 
                           aplicar_recargo, id_usuario):
@@ -108,7 +134,91 @@ class ModuloPresupuestos:
             return False, f"Error: {str(e)}", None
     
     @staticmethod
-    def listar_presupuestos(filtro_estado="", solo_vencidos=False, busqueda="", orden="fecha_desc"):
+    def consulta_listar_presupuestos(filtro_estado="", solo_vencidos=False, busqueda="", orden="fecha_desc",
+                                     desde_version=None, fecha_desde=None, fecha_hasta=None):
+        """
+        Arma la consulta del listado de presupuestos (usada también para exportar)
+        
+        Args:
+            filtro_estado (str): Filtrar por estado
+            solo_vencidos (bool): Mostrar solo presupuestos vencidos
+            busqueda (str): Buscar en descripción, cliente, equipo
+            orden (str): fecha_desc, fecha_asc, monto_desc
+            desde_version (int): Solo los que cambiaron desde esa versión (ver listar_presupuestos_desde)
+            fecha_desde: Fecha de creación desde (opcional)
+            fecha_hasta: Fecha de creación hasta (opcional)
+            
+        Returns:
+            tuple: (consulta, parametros)
+        """
+        consulta = """
+        SELECT 
+            p.id_presupuesto,
+            p.descripcion_trabajo,
+            p.monto_sin_recargo,
+            p.recargo_transferencia,
+            p.monto_total,
+            p.estado as estado_presupuesto,
+            p.fecha_creacion,
+            p.fecha_vencimiento,
+            e.tipo_dispositivo,
+            e.marca,
+            e.modelo,
+            e.id_equipo,
+            c.nombre as nombre_cliente
+        FROM presupuestos p
+        INNER JOIN equipos e ON p.id_equipo = e.id_equipo
+        INNER JOIN clientes c ON e.id_cliente = c.id_cliente
+        WHERE 1=1
+        """
+        
+        parametros = []
+        
+        # Filtros
+        if filtro_estado:
+            consulta += " AND p.estado = ?"
+            parametros.append(filtro_estado)
+        
+        # Filtro solo vencidos
+        if solo_vencidos:
+            consulta += " AND p.estado = 'Pendiente' AND p.fecha_vencimiento < ?"
+            parametros.append(datetime.now())
+        
+        if desde_version is not None:
+            consulta += f" AND p.id_presupuesto IN ({ModuloPresupuestos.CONSULTA_MODIFICADOS})"
+            parametros.extend([desde_version] * 3)
+        
+        if busqueda:
+            consulta += """ AND (
+                p.descripcion_trabajo LIKE ? OR
+                c.nombre LIKE ? OR
+                e.marca LIKE ? OR
+                e.modelo LIKE ?
+            )"""
+            busqueda_param = f"%{busqueda}%"
+            parametros.extend([busqueda_param] * 4)
+        
+        if fecha_desde:
+            consulta += " AND p.fecha_creacion >= ?"
+            parametros.append(fecha_desde)
+        
+        if fecha_hasta:
+            consulta += " AND p.fecha_creacion <= ?"
+            parametros.append(fecha_hasta)
+        
+        # Ordenamiento
+        if orden == "fecha_asc":
+            consulta += " ORDER BY p.fecha_creacion ASC"
+        elif orden == "monto_desc":
+            consulta += " ORDER BY p.monto_total DESC"
+        else:
+            consulta += " ORDER BY p.fecha_creacion DESC"
+        
+        return consulta, tuple(parametros)
+    
+    @staticmethod
+    def listar_presupuestos(filtro_estado="", solo_vencidos=False, busqueda="", orden="fecha_desc",
+                            desde_version=None):
         """
         Lista todos los presupuestos
         
@@ -117,63 +227,16 @@ class ModuloPresupuestos:
             solo_vencidos (bool): Mostrar solo presupuestos vencidos
             busqueda (str): Buscar en descripción, cliente, equipo
             orden (str): fecha_desc, fecha_asc, monto_desc
+            desde_version (int): Solo los que cambiaron desde esa versión (ver listar_presupuestos_desde)
             
         Returns:
             list: Lista de presupuestos
         """
         try:
-            consulta = """
-            SELECT 
-                p.id_presupuesto,
-                p.descripcion_trabajo,
-                p.monto_sin_recargo,
-                p.recargo_transferencia,
-                p.monto_total,
-                p.estado_presupuesto,
-                p.fecha_creacion,
-                p.fecha_vencimiento,
-                e.tipo_dispositivo,
-                e.marca,
-                e.modelo,
-                e.id_equipo,
-                c.nombre as nombre_cliente
-            FROM presupuestos p
-            INNER JOIN equipos e ON p.id_equipo = e.id_equipo
-            INNER JOIN clientes c ON e.id_cliente = c.id_cliente
-            WHERE 1=1
-            """
-            
-            parametros = []
-            
-            # Filtros
-            if filtro_estado:
-                consulta += " AND p.estado_presupuesto = ?"
-                parametros.append(filtro_estado)
-            
-            # Filtro solo vencidos
-            if solo_vencidos:
-                consulta += " AND p.estado_presupuesto = 'Pendiente' AND p.fecha_vencimiento < ?"
-                parametros.append(datetime.now())
-            
-            if busqueda:
-                consulta += """ AND (
-                    p.descripcion_trabajo LIKE ? OR
-                    c.nombre LIKE ? OR
-                    e.marca LIKE ? OR
-                    e.modelo LIKE ?
-                )"""
-                busqueda_param = f"%{busqueda}%"
-                parametros.extend([busqueda_param] * 4)
-            
-            # Ordenamiento
-            if orden == "fecha_asc":
-                consulta += " ORDER BY p.fecha_creacion ASC"
-            elif orden == "monto_desc":
-                consulta += " ORDER BY p.monto_total DESC"
-            else:
-                consulta += " ORDER BY p.fecha_creacion DESC"
-            
-            presupuestos = db.obtener_todos(consulta, tuple(parametros))
+            consulta, parametros = ModuloPresupuestos.consulta_listar_presupuestos(
+                filtro_estado, solo_vencidos, busqueda, orden, desde_version
+            )
+            presupuestos = db.obtener_todos(consulta, parametros)
             
             # Calcular días hasta vencimiento y marcar vencidos
             for presupuesto in presupuestos:
@@ -198,6 +261,25 @@ class ModuloPresupuestos:
             config.guardar_log(f"Error al listar presupuestos: {e}", "ERROR")
             return []
     
+    @staticmethod
+    def listar_presupuestos_desde(version=None, **filtros):
+        """
+        Cambios del listado de presupuestos desde una versión de los datos
+        
+        Args:
+            version (int): Versión devuelta por la llamada anterior (None = listado completo)
+            **filtros: Los mismos de listar_presupuestos
+            
+        Returns:
+            dict: 'version', 'cambios' (presupuestos nuevos o modificados) y
+                'eliminados' (IDs que ya no corresponden al listado)
+        """
+        return cambios_desde(
+            "presupuestos", version,
+            lambda desde: ModuloPresupuestos.listar_presupuestos(desde_version=desde, **filtros),
+            ModuloPresupuestos.CONSULTA_MODIFICADOS
+        )
+    
     @staticmethod
     def obtener_presupuesto_por_id(id_presupuesto):
         """
@@ -213,18 +295,18 @@ class ModuloPresupuestos:
             consulta = """
             SELECT 
                 p.*,
+                p.estado as estado_presupuesto,
                 e.tipo_dispositivo,
                 e.marca,
                 e.modelo,
                 e.identificador,
-                e.id_cliente,
                 c.nombre as cliente_nombre,
                 c.telefono as cliente_telefono,
                 u.nombre as usuario_nombre
             FROM presupuestos p
             INNER JOIN equipos e ON p.id_equipo = e.id_equipo
             INNER JOIN clientes c ON e.id_cliente = c.id_cliente
-            LEFT JOIN usuarios u ON p.id_usuario_crea = u.id_usuario
+            LEFT JOIN usuarios u ON p.id_usuario = u.id_usuario
             WHERE p.id_presupuesto = ?
             """
             
@@ -421,7 +503,7 @@ class ModuloPresupuestos:
                 ModuloEquipos.agregar_nota_equipo(
                     presupuesto['id_equipo'],
                     "Presupuesto vencido automáticamente (7 días sin respuesta)",
-                    1  # Usuario sistema
+                    SESION_SISTEMA.id_usuario
                 )
             
             if len(vencidos) > 0:
@@ -616,128 +698,19 @@ class ModuloPresupuestos:
             if not presupuesto:
                 return False, "Presupuesto no encontrado", None
             
-            # Importar módulo de PDFs
-            from reportlab.lib.pagesizes import letter
-            from reportlab.lib import colors
-            from reportlab.lib.units import inch
-            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-            from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
-            import os
+            from impresion.motor_documentos import MotorDocumentos
             
             # Crear directorio si no existe
-            directorio_pdfs = os.path.join(config.directorio_base, "presupuestos")
-            os.makedirs(directorio_pdfs, exist_ok=True)
+            directorio_pdfs = config.ruta_exportaciones / "presupuestos"
+            directorio_pdfs.mkdir(parents=True, exist_ok=True)
             
             # Nombre del archivo
             fecha_str = datetime.now().strftime("%Y%m%d_%H%M%S")
             nombre_archivo = f"presupuesto_{id_presupuesto}_{fecha_str}.pdf"
-            ruta_completa = os.path.join(directorio_pdfs, nombre_archivo)
-            
-            # Crear PDF
-            doc = SimpleDocTemplate(ruta_completa, pagesize=letter)
-            elementos = []
-            styles = getSampleStyleSheet()
-            
-            # Estilo personalizado para título
-            estilo_titulo = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=20,
-                textColor=colors.HexColor('#2563eb'),
-                spaceAfter=30,
-                alignment=TA_CENTER
-            )
+            ruta_completa = str(directorio_pdfs / nombre_archivo)
             
-            # Título
-            titulo = Paragraph(f"<b>PRESUPUESTO #{id_presupuesto}</b>", estilo_titulo)
-            elementos.append(titulo)
-            
-            # Información del negocio
-            info_negocio = [
-                [Paragraph(f"<b>{config.nombre_negocio}</b>", styles['Normal'])],
-                [Paragraph(f"{config.direccion_negocio}", styles['Normal'])],
-                [Paragraph(f"Tel: {config.telefono_negocio}", styles['Normal'])],
-            ]
-            
-            if config.email_negocio:
-                info_negocio.append([Paragraph(f"Email: {config.email_negocio}", styles['Normal'])])
-            
-            tabla_negocio = Table(info_negocio, colWidths=[6*inch])
-            tabla_negocio.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ]))
-            elementos.append(tabla_negocio)
-            elementos.append(Spacer(1, 0.3*inch))
-            
-            # Información del cliente y equipo
-            fecha_creacion = datetime.fromisoformat(str(presupuesto['fecha_creacion']).replace('Z', '+00:00')).strftime('%d/%m/%Y')
-            fecha_vencimiento = datetime.fromisoformat(str(presupuesto['fecha_vencimiento']).replace('Z', '+00:00')).strftime('%d/%m/%Y')
-            
-            datos_cliente = [
-                ['<b>Fecha:</b>', fecha_creacion, '<b>Vencimiento:</b>', fecha_vencimiento],
-                ['<b>Cliente:</b>', presupuesto['nombre_cliente'], '<b>Estado:</b>', presupuesto['estado_presupuesto']],
-                ['<b>Equipo:</b>', f"{presupuesto['marca']} {presupuesto['modelo']}", '<b>Tipo:</b>', presupuesto['tipo_dispositivo']],
-            ]
-            
-            tabla_cliente = Table(datos_cliente, colWidths=[1.2*inch, 2.3*inch, 1.2*inch, 2.3*inch])
-            tabla_cliente.setStyle(TableStyle([
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f8f9fa')),
-                ('BACKGROUND', (2, 0), (2, -1), colors.HexColor('#f8f9fa')),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 8),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-                ('TOPPADDING', (0, 0), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ]))
-            elementos.append(tabla_cliente)
-            elementos.append(Spacer(1, 0.3*inch))
-            
-            # Descripción del trabajo
-            elementos.append(Paragraph('<b>Descripción del Trabajo:</b>', styles['Heading2']))
-            elementos.append(Spacer(1, 0.1*inch))
-            elementos.append(Paragraph(presupuesto['descripcion_trabajo'], styles['Normal']))
-            elementos.append(Spacer(1, 0.3*inch))
-            
-            # Detalle de montos
-            from sistema_base.utilidades import formatear_dinero
-            
-            datos_montos = [
-                ['<b>Concepto</b>', '<b>Monto</b>'],
-                ['Mano de obra y reparación', formatear_dinero(presupuesto['monto_sin_recargo'])],
-                ['Recargo por transferencia', formatear_dinero(presupuesto['recargo_transferencia'])],
-                ['<b>TOTAL</b>', f"<b>{formatear_dinero(presupuesto['monto_total'])}</b>"],
-            ]
-            
-            tabla_montos = Table(datos_montos, colWidths=[4.5*inch, 2*inch])
-            tabla_montos.setStyle(TableStyle([
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2563eb')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-                ('FONTSIZE', (0, 0), (-1, -1), 11),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#f0f0f0')),
-                ('FONTSIZE', (0, -1), (-1, -1), 13),
-                ('LEFTPADDING', (0, 0), (-1, -1), 10),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-                ('TOPPADDING', (0, 0), (-1, -1), 8),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ]))
-            elementos.append(tabla_montos)
-            elementos.append(Spacer(1, 0.4*inch))
-            
-            # Texto del presupuesto
-            if config.texto_presupuesto:
-                elementos.append(Paragraph('<b>Condiciones:</b>', styles['Heading3']))
-                elementos.append(Spacer(1, 0.1*inch))
-                elementos.append(Paragraph(config.texto_presupuesto, styles['Normal']))
-            
-            # Generar PDF
-            doc.build(elementos)
+            # Generar PDF desde la plantilla compilada
+            MotorDocumentos.generar_pdf("presupuesto", presupuesto, ruta_completa)
             
             config.guardar_log(f"PDF de presupuesto ID {id_presupuesto} generado: {ruta_completa}", "INFO")
             return True, "PDF generado exitosamente", ruta_completa
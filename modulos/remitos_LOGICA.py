@@ -10,47 +10,43 @@ Lógica de negocio para generación y gestión de remitos
 from datetime import datetime
 from base_datos.conexion import db
 from sistema_base.configuracion import config
+from sistema_base.utilidades import formatear_fecha_hora
 
 
 class ModuloRemitos:
     """Clase para manejar la lógica de negocio de remitos"""
     
+    # Columnas al exportar consulta_listar_remitos: (clave, encabezado[, formateador])
+    COLUMNAS_EXPORTACION = [
+        ("numero_remito", "N° Remito"),
+        ("fecha_emision", "Fecha", formatear_fecha_hora),
+        ("cliente_nombre", "Cliente"),
+        ("tipo_dispositivo", "Dispositivo"),
+        ("marca", "Marca"),
+        ("modelo", "Modelo"),
+        ("usuario_nombre", "Generado por")
+    ]
+    
     @staticmethod
-    def generar_numero_remito():
+    def generar_numero_remito(cursor=None):
         """
         Genera un número único de remito con formato: R-YYYYMMDD-####
         
+        Args:
+            cursor: Cursor de la transacción donde se inserta el remito
+                    (así el número no se consume si la inserción falla)
+        
         Returns:
             str: Número de remito generado
         """
         try:
-            fecha_hoy = datetime.now().strftime('%Y%m%d')
-            prefijo = f"R-{fecha_hoy}-"
-            
-            # Buscar el último remito del día
-            consulta = """
-            SELECT numero_remito 
-            FROM remitos 
-            WHERE numero_remito LIKE ?
-            ORDER BY numero_remito DESC
-            LIMIT 1
-            """
-            
-            resultado = db.obtener_uno(consulta, (f"{prefijo}%",))
-            
-            if resultado:
-                # Extraer el número secuencial
-                ultimo_numero = resultado['numero_remito']
-                secuencial = int(ultimo_numero.split('-')[-1])
-                nuevo_secuencial = secuencial + 1
-            else:
-                # Primer remito del día
-                nuevo_secuencial = 1
-            
-            return f"{prefijo}{nuevo_secuencial:04d}"
+            from base_datos.secuencias import siguiente_numero_remito
+            return siguiente_numero_remito(cursor)
             
         except Exception as e:
             config.guardar_log(f"Error al generar número de remito: {e}", "ERROR")
+            if cursor is not None:
+                raise
             # Fallback
             return f"R-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
     
@@ -84,26 +80,26 @@ class ModuloRemitos:
             if not equipo:
                 return False, "Equipo no encontrado", None
             
-            # Generar número de remito
-            numero_remito = ModuloRemitos.generar_numero_remito()
-            
             # Insertar remito
             consulta_insertar = """
             INSERT INTO remitos (
                 numero_remito,
                 id_equipo,
                 id_cliente,
-                fecha_hora_generacion,
-                id_usuario_genera
+                fecha_emision,
+                id_usuario
             )
             VALUES (?, ?, ?, ?, ?)
             """
             
-            db.ejecutar_consulta(
-                consulta_insertar,
-                (numero_remito, id_equipo, equipo['id_cliente'], 
-                 datetime.now(), id_usuario)
-            )
+            # Número e inserción en la misma transacción
+            with db.transaccion() as cursor:
+                numero_remito = ModuloRemitos.generar_numero_remito(cursor)
+                cursor.execute(
+                    consulta_insertar,
+                    (numero_remito, id_equipo, equipo['id_cliente'], 
+                     datetime.now(), id_usuario)
+                )
             
             config.guardar_log(f"Remito {numero_remito} generado para equipo ID {id_equipo}", "INFO")
             return True, "Remito generado exitosamente", numero_remito
@@ -142,77 +138,142 @@ class ModuloRemitos:
             FROM remitos r
             INNER JOIN equipos e ON r.id_equipo = e.id_equipo
             INNER JOIN clientes c ON r.id_cliente = c.id_cliente
-            LEFT JOIN usuarios u ON r.id_usuario_genera = u.id_usuario
+            LEFT JOIN usuarios u ON r.id_usuario = u.id_usuario
             WHERE r.numero_remito = ?
             """
             
             return db.obtener_uno(consulta, (numero_remito,))
-            
+        
         except Exception as e:
             config.guardar_log(f"Error al obtener remito: {e}", "ERROR")
             return None
     
     @staticmethod
-    def listar_remitos(busqueda="", orden="fecha_desc", fecha_desde=None, fecha_hasta=None, solo_no_retirados=False):
+    def obtener_remito_por_id(id_remito):
         """
-        Lista todos los remitos
+        Obtiene un remito por su ID con los datos del equipo y cliente
         
         Args:
-            busqueda (str): Buscar por número, cliente, equipo
-            orden (str): fecha_desc, fecha_asc
-            fecha_desde: Fecha desde (opcional)
-            fecha_hasta: Fecha hasta (opcional)
-            solo_no_retirados (bool): Solo remitos no retirados
-            
+            id_remito (int): ID del remito
+        
         Returns:
-            list: Lista de remitos
+            dict: Datos completos del remito o None
         """
         try:
             consulta = """
-            SELECT 
-                r.numero_remito,
-                r.fecha_hora_generacion,
-                c.nombre as cliente_nombre,
+            SELECT
+                r.*,
                 e.tipo_dispositivo,
                 e.marca,
                 e.modelo,
+                e.identificador,
+                e.color,
+                e.estado_fisico,
+                e.accesorios,
+                e.falla_declarada,
+                c.nombre || ' ' || c.apellido as cliente_nombre,
+                c.telefono as cliente_telefono,
+                c.direccion as cliente_direccion,
                 u.nombre as usuario_nombre
             FROM remitos r
             INNER JOIN equipos e ON r.id_equipo = e.id_equipo
             INNER JOIN clientes c ON r.id_cliente = c.id_cliente
-            LEFT JOIN usuarios u ON r.id_usuario_genera = u.id_usuario
-            WHERE 1=1
+            LEFT JOIN usuarios u ON r.id_usuario = u.id_usuario
+            WHERE r.id_remito = ?
             """
             
-            parametros = []
-            
-            if busqueda:
-                consulta += """ AND (
-                    r.numero_remito LIKE ? OR
-                    c.nombre LIKE ? OR
-                    e.marca LIKE ? OR
-                    e.modelo LIKE ?
-                )"""
-                busqueda_param = f"%{busqueda}%"
-                parametros.extend([busqueda_param] * 4)
-            
-            if fecha_desde:
-                consulta += " AND r.fecha_hora_generacion >= ?"
-                parametros.append(fecha_desde)
-            
-            if fecha_hasta:
-                consulta += " AND r.fecha_hora_generacion <= ?"
-                parametros.append(fecha_hasta)
-            
-            if solo_no_retirados:
-                consulta += " AND (r.retirado IS NULL OR r.retirado = 0)"
+            return db.obtener_uno(consulta, (id_remito,))
+        
+        except Exception as e:
+            config.guardar_log(f"Error al obtener remito: {e}", "ERROR")
+            return None
+    
+    @staticmethod
+    def consulta_listar_remitos(busqueda="", orden="fecha_desc", fecha_desde=None, fecha_hasta=None, solo_no_retirados=False):
+        """
+        Arma la consulta del listado de remitos (usada también para exportar)
+        
+        Args:
+            busqueda (str): Buscar por número, cliente, equipo
+            orden (str): fecha_desc, fecha_asc
+            fecha_desde: Fecha desde (opcional)
+            fecha_hasta: Fecha hasta (opcional)
+            solo_no_retirados (bool): Solo remitos no retirados
             
-            if orden == "fecha_asc":
-                consulta += " ORDER BY r.fecha_hora_generacion ASC"
-            else:
-                consulta += " ORDER BY r.fecha_hora_generacion DESC"
+        Returns:
+            tuple: (consulta, parametros)
+        """
+        consulta = """
+        SELECT 
+            r.id_remito,
+            r.numero_remito,
+            r.id_equipo,
+            r.fecha_emision,
+            c.nombre as cliente_nombre,
+            e.tipo_dispositivo,
+            e.marca,
+            e.modelo,
+            e.fecha_ingreso,
+            e.estado_actual,
+            u.nombre as usuario_nombre
+        FROM remitos r
+        INNER JOIN equipos e ON r.id_equipo = e.id_equipo
+        INNER JOIN clientes c ON r.id_cliente = c.id_cliente
+        LEFT JOIN usuarios u ON r.id_usuario = u.id_usuario
+        WHERE 1=1
+        """
+        
+        parametros = []
+        
+        if busqueda:
+            consulta += """ AND (
+                r.numero_remito LIKE ? OR
+                c.nombre LIKE ? OR
+                e.marca LIKE ? OR
+                e.modelo LIKE ?
+            )"""
+            busqueda_param = f"%{busqueda}%"
+            parametros.extend([busqueda_param] * 4)
+        
+        if fecha_desde:
+            consulta += " AND r.fecha_emision >= ?"
+            parametros.append(fecha_desde)
+        
+        if fecha_hasta:
+            consulta += " AND r.fecha_emision <= ?"
+            parametros.append(fecha_hasta)
+        
+        if solo_no_retirados:
+            # El remito se entrega con el equipo: no retirado = equipo no entregado
+            consulta += " AND e.estado_actual != 'Entregado'"
+        
+        if orden == "fecha_asc":
+            consulta += " ORDER BY r.fecha_emision ASC"
+        else:
+            consulta += " ORDER BY r.fecha_emision DESC"
+        
+        return consulta, tuple(parametros)
+    
+    @staticmethod
+    def listar_remitos(busqueda="", orden="fecha_desc", fecha_desde=None, fecha_hasta=None, solo_no_retirados=False):
+        """
+        Lista todos los remitos
+        
+        Args:
+            busqueda (str): Buscar por número, cliente, equipo
+            orden (str): fecha_desc, fecha_asc
+            fecha_desde: Fecha desde (opcional)
+            fecha_hasta: Fecha hasta (opcional)
+            solo_no_retirados (bool): Solo remitos no retirados
             
-            return db.obtener_todos(consulta, tuple(parametros))
+        Returns:
+            list: Lista de remitos
+        """
+        try:
+            consulta, parametros = ModuloRemitos.consulta_listar_remitos(
+                busqueda, orden, fecha_desde, fecha_hasta, solo_no_retirados
+            )
+            return db.obtener_todos(consulta, parametros)
             
         except Exception as e:
             config.guardar_log(f"Error al listar remitos: {e}", "ERROR")
@@ -237,11 +298,11 @@ class ModuloRemitos:
             parametros = []
             
             if fecha_desde:
-                where_fecha += " AND fecha_hora_generacion >= ?"
+                where_fecha += " AND fecha_emision >= ?"
                 parametros.append(fecha_desde)
             
             if fecha_hasta:
-                where_fecha += " AND fecha_hora_generacion <= ?"
+                where_fecha += " AND fecha_emision <= ?"
                 parametros.append(fecha_hasta)
             
             # Total de remitos
@@ -253,7 +314,7 @@ class ModuloRemitos:
             if not fecha_desde and not fecha_hasta:
                 from datetime import datetime, timedelta
                 fecha_mes_atras = datetime.now() - timedelta(days=30)
-                consulta = "SELECT COUNT(*) as total FROM remitos WHERE fecha_hora_generacion >= ?"
+                consulta = "SELECT COUNT(*) as total FROM remitos WHERE fecha_emision >= ?"
                 resultado = db.obtener_uno(consulta, (fecha_mes_atras,))
                 estadisticas['ultimo_mes'] = resultado['total'] if resultado else 0
             else:
@@ -9,8 +9,13 @@ Lógica de negocio para gestión de inventario de repuestos
 
 from datetime import datetime
 from base_datos.conexion import db
+from base_datos import stock
+from base_datos.compatibilidad import repuestos_compatibles
+from base_datos.stock import StockInsuficiente
 from sistema_base.validadores import validar_requerido
 from sistema_base.configuracion import config
+from sistema_base.constantes import CANTIDAD_MINIMA_STOCK_REPUESTOS
+from sistema_base.utilidades import formatear_fecha_hora
 
 
 class ModuloRepuestos:
@@ -51,6 +56,30 @@ class ModuloRepuestos:
         "Para revisar"
     ]
     
+    # Columnas al exportar consulta_listar_repuestos: (clave, encabezado[, formateador])
+    COLUMNAS_EXPORTACION = [
+        ("id_repuesto", "ID"),
+        ("nombre", "Nombre"),
+        ("tipo", "Tipo"),
+        ("tipo_dispositivo", "Dispositivo"),
+        ("modelos_compatibles", "Modelos compatibles"),
+        ("origen", "Origen"),
+        ("estado", "Estado"),
+        ("cantidad_disponible", "Disponible"),
+        ("precio_referencia", "Precio de referencia"),
+        ("fecha_ingreso", "Ingreso", formatear_fecha_hora)
+    ]
+    
+    @staticmethod
+    def obtener_stock_minimo():
+        """
+        Cantidad desde la que un repuesto tiene stock bajo
+        
+        Returns:
+            int: La configurada o, si no hay ninguna, CANTIDAD_MINIMA_STOCK_REPUESTOS
+        """
+        return getattr(config, 'cantidad_minima_stock_repuestos', None) or CANTIDAD_MINIMA_STOCK_REPUESTOS
+    
     @staticmethod
     def agregar_repuesto(nombre, tipo_repuesto, tipo_dispositivo, modelos_compatibles,
                         origen, id_equipo_origen, cantidad, estado, precio_referencia,
@@ -129,6 +158,78 @@ class ModuloRepuestos:
             config.guardar_log(f"Error al agregar repuesto: {e}", "ERROR")
             return False, f"Error: {str(e)}", None
     
+    @staticmethod
+    def consulta_listar_repuestos(filtro_tipo_repuesto="", filtro_tipo_dispositivo="", 
+                                 filtro_origen="", filtro_estado="", busqueda="", 
+                                 solo_con_stock=False, fecha_desde=None, fecha_hasta=None):
+        """
+        Arma la consulta del listado de repuestos (usada también para exportar)
+        
+        Args:
+            filtro_tipo_repuesto (str): Filtrar por tipo de repuesto
+            filtro_tipo_dispositivo (str): Filtrar por tipo de dispositivo
+            filtro_origen (str): Filtrar por origen
+            filtro_estado (str): Filtrar por estado
+            busqueda (str): Buscar en nombre, modelos
+            solo_con_stock (bool): Solo mostrar con stock disponible
+            fecha_desde: Fecha de ingreso desde (opcional)
+            fecha_hasta: Fecha de ingreso hasta (opcional)
+            
+        Returns:
+            tuple: (consulta, parametros)
+        """
+        consulta = """
+        SELECT 
+            r.*,
+            e.marca as equipo_origen_marca,
+            e.modelo as equipo_origen_modelo
+        FROM repuestos r
+        LEFT JOIN equipos e ON r.id_equipo_origen = e.id_equipo
+        WHERE 1=1
+        """
+        
+        parametros = []
+        
+        # Filtros
+        if filtro_tipo_repuesto:
+            consulta += " AND r.tipo_repuesto = ?"
+            parametros.append(filtro_tipo_repuesto)
+        
+        if filtro_tipo_dispositivo:
+            consulta += " AND r.tipo_dispositivo = ?"
+            parametros.append(filtro_tipo_dispositivo)
+        
+        if filtro_origen:
+            consulta += " AND r.origen = ?"
+            parametros.append(filtro_origen)
+        
+        if filtro_estado:
+            consulta += " AND r.estado = ?"
+            parametros.append(filtro_estado)
+        
+        if solo_con_stock:
+            consulta += " AND r.cantidad_disponible > 0"
+        
+        if busqueda:
+            consulta += """ AND (
+                r.nombre LIKE ? OR
+                r.modelos_compatibles LIKE ?
+            )"""
+            busqueda_param = f"%{busqueda}%"
+            parametros.extend([busqueda_param, busqueda_param])
+        
+        if fecha_desde:
+            consulta += " AND r.fecha_ingreso >= ?"
+            parametros.append(fecha_desde)
+        
+        if fecha_hasta:
+            consulta += " AND r.fecha_ingreso <= ?"
+            parametros.append(fecha_hasta)
+        
+        consulta += " ORDER BY r.nombre ASC"
+        
+        return consulta, tuple(parametros)
+    
     @staticmethod
     def listar_repuestos(filtro_tipo_repuesto="", filtro_tipo_dispositivo="", 
                         filtro_origen="", filtro_estado="", busqueda="", 
@@ -148,58 +249,47 @@ class ModuloRepuestos:
             list: Lista de repuestos
         """
         try:
-            consulta = """
-            SELECT 
-                r.*,
-                e.marca as equipo_origen_marca,
-                e.modelo as equipo_origen_modelo
-            FROM repuestos r
-            LEFT JOIN equipos e ON r.id_equipo_origen = e.id_equipo
-            WHERE 1=1
-            """
-            
-            parametros = []
-            
-            # Filtros
-            if filtro_tipo_repuesto:
-                consulta += " AND r.tipo_repuesto = ?"
-                parametros.append(filtro_tipo_repuesto)
-            
-            if filtro_tipo_dispositivo:
-                consulta += " AND r.tipo_dispositivo = ?"
-                parametros.append(filtro_tipo_dispositivo)
-            
-            if filtro_origen:
-                consulta += " AND r.origen = ?"
-                parametros.append(filtro_origen)
-            
-            if filtro_estado:
-                consulta += " AND r.estado = ?"
-                parametros.append(filtro_estado)
+            consulta, parametros = ModuloRepuestos.consulta_listar_repuestos(
+                filtro_tipo_repuesto, filtro_tipo_dispositivo, filtro_origen, filtro_estado, busqueda, solo_con_stock
+            )
+            repuestos = db.obtener_todos(consulta, parametros)
             
-            if solo_con_stock:
-                consulta += " AND r.cantidad_disponible > 0"
+            # Marcar stock bajo
+            for repuesto in repuestos:
+                repuesto['stock_bajo'] = repuesto['cantidad_disponible'] <= ModuloRepuestos.obtener_stock_minimo()
             
-            if busqueda:
-                consulta += """ AND (
-                    r.nombre LIKE ? OR
-                    r.modelos_compatibles LIKE ?
-                )"""
-                busqueda_param = f"%{busqueda}%"
-                parametros.extend([busqueda_param, busqueda_param])
+            return repuestos
             
-            consulta += " ORDER BY r.nombre ASC"
+        except Exception as e:
+            config.guardar_log(f"Error al listar repuestos: {e}", "ERROR")
+            return []
+    
+    @staticmethod
+    def obtener_repuestos_compatibles(id_equipo, solo_con_stock=True):
+        """
+        Lista los repuestos compatibles con un equipo (por marca y modelo)
+        
+        Usa el índice repuestos_compatibilidad en lugar de buscar el
+        modelo en el texto de modelos_compatibles.
+        
+        Args:
+            id_equipo (int): ID del equipo
+            solo_con_stock (bool): Solo los que tienen unidades libres
             
-            repuestos = db.obtener_todos(consulta, tuple(parametros))
+        Returns:
+            list: Lista de repuestos
+        """
+        try:
+            repuestos = repuestos_compatibles(id_equipo, solo_con_stock)
             
-            # Marcar stock bajo
+            minimo = ModuloRepuestos.obtener_stock_minimo()
             for repuesto in repuestos:
-                repuesto['stock_bajo'] = repuesto['cantidad_disponible'] <= config.cantidad_minima_stock_repuestos
+                repuesto['stock_bajo'] = repuesto['cantidad_disponible'] <= minimo
             
             return repuestos
             
         except Exception as e:
-            config.guardar_log(f"Error al listar repuestos: {e}", "ERROR")
+            config.guardar_log(f"Error al obtener repuestos compatibles: {e}", "ERROR")
             return []
     
     @staticmethod
@@ -218,18 +308,17 @@ class ModuloRepuestos:
             SELECT 
                 r.*,
                 e.marca as equipo_origen_marca,
-                e.modelo as equipo_origen_modelo,
-                u.nombre as usuario_ingreso_nombre
+                e.modelo as equipo_origen_modelo
             FROM repuestos r
             LEFT JOIN equipos e ON r.id_equipo_origen = e.id_equipo
-            LEFT JOIN usuarios u ON r.id_usuario_ingreso = u.id_usuario
             WHERE r.id_repuesto = ?
             """
             
             repuesto = db.obtener_uno(consulta, (id_repuesto,))
             
             if repuesto:
-                repuesto['stock_bajo'] = repuesto['cantidad_disponible'] <= config.cantidad_minima_stock_repuestos
+                minimo = ModuloRepuestos.obtener_stock_minimo()
+                repuesto['stock_bajo'] = repuesto['cantidad_disponible'] <= minimo
             
             return repuesto
             
@@ -243,11 +332,14 @@ class ModuloRepuestos:
         """
         Modifica un repuesto
         
+        Un cambio de cantidad se asienta en el libro de stock como ajuste
+        por la diferencia.
+        
         Args:
             id_repuesto (int): ID del repuesto
             nombre (str): Nuevo nombre
             modelos_compatibles (str): Nuevos modelos
-            cantidad (int): Nueva cantidad
+            cantidad (int): Nueva cantidad disponible
             estado (str): Nuevo estado
             precio_referencia (float): Nuevo precio
             notas (str): Nuevas notas
@@ -262,30 +354,44 @@ class ModuloRepuestos:
             if not repuesto_anterior:
                 return False, "Repuesto no encontrado"
             
-            # Actualizar
+            # Actualizar (la cantidad, como ajuste en el libro de stock)
             consulta = """
             UPDATE repuestos
-            SET nombre = ?, modelos_compatibles = ?, cantidad_disponible = ?,
+            SET nombre = ?, modelos_compatibles = ?,
                 estado = ?, precio_referencia = ?, notas = ?
             WHERE id_repuesto = ?
             """
             
-            db.ejecutar_consulta(
-                consulta,
-                (nombre, modelos_compatibles, cantidad, estado, precio_referencia, notas, id_repuesto)
-            )
+            with db.transaccion() as cursor:
+                cursor.execute(
+                    consulta,
+                    (nombre, modelos_compatibles, estado, precio_referencia, notas, id_repuesto)
+                )
+                # La cantidad se vuelve a leer con la escritura ya tomada: si
+                # otra terminal movió stock después de abrir el formulario, el
+                # ajuste es contra lo que hay ahora y no pisa ese movimiento
+                cursor.execute(
+                    "SELECT cantidad_disponible FROM repuestos WHERE id_repuesto = ?", (id_repuesto,)
+                )
+                cantidad_actual = cursor.fetchone()[0]
+                diferencia = cantidad - cantidad_actual
+                if diferencia:
+                    stock.registrar_movimiento(
+                        id_repuesto, stock.MOVIMIENTO_AJUSTE, diferencia, id_usuario,
+                        motivo="Ajuste de inventario", cursor=cursor
+                    )
             
             # Registrar cambios en auditoría
             from sistema_base.seguridad import registrar_accion_auditoria
             
-            if repuesto_anterior['cantidad_disponible'] != cantidad:
+            if diferencia:
                 registrar_accion_auditoria(
                     id_usuario=id_usuario,
                     accion="Modificar",
                     modulo="Repuestos",
                     id_registro=id_repuesto,
                     campo_modificado="cantidad_disponible",
-                    valor_anterior=str(repuesto_anterior['cantidad_disponible']),
+                    valor_anterior=str(cantidad_actual),
                     valor_nuevo=str(cantidad),
                     motivo="Ajuste de inventario"
                 )
@@ -293,40 +399,40 @@ class ModuloRepuestos:
             config.guardar_log(f"Repuesto ID {id_repuesto} modificado", "INFO")
             return True, "Repuesto modificado exitosamente"
             
+        except StockInsuficiente as e:
+            return False, str(e)
         except Exception as e:
             config.guardar_log(f"Error al modificar repuesto: {e}", "ERROR")
             return False, f"Error: {str(e)}"
     
     @staticmethod
-    def descontar_stock(id_repuesto, cantidad, id_usuario):
+    def descontar_stock(id_repuesto, cantidad, id_usuario, id_orden=None):
         """
         Descuenta stock de un repuesto
         
+        El control y el descuento son un solo UPDATE condicional: si otra
+        terminal se llevó las últimas unidades, no queda stock negativo.
+        
         Args:
             id_repuesto (int): ID del repuesto
             cantidad (int): Cantidad a descontar
             id_usuario (int): ID del usuario
+            id_orden (int): Orden en la que se usa (si corresponde)
             
         Returns:
             tuple: (exito, mensaje)
         """
         try:
-            repuesto = ModuloRepuestos.obtener_repuesto_por_id(id_repuesto)
-            if not repuesto:
-                return False, "Repuesto no encontrado"
-            
-            if repuesto['cantidad_disponible'] < cantidad:
-                return False, f"Stock insuficiente. Disponible: {repuesto['cantidad_disponible']}"
+            if cantidad <= 0:
+                return False, "La cantidad debe ser mayor a cero"
             
-            nueva_cantidad = repuesto['cantidad_disponible'] - cantidad
+            motivo = f"Uso en reparación: -{cantidad}"
+            if id_orden:
+                motivo = f"Uso en orden N° {id_orden}: -{cantidad}"
             
-            consulta = """
-            UPDATE repuestos
-            SET cantidad_disponible = ?
-            WHERE id_repuesto = ?
-            """
-            
-            db.ejecutar_consulta(consulta, (nueva_cantidad, id_repuesto))
+            stock.registrar_movimiento(
+                id_repuesto, stock.MOVIMIENTO_SALIDA, cantidad, id_usuario, id_orden, motivo
+            )
             
             # Registrar en auditoría
             from sistema_base.seguridad import registrar_accion_auditoria
@@ -336,18 +442,244 @@ class ModuloRepuestos:
                 modulo="Repuestos",
                 id_registro=id_repuesto,
                 campo_modificado="cantidad_disponible",
-                valor_anterior=str(repuesto['cantidad_disponible']),
-                valor_nuevo=str(nueva_cantidad),
-                motivo=f"Uso en reparación: -{cantidad}"
+                motivo=motivo
             )
             
             config.guardar_log(f"Stock de repuesto ID {id_repuesto} descontado: -{cantidad}", "INFO")
             return True, "Stock descontado"
             
+        except (StockInsuficiente, ValueError) as e:
+            return False, str(e)
         except Exception as e:
             config.guardar_log(f"Error al descontar stock: {e}", "ERROR")
             return False, f"Error: {str(e)}"
     
+    @staticmethod
+    def ingresar_stock(id_repuesto, cantidad, motivo, id_usuario):
+        """
+        Suma unidades al stock de un repuesto (compra, recupero de un equipo)
+        
+        Args:
+            id_repuesto (int): ID del repuesto
+            cantidad (int): Unidades que ingresan
+            motivo (str): Origen del ingreso
+            id_usuario (int): ID del usuario
+            
+        Returns:
+            tuple: (exito, mensaje)
+        """
+        try:
+            if cantidad <= 0:
+                return False, "La cantidad debe ser mayor a cero"
+            
+            stock.registrar_movimiento(
+                id_repuesto, stock.MOVIMIENTO_ENTRADA, cantidad, id_usuario, motivo=motivo
+            )
+            
+            from sistema_base.seguridad import registrar_accion_auditoria
+            registrar_accion_auditoria(
+                id_usuario=id_usuario,
+                accion="Modificar",
+                modulo="Repuestos",
+                id_registro=id_repuesto,
+                campo_modificado="cantidad_disponible",
+                motivo=f"Ingreso de stock: +{cantidad}" + (f" ({motivo})" if motivo else "")
+            )
+            
+            config.guardar_log(f"Stock de repuesto ID {id_repuesto} ingresado: +{cantidad}", "INFO")
+            return True, "Stock ingresado"
+            
+        except (StockInsuficiente, ValueError) as e:
+            return False, str(e)
+        except Exception as e:
+            config.guardar_log(f"Error al ingresar stock: {e}", "ERROR")
+            return False, f"Error: {str(e)}"
+    
+    @staticmethod
+    def reservar_repuesto(id_orden, id_repuesto, cantidad, id_usuario):
+        """
+        Aparta unidades de un repuesto para una orden abierta
+        
+        Las unidades reservadas dejan de estar disponibles para otras
+        órdenes; se usan con ModuloOrdenes.agregar_repuesto_a_orden y se
+        liberan solas al finalizar la orden.
+        
+        Args:
+            id_orden (int): ID de la orden
+            id_repuesto (int): ID del repuesto
+            cantidad (int): Unidades a reservar
+            id_usuario (int): ID del usuario
+            
+        Returns:
+            tuple: (exito, mensaje)
+        """
+        try:
+            if cantidad <= 0:
+                return False, "La cantidad debe ser mayor a cero"
+            
+            orden = db.obtener_uno(
+                "SELECT estado FROM ordenes_trabajo WHERE id_orden = ?", (id_orden,)
+            )
+            if not orden:
+                return False, "Orden no encontrada"
+            if orden['estado'].startswith('Finalizad'):
+                return False, "La orden ya está finalizada"
+            
+            total = stock.reservar(id_orden, id_repuesto, cantidad, id_usuario)
+            
+            from sistema_base.seguridad import registrar_accion_auditoria
+            registrar_accion_auditoria(
+                id_usuario=id_usuario,
+                accion="Reservar",
+                modulo="Repuestos",
+                id_registro=id_repuesto,
+                motivo=f"Reserva para orden N° {id_orden}: {cantidad} (total {total})"
+            )
+            
+            config.guardar_log(f"Repuesto ID {id_repuesto} reservado para orden ID {id_orden}: {cantidad}", "INFO")
+            return True, f"Repuesto reservado ({total} para la orden)"
+            
+        except (StockInsuficiente, ValueError) as e:
+            return False, str(e)
+        except Exception as e:
+            config.guardar_log(f"Error al reservar repuesto: {e}", "ERROR")
+            return False, f"Error: {str(e)}"
+    
+    @staticmethod
+    def liberar_reserva(id_orden, id_repuesto, id_usuario, cantidad=None):
+        """
+        Devuelve al stock libre lo reservado para una orden
+        
+        Args:
+            id_orden (int): ID de la orden
+            id_repuesto (int): ID del repuesto (None = todos los de la orden)
+            id_usuario (int): ID del usuario
+            cantidad (int): Unidades a liberar (None = toda la reserva)
+            
+        Returns:
+            tuple: (exito, mensaje)
+        """
+        try:
+            liberadas = stock.liberar(id_orden, id_repuesto, cantidad, id_usuario)
+            if not liberadas:
+                return False, "La orden no tiene repuestos reservados"
+            
+            from sistema_base.seguridad import registrar_accion_auditoria
+            registrar_accion_auditoria(
+                id_usuario=id_usuario,
+                accion="Liberar",
+                modulo="Repuestos",
+                id_registro=id_repuesto,
+                motivo=f"Reserva liberada de orden N° {id_orden}: {liberadas}"
+            )
+            
+            config.guardar_log(f"Reserva de orden ID {id_orden} liberada: {liberadas}", "INFO")
+            return True, f"{liberadas} unidad(es) liberada(s)"
+            
+        except (StockInsuficiente, ValueError) as e:
+            return False, str(e)
+        except Exception as e:
+            config.guardar_log(f"Error al liberar reserva: {e}", "ERROR")
+            return False, f"Error: {str(e)}"
+    
+    @staticmethod
+    def obtener_reservas(id_orden=None, id_repuesto=None):
+        """
+        Lista las reservas vigentes
+        
+        Args:
+            id_orden (int): Solo las de esa orden
+            id_repuesto (int): Solo las de ese repuesto
+            
+        Returns:
+            list: Reservas con el nombre del repuesto
+        """
+        try:
+            consulta = """
+            SELECT rr.*, r.nombre as repuesto_nombre, o.estado as estado_orden
+            FROM reservas_repuestos rr
+            INNER JOIN repuestos r ON rr.id_repuesto = r.id_repuesto
+            LEFT JOIN ordenes_trabajo o ON rr.id_orden = o.id_orden
+            WHERE 1=1
+            """
+            parametros = []
+            
+            if id_orden is not None:
+                consulta += " AND rr.id_orden = ?"
+                parametros.append(id_orden)
+            
+            if id_repuesto is not None:
+                consulta += " AND rr.id_repuesto = ?"
+                parametros.append(id_repuesto)
+            
+            consulta += " ORDER BY rr.fecha_reserva ASC"
+            
+            return db.obtener_todos(consulta, tuple(parametros))
+            
+        except Exception as e:
+            config.guardar_log(f"Error al obtener reservas: {e}", "ERROR")
+            return []
+    
+    @staticmethod
+    def obtener_movimientos(id_repuesto, limite=100):
+        """
+        Obtiene el libro de movimientos de stock de un repuesto
+        
+        Args:
+            id_repuesto (int): ID del repuesto
+            limite (int): Cantidad máxima de registros
+            
+        Returns:
+            list: Movimientos, del más reciente al más antiguo
+        """
+        try:
+            consulta = """
+            SELECT m.*, u.nombre as usuario_nombre
+            FROM movimientos_stock m
+            LEFT JOIN usuarios u ON m.id_usuario = u.id_usuario
+            WHERE m.id_repuesto = ?
+            ORDER BY m.id_movimiento DESC
+            LIMIT ?
+            """
+            
+            return db.obtener_todos(consulta, (id_repuesto, limite))
+            
+        except Exception as e:
+            config.guardar_log(f"Error al obtener movimientos de stock: {e}", "ERROR")
+            return []
+    
+    @staticmethod
+    def verificar_stock(id_usuario=None):
+        """
+        Verifica los saldos de stock contra el libro y las reservas
+        
+        Args:
+            id_usuario (int): Usuario que lo solicita (para auditoría)
+            
+        Returns:
+            tuple: (exito, mensaje, ids de repuestos corregidos)
+        """
+        try:
+            corregidos = stock.recalcular_stock()
+            
+            if corregidos and id_usuario:
+                from sistema_base.seguridad import registrar_accion_auditoria
+                registrar_accion_auditoria(
+                    id_usuario=id_usuario,
+                    accion="Modificar",
+                    modulo="Repuestos",
+                    motivo=f"Verificación de stock: {len(corregidos)} repuesto(s) corregido(s)"
+                )
+            
+            config.guardar_log(f"Stock verificado: {len(corregidos)} repuesto(s) corregido(s)", "INFO")
+            if not corregidos:
+                return True, "El stock coincide con el libro de movimientos", []
+            return True, f"{len(corregidos)} repuesto(s) corregido(s)", corregidos
+            
+        except Exception as e:
+            config.guardar_log(f"Error al verificar stock: {e}", "ERROR")
+            return False, f"Error: {str(e)}", []
+    
     @staticmethod
     def obtener_estadisticas_repuestos():
         """
@@ -364,14 +696,19 @@ class ModuloRepuestos:
             resultado = db.obtener_uno(consulta)
             estadisticas['total_items'] = resultado['total'] if resultado else 0
             
-            # Total unidades
-            consulta = "SELECT SUM(cantidad_disponible) as total FROM repuestos"
+            # Total unidades (las reservadas siguen en el taller)
+            consulta = "SELECT SUM(cantidad_disponible + cantidad_reservada) as total FROM repuestos"
             resultado = db.obtener_uno(consulta)
             estadisticas['total_unidades'] = resultado['total'] if resultado and resultado['total'] else 0
             
+            # Reservadas para órdenes abiertas
+            consulta = "SELECT SUM(cantidad_reservada) as total FROM repuestos"
+            resultado = db.obtener_uno(consulta)
+            estadisticas['reservadas'] = resultado['total'] if resultado and resultado['total'] else 0
+            
             # Con stock bajo
             consulta = "SELECT COUNT(*) as total FROM repuestos WHERE cantidad_disponible <= ?"
-            resultado = db.obtener_uno(consulta, (config.cantidad_minima_stock_repuestos,))
+            resultado = db.obtener_uno(consulta, (ModuloRepuestos.obtener_stock_minimo(),))
             estadisticas['stock_bajo'] = resultado['total'] if resultado else 0
             
             # Sin stock
@@ -389,7 +726,10 @@ class ModuloRepuestos:
             estadisticas['recuperados'] = resultado['total'] if resultado else 0
             
             # Valor total del inventario
-            consulta = "SELECT SUM(cantidad_disponible * precio_referencia) as total FROM repuestos"
+            consulta = """
+            SELECT SUM((cantidad_disponible + cantidad_reservada) * precio_referencia) as total
+            FROM repuestos
+            """
             resultado = db.obtener_uno(consulta)
             estadisticas['valor_total'] = resultado['total'] if resultado and resultado['total'] else 0.0
             
@@ -9,17 +9,82 @@ Lógica de negocio para gestión de usuarios del sistema
 
 from datetime import datetime
 from base_datos.conexion import db
+from base_datos.particiones import consulta_auditoria
 from sistema_base.seguridad import (encriptar_contrasena, crear_usuario, 
                                      resetear_contrasena_admin, 
                                      validar_contrasena_temporal,
                                      generar_contrasena_temporal)
 from sistema_base.validadores import validar_nombre, validar_requerido
 from sistema_base.configuracion import config
+from sistema_base.constantes import ID_USUARIO_SISTEMA
+from sistema_base.utilidades import formatear_fecha_hora
 
 
 class ModuloUsuarios:
     """Clase para manejar la lógica de negocio de usuarios"""
     
+    # Columnas al exportar consulta_listar_usuarios: (clave, encabezado[, formateador])
+    COLUMNAS_EXPORTACION = [
+        ("id_usuario", "ID"),
+        ("nombre", "Nombre"),
+        ("username", "Usuario"),
+        ("rol", "Rol"),
+        ("estado", "Estado"),
+        ("fecha_creacion", "Alta", formatear_fecha_hora)
+    ]
+    
+    @staticmethod
+    def consulta_listar_usuarios(solo_activos=False, busqueda="", fecha_desde=None, fecha_hasta=None):
+        """
+        Arma la consulta del listado de usuarios (usada también para exportar)
+        
+        Args:
+            solo_activos (bool): Si True, solo muestra usuarios activos
+            busqueda (str): Texto para buscar en nombre o username
+            fecha_desde: Fecha de alta desde (opcional)
+            fecha_hasta: Fecha de alta hasta (opcional)
+            
+        Returns:
+            tuple: (consulta, parametros)
+        """
+        consulta = """
+        SELECT 
+            id_usuario,
+            nombre,
+            username,
+            rol,
+            activo,
+            fecha_creacion,
+            CASE WHEN activo = 1 THEN 'Activo' ELSE 'Inactivo' END as estado
+        FROM usuarios
+        WHERE id_usuario != ?
+        """
+        
+        # El usuario reservado 'sistema' no se administra
+        parametros = [ID_USUARIO_SISTEMA]
+        
+        # Filtro por activos
+        if solo_activos:
+            consulta += " AND activo = 1"
+        
+        # Filtro por búsqueda
+        if busqueda:
+            consulta += " AND (nombre LIKE ? OR username LIKE ?)"
+            busqueda_param = f"%{busqueda}%"
+            parametros.extend([busqueda_param, busqueda_param])
+        
+        if fecha_desde:
+            consulta += " AND fecha_creacion >= ?"
+            parametros.append(fecha_desde)
+        
+        if fecha_hasta:
+            consulta += " AND fecha_creacion <= ?"
+            parametros.append(fecha_hasta)
+        
+        consulta += " ORDER BY nombre ASC"
+        
+        return consulta, tuple(parametros)
+    
     @staticmethod
     def listar_usuarios(solo_activos=False, busqueda=""):
         """
@@ -33,34 +98,10 @@ class ModuloUsuarios:
             list: Lista de diccionarios con datos de usuarios
         """
         try:
-            consulta = """
-            SELECT 
-                id_usuario,
-                nombre,
-                username,
-                rol,
-                activo,
-                fecha_creacion,
-                CASE WHEN activo = 1 THEN 'Activo' ELSE 'Inactivo' END as estado
-            FROM usuarios
-            WHERE 1=1
-            """
-            
-            parametros = []
-            
-            # Filtro por activos
-            if solo_activos:
-                consulta += " AND activo = 1"
-            
-            # Filtro por búsqueda
-            if busqueda:
-                consulta += " AND (nombre LIKE ? OR username LIKE ?)"
-                busqueda_param = f"%{busqueda}%"
-                parametros.extend([busqueda_param, busqueda_param])
-            
-            consulta += " ORDER BY nombre ASC"
-            
-            return db.obtener_todos(consulta, tuple(parametros))
+            consulta, parametros = ModuloUsuarios.consulta_listar_usuarios(
+                solo_activos, busqueda
+            )
+            return db.obtener_todos(consulta, parametros)
             
         except Exception as e:
             config.guardar_log(f"Error al listar usuarios: {e}", "ERROR")
@@ -153,7 +194,7 @@ class ModuloUsuarios:
         """
         try:
             # Validar que quien modifica es admin
-            if not config.es_admin:
+            if not config.tiene_permiso("usuarios"):
                 return False, "Solo los administradores pueden modificar usuarios"
             
             # Validar nombre
@@ -262,7 +303,7 @@ class ModuloUsuarios:
         """
         try:
             # Validar que quien modifica es admin
-            if not config.es_admin:
+            if not config.tiene_permiso("usuarios"):
                 return False, "Solo los administradores pueden cambiar el estado de usuarios"
             
             # No permitir desactivar el propio usuario
@@ -337,8 +378,8 @@ class ModuloUsuarios:
             estadisticas = {}
             
             # Total de usuarios
-            consulta_total = "SELECT COUNT(*) as total FROM usuarios"
-            resultado = db.obtener_uno(consulta_total)
+            consulta_total = "SELECT COUNT(*) as total FROM usuarios WHERE id_usuario != ?"
+            resultado = db.obtener_uno(consulta_total, (ID_USUARIO_SISTEMA,))
             estadisticas['total'] = resultado['total'] if resultado else 0
             
             # Usuarios activos
@@ -383,9 +424,11 @@ class ModuloUsuarios:
             list: Lista de acciones del usuario
         """
         try:
-            consulta = """
+            # Todos los meses del log (ver base_datos.particiones)
+            registros, parametros = consulta_auditoria("id_usuario = ?", (id_usuario,), limite=limite)
+            consulta = f"""
             SELECT 
-                id_log,
+                id_auditoria as id_log,
                 fecha_hora,
                 accion,
                 modulo,
@@ -393,15 +436,13 @@ class ModuloUsuarios:
                 campo_modificado,
                 valor_anterior,
                 valor_nuevo,
-                motivo_modificacion,
-                es_accion_critica
-            FROM logs_sistema
-            WHERE id_usuario = ?
+                motivo as motivo_modificacion,
+                es_critica as es_accion_critica
+            FROM ({registros})
             ORDER BY fecha_hora DESC
-            LIMIT ?
             """
             
-            return db.obtener_todos(consulta, (id_usuario, limite))
+            return db.obtener_todos(consulta, parametros)
             
         except Exception as e:
             config.guardar_log(f"Error al obtener historial de usuario: {e}", "ERROR")
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+Modo servidor: una PC del local es dueña de la base y las demás
+trabajan contra ella por la red (ver servidor.servidor y servidor.cliente)
+"""
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""Permite iniciar el servidor con: python -m servidor"""
+
+from servidor.servidor import main
+
+main()
@@ -0,0 +1,455 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - CLIENTE DEL MODO SERVIDOR
+============================================================================
+Lo que usa una estación para trabajar contra el servidor:
+
+- ClienteServidor: habla HTTP/JSON con el servidor (una conexión
+  keep-alive por hilo) y permite agrupar operaciones en un lote.
+- ConexionRemota: misma interfaz que db (ConexionBD), pero cada consulta
+  se resuelve en el servidor.
+- instalar_cliente(url): reemplaza db por una ConexionRemota y hace que
+  las clases Modulo* de modulos/* ejecuten sus métodos en el servidor
+  (un viaje por operación, no uno por consulta). Tiene que llamarse antes
+  de importar cualquier módulo que use db (ver main.py --servidor).
+============================================================================
+"""
+
+import functools
+import http.client
+import importlib.abc
+import importlib.machinery
+import sys
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from servidor.protocolo import (RUTA_LOTE, RUTA_ESTADO, ENCABEZADO_SESION, ErrorServidor,
+                                codificar, decodificar)
+from sistema_base.configuracion import config
+
+
+# Segundos de espera de una respuesta (los listados grandes tardan)
+TIEMPO_ESPERA = 60
+
+# Filas por viaje al recorrer una consulta con iterar_consulta
+FILAS_POR_TRAMO = 2000
+
+
+class ResultadoPendiente:
+    """Resultado de una operación agregada a un lote, disponible al enviarlo"""
+
+    def __init__(self):
+        self.listo = False
+        self._valor = None
+        self._error = None
+
+    def resolver(self, respuesta):
+        self.listo = True
+        if respuesta.get('ok'):
+            self._valor = respuesta.get('valor')
+        else:
+            self._error = respuesta.get('error') or "Error en el servidor"
+
+    @property
+    def valor(self):
+        if not self.listo:
+            raise ErrorServidor("El lote todavía no se envió")
+        if self._error is not None:
+            raise ErrorServidor(self._error)
+        return self._valor
+
+
+class Lote:
+    """Operaciones que viajan juntas al servidor (ver ClienteServidor.lote)"""
+
+    def __init__(self, cliente):
+        self.cliente = cliente
+        self.operaciones = []
+        self.pendientes = []
+
+    def agregar(self, operacion):
+        pendiente = ResultadoPendiente()
+        self.operaciones.append(operacion)
+        self.pendientes.append(pendiente)
+        return pendiente
+
+    def llamar(self, modulo, clase, metodo, *args, **kwargs):
+        """Agrega la llamada a un método de un módulo; devuelve un ResultadoPendiente"""
+        return self.agregar({'tipo': "llamada", 'modulo': modulo, 'clase': clase, 'metodo': metodo,
+                             'args': list(args), 'kwargs': kwargs})
+
+    def sql(self, accion, consulta, parametros=None):
+        """Agrega una consulta SQL; devuelve un ResultadoPendiente"""
+        return self.agregar({'tipo': "sql", 'accion': accion, 'consulta': consulta,
+                             'parametros': list(parametros) if parametros else None})
+
+    def enviar(self):
+        if not self.operaciones:
+            return
+        for pendiente, respuesta in zip(self.pendientes, self.cliente.enviar(self.operaciones)):
+            pendiente.resolver(respuesta)
+        self.operaciones, self.pendientes = [], []
+
+
+class ClienteServidor:
+    """
+    Conexión de una estación con el servidor
+
+    Args:
+        url (str): Dirección del servidor (http://PC:8765)
+    """
+
+    def __init__(self, url):
+        partes = urlsplit(url if "://" in url else f"http://{url}")
+        self.host = partes.hostname
+        self.puerto = partes.port or 80
+        self.token = None
+        self.version = 0           # versión de la base según la última respuesta
+        self._locales = threading.local()
+
+    def _conexion(self):
+        conexion = getattr(self._locales, "conexion", None)
+        if conexion is None:
+            conexion = http.client.HTTPConnection(self.host, self.puerto, timeout=TIEMPO_ESPERA)
+            self._locales.conexion = conexion
+        return conexion
+
+    def _pedido(self, metodo, ruta, cuerpo=None):
+        encabezados = {'Content-Type': "application/json"}
+        if self.token:
+            encabezados[ENCABEZADO_SESION] = self.token
+
+        # Un reintento: el servidor puede haber cerrado la conexión ociosa
+        for intento in (1, 2):
+            conexion = self._conexion()
+            try:
+                conexion.request(metodo, ruta, body=cuerpo, headers=encabezados)
+                respuesta = conexion.getresponse()
+                contenido = respuesta.read()
+                break
+            except (ConnectionError, http.client.HTTPException, OSError) as e:
+                conexion.close()
+                self._locales.conexion = None
+                if intento == 2:
+                    raise ErrorServidor(f"No se pudo comunicar con el servidor {self.host}:{self.puerto}: {e}")
+
+        datos = decodificar(contenido)
+        if respuesta.status != 200:
+            raise ErrorServidor(datos.get('error') or f"HTTP {respuesta.status}")
+        return datos
+
+    def enviar(self, operaciones):
+        """
+        Envía un lote de operaciones
+
+        Returns:
+            list: Respuesta de cada operación ({'ok', 'valor' | 'error'})
+        """
+        datos = self._pedido("POST", RUTA_LOTE, codificar({'operaciones': operaciones}))
+        self.version = datos.get('version', self.version)
+        return datos['resultados']
+
+    def ejecutar(self, operacion):
+        """Envía una sola operación y devuelve su valor (o lanza ErrorServidor)"""
+        pendiente = ResultadoPendiente()
+        pendiente.resolver(self.enviar([operacion])[0])
+        return pendiente.valor
+
+    @contextmanager
+    def lote(self):
+        """
+        Agrupa operaciones en un solo viaje
+
+        Uso:
+            with cliente.lote() as lote:
+                equipos = lote.llamar("equipos_LOGICA", "ModuloEquipos", "listar_equipos")
+                stats = lote.llamar("equipos_LOGICA", "ModuloEquipos", "obtener_estadisticas_equipos")
+            equipos.valor, stats.valor
+        """
+        lote = Lote(self)
+        yield lote
+        lote.enviar()
+
+    def llamar(self, modulo, clase, metodo, *args, **kwargs):
+        """Ejecuta un método de un módulo en el servidor"""
+        return self.ejecutar({'tipo': "llamada", 'modulo': modulo, 'clase': clase, 'metodo': metodo,
+                              'args': list(args), 'kwargs': kwargs})
+
+    def iniciar_sesion(self, username, contrasena):
+        """
+        Inicia sesión en el servidor y en esta estación
+
+        Returns:
+            dict: Datos del usuario (como autenticar_usuario) o None
+        """
+        from sistema_base.sesion import Sesion
+
+        respuesta = self.enviar([{'tipo': "login", 'username': username, 'contrasena': contrasena}])[0]
+        usuario = respuesta.get('valor')
+        if not usuario:
+            return None
+
+        self.token = usuario.pop('token')
+        config.establecer_sesion(Sesion(usuario['id_usuario'], usuario['username'], usuario['nombre'],
+                                        usuario['rol'], usuario['primer_login']))
+        return usuario
+
+    def cerrar_sesion(self):
+        """Cierra la sesión en el servidor"""
+        if self.token:
+            try:
+                self.enviar([{'tipo': "logout"}])
+            except ErrorServidor:
+                pass
+            self.token = None
+
+    def estado(self):
+        """Estado del servidor (versión, caché, pedidos atendidos)"""
+        return self._pedido("GET", RUTA_ESTADO)
+
+
+# ----------------------------------------------------------------------
+# Reemplazo de db
+# ----------------------------------------------------------------------
+
+class FilaRemota(tuple):
+    """Fila de un cursor remoto: se lee por posición o por nombre, como sqlite3.Row"""
+
+    def __new__(cls, valores, columnas):
+        fila = super().__new__(cls, valores)
+        fila._columnas = columnas
+        return fila
+
+    def __getitem__(self, clave):
+        if isinstance(clave, str):
+            return tuple.__getitem__(self, self._columnas.index(clave))
+        return tuple.__getitem__(self, clave)
+
+    def keys(self):
+        return list(self._columnas)
+
+
+class CursorRemoto:
+    """
+    Cursor de una transacción abierta en el servidor
+
+    Cada execute es un viaje: dentro de db.transaccion() conviene usar
+    solo el cursor (otra escritura esperaría a que la transacción termine).
+    """
+
+    def __init__(self, cliente, id_transaccion):
+        self.cliente = cliente
+        self.id_transaccion = id_transaccion
+        self.lastrowid = None
+        self.rowcount = -1
+        self.description = None
+        self._filas = []
+
+    def _ejecutar(self, accion, consulta, parametros):
+        resultado = self.cliente.ejecutar({
+            'tipo': "sql", 'accion': accion, 'consulta': consulta, 'transaccion': self.id_transaccion,
+            'parametros': [list(p) for p in parametros] if accion == "ejecutar_muchas" else
+                          (list(parametros) if parametros else None),
+        })
+        columnas = resultado['columnas']
+        self.description = [(columna,) + (None,) * 6 for columna in columnas] or None
+        self._filas = [FilaRemota(fila, columnas) for fila in resultado['filas']]
+        self.lastrowid = resultado['ultimo_id']
+        self.rowcount = resultado['cantidad']
+        return self
+
+    def execute(self, consulta, parametros=()):
+        return self._ejecutar("ejecutar", consulta, parametros)
+
+    def executemany(self, consulta, lista_parametros):
+        return self._ejecutar("ejecutar_muchas", consulta, list(lista_parametros))
+
+    def fetchone(self):
+        return self._filas.pop(0) if self._filas else None
+
+    def fetchmany(self, cantidad=1):
+        filas, self._filas = self._filas[:cantidad], self._filas[cantidad:]
+        return filas
+
+    def fetchall(self):
+        filas, self._filas = self._filas, []
+        return filas
+
+    def __iter__(self):
+        while self._filas:
+            yield self._filas.pop(0)
+
+    def close(self):
+        self._filas = []
+
+
+class ConexionRemota:
+    """
+    Reemplazo de db (ConexionBD) que resuelve cada consulta en el servidor
+
+    Args:
+        cliente (ClienteServidor): Conexión con el servidor
+    """
+
+    def __init__(self, cliente):
+        self.cliente = cliente
+
+    def conectar(self):
+        # Quien pide la conexión solo la usa para total_changes (ver precarga)
+        return self
+
+    def desconectar(self):
+        pass
+
+    @property
+    def total_changes(self):
+        """Cambia cuando la base cambió en el servidor"""
+        return self.cliente.version
+
+    def _sql(self, accion, consulta, parametros=None, **extra):
+        operacion = {'tipo': "sql", 'accion': accion, 'consulta': consulta,
+                     'parametros': list(parametros) if parametros else None}
+        operacion.update(extra)
+        try:
+            return self.cliente.ejecutar(operacion)
+        except ErrorServidor as e:
+            config.guardar_log(f"Error en el servidor ({accion}): {e}", "ERROR")
+            raise
+
+    def ejecutar_consulta(self, consulta, parametros=None):
+        return self._sql("ejecutar", consulta, parametros)
+
+    def ejecutar_muchas(self, consulta, lista_parametros):
+        return self._sql("ejecutar_muchas", consulta, [list(p) for p in lista_parametros])
+
+    def obtener_uno(self, consulta, parametros=None):
+        return self._sql("obtener_uno", consulta, parametros)
+
+    def obtener_todos(self, consulta, parametros=None):
+        return self._sql("obtener_todos", consulta, parametros)
+
+    def iterar_consulta(self, consulta, parametros=None, tamano_lote=FILAS_POR_TRAMO):
+        desde = 0
+        while True:
+            filas = self._sql("obtener_lote", consulta, parametros, desde=desde, limite=tamano_lote)
+            yield from filas
+            if len(filas) < tamano_lote:
+                break
+            desde += len(filas)
+
+    @contextmanager
+    def transaccion(self):
+        id_transaccion = self.cliente.ejecutar({'tipo': "abrir_transaccion"})
+        cursor = CursorRemoto(self.cliente, id_transaccion)
+        try:
+            yield cursor
+        except Exception as e:
+            self.cliente.ejecutar({'tipo': "cerrar_transaccion", 'id': id_transaccion, 'confirmar': False})
+            config.guardar_log(f"Error en transacción, cambios revertidos: {e}", "ERROR")
+            raise
+        self.cliente.ejecutar({'tipo': "cerrar_transaccion", 'id': id_transaccion, 'confirmar': True})
+
+    def tabla_existe(self, nombre_tabla):
+        consulta = "SELECT name FROM sqlite_master WHERE type='table' AND name=?"
+        return self.obtener_uno(consulta, (nombre_tabla,)) is not None
+
+
+# ----------------------------------------------------------------------
+# Módulos remotos
+# ----------------------------------------------------------------------
+
+class ModuloRemoto:
+    """
+    Ocupa el lugar de una clase Modulo*: sus métodos se ejecutan en el
+    servidor y sus constantes (METODOS_PAGO, COLUMNAS_EXPORTACION...) se
+    leen de la clase local.
+    """
+
+    def __init__(self, cliente, modulo, clase):
+        self._cliente = cliente
+        self._modulo = modulo
+        self._clase = clase
+
+    def __getattr__(self, nombre):
+        valor = getattr(self._clase, nombre)
+        # consulta_* solo arma SQL; lo que no es un método se lee local
+        if nombre.startswith(("_", "consulta_")) or isinstance(valor, type) or not callable(valor):
+            return valor
+        return functools.partial(self._llamar, nombre, valor)
+
+    def _llamar(self, metodo, local, *args, **kwargs):
+        operacion = {'tipo': "llamada", 'modulo': self._modulo, 'clase': self._clase.__name__,
+                     'metodo': metodo, 'args': list(args), 'kwargs': kwargs}
+        try:
+            codificar(operacion)
+        except TypeError:
+            # Argumentos que no viajan (callbacks, cursores): se ejecuta acá, contra db remota
+            return local(*args, **kwargs)
+        return self._cliente.ejecutar(operacion)
+
+    def __repr__(self):
+        return f"<{self._clase.__name__} en {self._cliente.host}:{self._cliente.puerto}>"
+
+
+class _CargadorModulosRemotos(importlib.abc.MetaPathFinder):
+    """Al importar un módulo de modulos/*, cambia sus clases Modulo* por ModuloRemoto"""
+
+    def __init__(self, cliente):
+        self.cliente = cliente
+
+    def find_spec(self, nombre, ruta, destino=None):
+        if not nombre.startswith("modulos.") or nombre.count(".") != 1:
+            return None
+        spec = importlib.machinery.PathFinder.find_spec(nombre, ruta)
+        if spec is None or spec.loader is None:
+            return None
+
+        ejecutar_original = spec.loader.exec_module
+        cliente = self.cliente
+        modulo_corto = nombre.split(".", 1)[1]
+
+        def exec_module(modulo):
+            ejecutar_original(modulo)
+            for atributo, valor in list(vars(modulo).items()):
+                if isinstance(valor, type) and atributo.startswith("Modulo") and valor.__module__ == nombre:
+                    setattr(modulo, atributo, ModuloRemoto(cliente, modulo_corto, valor))
+
+        spec.loader.exec_module = exec_module
+        return spec
+
+
+def instalar_cliente(url):
+    """
+    Hace que esta estación trabaje contra el servidor
+
+    Args:
+        url (str): Dirección del servidor (http://PC:8765)
+
+    Returns:
+        ClienteServidor: Cliente instalado
+
+    Raises:
+        ErrorServidor: Si el servidor no responde
+        RuntimeError: Si algún módulo ya importó la db local
+    """
+    import base_datos.conexion as conexion
+
+    ya_importados = [nombre for nombre in sys.modules if nombre.startswith("modulos.")]
+    if ya_importados:
+        raise RuntimeError(f"instalar_cliente debe llamarse antes de importar {', '.join(ya_importados)}")
+
+    cliente = ClienteServidor(url)
+    cliente.estado()
+
+    conexion.db = ConexionRemota(cliente)
+    sys.meta_path.insert(0, _CargadorModulosRemotos(cliente))
+
+    # El login se valida en el servidor, que entrega el token de la sesión
+    import sistema_base.seguridad as seguridad
+    seguridad.db = conexion.db
+    seguridad.autenticar_usuario = cliente.iniciar_sesion
+
+    config.guardar_log(f"Trabajando contra el servidor {cliente.host}:{cliente.puerto}", "INFO")
+    return cliente
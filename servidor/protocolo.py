@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - PROTOCOLO DEL MODO SERVIDOR
+============================================================================
+Formato de los mensajes entre las estaciones y el servidor.
+
+Todo viaja como JSON en un POST a RUTA_LOTE:
+
+    {"operaciones": [operacion, ...]}
+    ->  {"resultados": [{"ok": true, "valor": ...} | {"ok": false, "error": "..."}],
+         "version": n}
+
+Operaciones:
+    {"tipo": "login", "username": ..., "contrasena": ...}
+    {"tipo": "logout"}
+    {"tipo": "llamada", "modulo": "equipos_LOGICA", "clase": "ModuloEquipos",
+     "metodo": "listar_equipos", "args": [...], "kwargs": {...}}
+    {"tipo": "sql", "accion": "obtener_uno" | "obtener_todos" | "obtener_lote" |
+     "ejecutar" | "ejecutar_muchas", "consulta": ..., "parametros": [...],
+     "transaccion": id (opcional)}
+    {"tipo": "abrir_transaccion"}
+    {"tipo": "cerrar_transaccion", "id": ..., "confirmar": true | false}
+
+'version' cuenta las escrituras confirmadas en el servidor: el cliente la
+usa para saber si algo cambió desde la última consulta.
+
+JSON no tiene fechas ni bytes: se envían como objetos marcados
+({"__fecha__": "2025-01-31"}, {"__bytes__": "base64..."}).
+============================================================================
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+
+PUERTO_DEFECTO = 8765
+
+RUTA_LOTE = "/api/lote"
+RUTA_ESTADO = "/api/estado"
+
+# Encabezado con el token de la sesión
+ENCABEZADO_SESION = "X-Sesion"
+
+# Tamaño máximo de un pedido (los logos viajan como BLOB)
+MAXIMO_PEDIDO_BYTES = 32 * 1024 * 1024
+
+
+class ErrorServidor(Exception):
+    """Error devuelto por el servidor o de comunicación con él"""
+
+
+def _a_json(valor):
+    if isinstance(valor, datetime):
+        return {"__fecha_hora__": valor.isoformat()}
+    if isinstance(valor, date):
+        return {"__fecha__": valor.isoformat()}
+    if isinstance(valor, (bytes, bytearray, memoryview)):
+        return {"__bytes__": base64.b64encode(bytes(valor)).decode("ascii")}
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (set, frozenset)):
+        return list(valor)
+    raise TypeError(f"No se puede enviar un {type(valor).__name__} al servidor")
+
+
+def _desde_json(objeto):
+    if len(objeto) == 1:
+        if "__fecha_hora__" in objeto:
+            return datetime.fromisoformat(objeto["__fecha_hora__"])
+        if "__fecha__" in objeto:
+            return date.fromisoformat(objeto["__fecha__"])
+        if "__bytes__" in objeto:
+            return base64.b64decode(objeto["__bytes__"])
+    return objeto
+
+
+def codificar(datos):
+    """
+    Convierte un mensaje a bytes JSON
+
+    Raises:
+        TypeError: Si contiene valores que no se pueden enviar
+    """
+    return json.dumps(datos, default=_a_json, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decodificar(contenido):
+    """Convierte bytes JSON en un mensaje"""
+    return json.loads(contenido, object_hook=_desde_json)
@@ -0,0 +1,560 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - SERVIDOR PARA VARIAS ESTACIONES
+============================================================================
+Una PC del local es dueña de la base de datos y atiende a las demás por
+la red local con una API HTTP/JSON (ver servidor.protocolo):
+
+    python -m servidor --host 0.0.0.0 --puerto 8765
+
+Las estaciones abren la aplicación con --servidor http://PC:8765 y dejan
+de compartir techmanager.db por una carpeta de red (lento y con riesgo de
+corrupción por los bloqueos de SQLite sobre archivos remotos).
+
+- Toda la base se usa desde un único hilo de trabajo: las operaciones de
+  las estaciones se ejecutan en orden, con la misma conexión y la misma
+  lógica de modulos/* que usa la aplicación de escritorio.
+- Cada pedido puede traer un lote de operaciones: una pantalla que
+  necesita el listado y las estadísticas hace un solo viaje por la red.
+- Las lecturas (listar_*, obtener_*, buscar_*, SELECT) se guardan en una
+  caché que se vacía en cuanto cualquier escritura cambia la base, incluso
+  si la hizo otro proceso (backup restaurado, línea de comandos).
+- Las transacciones de una estación (db.transaccion() en el cliente)
+  usan una conexión propia y toman el turno de escritura hasta que se
+  confirman, se deshacen o vencen.
+============================================================================
+"""
+
+import argparse
+import asyncio
+import importlib
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from base_datos.conexion import db
+from servidor.protocolo import (PUERTO_DEFECTO, RUTA_LOTE, RUTA_ESTADO, ENCABEZADO_SESION,
+                                MAXIMO_PEDIDO_BYTES, ErrorServidor, codificar, decodificar)
+from sistema_base.configuracion import config
+
+
+# Métodos de los módulos que solo leen (sus resultados se pueden cachear)
+PREFIJOS_LECTURA = ("listar_", "obtener_", "buscar_", "contar_")
+
+# Nombres válidos de módulo, clase y método
+_NOMBRE_MODULO = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_NOMBRE_CLASE = re.compile(r"^Modulo[A-Za-z0-9_]+$")
+
+# Consultas SQL que solo leen (un PRAGMA puede escribir: no se cachea)
+_LECTURA_SQL = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+# Segundos que una transacción de una estación puede quedar abierta
+VIGENCIA_TRANSACCION = 15
+
+# Resultados de lectura guardados como máximo
+MAXIMO_CACHE = 1024
+
+RAZONES = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class CacheLecturas:
+    """Resultados de lectura ya codificados, de la versión actual de la base"""
+
+    def __init__(self, maximo=MAXIMO_CACHE):
+        self.maximo = maximo
+        self.entradas = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave):
+        valor = self.entradas.get(clave)
+        if valor is None:
+            self.fallos += 1
+            return None
+        self.entradas.move_to_end(clave)
+        self.aciertos += 1
+        return valor
+
+    def guardar(self, clave, valor):
+        self.entradas[clave] = valor
+        self.entradas.move_to_end(clave)
+        while len(self.entradas) > self.maximo:
+            self.entradas.popitem(last=False)
+
+    def limpiar(self):
+        self.entradas.clear()
+
+    def resumen(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            'entradas': len(self.entradas),
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': round(self.aciertos / consultas, 3) if consultas else None,
+        }
+
+
+class TransaccionRemota:
+    """Transacción abierta por una estación, con su propia conexión"""
+
+    def __init__(self, id_transaccion, token):
+        self.id = id_transaccion
+        self.token = token
+        self.conexion = sqlite3.connect(str(config.ruta_base_datos), timeout=5,
+                                        isolation_level=None, check_same_thread=False)
+        self.conexion.execute("PRAGMA foreign_keys = ON")
+        self.conexion.execute("BEGIN IMMEDIATE")
+        self.vencimiento = None
+
+    def cerrar(self, confirmar):
+        try:
+            self.conexion.execute("COMMIT" if confirmar else "ROLLBACK")
+        finally:
+            self.conexion.close()
+
+
+class ServidorTechManager:
+    """Servidor HTTP/JSON de la base de datos"""
+
+    def __init__(self):
+        # Un solo hilo usa la base: las operaciones quedan en orden
+        self.ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="base_datos")
+        self.sesiones = {}             # token -> Sesion
+        self.transacciones = {}        # id -> TransaccionRemota
+        self.turno_escritura = None    # asyncio.Lock, creado dentro del bucle
+        self.cache = CacheLecturas()
+        self.version = 0               # escrituras confirmadas
+        self._version_datos = None     # PRAGMA data_version visto por última vez
+        self.pedidos = 0
+        self.operaciones = 0
+        self.inicio = time.monotonic()
+        self._servidor = None
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    async def iniciar(self, host="127.0.0.1", puerto=PUERTO_DEFECTO):
+        """
+        Empieza a aceptar conexiones
+
+        Returns:
+            int: Puerto en el que escucha (útil con puerto 0)
+        """
+        self.turno_escritura = asyncio.Lock()
+        await asyncio.get_running_loop().run_in_executor(self.ejecutor, self._preparar_conexion)
+        self._servidor = await asyncio.start_server(self.atender, host, puerto)
+        puerto_real = self._servidor.sockets[0].getsockname()[1]
+        config.guardar_log(f"Servidor escuchando en {host}:{puerto_real}", "INFO")
+        return puerto_real
+
+    async def servir(self, host="127.0.0.1", puerto=PUERTO_DEFECTO):
+        """Atiende pedidos hasta que se cancela"""
+        await self.iniciar(host, puerto)
+        async with self._servidor:
+            await self._servidor.serve_forever()
+
+    async def detener(self):
+        """Deja de aceptar conexiones y deshace las transacciones abiertas"""
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        for id_transaccion in list(self.transacciones):
+            await self._cerrar_transaccion(id_transaccion, False)
+        self.ejecutor.shutdown(wait=True)
+
+    async def atender(self, lector, escritor):
+        """Atiende una conexión (HTTP/1.1 con keep-alive)"""
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                try:
+                    metodo, ruta, _ = linea.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    await self._responder(escritor, 400, {'error': "Pedido inválido"}, False)
+                    break
+
+                encabezados = {}
+                while True:
+                    linea = await lector.readline()
+                    if linea in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, _, valor = linea.decode("latin-1").partition(":")
+                    encabezados[nombre.strip().lower()] = valor.strip()
+
+                largo = int(encabezados.get("content-length") or 0)
+                if largo > MAXIMO_PEDIDO_BYTES:
+                    await self._responder(escritor, 413, {'error': "Pedido demasiado grande"}, False)
+                    break
+                cuerpo = await lector.readexactly(largo) if largo else b""
+
+                mantener = encabezados.get("connection", "").lower() != "close"
+                estado, respuesta = await self.procesar(metodo, ruta, encabezados, cuerpo)
+                await self._responder(escritor, estado, respuesta, mantener)
+                if not mantener:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            # Cliente que se fue, o servidor que se detiene con la conexión abierta
+            pass
+        finally:
+            escritor.close()
+
+    async def _responder(self, escritor, estado, respuesta, mantener):
+        contenido = respuesta if isinstance(respuesta, bytes) else codificar(respuesta)
+        escritor.write(
+            f"HTTP/1.1 {estado} {RAZONES.get(estado, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(contenido)}\r\n"
+            f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n".encode("latin-1") + contenido
+        )
+        await escritor.drain()
+
+    async def procesar(self, metodo, ruta, encabezados, cuerpo):
+        """
+        Resuelve un pedido
+
+        Returns:
+            tuple: (código HTTP, respuesta como dict o bytes JSON)
+        """
+        if ruta == RUTA_ESTADO and metodo == "GET":
+            return 200, self.estado()
+        if ruta != RUTA_LOTE:
+            return 404, {'error': f"Ruta desconocida: {ruta}"}
+        if metodo != "POST":
+            return 405, {'error': "Use POST"}
+
+        try:
+            operaciones = decodificar(cuerpo)['operaciones']
+        except (ValueError, KeyError, TypeError):
+            return 400, {'error': "Se esperaba {\"operaciones\": [...]}"}
+
+        self.pedidos += 1
+        self.operaciones += len(operaciones)
+        token = encabezados.get(ENCABEZADO_SESION.lower())
+
+        try:
+            # Las transacciones toman o liberan el turno de escritura
+            if len(operaciones) == 1 and operaciones[0].get('tipo') in ("abrir_transaccion", "cerrar_transaccion"):
+                return 200, await self._operacion_transaccion(operaciones[0], token)
+
+            bucle = asyncio.get_running_loop()
+            if self._escribe(operaciones):
+                async with self.turno_escritura:
+                    partes = await bucle.run_in_executor(self.ejecutor, self._ejecutar_lote, operaciones, token)
+            else:
+                partes = await bucle.run_in_executor(self.ejecutor, self._ejecutar_lote, operaciones, token)
+        except Exception as e:
+            config.guardar_log(f"Error del servidor: {e}", "ERROR")
+            return 500, {'error': str(e)}
+
+        return 200, (b'{"resultados":[' + b",".join(partes) + b'],"version":' + str(self.version).encode() + b"}")
+
+    @staticmethod
+    def _escribe(operaciones):
+        """True si alguna operación del lote puede escribir fuera de una transacción"""
+        for operacion in operaciones:
+            tipo = operacion.get('tipo')
+            if tipo == "llamada" and not str(operacion.get('metodo', "")).startswith(PREFIJOS_LECTURA):
+                return True
+            if tipo == "sql" and not operacion.get('transaccion') and operacion.get('accion') in ("ejecutar", "ejecutar_muchas"):
+                return True
+            if tipo == "login":
+                return True
+        return False
+
+    def estado(self):
+        """Resumen del servidor para GET /api/estado"""
+        return {
+            'version': self.version,
+            'sesiones': len(self.sesiones),
+            'transacciones_abiertas': len(self.transacciones),
+            'pedidos': self.pedidos,
+            'operaciones': self.operaciones,
+            'cache': self.cache.resumen(),
+            'segundos_activo': round(time.monotonic() - self.inicio),
+        }
+
+    # ------------------------------------------------------------------
+    # Transacciones de las estaciones
+    # ------------------------------------------------------------------
+
+    async def _operacion_transaccion(self, operacion, token):
+        bucle = asyncio.get_running_loop()
+
+        if token not in self.sesiones:
+            return self._respuesta_unica(False, "Sesión no iniciada")
+
+        if operacion['tipo'] == "abrir_transaccion":
+            await self.turno_escritura.acquire()
+            try:
+                id_transaccion = secrets.token_hex(8)
+                transaccion = await bucle.run_in_executor(self.ejecutor, TransaccionRemota, id_transaccion, token)
+            except Exception as e:
+                self.turno_escritura.release()
+                return self._respuesta_unica(False, str(e))
+
+            transaccion.vencimiento = bucle.call_later(
+                VIGENCIA_TRANSACCION,
+                lambda: asyncio.ensure_future(self._cerrar_transaccion(id_transaccion, False, vencida=True))
+            )
+            self.transacciones[id_transaccion] = transaccion
+            return self._respuesta_unica(True, id_transaccion)
+
+        confirmar = bool(operacion.get('confirmar'))
+        exito, mensaje = await self._cerrar_transaccion(operacion.get('id'), confirmar)
+        return self._respuesta_unica(exito, mensaje)
+
+    async def _cerrar_transaccion(self, id_transaccion, confirmar, vencida=False):
+        transaccion = self.transacciones.pop(id_transaccion, None)
+        if transaccion is None:
+            return False, "La transacción no existe o venció"
+
+        transaccion.vencimiento.cancel()
+        try:
+            await asyncio.get_running_loop().run_in_executor(self.ejecutor, transaccion.cerrar, confirmar)
+            if confirmar:
+                self.ejecutor.submit(self._registrar_cambio)
+            if vencida:
+                config.guardar_log(f"Transacción {id_transaccion} deshecha por vencimiento", "WARNING")
+            return True, "Confirmada" if confirmar else "Deshecha"
+        except Exception as e:
+            return False, str(e)
+        finally:
+            self.turno_escritura.release()
+
+    def _respuesta_unica(self, exito, valor):
+        parte = codificar({'ok': True, 'valor': valor} if exito else {'ok': False, 'error': valor})
+        return b'{"resultados":[' + parte + b'],"version":' + str(self.version).encode() + b"}"
+
+    # ------------------------------------------------------------------
+    # Ejecución (siempre en el hilo de la base)
+    # ------------------------------------------------------------------
+
+    def _preparar_conexion(self):
+        conexion = db.conectar()
+        # Lectores (exportaciones, línea de comandos) sin bloquear al servidor
+        conexion.execute("PRAGMA journal_mode = WAL")
+        self._version_datos = conexion.execute("PRAGMA data_version").fetchone()[0]
+
+    def _registrar_cambio(self):
+        self.version += 1
+        self.cache.limpiar()
+
+    def _verificar_cambios_externos(self):
+        """Detecta escrituras de otras conexiones (transacciones, otros procesos)"""
+        version_datos = db.conectar().execute("PRAGMA data_version").fetchone()[0]
+        if version_datos != self._version_datos:
+            self._version_datos = version_datos
+            self._registrar_cambio()
+
+    def _ejecutar_lote(self, operaciones, token):
+        """
+        Ejecuta las operaciones de un pedido
+
+        Returns:
+            list: Resultado de cada operación, ya codificado en JSON
+        """
+        self._verificar_cambios_externos()
+        sesion = self.sesiones.get(token)
+        partes = []
+
+        for operacion in operaciones:
+            try:
+                tipo = operacion.get('tipo')
+                if tipo == "login":
+                    token, valor = self._login(operacion)
+                    sesion = self.sesiones.get(token)
+                    partes.append(codificar({'ok': valor is not None, 'valor': valor,
+                                             'error': None if valor else "Usuario o contraseña incorrectos"}))
+                    continue
+                if sesion is None:
+                    raise ErrorServidor("Sesión no iniciada")
+                if tipo == "logout":
+                    self.sesiones.pop(token, None)
+                    sesion = None
+                    partes.append(codificar({'ok': True, 'valor': None}))
+                elif tipo == "llamada":
+                    partes.append(self._llamar(operacion, sesion))
+                elif tipo == "sql":
+                    partes.append(self._sql(operacion, token))
+                else:
+                    raise ErrorServidor(f"Operación desconocida: {tipo}")
+            except Exception as e:
+                partes.append(codificar({'ok': False, 'error': f"{type(e).__name__}: {e}"}))
+
+        return partes
+
+    def _login(self, operacion):
+        from sistema_base.seguridad import autenticar_usuario
+
+        try:
+            usuario = autenticar_usuario(operacion.get('username', ""), operacion.get('contrasena', ""))
+            if not usuario:
+                return None, None
+            token = secrets.token_urlsafe(24)
+            self.sesiones[token] = config.sesion
+            usuario['token'] = token
+            return token, usuario
+        finally:
+            config.cerrar_sesion()
+
+    def _ejecutar_registrando(self, clave, funcion):
+        """Ejecuta una operación, cacheando lecturas y versionando escrituras"""
+        if clave is not None:
+            parte = self.cache.obtener(clave)
+            if parte is not None:
+                return parte
+
+        conexion = db.conectar()
+        cambios = conexion.total_changes
+        parte = codificar({'ok': True, 'valor': funcion()})
+
+        if conexion.total_changes != cambios:
+            self._registrar_cambio()
+        elif clave is not None:
+            self.cache.guardar(clave, parte)
+        return parte
+
+    def _llamar(self, operacion, sesion):
+        modulo, clase, metodo = operacion.get('modulo', ""), operacion.get('clase', ""), operacion.get('metodo', "")
+        if not (_NOMBRE_MODULO.match(modulo) and _NOMBRE_CLASE.match(clase)
+                and _NOMBRE_MODULO.match(metodo) and not metodo.startswith("_")):
+            raise ErrorServidor(f"Operación no permitida: {modulo}.{clase}.{metodo}")
+
+        funcion = getattr(getattr(importlib.import_module(f"modulos.{modulo}"), clase), metodo)
+        args, kwargs = operacion.get('args') or [], operacion.get('kwargs') or {}
+
+        clave = None
+        if metodo.startswith(PREFIJOS_LECTURA):
+            # Los permisos dependen del rol: un técnico no ve lo mismo que un admin
+            clave = (modulo, clase, metodo, sesion.rol, codificar([args, kwargs]))
+
+        def ejecutar():
+            config.establecer_sesion(sesion)
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                config.cerrar_sesion()
+
+        return self._ejecutar_registrando(clave, ejecutar)
+
+    def _sql(self, operacion, token):
+        accion = operacion.get('accion')
+        consulta = operacion.get('consulta', "")
+        parametros = operacion.get('parametros')
+        parametros = tuple(parametros) if parametros else None
+
+        id_transaccion = operacion.get('transaccion')
+        if id_transaccion:
+            transaccion = self.transacciones.get(id_transaccion)
+            if transaccion is None or transaccion.token != token:
+                raise ErrorServidor("La transacción no existe o venció")
+            return codificar({'ok': True, 'valor': self._sql_en_transaccion(transaccion, accion, consulta, parametros)})
+
+        if accion == "obtener_uno":
+            funcion = lambda: db.obtener_uno(consulta, parametros)
+        elif accion == "obtener_todos":
+            funcion = lambda: db.obtener_todos(consulta, parametros)
+        elif accion == "obtener_lote":
+            # Un tramo de una consulta larga (db.iterar_consulta en el cliente)
+            tramo = (parametros or ()) + (operacion['limite'], operacion['desde'])
+            funcion = lambda: db.obtener_todos(f"SELECT * FROM ({consulta}) LIMIT ? OFFSET ?", tramo)
+        elif accion == "ejecutar":
+            funcion = lambda: db.ejecutar_consulta(consulta, parametros)
+        elif accion == "ejecutar_muchas":
+            funcion = lambda: db.ejecutar_muchas(consulta, operacion.get('parametros') or [])
+        else:
+            raise ErrorServidor(f"Acción SQL desconocida: {accion}")
+
+        clave = None
+        if accion.startswith("obtener") and _LECTURA_SQL.match(consulta):
+            clave = ("sql", accion, consulta, codificar([parametros, operacion.get('desde')]))
+        return self._ejecutar_registrando(clave, funcion)
+
+    @staticmethod
+    def _sql_en_transaccion(transaccion, accion, consulta, parametros):
+        """Ejecuta en la conexión de la transacción y devuelve lo que necesita el cursor remoto"""
+        cursor = transaccion.conexion.cursor()
+        try:
+            if accion == "ejecutar_muchas":
+                cursor.executemany(consulta, parametros or [])
+            elif parametros:
+                cursor.execute(consulta, parametros)
+            else:
+                cursor.execute(consulta)
+
+            columnas = [d[0] for d in cursor.description] if cursor.description else []
+            return {
+                'columnas': columnas,
+                'filas': [list(fila) for fila in cursor.fetchall()] if columnas else [],
+                'ultimo_id': cursor.lastrowid,
+                'cantidad': cursor.rowcount,
+            }
+        finally:
+            cursor.close()
+
+
+def iniciar_en_hilo(host="127.0.0.1", puerto=0):
+    """
+    Levanta el servidor en un hilo propio (pruebas de carga, herramientas)
+
+    Returns:
+        tuple: (servidor, puerto, función que lo detiene)
+    """
+    listo = threading.Event()
+    servidor = ServidorTechManager()
+    estado = {}
+
+    def ejecutar():
+        bucle = asyncio.new_event_loop()
+        asyncio.set_event_loop(bucle)
+        estado['bucle'] = bucle
+        estado['puerto'] = bucle.run_until_complete(servidor.iniciar(host, puerto))
+        listo.set()
+        bucle.run_forever()
+        bucle.run_until_complete(servidor.detener())
+        # Conexiones keep-alive que siguen esperando un pedido
+        pendientes = asyncio.all_tasks(bucle)
+        for tarea in pendientes:
+            tarea.cancel()
+        bucle.run_until_complete(asyncio.gather(*pendientes, return_exceptions=True))
+        bucle.close()
+
+    hilo = threading.Thread(target=ejecutar, name="servidor", daemon=True)
+    hilo.start()
+    listo.wait()
+
+    def detener():
+        estado['bucle'].call_soon_threadsafe(estado['bucle'].stop)
+        hilo.join()
+
+    return servidor, estado['puerto'], detener
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de TechManager para varias estaciones")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Dirección a escuchar (0.0.0.0 para aceptar a las otras PCs del local)")
+    parser.add_argument("--puerto", type=int, default=PUERTO_DEFECTO)
+    parser.add_argument("--base", type=Path, help="Archivo de la base de datos (por defecto, el de la instalación)")
+    argumentos = parser.parse_args()
+
+    from cli import preparar_base
+    preparar_base(argumentos.base)
+
+    print(f"Servidor de TechManager en http://{argumentos.host}:{argumentos.puerto} (Ctrl+C para detener)")
+    try:
+        asyncio.run(ServidorTechManager().servir(argumentos.host, argumentos.puerto))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db.desconectar()
@@ -11,6 +11,7 @@ import os
 import sys
 from pathlib import Path
 from datetime import datetime
+from sistema_base.constantes import COLOR_PRIMARIO_DEFECTO, COLOR_SECUNDARIO_DEFECTO
 
 class Configuracion:
     """
@@ -60,6 +61,7 @@ class Configuracion:
         self.ruta_imagenes = self.ruta_recursos / "imagenes"
         
         # Usuario actual (se setea después del login)
+        self.sesion = None
         self.usuario_actual = None
         self.es_admin = False
         
@@ -68,8 +70,8 @@ class Configuracion:
         self.telefono_contacto = ""
         self.direccion = ""
         self.email = ""
-        self.color_primario = "#2563eb"
-        self.color_secundario = "#64748b"
+        self.color_primario = COLOR_PRIMARIO_DEFECTO
+        self.color_secundario = COLOR_SECUNDARIO_DEFECTO
         self.dias_alerta_equipo = 2
         self.backup_automatico = False
         
@@ -84,24 +86,69 @@ class Configuracion:
         self.backup_nube_activo = False
         self.tipo_backup_nube = "Sin backup en nube"
         
+        # Impresora térmica de tickets (tipo: '', 'red', 'archivo' o 'usb')
+        self.impresora_termica_tipo = ""
+        self.impresora_termica_destino = ""
+        self.ancho_papel_ticket = 80
+        
+        # Costo de bcrypt (None = calibrar según la latencia objetivo)
+        self.costo_bcrypt = None
+        self.latencia_objetivo_login_ms = 250
+        
+        # Ventanas de módulos que se mantienen abiertas (0 = sin límite de memoria)
+        self.maximo_ventanas_abiertas = 6
+        self.memoria_maxima_ventanas_mb = 0
+        
+        # Años desde la entrega tras los cuales un equipo pasa al archivo histórico
+        self.archivo_anios_antiguedad = 2
+        
+        # Meses de auditoría a conservar además del actual (0 = todos)
+        self.auditoria_meses_retencion = 0
+        
         # Flag de inicialización
         self._inicializado = True
     
-    def establecer_usuario(self, usuario, rol):
+    def establecer_sesion(self, sesion):
+        """
+        Establece la sesión del usuario que inició sesión
+        
+        Args:
+            sesion (Sesion): Sesión creada al autenticar (ver sistema_base.sesion)
+        """
+        self.sesion = sesion
+        self.usuario_actual = sesion.username
+        self.es_admin = sesion.es_admin
+    
+    def establecer_usuario(self, usuario, rol, id_usuario=None, nombre=None):
         """
         Establece el usuario que inició sesión
         
         Args:
             usuario (str): Nombre de usuario
             rol (str): Rol del usuario ('admin' o 'tecnico')
+            id_usuario (int): ID del usuario
+            nombre (str): Nombre para mostrar
         """
-        self.usuario_actual = usuario
-        self.es_admin = (rol == 'admin')
+        from sistema_base.sesion import Sesion
+        self.establecer_sesion(Sesion(id_usuario, usuario, nombre or usuario, rol))
+    
+    def tiene_permiso(self, permiso):
+        """
+        Verifica un permiso del usuario actual (en memoria)
+        
+        Args:
+            permiso (str): Permiso (ver PERMISOS_POR_ROL) o rol
+            
+        Returns:
+            bool: True si hay sesión y tiene el permiso
+        """
+        return self.sesion is not None and self.sesion.tiene_permiso(permiso)
     
     def cerrar_sesion(self):
         """
         Cierra la sesión del usuario actual
         """
+        self.sesion = None
         self.usuario_actual = None
         self.es_admin = False
     
@@ -124,6 +171,23 @@ class Configuracion:
         self.backup_nube_activo = datos.get('backup_nube_activo', False)
         self.tipo_backup_nube = datos.get('tipo_backup_nube', 'Sin backup en nube')
         
+        # Impresora térmica
+        self.impresora_termica_tipo = datos.get('impresora_termica_tipo') or ''
+        self.impresora_termica_destino = datos.get('impresora_termica_destino') or ''
+        self.ancho_papel_ticket = datos.get('ancho_papel_ticket') or 80
+        
+        # Seguridad
+        self.costo_bcrypt = datos.get('costo_bcrypt')
+        self.latencia_objetivo_login_ms = datos.get('latencia_objetivo_login_ms') or 250
+        
+        # Caché de ventanas
+        self.maximo_ventanas_abiertas = datos.get('maximo_ventanas_abiertas') or 6
+        self.memoria_maxima_ventanas_mb = datos.get('memoria_maxima_ventanas_mb') or 0
+        
+        # Archivo histórico
+        self.archivo_anios_antiguedad = datos.get('archivo_anios_antiguedad') or 2
+        self.auditoria_meses_retencion = datos.get('auditoria_meses_retencion') or 0
+        
         # Logos (se guardan como BLOB en la BD)
         self.logo_sistema = datos.get('logo_sistema')
         self.logo_remito = datos.get('logo_remito')
@@ -23,6 +23,12 @@ ANIO = "2025"
 NOMBRE_BASE_DATOS = "techmanager.db"
 VERSION_ESQUEMA_BD = 1
 
+# ============================================================================
+# COLORES POR DEFECTO DEL TEMA
+# ============================================================================
+COLOR_PRIMARIO_DEFECTO = "#2563eb"
+COLOR_SECUNDARIO_DEFECTO = "#64748b"
+
 # ============================================================================
 # TIPOS DE DISPOSITIVOS
 # ============================================================================
@@ -164,6 +170,39 @@ ROLES_USUARIO = [
     "tecnico"
 ]
 
+# Permisos de cada rol (se consultan en memoria desde la sesión)
+PERMISOS_TECNICO = [
+    "clientes",
+    "equipos",
+    "remitos",
+    "presupuestos",
+    "ordenes",
+    "repuestos",
+    "pagos",
+    "facturacion",
+    "garantias",
+    "exportar"
+]
+
+PERMISOS_POR_ROL = {
+    "tecnico": PERMISOS_TECNICO,
+    "admin": PERMISOS_TECNICO + [
+        "usuarios",
+        "configuracion",
+        "backups",
+        "auditoria",
+        "importar",
+        "incobrables"
+    ]
+}
+
+# Usuario reservado para las tareas automáticas (vencimientos, alertas).
+# Existe en la tabla usuarios para que la auditoría lo referencie, pero
+# está inactivo y no puede iniciar sesión. El username lleva un espacio,
+# que la validación de usuarios rechaza, así ninguna cuenta real lo puede tener.
+ID_USUARIO_SISTEMA = 0
+USERNAME_SISTEMA = "tareas automáticas"
+
 # ============================================================================
 # MÓDULOS DEL SISTEMA (para auditoría y notas)
 # ============================================================================
@@ -211,6 +250,11 @@ DIAS_VENCIMIENTO_PRESUPUESTO = 7  # 7 días sin respuesta
 PORCENTAJE_ANTICIPO_MINIMO = 50  # 50% mínimo
 PORCENTAJE_RECARGO_TRANSFERENCIA = 10  # 10% de recargo
 
+# ============================================================================
+# CONFIGURACIÓN DE STOCK
+# ============================================================================
+CANTIDAD_MINIMA_STOCK_REPUESTOS = 5  # Stock bajo si hay 5 o menos (si no se configuró otro valor)
+
 # ============================================================================
 # CONFIGURACIÓN DE REPORTES
 # ============================================================================
@@ -284,6 +328,17 @@ LONGITUD_MAXIMA_EMAIL = 100
 LONGITUD_MAXIMA_TELEFONO = 20
 LONGITUD_MAXIMA_NOTA = 1000
 
+# ============================================================================
+# SEGURIDAD
+# ============================================================================
+# Costo de bcrypt: cada punto duplica el tiempo de verificación.
+# El mínimo es el costo con que se crearon los hashes originales: la
+# calibración nunca baja de ahí
+COSTO_BCRYPT_MINIMO = 12
+COSTO_BCRYPT_MAXIMO = 15
+# Tiempo buscado para verificar una contraseña al calibrar el costo
+LATENCIA_OBJETIVO_LOGIN_MS = 250
+
 # ============================================================================
 # MENSAJES DE CONFIRMACIÓN
 # ============================================================================
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - PERFIL DE ARRANQUE
+============================================================================
+Mide cuánto tarda cada etapa del inicio y cada importación de módulos
+(al estilo de 'python -X importtime'), para seguir el tiempo de arranque
+en frío de una versión a otra.
+
+Se activa con:  python main.py --perfil-arranque
+El informe se guarda en logs/perfil_arranque_AAAAMMDD_HHMMSS.log
+
+Este módulo solo usa la biblioteca estándar: se importa antes que todo lo
+demás para poder medir el resto de las importaciones.
+============================================================================
+"""
+
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class PerfilArranque:
+    """Cronómetro de etapas e importaciones del arranque"""
+
+    # Importaciones que se listan en el resumen, de mayor a menor
+    CANTIDAD_RESUMEN = 20
+
+    def __init__(self):
+        self.activo = False
+        self.inicio = None
+        self.etapas = []           # (nombre, segundos)
+        self.importaciones = []    # (modulo, propio_us, acumulado_us, nivel)
+        self._importar_original = None
+        self._hilo = None
+        self._pila = []
+
+    def activar(self):
+        """Empieza a medir (instala el gancho de importación)"""
+        if self.activo:
+            return
+
+        self.activo = True
+        self.inicio = time.perf_counter()
+        self._hilo = threading.get_ident()
+        self._importar_original = builtins.__import__
+        builtins.__import__ = self._importar
+
+    def _importar(self, nombre, globales=None, locales=None, lista_desde=(), nivel=0):
+        """Reemplazo de __import__ que cronometra los módulos nuevos"""
+        if threading.get_ident() != self._hilo:
+            return self._importar_original(nombre, globales, locales, lista_desde, nivel)
+
+        cargados = len(sys.modules)
+        self._pila.append(0.0)
+        comienzo = time.perf_counter()
+        try:
+            return self._importar_original(nombre, globales, locales, lista_desde, nivel)
+        finally:
+            acumulado = time.perf_counter() - comienzo
+            hijos = self._pila.pop()
+            if self._pila:
+                self._pila[-1] += acumulado
+
+            # Solo interesan las importaciones que cargaron algo nuevo
+            if len(sys.modules) > cargados:
+                self.importaciones.append((
+                    self._nombre_absoluto(nombre, globales, nivel),
+                    int((acumulado - hijos) * 1_000_000),
+                    int(acumulado * 1_000_000),
+                    len(self._pila)
+                ))
+
+    @staticmethod
+    def _nombre_absoluto(nombre, globales, nivel):
+        """Resuelve el nombre de una importación relativa ('from . import x')"""
+        if nivel == 0:
+            return nombre
+        paquete = (globales or {}).get("__package__") or ""
+        partes = paquete.rsplit(".", nivel - 1)
+        base = partes[0] if len(partes) == nivel else paquete
+        return f"{base}.{nombre}" if nombre else base
+
+    @contextmanager
+    def etapa(self, nombre):
+        """
+        Mide una etapa del arranque
+
+        Args:
+            nombre (str): Nombre de la etapa en el informe
+        """
+        if not self.activo:
+            yield
+            return
+
+        comienzo = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas.append((nombre, time.perf_counter() - comienzo))
+
+    def finalizar(self):
+        """
+        Deja de medir y guarda el informe en la carpeta de logs
+
+        Returns:
+            Path: Archivo del informe, o None si el perfil no estaba activo
+        """
+        if not self.activo:
+            return None
+
+        total = time.perf_counter() - self.inicio
+        builtins.__import__ = self._importar_original
+        self.activo = False
+
+        from sistema_base.configuracion import config
+        from sistema_base.constantes import VERSION
+
+        lineas = [
+            f"TechManager {VERSION} - Perfil de arranque ({datetime.now():%Y-%m-%d %H:%M:%S})",
+            f"Python {sys.version.split()[0]} - {sys.platform}",
+            f"Hasta la primera ventana: {total * 1000:.0f} ms",
+            "",
+            "ETAPAS",
+        ]
+        for nombre, segundos in self.etapas:
+            lineas.append(f"  {segundos * 1000:>9.1f} ms  {nombre}")
+
+        lineas += ["", f"IMPORTACIONES MÁS LENTAS (acumulado, top {self.CANTIDAD_RESUMEN})"]
+        primer_nivel = [i for i in self.importaciones if i[3] == 0]
+        for modulo, _, acumulado, _ in sorted(primer_nivel, key=lambda i: -i[2])[:self.CANTIDAD_RESUMEN]:
+            lineas.append(f"  {acumulado / 1000:>9.1f} ms  {modulo}")
+
+        lineas += ["", "IMPORTACIONES (propio us | acumulado us | módulo)"]
+        for modulo, propio, acumulado, nivel in self.importaciones:
+            lineas.append(f"  {propio:>10} | {acumulado:>10} | {'  ' * nivel}{modulo}")
+
+        archivo = config.ruta_logs / f"perfil_arranque_{datetime.now():%Y%m%d_%H%M%S}.log"
+        try:
+            archivo.write_text("\n".join(lineas) + "\n", encoding="utf-8")
+        except OSError as e:
+            config.guardar_log(f"No se pudo guardar el perfil de arranque: {e}", "ERROR")
+            return None
+
+        config.guardar_log(f"Arranque en {total * 1000:.0f} ms (perfil en {archivo.name})", "INFO")
+        return archivo
+
+
+# Instancia global (se activa desde main.py con --perfil-arranque)
+perfil = PerfilArranque()
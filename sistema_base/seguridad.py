@@ -8,23 +8,111 @@ Maneja la autenticación de usuarios y encriptación de contraseñas
 """
 
 import bcrypt
+import time
 from datetime import datetime
 from base_datos.conexion import db
 from sistema_base.configuracion import config
+from sistema_base.sesion import Sesion
+from sistema_base.constantes import (COSTO_BCRYPT_MINIMO, COSTO_BCRYPT_MAXIMO,
+                                     LATENCIA_OBJETIVO_LOGIN_MS)
 
 
-def encriptar_contrasena(contrasena):
+# Costo de bcrypt vigente (se resuelve una vez por sesión)
+_costo_bcrypt = None
+
+
+def calibrar_costo_bcrypt(latencia_objetivo_ms=None):
+    """
+    Calcula el costo de bcrypt más alto cuya verificación no supere la
+    latencia objetivo en esta máquina
+    
+    Args:
+        latencia_objetivo_ms (int): Tiempo máximo buscado (por defecto el configurado)
+        
+    Returns:
+        int: Costo de bcrypt
+    """
+    objetivo = (latencia_objetivo_ms or config.latencia_objetivo_login_ms or LATENCIA_OBJETIVO_LOGIN_MS) / 1000
+    
+    inicio = time.perf_counter()
+    bcrypt.hashpw(b"calibracion", bcrypt.gensalt(COSTO_BCRYPT_MINIMO))
+    segundos = time.perf_counter() - inicio
+    
+    # Cada punto de costo duplica el tiempo
+    costo = COSTO_BCRYPT_MINIMO
+    while costo < COSTO_BCRYPT_MAXIMO and segundos * 2 <= objetivo:
+        costo += 1
+        segundos *= 2
+    
+    config.guardar_log(f"Costo de bcrypt calibrado: {costo} (~{segundos * 1000:.0f} ms)", "INFO")
+    return costo
+
+
+def obtener_costo_bcrypt():
+    """
+    Devuelve el costo de bcrypt a usar para nuevos hashes
+    
+    Usa el costo guardado en la configuración; si no hay ninguno, lo
+    calibra y lo guarda para que todas las terminales usen el mismo.
+    
+    Returns:
+        int: Costo de bcrypt
+    """
+    global _costo_bcrypt
+    
+    if config.costo_bcrypt:
+        return max(int(config.costo_bcrypt), COSTO_BCRYPT_MINIMO)
+    
+    if _costo_bcrypt is None:
+        try:
+            fila = db.obtener_uno("SELECT costo_bcrypt FROM configuracion_sistema WHERE id_config = 1")
+            _costo_bcrypt = fila['costo_bcrypt'] if fila else None
+        except Exception as e:
+            config.guardar_log(f"Error al leer costo de bcrypt: {e}", "ERROR")
+        
+        if not _costo_bcrypt:
+            _costo_bcrypt = calibrar_costo_bcrypt()
+            try:
+                db.ejecutar_consulta(
+                    "UPDATE configuracion_sistema SET costo_bcrypt = ? WHERE id_config = 1",
+                    (_costo_bcrypt,)
+                )
+            except Exception as e:
+                config.guardar_log(f"Error al guardar costo de bcrypt: {e}", "ERROR")
+    
+    # Un costo guardado por una versión anterior puede ser menor al mínimo
+    return max(int(_costo_bcrypt), COSTO_BCRYPT_MINIMO)
+
+
+def obtener_costo_hash(password_hash):
+    """
+    Extrae el costo de un hash bcrypt ($2b$12$...)
+    
+    Args:
+        password_hash (str): Hash almacenado
+        
+    Returns:
+        int: Costo del hash (None si no tiene formato bcrypt)
+    """
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def encriptar_contrasena(contrasena, costo=None):
     """
     Encripta una contraseña usando bcrypt
     
     Args:
         contrasena (str): Contraseña en texto plano
+        costo (int): Costo de bcrypt (por defecto el configurado)
         
     Returns:
         str: Contraseña encriptada
     """
     password_bytes = contrasena.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(costo or obtener_costo_bcrypt())
     password_hash = bcrypt.hashpw(password_bytes, salt)
     return password_hash.decode('utf-8')
 
@@ -45,10 +133,46 @@ def verificar_contrasena(contrasena, password_hash):
     return bcrypt.checkpw(password_bytes, hash_bytes)
 
 
+def actualizar_hash_si_corresponde(id_usuario, contrasena, password_hash):
+    """
+    Vuelve a encriptar la contraseña si su hash tiene un costo menor
+    al configurado (se llama después de un login correcto, cuando se
+    dispone de la contraseña en texto plano). Un hash más costoso se
+    deja como está: nunca se debilita.
+    
+    Args:
+        id_usuario (int): ID del usuario
+        contrasena (str): Contraseña en texto plano (ya verificada)
+        password_hash (str): Hash almacenado
+    """
+    try:
+        costo_objetivo = obtener_costo_bcrypt()
+        costo_actual = obtener_costo_hash(password_hash)
+        
+        if costo_actual is not None and costo_actual >= costo_objetivo:
+            return
+        
+        nuevo_hash = encriptar_contrasena(contrasena, costo_objetivo)
+        db.ejecutar_consulta(
+            "UPDATE usuarios SET password_hash = ? WHERE id_usuario = ? AND password_hash = ?",
+            (nuevo_hash, id_usuario, password_hash)
+        )
+        config.guardar_log(
+            f"Hash de contraseña actualizado para usuario ID {id_usuario} (costo {costo_actual} → {costo_objetivo})",
+            "INFO"
+        )
+    except Exception as e:
+        # No impide el login: se reintenta en el próximo
+        config.guardar_log(f"Error al actualizar hash de contraseña: {e}", "ERROR")
+
+
 def autenticar_usuario(username, contrasena):
     """
     Autentica un usuario verificando sus credenciales
     
+    La verificación de bcrypt es lenta a propósito: desde la interfaz
+    debe llamarse en un hilo de trabajo (ver VentanaLogin).
+    
     Args:
         username (str): Nombre de usuario
         contrasena (str): Contraseña en texto plano
@@ -73,11 +197,18 @@ def autenticar_usuario(username, contrasena):
         # Verificar contraseña
         if verificar_contrasena(contrasena, usuario['password_hash']):
             # Login exitoso
+            actualizar_hash_si_corresponde(usuario['id_usuario'], contrasena, usuario['password_hash'])
             registrar_login(usuario['id_usuario'], usuario['username'])
             config.guardar_log(f"Login exitoso: {username} ({usuario['rol']})", "INFO")
             
-            # Establecer usuario actual en la configuración
-            config.establecer_usuario(usuario['username'], usuario['rol'])
+            # Crear la sesión: desde acá id, rol y permisos se leen en memoria
+            config.establecer_sesion(Sesion(
+                usuario['id_usuario'],
+                usuario['username'],
+                usuario['nombre'],
+                usuario['rol'],
+                usuario['primer_login']
+            ))
             
             return {
                 'id_usuario': usuario['id_usuario'],
@@ -215,10 +346,7 @@ def resetear_contrasena_admin(id_usuario_admin, id_usuario_objetivo, nueva_contr
     """
     try:
         # Verificar que quien ejecuta es admin
-        consulta = "SELECT rol FROM usuarios WHERE id_usuario = ?"
-        usuario_admin = db.obtener_uno(consulta, (id_usuario_admin,))
-        
-        if usuario_admin is None or usuario_admin['rol'] != 'admin':
+        if not config.tiene_permiso("usuarios"):
             return False, "Solo los administradores pueden resetear contraseñas"
         
         # Validar contraseña temporal (6-10 caracteres alfanuméricos)
@@ -306,47 +434,42 @@ def registrar_accion_auditoria(id_usuario, accion, modulo, id_registro=None,
         config.guardar_log(f"Error al registrar auditoría: {e}", "ERROR")
 
 
-def verificar_permisos(rol_requerido):
+def verificar_permisos(permiso):
     """
-    Verifica si el usuario actual tiene los permisos necesarios
+    Verifica si el usuario actual tiene un permiso (sin consultar la BD)
     
     Args:
-        rol_requerido (str): Rol requerido ('admin' o 'tecnico')
+        permiso (str): Permiso (ver PERMISOS_POR_ROL) o rol requerido ('admin' o 'tecnico')
         
     Returns:
         bool: True si tiene permisos, False si no
     """
-    if rol_requerido == 'admin':
-        return config.es_admin
-    elif rol_requerido == 'tecnico':
-        # Tanto admin como tecnico pueden hacer acciones de tecnico
-        return config.usuario_actual is not None
-    else:
-        return False
+    return config.tiene_permiso(permiso)
+
+
+def obtener_sesion_actual():
+    """
+    Obtiene la sesión del usuario logueado
+    
+    Returns:
+        Sesion: Sesión actual o None si no hay sesión
+    """
+    return config.sesion
 
 
 def obtener_usuario_actual():
     """
     Obtiene los datos del usuario actualmente logueado
     
+    Los datos se cargan una vez al iniciar sesión; no consulta la BD.
+    
     Returns:
         dict: Datos del usuario o None si no hay sesión
     """
-    if config.usuario_actual is None:
+    if config.sesion is None:
         return None
     
-    try:
-        consulta = """
-        SELECT id_usuario, nombre, username, rol
-        FROM usuarios
-        WHERE username = ? AND activo = 1
-        """
-        
-        return db.obtener_uno(consulta, (config.usuario_actual,))
-        
-    except Exception as e:
-        config.guardar_log(f"Error al obtener usuario actual: {e}", "ERROR")
-        return None
+    return config.sesion.como_dict()
 
 
 def crear_usuario(nombre, username, password_temporal, rol, id_usuario_admin):
@@ -365,7 +488,7 @@ def crear_usuario(nombre, username, password_temporal, rol, id_usuario_admin):
     """
     try:
         # Validar que quien crea es admin
-        if not config.es_admin:
+        if not config.tiene_permiso("usuarios"):
             return False, "Solo los administradores pueden crear usuarios", None
         
         # Validar longitud de contraseña temporal (6-10 caracteres)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+============================================================================
+TECHMANAGER v1.0 - SESIÓN DE USUARIO
+============================================================================
+Datos del usuario logueado, cargados una sola vez al iniciar sesión.
+
+Las ventanas y módulos consultan la sesión en memoria (id, rol, permisos,
+nombre) en lugar de volver a leer la tabla usuarios en cada acción.
+============================================================================
+"""
+
+from datetime import datetime
+from sistema_base.constantes import (PERMISOS_POR_ROL, ID_USUARIO_SISTEMA,
+                                     USERNAME_SISTEMA)
+
+
+class Sesion:
+    """Usuario autenticado y sus permisos"""
+
+    __slots__ = ("id_usuario", "username", "nombre", "rol", "permisos",
+                 "primer_login", "fecha_inicio", "es_sistema")
+
+    def __init__(self, id_usuario, username, nombre, rol, primer_login=False, es_sistema=False):
+        self.id_usuario = id_usuario
+        self.username = username
+        self.nombre = nombre
+        self.rol = rol
+        self.permisos = frozenset(PERMISOS_POR_ROL.get(rol, ()))
+        self.primer_login = bool(primer_login)
+        self.fecha_inicio = datetime.now()
+        self.es_sistema = es_sistema
+
+    @property
+    def es_admin(self):
+        """True si el usuario es administrador"""
+        return self.rol == "admin"
+
+    def tiene_permiso(self, permiso):
+        """
+        Verifica un permiso sin consultar la base de datos
+
+        Args:
+            permiso (str): Permiso (ver PERMISOS_POR_ROL) o rol ('admin', 'tecnico')
+
+        Returns:
+            bool: True si la sesión lo tiene
+        """
+        if permiso == "admin":
+            return self.es_admin
+        if permiso == "tecnico":
+            # Tanto admin como tecnico pueden hacer acciones de tecnico
+            return True
+        return permiso in self.permisos
+
+    def como_dict(self):
+        """
+        Datos del usuario con el formato de obtener_usuario_actual()
+
+        Returns:
+            dict: id_usuario, nombre, username, rol
+        """
+        return {
+            'id_usuario': self.id_usuario,
+            'nombre': self.nombre,
+            'username': self.username,
+            'rol': self.rol
+        }
+
+    def __repr__(self):
+        return f"Sesion({self.username!r}, rol={self.rol!r})"
+
+
+# Principal de las tareas automáticas: tiene todos los permisos y queda
+# registrado en la auditoría como el usuario 'sistema'
+SESION_SISTEMA = Sesion(ID_USUARIO_SISTEMA, USERNAME_SISTEMA, "Sistema", "admin", es_sistema=True)
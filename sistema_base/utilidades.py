@@ -138,37 +138,20 @@ def aplicar_porcentaje(monto, porcentaje):
     return monto * (porcentaje / 100)
 
 
-def generar_numero_remito():
+def generar_numero_remito(cursor=None):
     """
     Genera un número de remito único
     
+    Args:
+        cursor: Cursor de la transacción donde se inserta el remito (opcional)
+    
     Returns:
         str: Número de remito (ej: "R-20250113-0001")
     """
-    from base_datos.conexion import db
+    from base_datos.secuencias import siguiente_numero_remito
     
     # Formato: R-YYYYMMDD-NNNN
-    fecha_hoy = datetime.now().strftime("%Y%m%d")
-    
-    # Buscar último remito del día
-    consulta = """
-    SELECT numero_remito FROM remitos 
-    WHERE numero_remito LIKE ?
-    ORDER BY numero_remito DESC
-    LIMIT 1
-    """
-    
-    patron = f"R-{fecha_hoy}-%"
-    ultimo = db.obtener_uno(consulta, (patron,))
-    
-    if ultimo:
-        # Extraer número secuencial
-        numero_str = ultimo['numero_remito'].split('-')[-1]
-        numero = int(numero_str) + 1
-    else:
-        numero = 1
-    
-    return f"R-{fecha_hoy}-{numero:04d}"
+    return siguiente_numero_remito(cursor)
 
 
 def limpiar_texto(texto):
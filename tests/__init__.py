@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas sobre una base con el esquema real (ver conftest.py)
+"""
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Fixtures comunes: una base sintética nueva por prueba, con el esquema que
+crea inicializar_base_datos, y los errores que se registran en el log
+"""
+
+import pytest
+
+from sistema_base.configuracion import config
+
+
+@pytest.fixture
+def errores_log(monkeypatch, tmp_path):
+    """Mensajes ERROR registrados durante la prueba (las funciones de los
+    módulos capturan las excepciones y devuelven [] o None)"""
+    errores = []
+    guardar_log = config.guardar_log
+
+    def registrar(mensaje, tipo='INFO'):
+        if tipo == 'ERROR':
+            errores.append(mensaje)
+        guardar_log(mensaje, tipo)
+
+    monkeypatch.setattr(config, 'ruta_logs', tmp_path / "logs")
+    (tmp_path / "logs").mkdir()
+    monkeypatch.setattr(config, 'guardar_log', registrar)
+    return errores
+
+
+@pytest.fixture
+def base(tmp_path, errores_log):
+    """Base sintética chica (60 equipos) en una carpeta temporal"""
+    from base_datos.conexion import db
+    from benchmarks.datos_sinteticos import generar_base
+
+    generar_base(tmp_path / "techmanager.db", 60)
+    # Los ALTER de columnas que ya existen registran errores esperados
+    errores_log.clear()
+    yield db
+    db.desconectar()
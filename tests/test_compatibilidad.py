@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Índice de modelos compatibles de los repuestos (base_datos.compatibilidad)
+"""
+
+from base_datos.compatibilidad import parsear_modelos, repuestos_compatibles
+
+MARCAS = {"samsung", "motorola", "apple"}
+
+
+def test_sin_marca_conocida_no_se_separa_marca():
+    pares = parsear_modelos("A10 Lite, A20", MARCAS)
+
+    assert pares == [("", "a10lite"), ("", "a20")]
+
+
+def test_numero_de_modelo_no_es_marca():
+    pares = parsear_modelos("iPhone 11 Pro, 12 Pro", MARCAS)
+
+    assert pares == [("", "iphone11pro"), ("", "12pro")]
+
+
+def test_descripcion_antes_de_la_marca():
+    pares = parsear_modelos("Pantalla Samsung A10", MARCAS)
+
+    assert pares == [("samsung", "a10"), ("", "samsunga10")]
+
+
+def test_modelo_sin_marca_hereda_la_anterior():
+    pares = parsear_modelos("Motorola G7, G7 Play / Samsung A10", MARCAS)
+
+    assert ("motorola", "g7play") in pares
+    assert ("samsung", "a10") in pares
+    assert all(marca in ("", "motorola", "samsung") for marca, _ in pares)
+
+
+def test_samsung_a20_encuentra_sus_repuestos(base, errores_log):
+    id_cliente = base.obtener_uno("SELECT id_cliente FROM clientes LIMIT 1")['id_cliente']
+    id_equipo = base.ejecutar_consulta("""
+        INSERT INTO equipos (id_cliente, tipo_dispositivo, marca, modelo, estado_fisico, falla_declarada)
+        VALUES (?, 'Celular', 'Samsung', 'A20', 'Bueno', 'No carga')
+    """, (id_cliente,))
+    ids = []
+    for modelos in ("A10 Lite, A20", "Pantalla Samsung A10, A20", "Samsung A30"):
+        ids.append(base.ejecutar_consulta("""
+            INSERT INTO repuestos (nombre, tipo, tipo_dispositivo, modelos_compatibles, origen, cantidad_disponible)
+            VALUES ('Prueba', 'Pantalla', 'Celular', ?, 'Nuevo', 1)
+        """, (modelos,)))
+
+    compatibles = {repuesto['id_repuesto'] for repuesto in repuestos_compatibles(id_equipo)}
+
+    assert ids[0] in compatibles
+    assert ids[1] in compatibles
+    assert ids[2] not in compatibles
+    assert errores_log == []
+
+
+def test_base_sintetica_tiene_repuestos_compatibles(base, errores_log):
+    equipos = base.obtener_todos("SELECT id_equipo FROM equipos")
+
+    assert any(repuestos_compatibles(equipo['id_equipo'], solo_con_stock=False) for equipo in equipos)
+    assert errores_log == []
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Documentos imprimibles generados con el motor de plantillas compiladas
+"""
+
+import pytest
+
+from sistema_base.configuracion import config
+
+pytest.importorskip("reportlab")
+
+
+def test_pdf_de_presupuesto(base, errores_log, tmp_path, monkeypatch):
+    from impresion.motor_documentos import MotorDocumentos, _cache_plantillas
+    from modulos.presupuestos_LOGICA import ModuloPresupuestos
+
+    MotorDocumentos.invalidar_cache()
+    monkeypatch.setattr(config, 'ruta_exportaciones', tmp_path / "exportaciones")
+    presupuesto = base.obtener_uno("SELECT id_presupuesto FROM presupuestos ORDER BY id_presupuesto LIMIT 1")
+
+    exito, mensaje, ruta = ModuloPresupuestos.generar_pdf_presupuesto(presupuesto['id_presupuesto'])
+
+    assert exito, mensaje
+    with open(ruta, "rb") as archivo:
+        contenido = archivo.read()
+    assert contenido.startswith(b"%PDF")
+    assert len(contenido) > 1000
+    # Se generó con la plantilla compilada
+    assert "presupuesto" in _cache_plantillas
+    assert errores_log == []
+
+
+def test_facturas_en_lote_muestran_el_numero_de_factura(base, errores_log):
+    from datetime import date
+    from impresion.exportacion_lote import ExportacionLote, _renderizar_documento
+    from impresion.motor_documentos import MotorDocumentos
+
+    MotorDocumentos.invalidar_cache()
+    # Una factura anterior a la numeración (sin número)
+    anterior = base.obtener_uno("SELECT id_factura FROM facturacion ORDER BY id_factura LIMIT 1")['id_factura']
+    base.ejecutar_consulta("UPDATE facturacion SET numero_factura = NULL WHERE id_factura = ?", (anterior,))
+    numeros = {
+        fila['id_factura']: fila['numero_factura']
+        for fila in base.obtener_todos("SELECT id_factura, numero_factura FROM facturacion")
+    }
+
+    exportacion = ExportacionLote(["facturas"], date(2000, 1, 1), date(2100, 1, 1))
+    documentos = list(exportacion.iterar_documentos())
+
+    assert len(documentos) == len(numeros)
+    for plantilla, datos, nombre_archivo in documentos:
+        numero = numeros[datos['id_factura']] or f"#{anterior}"
+        assert datos['numero_factura'] == numero
+        assert nombre_archivo == "facturas/" + "factura_{}.pdf".format(numero.replace("#", "_"))
+        assert f">{numero}</p>" in MotorDocumentos.generar_html(plantilla, datos)
+
+    assert _renderizar_documento(*documentos[0][:2], None).startswith(b"%PDF")
+    assert errores_log == []
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Exportación de los listados (consulta_listar_* + COLUMNAS_EXPORTACION)
+contra el esquema real
+"""
+
+import csv
+import importlib
+
+import pytest
+
+from modulos.exportacion_LOGICA import ModuloExportacion
+
+
+LISTADOS = [
+    ("modulos.clientes", "ModuloClientes", "clientes"),
+    ("modulos.equipos_LOGICA", "ModuloEquipos", "equipos"),
+    ("modulos.presupuestos_LOGICA", "ModuloPresupuestos", "presupuestos"),
+    ("modulos.ordenes_LOGICA", "ModuloOrdenes", "ordenes"),
+    ("modulos.repuestos_LOGICA", "ModuloRepuestos", "repuestos"),
+    ("modulos.garantias_LOGICA", "ModuloGarantias", "garantias"),
+    ("modulos.usuarios", "ModuloUsuarios", "usuarios"),
+    ("modulos.remitos_LOGICA", "ModuloRemitos", "remitos"),
+]
+
+
+@pytest.mark.parametrize("modulo, clase, nombre", LISTADOS)
+def test_exportar_listado_a_csv(base, errores_log, tmp_path, modulo, clase, nombre):
+    if modulo == "modulos.usuarios":
+        pytest.importorskip("bcrypt")
+    clase = getattr(importlib.import_module(modulo), clase)
+    consulta, parametros = getattr(clase, f"consulta_listar_{nombre}")()
+    ruta = tmp_path / f"{nombre}.csv"
+
+    exito, mensaje, cantidad = ModuloExportacion.exportar_consulta(
+        consulta, parametros, clase.COLUMNAS_EXPORTACION, str(ruta)
+    )
+
+    assert exito, mensaje
+    assert cantidad == len(getattr(clase, f"listar_{nombre}")())
+    with open(ruta, encoding="utf-8-sig", newline="") as archivo:
+        filas = list(csv.reader(archivo))
+    assert filas[0] == [columna[1] for columna in clase.COLUMNAS_EXPORTACION]
+    assert len(filas) == cantidad + 1
+    assert errores_log == []
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+Listado y estadísticas de repuestos contra el esquema real
+"""
+
+from modulos.repuestos_LOGICA import ModuloRepuestos
+from sistema_base.constantes import CANTIDAD_MINIMA_STOCK_REPUESTOS
+
+
+def test_listado_y_estadisticas_de_repuestos(base, errores_log):
+    total = base.obtener_uno("SELECT COUNT(*) AS total FROM repuestos")['total']
+
+    repuestos = ModuloRepuestos.listar_repuestos()
+    estadisticas = ModuloRepuestos.obtener_estadisticas_repuestos()
+
+    assert len(repuestos) == total
+    assert estadisticas['total_items'] == total
+    assert estadisticas['stock_bajo'] == sum(
+        1 for repuesto in repuestos if repuesto['cantidad_disponible'] <= CANTIDAD_MINIMA_STOCK_REPUESTOS
+    )
+    assert errores_log == []
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Usuario reservado de las tareas automáticas: nunca modifica cuentas reales
+"""
+
+from base_datos.crear_tablas import crear_usuario_sistema, verificar_usuario_sistema
+from sistema_base.constantes import ID_USUARIO_SISTEMA, USERNAME_SISTEMA
+
+
+def _username(base, id_usuario):
+    return base.obtener_uno(
+        "SELECT username FROM usuarios WHERE id_usuario = ?", (id_usuario,)
+    )['username']
+
+
+def _crear_usuario(base, username):
+    return base.ejecutar_consulta(
+        "INSERT INTO usuarios (nombre, username, password_hash, rol) VALUES ('Real', ?, 'x', 'tecnico')",
+        (username,)
+    )
+
+
+def test_una_cuenta_real_llamada_sistema_no_se_toca(base, errores_log):
+    id_real = _crear_usuario(base, "sistema")
+
+    crear_usuario_sistema()
+
+    assert _username(base, id_real) == "sistema"
+    assert _username(base, ID_USUARIO_SISTEMA) == USERNAME_SISTEMA
+    assert verificar_usuario_sistema() == (True, "")
+    assert errores_log == []
+
+
+def test_migra_el_username_anterior_y_devuelve_el_renombrado(base, errores_log):
+    base.ejecutar_consulta(
+        "UPDATE usuarios SET username = 'sistema' WHERE id_usuario = ?", (ID_USUARIO_SISTEMA,)
+    )
+    id_real = _crear_usuario(base, "temporal")
+    base.ejecutar_consulta(
+        "UPDATE usuarios SET username = ? WHERE id_usuario = ?", (f"sistema_{id_real}", id_real)
+    )
+
+    crear_usuario_sistema()
+
+    assert _username(base, ID_USUARIO_SISTEMA) == USERNAME_SISTEMA
+    assert _username(base, id_real) == "sistema"
+    assert errores_log == []
+
+
+def test_id_reservado_ocupado_se_informa_sin_modificar(base, errores_log):
+    with base.transaccion() as cursor:
+        # La auditoría de la base sintética referencia al usuario reservado
+        cursor.execute("PRAGMA foreign_keys = OFF")
+        cursor.execute("DELETE FROM usuarios WHERE id_usuario = ?", (ID_USUARIO_SISTEMA,))
+        cursor.execute(
+            "INSERT INTO usuarios (id_usuario, nombre, username, password_hash, rol) "
+            "VALUES (?, 'Real', 'jperez', 'x', 'admin')",
+            (ID_USUARIO_SISTEMA,)
+        )
+
+    crear_usuario_sistema()
+
+    assert _username(base, ID_USUARIO_SISTEMA) == "jperez"
+    exito, mensaje = verificar_usuario_sistema()
+    assert not exito and "jperez" in mensaje
+    assert errores_log == [mensaje]
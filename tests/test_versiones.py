@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Listados por versión (listar_*_desde) contra el esquema real
+"""
+
+from modulos.ordenes_LOGICA import ModuloOrdenes
+from modulos.presupuestos_LOGICA import ModuloPresupuestos
+
+
+def test_listado_completo_de_ordenes(base, errores_log):
+    total = base.obtener_uno("SELECT COUNT(*) AS total FROM ordenes_trabajo")['total']
+    resultado = ModuloOrdenes.listar_ordenes_desde()
+
+    assert total > 0
+    assert len(resultado['cambios']) == total
+    assert resultado['eliminados'] == []
+    assert errores_log == []
+
+
+def test_cambios_de_ordenes_desde_una_version(base, errores_log):
+    version = ModuloOrdenes.listar_ordenes_desde()['version']
+    orden = base.obtener_uno("SELECT id_orden FROM ordenes_trabajo ORDER BY id_orden LIMIT 1")
+    base.ejecutar_consulta(
+        "UPDATE ordenes_trabajo SET observaciones_tecnicas = 'revisada' WHERE id_orden = ?",
+        (orden['id_orden'],)
+    )
+
+    resultado = ModuloOrdenes.listar_ordenes_desde(version)
+
+    assert [fila['id_orden'] for fila in resultado['cambios']] == [orden['id_orden']]
+    assert resultado['eliminados'] == []
+    assert resultado['version'] > version
+    assert errores_log == []
+
+
+def test_orden_que_deja_de_pasar_el_filtro(base, errores_log):
+    orden = base.obtener_uno("SELECT id_orden, estado FROM ordenes_trabajo ORDER BY id_orden LIMIT 1")
+    filtros = {'filtro_estado': orden['estado']}
+    version = ModuloOrdenes.listar_ordenes_desde(**filtros)['version']
+    base.ejecutar_consulta(
+        "UPDATE ordenes_trabajo SET estado = 'Pausada' WHERE id_orden = ?", (orden['id_orden'],)
+    )
+
+    resultado = ModuloOrdenes.listar_ordenes_desde(version, **filtros)
+
+    # Las demás órdenes del cliente vuelven como cambios: el trigger de
+    # resumen_clientes actualiza el cliente (ver base_datos.resumen_clientes)
+    assert resultado['eliminados'] == [orden['id_orden']]
+    assert all(fila['estado_orden'] == orden['estado'] for fila in resultado['cambios'])
+    assert errores_log == []
+
+
+def test_cambios_de_presupuestos(base, errores_log):
+    completo = ModuloPresupuestos.listar_presupuestos_desde()
+    total = base.obtener_uno("SELECT COUNT(*) AS total FROM presupuestos")['total']
+    assert total > 0
+    assert len(completo['cambios']) == total
+
+    presupuesto = completo['cambios'][0]
+    base.ejecutar_consulta(
+        "UPDATE presupuestos SET notas = 'llamar' WHERE id_presupuesto = ?",
+        (presupuesto['id_presupuesto'],)
+    )
+    resultado = ModuloPresupuestos.listar_presupuestos_desde(completo['version'])
+
+    assert [fila['id_presupuesto'] for fila in resultado['cambios']] == [presupuesto['id_presupuesto']]
+    assert resultado['eliminados'] == []
+    assert errores_log == []